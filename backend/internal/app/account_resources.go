@@ -0,0 +1,237 @@
+package app
+
+import (
+	"encoding/json"
+	"fmt"
+	"sort"
+	"strconv"
+	"sync"
+	"time"
+
+	ovhsdk "github.com/ovh/go-ovh/ovh"
+
+	"github.com/ovh-webui/server/internal/db"
+)
+
+const (
+	// resourceSyncMinInterval 两次增量同步的最小间隔；间隔内的请求直接读本地副本
+	resourceSyncMinInterval = 30 * time.Second
+	// resourceSyncMaxFetch 单次同步最多拉取的正文数：历史很长的账户首次同步分几次补齐，新的先拉
+	resourceSyncMaxFetch = 200
+	// resourceSyncConcurrency 同步时请求 OVH 的并发数
+	resourceSyncConcurrency = 10
+)
+
+// AccountResourceKind 一类"先列 ID、再逐条 GET 正文"的账户资源，本地副本存 ovh_account_resources
+type AccountResourceKind struct {
+	Name      string // ovh_account_resources.kind
+	ListPath  string // 列 ID 的路径；正文路径为 ListPath + "/" + id
+	SortField string // 正文里作为排序键的日期字段
+	// Final 正文是否已定稿（不会再变，之后不再重新拉）；nil 表示可变资源，每次同步都重新拉
+	Final func(body map[string]interface{}) bool
+}
+
+func alwaysFinal(map[string]interface{}) bool { return true }
+
+// 账单 / 退款 / 已发邮件生成后不会再变；联系人变更到 done / refused 后不再变；子账户描述可改，每次同步重拉
+var (
+	ResourceBills          = AccountResourceKind{Name: "bill", ListPath: "/me/bill", SortField: "date", Final: alwaysFinal}
+	ResourceRefunds        = AccountResourceKind{Name: "refund", ListPath: "/me/refund", SortField: "date", Final: alwaysFinal}
+	ResourceEmails         = AccountResourceKind{Name: "email", ListPath: "/me/notification/email/history", SortField: "date", Final: alwaysFinal}
+	ResourceContactChanges = AccountResourceKind{Name: "contact_change", ListPath: "/me/task/contactChange", SortField: "dateRequest", Final: contactChangeDone}
+	ResourceSubAccounts    = AccountResourceKind{Name: "sub_account", ListPath: "/me/subAccount", SortField: "creationDate"}
+)
+
+func contactChangeDone(body map[string]interface{}) bool {
+	st, _ := body["state"].(string)
+	return st == "done" || st == "refused"
+}
+
+// AccountResourceSync 一次 AccountResources 调用的同步情况
+type AccountResourceSync struct {
+	Synced  bool      // 本次是否请求了 OVH（false = 间隔内直接读本地）
+	At      time.Time // 最近一次同步完成时间
+	Fetched int       // 本次拉取的正文数
+	Pending int       // 还没拉到正文的 ID 数（超出单次上限或拉取失败，下次请求继续补）
+}
+
+type resourceSyncState struct {
+	mu      sync.Mutex
+	at      time.Time
+	pending int
+	// backfill 上次同步因单次上限留下了新 ID 且有进展：下次请求不等间隔继续补。
+	// 只有拉取失败的 ID（例如列表里有、正文 404）不算，仍按间隔重试，不会每次请求都打 OVH
+	backfill bool
+}
+
+// AccountResources 保证账户某类资源的本地副本是新的，之后由调用方 db.PageAccountResources 分页读取。
+// 距上次同步超过 resourceSyncMinInterval、首次同步还在分批补齐、或 force 时先增量同步：
+// 只列一次 ID，拉新出现的 ID 与未定稿资源的正文，OVH 已不再列出的从本地删除；
+// 已定稿的资源不会再请求 OVH。同步失败但本地有数据时返回本地数据的状态。
+func (s *State) AccountResources(accountID string, kind AccountResourceKind, client *ovhsdk.Client, force bool) (AccountResourceSync, error) {
+	st := s.resourceSyncStateFor(accountID, kind.Name)
+	st.mu.Lock()
+	defer st.mu.Unlock()
+
+	res := AccountResourceSync{At: st.at, Pending: st.pending}
+	if !force && !st.backfill && time.Since(st.at) < resourceSyncMinInterval {
+		return res, nil
+	}
+	fetched, overflow, failed, err := s.syncAccountResources(accountID, kind, client)
+	if err != nil {
+		known, lerr := s.DB.AccountResourceFinal(accountID, kind.Name)
+		if lerr != nil || len(known) == 0 {
+			return res, err
+		}
+		s.Logger.Warn(fmt.Sprintf("账户资源 %s 同步失败，返回本地数据: %s", kind.Name, err.Error()), "account_management")
+		return res, nil
+	}
+	st.at = time.Now()
+	st.pending = overflow + failed
+	st.backfill = overflow > 0 && fetched > 0
+	return AccountResourceSync{Synced: true, At: st.at, Fetched: fetched, Pending: st.pending}, nil
+}
+
+func (s *State) resourceSyncStateFor(accountID, kind string) *resourceSyncState {
+	key := accountID + "|" + kind
+	s.resourceSyncMu.Lock()
+	defer s.resourceSyncMu.Unlock()
+	st, ok := s.resourceSync[key]
+	if !ok {
+		st = &resourceSyncState{}
+		s.resourceSync[key] = st
+	}
+	return st
+}
+
+// syncAccountResources 增量同步一次，返回本次拉到的正文数、超出单次上限留到下次的新 ID 数、
+// 拉取失败的新 ID 数
+func (s *State) syncAccountResources(accountID string, kind AccountResourceKind, client *ovhsdk.Client) (fetched, overflow, failed int, err error) {
+	var rawIDs []interface{}
+	if err := client.Get(kind.ListPath, &rawIDs); err != nil {
+		return 0, 0, 0, err
+	}
+	listed := make([]string, 0, len(rawIDs))
+	for _, v := range rawIDs {
+		if id := resourceID(v); id != "" {
+			listed = append(listed, id)
+		}
+	}
+	known, err := s.DB.AccountResourceFinal(accountID, kind.Name)
+	if err != nil {
+		return 0, 0, 0, err
+	}
+	if kind.Final == nil {
+		// 可变资源：已有的也当未定稿重新拉
+		for id := range known {
+			known[id] = false
+		}
+	}
+	fetch, removed, overflow := planResourceSync(listed, known, resourceSyncMaxFetch)
+
+	rows := make([]db.AccountResourceRow, len(fetch))
+	ok := make([]bool, len(fetch))
+	sem := make(chan struct{}, resourceSyncConcurrency)
+	var wg sync.WaitGroup
+	for i, id := range fetch {
+		wg.Add(1)
+		sem <- struct{}{}
+		go func(i int, id string) {
+			defer wg.Done()
+			defer func() { <-sem }()
+			rows[i], ok[i] = fetchAccountResource(client, kind, id)
+		}(i, id)
+	}
+	wg.Wait()
+
+	got := rows[:0]
+	for i, r := range rows {
+		if ok[i] {
+			got = append(got, r)
+		} else if _, had := known[fetch[i]]; !had {
+			failed++ // 新 ID 拉取失败，下次同步再试
+		}
+	}
+	if err := s.DB.SyncAccountResources(accountID, kind.Name, got, removed); err != nil {
+		return 0, 0, 0, err
+	}
+	if len(got) > 0 || len(removed) > 0 || failed > 0 {
+		s.Logger.Info(fmt.Sprintf("账户资源 %s 同步: 拉取 %d 条，删除 %d 条，待补 %d 条，失败 %d 条",
+			kind.Name, len(got), len(removed), overflow, failed), "account_management")
+	}
+	return len(got), overflow, failed, nil
+}
+
+// fetchAccountResource 拉单条正文，取排序键并判断是否定稿
+func fetchAccountResource(client *ovhsdk.Client, kind AccountResourceKind, id string) (db.AccountResourceRow, bool) {
+	var body json.RawMessage
+	if err := client.Get(kind.ListPath+"/"+id, &body); err != nil {
+		return db.AccountResourceRow{}, false
+	}
+	var m map[string]interface{}
+	_ = json.Unmarshal(body, &m)
+	sortKey, _ := m[kind.SortField].(string)
+	final := 0
+	if kind.Final != nil && m != nil && kind.Final(m) {
+		final = 1
+	}
+	return db.AccountResourceRow{
+		ResID:     id,
+		SortKey:   sortKey,
+		Body:      string(body),
+		Final:     final,
+		FetchedAt: time.Now().UnixMilli(),
+	}, true
+}
+
+// planResourceSync 对比 OVH 列出的 ID 与本地副本（res_id → 是否定稿）：
+// fetch 为要拉正文的 ID（新出现的与未定稿的，按 ID 从新到旧，最多 max 个），
+// removed 为本地有但 OVH 已不再列出的 ID，pending 为超出 max、留到下次的新 ID 数
+// （超出的未定稿旧资源本地已有正文，不算待补）。
+func planResourceSync(listed []string, known map[string]bool, max int) (fetch, removed []string, pending int) {
+	seen := make(map[string]struct{}, len(listed))
+	for _, id := range listed {
+		if _, dup := seen[id]; dup {
+			continue
+		}
+		seen[id] = struct{}{}
+		if !known[id] {
+			fetch = append(fetch, id)
+		}
+	}
+	for id := range known {
+		if _, ok := seen[id]; !ok {
+			removed = append(removed, id)
+		}
+	}
+	sort.Strings(removed)
+	// 数字 ID 与同前缀的账单号（FR12345）都是递增分配：先比长度再比字典序即从新到旧
+	sort.Slice(fetch, func(i, j int) bool {
+		if len(fetch[i]) != len(fetch[j]) {
+			return len(fetch[i]) > len(fetch[j])
+		}
+		return fetch[i] > fetch[j]
+	})
+	if len(fetch) > max {
+		for _, id := range fetch[max:] {
+			if _, had := known[id]; !had {
+				pending++
+			}
+		}
+		fetch = fetch[:max]
+	}
+	return fetch, removed, pending
+}
+
+// resourceID 列表里的 ID 可能是字符串（账单 / 退款）或数字（邮件 / 任务 / 子账户，SDK 解成 json.Number）
+func resourceID(v interface{}) string {
+	switch x := v.(type) {
+	case string:
+		return x
+	case json.Number:
+		return x.String()
+	case float64:
+		return strconv.FormatFloat(x, 'f', -1, 64)
+	}
+	return ""
+}
@@ -0,0 +1,47 @@
+package app
+
+import (
+	"encoding/json"
+	"reflect"
+	"testing"
+)
+
+func TestPlanResourceSync(t *testing.T) {
+	// 本地：FR100（定稿）、FR101（未定稿）、FR050（OVH 已不再列出）
+	known := map[string]bool{"FR100": true, "FR101": false, "FR050": true}
+	listed := []string{"FR100", "FR101", "FR102", "FR99", "FR102", "FR1000"}
+
+	fetch, removed, pending := planResourceSync(listed, known, 10)
+	if !reflect.DeepEqual(fetch, []string{"FR1000", "FR102", "FR101", "FR99"}) {
+		t.Fatalf("fetch = %v", fetch)
+	}
+	if !reflect.DeepEqual(removed, []string{"FR050"}) || pending != 0 {
+		t.Fatalf("removed = %v, pending = %d", removed, pending)
+	}
+
+	// 超出上限：先拉新的；剩下的新 ID 计入 pending，本地已有的未定稿资源不算
+	fetch, _, pending = planResourceSync(listed, known, 2)
+	if !reflect.DeepEqual(fetch, []string{"FR1000", "FR102"}) || pending != 1 {
+		t.Fatalf("capped: fetch = %v, pending = %d", fetch, pending)
+	}
+
+	if fetch, removed, pending := planResourceSync([]string{"FR100"}, map[string]bool{"FR100": true}, 10); fetch != nil || removed != nil || pending != 0 {
+		t.Fatalf("up to date: fetch = %v, removed = %v, pending = %d", fetch, removed, pending)
+	}
+}
+
+func TestResourceID(t *testing.T) {
+	for _, tc := range []struct {
+		in   interface{}
+		want string
+	}{
+		{"FR123", "FR123"},
+		{json.Number("4567890"), "4567890"},
+		{float64(4567890), "4567890"},
+		{nil, ""},
+	} {
+		if got := resourceID(tc.in); got != tc.want {
+			t.Fatalf("resourceID(%v) = %q, want %q", tc.in, got, tc.want)
+		}
+	}
+}
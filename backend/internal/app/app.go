@@ -3,12 +3,15 @@ package app
 import (
 	"strings"
 	"sync"
+	"sync/atomic"
 	"time"
 
 	"github.com/google/uuid"
 
+	"github.com/ovh-webui/server/internal/cluster"
 	"github.com/ovh-webui/server/internal/config"
 	"github.com/ovh-webui/server/internal/db"
+	"github.com/ovh-webui/server/internal/events"
 	"github.com/ovh-webui/server/internal/logger"
 	"github.com/ovh-webui/server/internal/ovh"
 	"github.com/ovh-webui/server/internal/storage"
@@ -64,10 +67,19 @@ type State struct {
 	Logger      *logger.Logger
 	ServerCache *ServerListCache
 	DB          *db.DB // SQLite 持久化层
+	Startup     *Readiness
+	Events      *events.Broker // 状态变化推送（/api/events），见 events.go
+
+	// 非关键数据懒加载：首次使用时才从 SQLite 读（见 EnsureServerCatalog / ensureHistoryCounters）
+	serversOnce sync.Once
+	historyOnce sync.Once
 
 	APIKey string
 	Port   string
 
+	// CatalogMmap 启动读服务器目录快照时用内存映射（CATALOG_SNAPSHOT_MMAP=true）
+	CatalogMmap bool
+
 	// 多账户:内存里持有全部 OVH 账户副本(启动从 SQLite 加载),
 	// OVH Factory 通过 FindAccount 闭包按 id 查询
 	AccountsMu sync.RWMutex
@@ -76,11 +88,32 @@ type State struct {
 	QueueMu sync.Mutex
 	Queue   []types.QueueItem
 
+	// 抢购历史明细只在 SQLite（见 history.go），内存只留增量计数器；
+	// HistoryMu 串行化单条历史的读-改-写与计数器更新
 	HistoryMu sync.Mutex
-	History   []types.PurchaseHistoryEntry
+	history   historyCounters
 
 	ServerPlansMu sync.RWMutex
 	ServerPlans   []types.ServerPlan
+	// 目录增量比较用的指纹表 + 变化回调（见 catalog_diff.go），同样由 ServerPlansMu 保护
+	catalogIndex map[string]planFingerprint
+	catalogHooks []func(CatalogDiff)
+
+	// 各账户独服详情缓存（见 inventory.go），accountID → 缓存
+	inventoryMu  sync.Mutex
+	inventory    map[string]*accountInventory
+	inventorySem chan struct{}
+
+	// 订单索引的按账户同步状态（见 order_index.go）
+	orderSyncMu sync.Mutex
+	orderSync   map[string]*orderSyncState
+
+	// 账单 / 退款 / 邮件等账户资源本地副本的同步状态（见 account_resources.go），"accountID|kind" → 状态
+	resourceSyncMu sync.Mutex
+	resourceSync   map[string]*resourceSyncState
+
+	// 独服安装模板详情（见 os_templates.go），全局共享
+	osTemplates osTemplateCache
 
 	DeletedTaskIDsMu sync.Mutex
 	DeletedTaskIDs   map[string]struct{}
@@ -92,9 +125,24 @@ type State struct {
 	MonitorRunning        bool
 	QueueProcessorRunning bool
 
-	// 串行化全表 Replace 落盘，避免并发 SaveHistory/SaveQueue 快照互相覆盖丢数据
-	historyPersistMu sync.Mutex
-	queuePersistMu   sync.Mutex
+	// 串行化全表 Replace 落盘，避免并发 SaveQueue 快照互相覆盖丢数据
+	queuePersistMu sync.Mutex
+	// 上次 SaveQueue 时的队列（id → 任务），用来算队列事件；由 queuePersistMu 保护
+	queueSeen map[string]types.QueueItem
+	// 集群模式下本实例落过盘的任务 id（落盘成功的快照 + 加载 / 接管的），由 queuePersistMu 保护：
+	// 这些任务库里已不归本实例时 SaveQueue 不会再写回
+	queuePersisted map[string]bool
+	// 串行化 SaveServers：整表 Replace、读回时间戳、写目录快照作为一个整体，
+	// 避免并发保存留下 A 的快照配 B 的时间戳
+	serversPersistMu sync.Mutex
+
+	// Cluster 多实例分片协调（CLUSTER_MODE=true 时由 main 注入，否则为 nil，见 cluster.go）
+	Cluster *cluster.Coordinator
+	// 队列循环上次见到的协调 Epoch，变化即重新加载队列
+	clusterQueueEpoch atomic.Int64
+
+	// 统计事件的数据来源（main 注入，需要 monitor 状态）
+	statsSource atomic.Value // func() interface{}
 }
 
 // NewState 构造应用状态。DB 必须已 Open。
@@ -105,20 +153,34 @@ func NewState(paths storage.Paths, cfg *config.Store, lg *logger.Logger, sqliteD
 		Logger:                lg,
 		ServerCache:           NewServerListCache(),
 		DB:                    sqliteDB,
+		Startup:               NewReadiness(),
+		Events:                events.NewBroker(),
 		DeletedTaskIDs:        make(map[string]struct{}),
+		inventory:             map[string]*accountInventory{},
+		inventorySem:          make(chan struct{}, inventoryRefreshWorkers),
+		orderSync:             map[string]*orderSyncState{},
+		resourceSync:          map[string]*resourceSyncState{},
 		Accounts:              []types.OVHAccount{},
 		Queue:                 []types.QueueItem{},
-		History:               []types.PurchaseHistoryEntry{},
 		ServerPlans:           []types.ServerPlan{},
 		VPSSubscriptions:      []types.VPSSubscription{},
 		VPSCheckInterval:      60,
 		QueueProcessorRunning: true,
 	}
 	// Factory 闭包注入 lookup,允许按 id 查账户(空 id → 默认)
-	s.OVH = ovh.NewFactory(cfg, s.FindAccount)
+	s.OVH = ovh.NewFactory(cfg, s.FindAccount, s.accountsSnapshot)
 	return s
 }
 
+// accountsSnapshot 全部账户副本（OVH Factory 做只读查询分流用）
+func (s *State) accountsSnapshot() []types.OVHAccount {
+	s.AccountsMu.RLock()
+	defer s.AccountsMu.RUnlock()
+	out := make([]types.OVHAccount, len(s.Accounts))
+	copy(out, s.Accounts)
+	return out
+}
+
 // HasAnyAccount 是否至少有一个 OVH 账户。
 // 多账户场景下,旧的 state.Config.HasCredentials() 不再可靠(新用户的 kv['config'] 可能为空),
 // 凡是判断"系统能不能调 OVH"都应该走这个。
@@ -170,75 +232,152 @@ func (s *State) ReloadAccounts() error {
 	return nil
 }
 
-// LoadAll 启动时从 SQLite 加载全部持久化数据到内存。
+// LoadAll 启动时从 SQLite 加载关键持久化数据到内存。
 // 列表字段保证非 nil（JSON 序列化为 [] 而非 null）。
-func (s *State) LoadAll() {
-	// accounts: 必须最先加载,因为别的数据/loop 都按 account_id 索引
+//
+// 依赖顺序：accounts 必须最先（老用户迁移会回填 queue/history 的 account_id），
+// 之后 queue / vps 以及调用方传入的 extra 阶段（monitor 订阅）互不依赖，并发加载。
+// history 计数器与服务器目录不在这里加载：首次使用时才读（EnsureServerCatalog / ensureHistoryCounters）。
+func (s *State) LoadAll(extra map[string]func() error) {
+	s.Startup.Register("accounts", true)
+	s.Startup.Register("queue", true)
+	s.Startup.Register("vps", true)
+	for name := range extra {
+		s.Startup.Register(name, true)
+	}
+	s.Startup.Register("history", false)
+	s.Startup.Register("servers", false)
+
+	_ = s.Startup.Run("accounts", s.loadAccounts)
+	steps := map[string]func() error{
+		"queue": s.loadQueue,
+		"vps":   s.loadVPS,
+	}
+	for name, fn := range extra {
+		steps[name] = fn
+	}
+	s.Startup.RunParallel(steps)
+}
+
+func (s *State) loadAccounts() error {
 	s.migrateLegacyConfigToAccount() // 老用户从 kv['config'] 自动建默认账户
-	if accs, err := s.DB.ListAccounts(); err == nil {
-		if accs == nil {
-			accs = []types.OVHAccount{}
-		}
-		s.AccountsMu.Lock()
-		s.Accounts = accs
-		s.AccountsMu.Unlock()
-		s.Logger.Info("已加载 OVH 账户: "+intStr(len(accs))+" 个", "system")
-	} else {
+	accs, err := s.DB.ListAccounts()
+	if err != nil {
 		s.Logger.Error("load accounts: "+err.Error(), "system")
+		return err
 	}
-
-	// queue
-	if items, err := s.DB.ListQueue(); err == nil {
-		s.Queue = items
-	} else {
-		s.Logger.Error("load queue: "+err.Error(), "system")
-	}
-	if s.Queue == nil {
-		s.Queue = []types.QueueItem{}
+	if accs == nil {
+		accs = []types.OVHAccount{}
 	}
+	s.AccountsMu.Lock()
+	s.Accounts = accs
+	s.AccountsMu.Unlock()
+	s.Logger.Info("已加载 OVH 账户: "+intStr(len(accs))+" 个", "system")
+	return nil
+}
 
-	// history
-	if items, err := s.DB.ListHistory(); err == nil {
-		s.History = items
+func (s *State) loadQueue() error {
+	var items []types.QueueItem
+	var err error
+	if owner := s.queueOwner(); owner != "" {
+		items, err = s.DB.ListQueueOwned(owner)
 	} else {
-		s.Logger.Error("load history: "+err.Error(), "system")
+		items, err = s.DB.ListQueue()
 	}
-	if s.History == nil {
-		s.History = []types.PurchaseHistoryEntry{}
+	if err != nil {
+		s.Logger.Error("load queue: "+err.Error(), "system")
 	}
-
-	// servers
-	if plans, err := s.DB.ListServers(); err == nil && len(plans) > 0 {
-		s.ServerPlans = plans
-		// 用 SQLite 里真实的 updated_at 重建缓存时间戳，
-		// 这样过期的旧数据下次访问能正确触发刷新；NOW 会导致旧数据被当作"刚刷的"。
-		if tsMs, err := s.DB.ServersUpdatedAt(); err == nil && tsMs > 0 {
-			s.ServerCache.SetAt(plans, time.UnixMilli(tsMs))
-		} else {
-			s.ServerCache.Set(plans)
-		}
-		s.Logger.Info("已从 SQLite 加载服务器目录并同步到缓存", "system")
-	} else if err != nil {
-		s.Logger.Error("load servers: "+err.Error(), "system")
+	if items == nil {
+		items = []types.QueueItem{}
 	}
-	if s.ServerPlans == nil {
-		s.ServerPlans = []types.ServerPlan{}
+	s.QueueMu.Lock()
+	s.Queue = items
+	s.QueueMu.Unlock()
+	s.queuePersistMu.Lock()
+	s.queueSeen = queueIndex(items)
+	s.queuePersisted = make(map[string]bool, len(items))
+	for _, it := range items {
+		s.queuePersisted[it.ID] = true
 	}
+	s.queuePersistMu.Unlock()
+	return err
+}
 
-	// vps subscriptions
-	if subs, err := s.DB.ListVPSSubscriptions(); err == nil {
-		s.VPSSubscriptions = subs
-	} else {
+func (s *State) loadVPS() error {
+	subs, err := s.DB.ListVPSSubscriptions()
+	if err != nil {
 		s.Logger.Error("load vps subs: "+err.Error(), "system")
 	}
-	if s.VPSSubscriptions == nil {
-		s.VPSSubscriptions = []types.VPSSubscription{}
+	if subs == nil {
+		subs = []types.VPSSubscription{}
 	}
+	s.VPSSubsMu.Lock()
+	s.VPSSubscriptions = subs
 	// vps check interval 存 kv
 	var ci int
 	if ok, _ := s.DB.GetKV("vps_check_interval", &ci); ok && ci > 0 {
 		s.VPSCheckInterval = ci
 	}
+	s.VPSSubsMu.Unlock()
+	return err
+}
+
+// EnsureServerCatalog 首次使用服务器目录（ServerPlans / ServerCache）前调用，
+// 只在第一次从 SQLite 回灌；之后是空操作。读写 ServerPlans 的入口都要先调它。
+func (s *State) EnsureServerCatalog() {
+	s.serversOnce.Do(func() {
+		_ = s.Startup.Run("servers", s.loadServers)
+	})
+}
+
+// serverSnapshotFile 服务器目录二进制快照（见 storage/snapshot.go），与 SQLite servers 表同步写
+const serverSnapshotFile = "servers.snap"
+
+// ServerSnapshotPath 快照文件路径（缓存目录下）
+func (s *State) ServerSnapshotPath() string {
+	return s.Paths.CacheFile(serverSnapshotFile)
+}
+
+func (s *State) loadServers() error {
+	tsMs, err := s.DB.ServersUpdatedAt()
+	if err != nil {
+		s.Logger.Error("load servers: "+err.Error(), "system")
+		return err
+	}
+	if tsMs == 0 {
+		return nil
+	}
+	// 快照时间戳与 servers 表一致才用，否则（没刷新过快照 / 表被外部清过）回退 SQLite 逐行 JSON
+	plans, snapTs, ok, err := storage.ReadServerSnapshot(s.ServerSnapshotPath(), s.CatalogMmap)
+	if err != nil {
+		s.Logger.Warn("读取服务器目录快照失败，回退 SQLite: "+err.Error(), "system")
+	}
+	fromSnapshot := ok && snapTs == tsMs
+	if !fromSnapshot {
+		if plans, err = s.DB.ListServers(); err != nil {
+			s.Logger.Error("load servers: "+err.Error(), "system")
+			return err
+		}
+		if len(plans) == 0 {
+			return nil
+		}
+		// 补一份快照，下次启动直接走快照
+		if err := storage.WriteServerSnapshot(s.ServerSnapshotPath(), plans, tsMs); err != nil {
+			s.Logger.Warn("写服务器目录快照失败: "+err.Error(), "system")
+		}
+	}
+	s.ServerPlansMu.Lock()
+	s.ServerPlans = plans
+	s.ServerPlansMu.Unlock()
+	// 用 SQLite 里真实的 updated_at 重建缓存时间戳，
+	// 这样过期的旧数据下次访问能正确触发刷新；NOW 会导致旧数据被当作"刚刷的"。
+	s.ServerCache.SetAt(plans, time.UnixMilli(tsMs))
+	if fromSnapshot {
+		s.Logger.Info("已从目录快照加载服务器目录并同步到缓存", "system")
+	} else {
+		s.Logger.Info("已从 SQLite 加载服务器目录并同步到缓存", "system")
+	}
+	return nil
 }
 
 // CountActiveQueues 统计未完成的队列项
@@ -256,6 +395,7 @@ func (s *State) CountActiveQueues() int {
 
 // CountAvailableServers 统计有库存的型号
 func (s *State) CountAvailableServers() int {
+	s.EnsureServerCatalog()
 	s.ServerPlansMu.RLock()
 	defer s.ServerPlansMu.RUnlock()
 	cnt := 0
@@ -270,19 +410,12 @@ func (s *State) CountAvailableServers() int {
 	return cnt
 }
 
-// CountPurchase 统计成功/失败订单数
+// CountPurchase 统计成功/失败订单数（增量计数器，O(1)）
 func (s *State) CountPurchase() (success, failed int) {
+	s.ensureHistoryCounters()
 	s.HistoryMu.Lock()
 	defer s.HistoryMu.Unlock()
-	for _, h := range s.History {
-		switch h.Status {
-		case "success":
-			success++
-		case "failed":
-			failed++
-		}
-	}
-	return
+	return s.history.success, s.history.failed
 }
 
 // SaveQueue 把内存中 Queue 整表覆盖写入 SQLite（串行化，取最新快照）
@@ -293,27 +426,43 @@ func (s *State) SaveQueue() error {
 	cp := make([]types.QueueItem, len(s.Queue))
 	copy(cp, s.Queue)
 	s.QueueMu.Unlock()
+	s.publishQueueDiff(cp)
+	if owner := s.queueOwner(); owner != "" {
+		if err := s.DB.ReplaceQueueOwned(owner, cp, s.queuePersisted); err != nil {
+			return err
+		}
+		// 只留当前队列里的 id：移出内存队列的任务不会再被保存
+		persisted := make(map[string]bool, len(cp))
+		for _, it := range cp {
+			persisted[it.ID] = true
+		}
+		s.queuePersisted = persisted
+		return nil
+	}
 	return s.DB.ReplaceQueue(cp)
 }
 
-// SaveHistory 把内存中 History 整表覆盖写入 SQLite（串行化，取最新快照）
-func (s *State) SaveHistory() error {
-	s.historyPersistMu.Lock()
-	defer s.historyPersistMu.Unlock()
-	s.HistoryMu.Lock()
-	cp := make([]types.PurchaseHistoryEntry, len(s.History))
-	copy(cp, s.History)
-	s.HistoryMu.Unlock()
-	return s.DB.ReplaceHistory(cp)
-}
-
-// SaveServers 把内存中 ServerPlans 整表覆盖写入 SQLite
+// SaveServers 把内存中 ServerPlans 整表覆盖写入 SQLite，并用同一时间戳写目录快照。
+// 快照只是启动加速缓存，写失败只记日志。
 func (s *State) SaveServers() error {
+	s.EnsureServerCatalog()
+	s.serversPersistMu.Lock()
+	defer s.serversPersistMu.Unlock()
 	s.ServerPlansMu.RLock()
 	cp := make([]types.ServerPlan, len(s.ServerPlans))
 	copy(cp, s.ServerPlans)
 	s.ServerPlansMu.RUnlock()
-	return s.DB.ReplaceServers(cp)
+	if err := s.DB.ReplaceServers(cp); err != nil {
+		return err
+	}
+	tsMs, err := s.DB.ServersUpdatedAt()
+	if err == nil {
+		err = storage.WriteServerSnapshot(s.ServerSnapshotPath(), cp, tsMs)
+	}
+	if err != nil {
+		s.Logger.Warn("写服务器目录快照失败: "+err.Error(), "system")
+	}
+	return nil
 }
 
 // migrateLegacyConfigToAccount 老用户升级:如果 SQLite 里没账户但 kv['config'] 有
@@ -389,14 +538,11 @@ func intStr(n int) string {
 	return string(digits)
 }
 
-// SaveAll 一次性保存所有数据
+// SaveAll 一次性保存所有数据（history 逐条实时落库，无需在此保存）
 func (s *State) SaveAll() {
 	if err := s.SaveQueue(); err != nil {
 		s.Logger.Error("save queue: "+err.Error(), "system")
 	}
-	if err := s.SaveHistory(); err != nil {
-		s.Logger.Error("save history: "+err.Error(), "system")
-	}
 	if err := s.SaveServers(); err != nil {
 		s.Logger.Error("save servers: "+err.Error(), "system")
 	}
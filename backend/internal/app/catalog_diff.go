@@ -0,0 +1,246 @@
+package app
+
+import (
+	"hash/fnv"
+	"sort"
+
+	"github.com/ovh-webui/server/internal/types"
+)
+
+// planFingerprint 单个 plan 的分段哈希：硬件描述 / 机房集合 / 选项集合。
+// 刷新时只比较三个 uint64，只有哈希不同的 plan 才去算具体增删了哪些机房和选项。
+type planFingerprint struct {
+	info        uint64
+	datacenters uint64
+	options     uint64
+}
+
+// CatalogDiff 一次目录刷新的差异。Baseline=true 表示之前没有目录（首次加载 / 清过缓存），
+// 此时不产生变更记录，避免整份目录都被当成"新上架"。
+type CatalogDiff struct {
+	At       string
+	Baseline bool
+	Changes  []types.CatalogChange
+}
+
+func hashStrings(parts ...string) uint64 {
+	h := fnv.New64a()
+	for _, p := range parts {
+		_, _ = h.Write([]byte(p))
+		_, _ = h.Write([]byte{0})
+	}
+	return h.Sum64()
+}
+
+// planDatacenters 机房代码集合（排序去重，不含库存状态）
+func planDatacenters(p *types.ServerPlan) []string {
+	out := make([]string, 0, len(p.Datacenters))
+	for _, dc := range p.Datacenters {
+		out = append(out, dc.Datacenter)
+	}
+	return sortedUnique(out)
+}
+
+// planOptions 可选 + 默认选项集合（默认项加 * 前缀区分，默认配置变化也算选项变化）
+func planOptions(p *types.ServerPlan) []string {
+	out := make([]string, 0, len(p.AvailableOptions)+len(p.DefaultOptions))
+	for _, o := range p.AvailableOptions {
+		out = append(out, o.Value)
+	}
+	for _, o := range p.DefaultOptions {
+		out = append(out, "*"+o.Value)
+	}
+	return sortedUnique(out)
+}
+
+func sortedUnique(in []string) []string {
+	sort.Strings(in)
+	out := in[:0]
+	for i, s := range in {
+		if i == 0 || s != in[i-1] {
+			out = append(out, s)
+		}
+	}
+	return out
+}
+
+func fingerprintPlan(p *types.ServerPlan) planFingerprint {
+	return planFingerprint{
+		info:        hashStrings(p.Name, p.Description, p.CPU, p.Memory, p.Storage, p.Bandwidth, p.VrackBandwidth),
+		datacenters: hashStrings(planDatacenters(p)...),
+		options:     hashStrings(planOptions(p)...),
+	}
+}
+
+func indexCatalog(plans []types.ServerPlan) map[string]planFingerprint {
+	idx := make(map[string]planFingerprint, len(plans))
+	for i := range plans {
+		idx[plans[i].PlanCode] = fingerprintPlan(&plans[i])
+	}
+	return idx
+}
+
+// setDelta 两个已排序集合的差：added = b-a，removed = a-b
+func setDelta(a, b []string) (added, removed []string) {
+	i, j := 0, 0
+	for i < len(a) || j < len(b) {
+		switch {
+		case j >= len(b) || (i < len(a) && a[i] < b[j]):
+			removed = append(removed, a[i])
+			i++
+		case i >= len(a) || b[j] < a[i]:
+			added = append(added, b[j])
+			j++
+		default:
+			i++
+			j++
+		}
+	}
+	return added, removed
+}
+
+// diffCatalog 用旧指纹表比较新目录，返回新指纹表和变化列表（added / changed 按新目录顺序，removed 在后）。
+// 旧 plan 明细只在指纹不同时才按 planCode 查找。
+func diffCatalog(oldPlans []types.ServerPlan, oldIdx map[string]planFingerprint, newPlans []types.ServerPlan, at string) (map[string]planFingerprint, []types.CatalogChange) {
+	newIdx := make(map[string]planFingerprint, len(newPlans))
+	var changes []types.CatalogChange
+	var oldByCode map[string]*types.ServerPlan
+	oldPlan := func(code string) *types.ServerPlan {
+		if oldByCode == nil {
+			oldByCode = make(map[string]*types.ServerPlan, len(oldPlans))
+			for i := range oldPlans {
+				oldByCode[oldPlans[i].PlanCode] = &oldPlans[i]
+			}
+		}
+		return oldByCode[code]
+	}
+
+	for i := range newPlans {
+		p := &newPlans[i]
+		fp := fingerprintPlan(p)
+		newIdx[p.PlanCode] = fp
+		prev, existed := oldIdx[p.PlanCode]
+		if !existed {
+			changes = append(changes, types.CatalogChange{At: at, PlanCode: p.PlanCode, Kind: "added", Name: p.Name})
+			continue
+		}
+		if prev == fp {
+			continue
+		}
+		c := types.CatalogChange{At: at, PlanCode: p.PlanCode, Kind: "changed", Name: p.Name}
+		op := oldPlan(p.PlanCode)
+		if prev.info != fp.info {
+			c.Fields = append(c.Fields, "info")
+		}
+		if prev.datacenters != fp.datacenters {
+			c.Fields = append(c.Fields, "datacenters")
+			if op != nil {
+				c.AddedDatacenters, c.RemovedDatacenters = setDelta(planDatacenters(op), planDatacenters(p))
+			}
+		}
+		if prev.options != fp.options {
+			c.Fields = append(c.Fields, "options")
+			if op != nil {
+				c.AddedOptions, c.RemovedOptions = setDelta(planOptions(op), planOptions(p))
+			}
+		}
+		changes = append(changes, c)
+	}
+	for code := range oldIdx {
+		if _, ok := newIdx[code]; !ok {
+			name := ""
+			if op := oldPlan(code); op != nil {
+				name = op.Name
+			}
+			changes = append(changes, types.CatalogChange{At: at, PlanCode: code, Kind: "removed", Name: name})
+		}
+	}
+	// removed 来自 map 遍历，按 planCode 排一下保证日志稳定
+	sort.SliceStable(changes, func(i, j int) bool {
+		ri, rj := changes[i].Kind == "removed", changes[j].Kind == "removed"
+		if ri != rj {
+			return !ri
+		}
+		return ri && changes[i].PlanCode < changes[j].PlanCode
+	})
+	return newIdx, changes
+}
+
+// OnCatalogDiff 注册目录变化回调（启动时由 main 注册，例如监控的上新 / 选项变更提醒）
+func (s *State) OnCatalogDiff(fn func(CatalogDiff)) {
+	s.ServerPlansMu.Lock()
+	s.catalogHooks = append(s.catalogHooks, fn)
+	s.ServerPlansMu.Unlock()
+}
+
+// ReplaceServerCatalog 用刷新得到的新目录替换 ServerPlans / ServerCache 并落盘，
+// 同时与旧目录做增量比较：变化写入 catalog_changes 并通知已注册的回调。
+func (s *State) ReplaceServerCatalog(plans []types.ServerPlan) CatalogDiff {
+	s.EnsureServerCatalog()
+	at := types.NowISO()
+
+	s.ServerPlansMu.Lock()
+	old := s.ServerPlans
+	oldIdx := s.catalogIndex
+	if oldIdx == nil {
+		oldIdx = indexCatalog(old)
+	}
+	newIdx, changes := diffCatalog(old, oldIdx, plans, at)
+	s.ServerPlans = plans
+	s.catalogIndex = newIdx
+	hooks := s.catalogHooks
+	s.ServerPlansMu.Unlock()
+
+	s.ServerCache.Set(plans)
+	if err := s.SaveServers(); err != nil {
+		s.Logger.Error("save servers: "+err.Error(), "system")
+	}
+	s.TouchStats()
+
+	diff := CatalogDiff{At: at, Baseline: len(old) == 0}
+	if diff.Baseline || len(changes) == 0 {
+		return diff
+	}
+	if err := s.DB.AppendCatalogChanges(changes); err != nil {
+		s.Logger.Error("写目录变更日志失败: "+err.Error(), "system")
+	}
+	diff.Changes = changes
+	s.Logger.Info("服务器目录变化: "+intStr(len(changes))+" 个型号", "system")
+	// 回调里可能发 Telegram，不阻塞刷新请求
+	for _, fn := range hooks {
+		go fn(diff)
+	}
+	return diff
+}
+
+// ResetServerCatalog 清空内存目录（缓存管理"清除内存缓存"），下次刷新视为基线，不产生变更记录
+func (s *State) ResetServerCatalog() {
+	s.EnsureServerCatalog()
+	s.ServerPlansMu.Lock()
+	s.ServerPlans = []types.ServerPlan{}
+	s.catalogIndex = nil
+	s.ServerPlansMu.Unlock()
+	s.ServerCache.Set(nil)
+	s.ServerCache.Timestamp = nil
+}
+
+// FindServerPlan 按 planCode 查当前目录中的 plan
+func (s *State) FindServerPlan(planCode string) (types.ServerPlan, bool) {
+	s.EnsureServerCatalog()
+	s.ServerPlansMu.RLock()
+	defer s.ServerPlansMu.RUnlock()
+	for _, p := range s.ServerPlans {
+		if p.PlanCode == planCode {
+			return p, true
+		}
+	}
+	return types.ServerPlan{}, false
+}
+
+// ServerPlanCount 当前目录中的 plan 数（监控状态里的 known_servers_count）
+func (s *State) ServerPlanCount() int {
+	s.EnsureServerCatalog()
+	s.ServerPlansMu.RLock()
+	defer s.ServerPlansMu.RUnlock()
+	return len(s.ServerPlans)
+}
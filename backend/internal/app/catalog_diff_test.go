@@ -0,0 +1,71 @@
+package app
+
+import (
+	"reflect"
+	"testing"
+
+	"github.com/ovh-webui/server/internal/types"
+)
+
+func testPlan(code string, dcs []string, opts ...string) types.ServerPlan {
+	p := types.ServerPlan{PlanCode: code, Name: code, CPU: "Xeon"}
+	for _, dc := range dcs {
+		p.Datacenters = append(p.Datacenters, types.Datacenter{Datacenter: dc, Availability: "unavailable"})
+	}
+	for _, o := range opts {
+		p.AvailableOptions = append(p.AvailableOptions, types.ServerOption{Label: o, Value: o})
+	}
+	return p
+}
+
+func TestSetDelta(t *testing.T) {
+	added, removed := setDelta([]string{"a", "c", "d"}, []string{"b", "c", "e"})
+	if !reflect.DeepEqual(added, []string{"b", "e"}) || !reflect.DeepEqual(removed, []string{"a", "d"}) {
+		t.Fatalf("added=%v removed=%v", added, removed)
+	}
+	if a, r := setDelta(nil, nil); a != nil || r != nil {
+		t.Fatalf("empty sets: added=%v removed=%v", a, r)
+	}
+}
+
+func TestDiffCatalog(t *testing.T) {
+	old := []types.ServerPlan{
+		testPlan("ks-1", []string{"gra", "rbx"}, "ram-32g"),
+		testPlan("ks-2", []string{"bhs"}),
+		testPlan("ks-3", []string{"sbg"}),
+	}
+	next := []types.ServerPlan{
+		testPlan("ks-1", []string{"gra", "waw"}, "ram-32g", "ram-64g"),
+		testPlan("ks-3", []string{"sbg"}),
+		testPlan("ks-4", []string{"gra"}),
+	}
+	// 仅库存状态变化不算目录变化
+	next[1].Datacenters[0].Availability = "1H-low"
+
+	idx, changes := diffCatalog(old, indexCatalog(old), next, "t")
+	if len(idx) != 3 {
+		t.Fatalf("index size = %d", len(idx))
+	}
+	if len(changes) != 3 {
+		t.Fatalf("changes = %+v", changes)
+	}
+	c := changes[0]
+	if c.PlanCode != "ks-1" || c.Kind != "changed" ||
+		!reflect.DeepEqual(c.Fields, []string{"datacenters", "options"}) ||
+		!reflect.DeepEqual(c.AddedDatacenters, []string{"waw"}) ||
+		!reflect.DeepEqual(c.RemovedDatacenters, []string{"rbx"}) ||
+		!reflect.DeepEqual(c.AddedOptions, []string{"ram-64g"}) || c.RemovedOptions != nil {
+		t.Fatalf("changed = %+v", c)
+	}
+	if changes[1].PlanCode != "ks-4" || changes[1].Kind != "added" {
+		t.Fatalf("added = %+v", changes[1])
+	}
+	if changes[2].PlanCode != "ks-2" || changes[2].Kind != "removed" || changes[2].Name != "ks-2" {
+		t.Fatalf("removed = %+v", changes[2])
+	}
+
+	// 同一份目录再比一次：无变化
+	if _, again := diffCatalog(next, idx, next, "t"); len(again) != 0 {
+		t.Fatalf("unchanged catalog produced %+v", again)
+	}
+}
@@ -0,0 +1,159 @@
+package app
+
+import (
+	"fmt"
+	"time"
+
+	"github.com/ovh-webui/server/internal/types"
+)
+
+const (
+	// queueOrphanGraceTTLs 实例心跳中断超过这么多个租约时长，它名下的队列任务才会被接管。
+	// 远大于租约有效期：被接管方在 Fresh() 失效后就不再下单，两者之间留足余量。
+	queueOrphanGraceTTLs = 3
+	// queueAttemptClaimTTL 每次尝试下单前认领任务的时长：期间其它实例不能对同一任务下单，
+	// 需大于单次 PurchaseServer 的最长耗时
+	queueAttemptClaimTTL = 5 * time.Minute
+	// queueTombstoneTTL 已完成任务的墓碑保留时长，远大于任何实例可能失联后恢复的时间
+	queueTombstoneTTL = 7 * 24 * time.Hour
+)
+
+// ClusterOwns 集群模式下 key 所在分片是否归本实例；单实例模式总是 true
+func (s *State) ClusterOwns(key string) bool {
+	return s.Cluster == nil || s.Cluster.Owns(key)
+}
+
+// ClusterClaim 集群模式下一次性认领 key（ttl 内别的实例认领失败）；单实例模式总是 true
+func (s *State) ClusterClaim(key string, ttl time.Duration) bool {
+	return s.Cluster == nil || s.Cluster.Claim(key, ttl)
+}
+
+// queueOwner 集群模式下本实例写入队列行的 owner；单实例为空
+func (s *State) queueOwner() string {
+	if s.Cluster == nil {
+		return ""
+	}
+	return s.Cluster.ID()
+}
+
+// SyncClusterQueue 集群模式下队列循环每轮调用：
+//   - 本实例曾失联（Epoch 变化）时丢弃内存队列，从库里重新加载仍归自己的任务，
+//     失联期间被别的实例接管的任务不会再在这里下单；
+//   - 接管心跳中断超过 queueOrphanGraceTTLs 个租约时长的实例名下的任务。
+func (s *State) SyncClusterQueue() {
+	if s.Cluster == nil {
+		return
+	}
+	owner := s.Cluster.ID()
+	if epoch := s.Cluster.Epoch(); epoch != s.clusterQueueEpoch.Load() {
+		s.clusterQueueEpoch.Store(epoch)
+		if err := s.loadQueue(); err == nil {
+			s.Logger.Warn("集群协调曾中断，已按库中归属重新加载队列", "queue")
+		}
+	}
+	if !s.Cluster.Fresh(time.Now()) {
+		return
+	}
+	live, err := s.Cluster.Members(queueOrphanGraceTTLs * s.Cluster.TTL())
+	if err != nil {
+		return
+	}
+	n, err := s.DB.AdoptQueue(owner, live)
+	if err != nil {
+		s.Logger.Warn("接管失联实例的队列任务失败: "+err.Error(), "queue")
+		return
+	}
+	if n == 0 {
+		return
+	}
+	items, err := s.DB.ListQueueOwned(owner)
+	if err != nil {
+		s.Logger.Warn("加载接管的队列任务失败: "+err.Error(), "queue")
+		return
+	}
+	s.QueueMu.Lock()
+	have := make(map[string]bool, len(s.Queue))
+	for _, it := range s.Queue {
+		have[it.ID] = true
+	}
+	added := 0
+	for _, it := range items {
+		if !have[it.ID] {
+			s.Queue = append(s.Queue, it)
+			added++
+		}
+	}
+	s.QueueMu.Unlock()
+	s.queuePersistMu.Lock()
+	for _, it := range items {
+		s.queueSeen[it.ID] = it
+		s.queuePersisted[it.ID] = true
+	}
+	s.queuePersistMu.Unlock()
+	s.Logger.Info(fmt.Sprintf("已接管失联实例的队列任务 %d 个", added), "queue")
+}
+
+// ClusterQueueAttempt 集群模式下每次对任务下单前调用。
+// ok=false 本轮跳过；drop=true 任务已不归本实例（被接管 / 已被别的实例完成），应从内存队列移除。
+// 同一任务同时只有一个实例能通过：需本实例协调未中断、库里该行归本实例（或新建尚未落盘），
+// 且拿到该任务的下单认领。
+func (s *State) ClusterQueueAttempt(item types.QueueItem) (ok, drop bool) {
+	if s.Cluster == nil {
+		return true, false
+	}
+	if !s.Cluster.Fresh(time.Now()) {
+		return false, false
+	}
+	owner, exists, err := s.DB.QueueOwner(item.ID)
+	if err != nil {
+		return false, false
+	}
+	if exists && owner != s.Cluster.ID() {
+		return false, true
+	}
+	if !exists {
+		// 已到过终态（有墓碑），或落过盘却不在库里（被别的实例完成 / 删除）
+		finished, err := s.DB.QueueItemFinished(item.ID)
+		if err != nil {
+			return false, false
+		}
+		s.queuePersistMu.Lock()
+		persisted := s.queuePersisted[item.ID]
+		s.queuePersistMu.Unlock()
+		if finished || persisted {
+			return false, true
+		}
+	}
+	return s.Cluster.Claim("queue:"+item.ID, queueAttemptClaimTTL), false
+}
+
+// FinishClusterQueueItem 集群模式下任务到终态后删库里的行（不论当前 owner）并留墓碑：
+// 别的实例若接管过它，下次尝试前会发现已完成而放弃；失联恢复的原 owner 保存队列时也不会把它写回
+func (s *State) FinishClusterQueueItem(id string) {
+	if s.Cluster == nil {
+		return
+	}
+	now := time.Now()
+	if err := s.DB.FinishQueueItem(id, now.UnixMilli(), now.Add(-queueTombstoneTTL).UnixMilli()); err != nil {
+		s.Logger.Warn("删除已完成队列任务失败: "+err.Error(), "queue")
+	}
+}
+
+// SyncClusterVPS 集群模式下 VPS 监控每轮开始前从库里重新加载订阅：
+// 订阅的增删改可能发生在别的实例上，各实例只写回自己负责的订阅状态
+func (s *State) SyncClusterVPS() {
+	if s.Cluster == nil {
+		return
+	}
+	subs, err := s.DB.ListVPSSubscriptions()
+	if err != nil {
+		s.Logger.Warn("集群模式重新加载 VPS 订阅失败: "+err.Error(), "vps_monitor")
+		return
+	}
+	if subs == nil {
+		subs = []types.VPSSubscription{}
+	}
+	s.VPSSubsMu.Lock()
+	s.VPSSubscriptions = subs
+	s.VPSSubsMu.Unlock()
+}
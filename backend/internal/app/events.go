@@ -0,0 +1,81 @@
+package app
+
+import (
+	"time"
+
+	"github.com/ovh-webui/server/internal/events"
+	"github.com/ovh-webui/server/internal/types"
+)
+
+// statsDebounce 统计事件合并窗口：队列 / 历史连续变化时 1 秒内只算一次统计
+const statsDebounce = time.Second
+
+// QueueEvent 队列事件内容。op: added / updated / removed；removed 时 item 为移除前最后一次看到的状态
+type QueueEvent struct {
+	Op   string          `json:"op"`
+	Item types.QueueItem `json:"item"`
+}
+
+// SetStatsSource 设置统计事件的数据来源（与 GET /api/stats 同一份计算）
+func (s *State) SetStatsSource(fn func() interface{}) {
+	s.statsSource.Store(fn)
+}
+
+// StatsSnapshot 当前统计（未设置来源时为 nil）
+func (s *State) StatsSnapshot() interface{} {
+	fn, _ := s.statsSource.Load().(func() interface{})
+	if fn == nil {
+		return nil
+	}
+	return fn()
+}
+
+// TouchStats 统计相关状态变了：合并窗口结束后推一次 stats 事件（无订阅者时什么都不做）
+func (s *State) TouchStats() {
+	s.Events.PublishDebounced(events.TypeStats, statsDebounce, s.StatsSnapshot)
+}
+
+// PublishQueueItem 推送单个队列任务的变化（队列处理器在任务完成 / 失败、移出队列前调用）
+func (s *State) PublishQueueItem(op string, item types.QueueItem) {
+	s.Events.Publish(events.TypeQueue, QueueEvent{Op: op, Item: item})
+	s.TouchStats()
+}
+
+// publishQueueDiff 与上次保存时的队列比较，推送新增 / 状态或重试次数变化 / 移除。调用方持有 queuePersistMu。
+func (s *State) publishQueueDiff(items []types.QueueItem) {
+	prev := s.queueSeen
+	s.queueSeen = queueIndex(items)
+	if s.Events.Subscribers() == 0 {
+		return
+	}
+	changed := false
+	for _, it := range items {
+		old, ok := prev[it.ID]
+		switch {
+		case !ok:
+			s.Events.Publish(events.TypeQueue, QueueEvent{Op: "added", Item: it})
+		case old.Status != it.Status || old.RetryCount != it.RetryCount || old.Priority != it.Priority:
+			s.Events.Publish(events.TypeQueue, QueueEvent{Op: "updated", Item: it})
+		default:
+			continue
+		}
+		changed = true
+	}
+	for id, old := range prev {
+		if _, ok := s.queueSeen[id]; !ok {
+			s.Events.Publish(events.TypeQueue, QueueEvent{Op: "removed", Item: old})
+			changed = true
+		}
+	}
+	if changed {
+		s.TouchStats()
+	}
+}
+
+func queueIndex(items []types.QueueItem) map[string]types.QueueItem {
+	m := make(map[string]types.QueueItem, len(items))
+	for _, it := range items {
+		m[it.ID] = it
+	}
+	return m
+}
@@ -0,0 +1,164 @@
+package app
+
+import (
+	"time"
+
+	"github.com/ovh-webui/server/internal/db"
+	"github.com/ovh-webui/server/internal/events"
+	"github.com/ovh-webui/server/internal/types"
+)
+
+// recentSuccessWindow 近期成功订单的内存窗口。
+// quick-order / Telegram 入队的"刚成功过同配置"去重只看 120s，窗口留一点余量。
+const recentSuccessWindow = 5 * time.Minute
+
+// recentSuccess 近期成功订单（记录写入时刻，不再反解析 purchase_time 字符串）
+type recentSuccess struct {
+	at    time.Time
+	entry types.PurchaseHistoryEntry
+}
+
+// historyCounters 抢购历史的增量计数器。
+// 明细只在 SQLite 里，内存只留 /api/stats 需要的总数 + 去重需要的近期成功窗口，
+// 每次 UpdateHistoryByTask 按新旧状态差值调整，不再扫描全量历史。
+type historyCounters struct {
+	success int
+	failed  int
+	recent  []recentSuccess
+}
+
+func (h *historyCounters) apply(status string, delta int) {
+	switch status {
+	case "success":
+		h.success += delta
+	case "failed":
+		h.failed += delta
+	}
+}
+
+// pruneRecent 丢掉窗口外的近期成功记录（按时间顺序追加，前缀即过期部分）
+func (h *historyCounters) pruneRecent(now time.Time) {
+	cut := 0
+	for cut < len(h.recent) && now.Sub(h.recent[cut].at) > recentSuccessWindow {
+		cut++
+	}
+	if cut > 0 {
+		h.recent = append(h.recent[:0:0], h.recent[cut:]...)
+	}
+}
+
+// loadHistoryCounters 启动/账户删除后从 SQLite 重建计数器：
+// 一次 GROUP BY 取总数 + 按索引取窗口内的成功单，不加载历史明细。
+func (s *State) loadHistoryCounters() error {
+	agg, err := s.DB.AggregateHistory(db.HistoryFilter{})
+	if err != nil {
+		return err
+	}
+	now := time.Now()
+	since := now.Add(-recentSuccessWindow).Format(types.ISOLayout)
+	recentRows, _, err := s.DB.QueryHistory(db.HistoryFilter{Status: "success", Since: since}, "", 0)
+	if err != nil {
+		return err
+	}
+	recent := make([]recentSuccess, 0, len(recentRows))
+	// QueryHistory 按时间倒序，窗口要按时间正序追加
+	for i := len(recentRows) - 1; i >= 0; i-- {
+		at, err := time.ParseInLocation(types.ISOLayout, recentRows[i].PurchaseTime, time.Local)
+		if err != nil {
+			at = now
+		}
+		recent = append(recent, recentSuccess{at: at, entry: recentRows[i]})
+	}
+	s.HistoryMu.Lock()
+	s.history = historyCounters{success: agg.Success, failed: agg.Failed, recent: recent}
+	s.HistoryMu.Unlock()
+	return nil
+}
+
+// ensureHistoryCounters 计数器懒加载：第一次用到（stats / 去重 / 写历史）时才查 SQLite
+func (s *State) ensureHistoryCounters() {
+	s.historyOnce.Do(func() {
+		if err := s.Startup.Run("history", s.loadHistoryCounters); err != nil {
+			s.Logger.Error("load history counters: "+err.Error(), "system")
+		}
+	})
+}
+
+// ReloadHistoryCounters 外部批量改动 history 表后（如级联删除账户）重建计数器
+func (s *State) ReloadHistoryCounters() {
+	first := false
+	s.historyOnce.Do(func() {
+		first = true
+		if err := s.Startup.Run("history", s.loadHistoryCounters); err != nil {
+			s.Logger.Error("load history counters: "+err.Error(), "system")
+		}
+	})
+	if first {
+		return
+	}
+	if err := s.loadHistoryCounters(); err != nil {
+		s.Logger.Error("load history counters: "+err.Error(), "system")
+	}
+}
+
+// UpdateHistoryByTask 按队列任务 ID 读-改-写一条历史（不存在则由 fn 新建）。
+// fn 拿到的 entry 在 exists=false 时为零值；返回 false 表示无需写库。
+// HistoryMu 串行化整个读-改-写，保证同一任务的成功/失败/补全不会互相覆盖，计数器也随之增量调整。
+func (s *State) UpdateHistoryByTask(taskID string, fn func(entry *types.PurchaseHistoryEntry, exists bool) bool) error {
+	s.ensureHistoryCounters()
+	s.HistoryMu.Lock()
+	defer s.HistoryMu.Unlock()
+	entry, exists, err := s.DB.GetHistoryByTaskID(taskID)
+	if err != nil {
+		return err
+	}
+	prevStatus := entry.Status
+	if !fn(&entry, exists) {
+		return nil
+	}
+	if err := s.DB.UpsertHistory(entry); err != nil {
+		return err
+	}
+	if exists {
+		s.history.apply(prevStatus, -1)
+	}
+	s.history.apply(entry.Status, +1)
+	if entry.Status == "success" && prevStatus != "success" {
+		now := time.Now()
+		s.history.pruneRecent(now)
+		s.history.recent = append(s.history.recent, recentSuccess{at: now, entry: entry})
+	}
+	s.Events.Publish(events.TypePurchase, entry)
+	s.TouchStats()
+	return nil
+}
+
+// RecentSuccessHistory 返回 within 时间内成功的历史副本（最新在后），给重复下单判断用。
+// within 超过内存窗口时按窗口截断。
+func (s *State) RecentSuccessHistory(within time.Duration) []types.PurchaseHistoryEntry {
+	s.ensureHistoryCounters()
+	s.HistoryMu.Lock()
+	defer s.HistoryMu.Unlock()
+	now := time.Now()
+	s.history.pruneRecent(now)
+	out := make([]types.PurchaseHistoryEntry, 0, len(s.history.recent))
+	for _, r := range s.history.recent {
+		if now.Sub(r.at) < within {
+			out = append(out, r.entry)
+		}
+	}
+	return out
+}
+
+// ClearHistory 清空历史表并归零计数器
+func (s *State) ClearHistory() error {
+	s.ensureHistoryCounters()
+	s.HistoryMu.Lock()
+	defer s.HistoryMu.Unlock()
+	if _, err := s.DB.ClearHistory(); err != nil {
+		return err
+	}
+	s.history = historyCounters{}
+	s.TouchStats()
+	return nil
+}
@@ -0,0 +1,247 @@
+package app
+
+import (
+	"bytes"
+	"encoding/json"
+	"sync"
+	"time"
+
+	ovhsdk "github.com/ovh/go-ovh/ovh"
+
+	"github.com/ovh-webui/server/internal/db"
+)
+
+const (
+	// inventoryStaleAfter 独服详情缓存超过这个时间，列表请求时先返回缓存再排后台刷新
+	inventoryStaleAfter = 10 * time.Minute
+	// inventoryFetchConcurrency 同步拉新增独服详情的并发数（与原先 ListMyServers 一致）
+	inventoryFetchConcurrency = 10
+	// inventoryRefreshWorkers 后台刷新全局并发上限，避免多账户同时刷新打满 OVH 限流
+	inventoryRefreshWorkers = 4
+)
+
+// InventoryEntry 单台独服的缓存详情：/dedicated/server/{name} + /serviceInfos 原始数据。
+// Err 非空表示本次拉详情失败（只在内存，不落库，下次列表时重试）。
+type InventoryEntry struct {
+	ServiceName  string
+	Info         map[string]interface{}
+	ServiceInfos map[string]interface{}
+	Err          string
+	RefreshedAt  time.Time // 零值 = 已失效（控制操作后）
+}
+
+// InventoryList 一次列表的结果
+type InventoryList struct {
+	Entries    []InventoryEntry // 与 /dedicated/server 返回顺序一致
+	Fetched    int              // 本次同步拉取详情的台数（新增 / 上次失败 / 强制刷新）
+	Refreshing int              // 本次排入后台刷新的台数（过期 / 已失效）
+}
+
+// accountInventory 单个账户的独服缓存，首次列表时从 SQLite 装载
+type accountInventory struct {
+	entries    map[string]*InventoryEntry
+	refreshing map[string]struct{} // 已排队 / 正在后台刷新的 service name，避免重复排队
+}
+
+// ListServerInventory 列出账户名下独服：每次只请求一次 /dedicated/server 对齐增删，
+// 新增（或上次失败）的独服同步拉详情，过期 / 已失效的先返回缓存并排后台刷新。
+// force=true 时全部同步重新拉取（前端"刷新"按钮）。
+func (s *State) ListServerInventory(accountID string, client *ovhsdk.Client, force bool) (InventoryList, error) {
+	var names []string
+	if err := client.Get("/dedicated/server", &names); err != nil {
+		return InventoryList{}, err
+	}
+
+	now := time.Now()
+	var fetch, stale, removed []string
+	s.inventoryMu.Lock()
+	inv := s.accountInventoryLocked(accountID)
+	listed := make(map[string]struct{}, len(names))
+	for _, n := range names {
+		listed[n] = struct{}{}
+		e, ok := inv.entries[n]
+		switch {
+		case !ok || e.Err != "" || force:
+			fetch = append(fetch, n)
+		case now.Sub(e.RefreshedAt) > inventoryStaleAfter:
+			if _, busy := inv.refreshing[n]; !busy {
+				inv.refreshing[n] = struct{}{}
+				stale = append(stale, n)
+			}
+		}
+	}
+	for n := range inv.entries {
+		if _, ok := listed[n]; !ok {
+			delete(inv.entries, n)
+			removed = append(removed, n)
+		}
+	}
+	s.inventoryMu.Unlock()
+
+	if err := s.DB.DeleteServerInventory(accountID, removed); err != nil {
+		s.Logger.Error("清理独服缓存失败: "+err.Error(), "server_control")
+	}
+	if len(fetch) > 0 {
+		s.storeInventory(accountID, fetchInventoryEntries(client, fetch), false)
+	}
+	for _, n := range stale {
+		go s.refreshInventoryEntry(accountID, client, n)
+	}
+
+	out := InventoryList{Entries: make([]InventoryEntry, 0, len(names)), Fetched: len(fetch), Refreshing: len(stale)}
+	s.inventoryMu.Lock()
+	inv = s.accountInventoryLocked(accountID)
+	for _, n := range names {
+		if e, ok := inv.entries[n]; ok {
+			out.Entries = append(out.Entries, *e)
+		} else {
+			// 拉取期间账户缓存被清空（删账户 / 清缓存）
+			out.Entries = append(out.Entries, InventoryEntry{ServiceName: n, Err: "inventory reset during refresh"})
+		}
+	}
+	s.inventoryMu.Unlock()
+	return out, nil
+}
+
+// ExpireServerInventory 控制操作（重启 / 重装 / 改配置等）成功后调用：
+// 标记该独服缓存失效，下次列表时后台刷新
+func (s *State) ExpireServerInventory(accountID, serviceName string) {
+	s.inventoryMu.Lock()
+	if inv, ok := s.inventory[accountID]; ok {
+		if e, ok := inv.entries[serviceName]; ok {
+			e.RefreshedAt = time.Time{}
+		}
+	}
+	s.inventoryMu.Unlock()
+	if err := s.DB.ExpireServerInventory(accountID, serviceName); err != nil {
+		s.Logger.Warn("标记独服缓存失效失败: "+err.Error(), "server_control")
+	}
+}
+
+// DropServerInventory 删除账户后丢掉内存缓存（SQLite 由 DeleteAccount 级联删除）
+func (s *State) DropServerInventory(accountID string) {
+	s.inventoryMu.Lock()
+	delete(s.inventory, accountID)
+	s.inventoryMu.Unlock()
+}
+
+// ClearServerInventory 清空全部账户的独服缓存（内存 + SQLite）
+func (s *State) ClearServerInventory() error {
+	s.inventoryMu.Lock()
+	s.inventory = map[string]*accountInventory{}
+	s.inventoryMu.Unlock()
+	return s.DB.ClearServerInventory()
+}
+
+// accountInventoryLocked 取账户缓存，第一次用到时从 SQLite 装载。调用方持有 inventoryMu。
+func (s *State) accountInventoryLocked(accountID string) *accountInventory {
+	if inv, ok := s.inventory[accountID]; ok {
+		return inv
+	}
+	inv := &accountInventory{entries: map[string]*InventoryEntry{}, refreshing: map[string]struct{}{}}
+	rows, err := s.DB.ListServerInventory(accountID)
+	if err != nil {
+		s.Logger.Warn("加载独服缓存失败: "+err.Error(), "server_control")
+	}
+	for _, r := range rows {
+		e := &InventoryEntry{ServiceName: r.ServiceName}
+		if decodeInventoryJSON(r.Info, &e.Info) != nil || decodeInventoryJSON(r.ServiceInfos, &e.ServiceInfos) != nil {
+			continue
+		}
+		if r.RefreshedAt > 0 {
+			e.RefreshedAt = time.UnixMilli(r.RefreshedAt)
+		}
+		inv.entries[r.ServiceName] = e
+	}
+	s.inventory[accountID] = inv
+	return inv
+}
+
+// refreshInventoryEntry 后台刷新单台独服（受 inventoryRefreshWorkers 限制）
+func (s *State) refreshInventoryEntry(accountID string, client *ovhsdk.Client, name string) {
+	s.inventorySem <- struct{}{}
+	defer func() { <-s.inventorySem }()
+	s.storeInventory(accountID, []InventoryEntry{fetchInventoryEntry(client, name)}, true)
+}
+
+// storeInventory 写回拉取结果并落库。
+// background=true 时：独服已不在缓存里（期间被移除）就丢弃；拉取失败则保留旧数据，只记日志。
+func (s *State) storeInventory(accountID string, entries []InventoryEntry, background bool) {
+	rows := make([]db.ServerInventoryRow, 0, len(entries))
+	s.inventoryMu.Lock()
+	inv, ok := s.inventory[accountID]
+	if !ok {
+		s.inventoryMu.Unlock()
+		return
+	}
+	for i := range entries {
+		e := entries[i]
+		delete(inv.refreshing, e.ServiceName)
+		if background {
+			if _, exists := inv.entries[e.ServiceName]; !exists {
+				continue
+			}
+			if e.Err != "" {
+				s.Logger.Warn("后台刷新独服 "+e.ServiceName+" 失败: "+e.Err, "server_control")
+				continue
+			}
+		}
+		inv.entries[e.ServiceName] = &e
+		if e.Err != "" {
+			continue
+		}
+		info, _ := json.Marshal(e.Info)
+		svc, _ := json.Marshal(e.ServiceInfos)
+		rows = append(rows, db.ServerInventoryRow{
+			AccountID:    accountID,
+			ServiceName:  e.ServiceName,
+			Info:         string(info),
+			ServiceInfos: string(svc),
+			RefreshedAt:  e.RefreshedAt.UnixMilli(),
+		})
+	}
+	s.inventoryMu.Unlock()
+	if err := s.DB.UpsertServerInventory(rows); err != nil {
+		s.Logger.Error("保存独服缓存失败: "+err.Error(), "server_control")
+	}
+}
+
+// fetchInventoryEntries 并发拉多台独服详情，结果按 names 顺序
+func fetchInventoryEntries(client *ovhsdk.Client, names []string) []InventoryEntry {
+	out := make([]InventoryEntry, len(names))
+	sem := make(chan struct{}, inventoryFetchConcurrency)
+	var wg sync.WaitGroup
+	for i, name := range names {
+		wg.Add(1)
+		sem <- struct{}{}
+		go func(idx int, nm string) {
+			defer wg.Done()
+			defer func() { <-sem }()
+			out[idx] = fetchInventoryEntry(client, nm)
+		}(i, name)
+	}
+	wg.Wait()
+	return out
+}
+
+// fetchInventoryEntry 拉单台独服 detail + serviceInfos（serviceInfos 失败不算错误，与原逻辑一致）
+func fetchInventoryEntry(client *ovhsdk.Client, name string) InventoryEntry {
+	e := InventoryEntry{ServiceName: name}
+	if err := client.Get("/dedicated/server/"+name, &e.Info); err != nil {
+		e.Err = err.Error()
+		return e
+	}
+	_ = client.Get("/dedicated/server/"+name+"/serviceInfos", &e.ServiceInfos)
+	e.RefreshedAt = time.Now()
+	return e
+}
+
+// decodeInventoryJSON 用 UseNumber 解码，数字字段原样回给前端
+func decodeInventoryJSON(raw string, out *map[string]interface{}) error {
+	if raw == "" || raw == "null" {
+		return nil
+	}
+	dec := json.NewDecoder(bytes.NewReader([]byte(raw)))
+	dec.UseNumber()
+	return dec.Decode(out)
+}
@@ -0,0 +1,255 @@
+package app
+
+import (
+	"encoding/json"
+	"fmt"
+	"sort"
+	"strings"
+	"sync"
+	"time"
+
+	ovhsdk "github.com/ovh/go-ovh/ovh"
+
+	"github.com/ovh-webui/server/internal/db"
+)
+
+const (
+	// orderIndexMinInterval 两次增量同步的最小间隔；间隔内的请求直接读本地索引
+	orderIndexMinInterval = 30 * time.Second
+	// orderFrozenAfter 下单超过这个时间仍未到终态的订单不再重新拉 status
+	orderFrozenAfter = 60 * 24 * time.Hour
+	// orderSyncConcurrency 同步时请求 OVH 的并发数
+	orderSyncConcurrency = 10
+	// orderSyncMaxNew 单次同步最多补拉的新订单数（新的先拉）：订单历史很长的账户首次同步
+	// 只同步拉最新的这些，其余由后台分批补齐，请求不会因爬完整个历史而超时
+	orderSyncMaxNew = 100
+	// orderSyncBatch 每拉完这么多个订单落一次库，中途失败 / 超时已拉到的不丢
+	orderSyncBatch = 25
+)
+
+// OrderIndexSync 一次 OrderIndex 调用的同步情况
+type OrderIndexSync struct {
+	Synced    bool      // 本次是否请求了 OVH（false = 间隔内直接读本地）
+	At        time.Time // 最近一次同步完成时间
+	NewOrders int       // 新发现的订单数
+	Rechecked int       // 重新拉 status 的未终态订单数
+	Pending   int       // 还没进索引、留给后台补齐的订单数
+}
+
+type orderSyncState struct {
+	mu          sync.Mutex
+	at          time.Time
+	pending     int
+	backfilling bool // 后台补齐中（由 mu 保护）
+}
+
+// OrderCancelled 订单是否已取消（cancelled / cancelledByCustomer...，大小写不敏感）
+func OrderCancelled(status string) bool {
+	return strings.HasPrefix(strings.ToLower(status), "cancelled")
+}
+
+func orderDelivered(status string) bool { return strings.EqualFold(status, "delivered") }
+
+func orderTerminal(status string) bool { return orderDelivered(status) || OrderCancelled(status) }
+
+// OrderIndex 返回账户的本地订单索引（按订单 ID 倒序）。
+// 距上次同步超过 orderIndexMinInterval（或 force）时先增量同步：
+// 只拉新出现的订单 ID 的正文 / 状态 / 明细（单次最多 orderSyncMaxNew 个，其余后台补齐），
+// 并重新拉未到终态订单的 status；已交付 / 已取消的订单不会再请求 OVH。
+// 同步失败但本地有数据时返回本地数据。
+func (s *State) OrderIndex(accountID string, client *ovhsdk.Client, force bool) ([]db.OrderIndexRow, OrderIndexSync, error) {
+	st := s.orderSyncStateFor(accountID)
+	st.mu.Lock()
+	defer st.mu.Unlock()
+
+	res := OrderIndexSync{At: st.at, Pending: st.pending}
+	if force || time.Since(st.at) >= orderIndexMinInterval {
+		n, re, pending, err := s.syncOrderIndex(accountID, client)
+		if err != nil {
+			rows, lerr := s.DB.ListOrderIndex(accountID)
+			if lerr != nil || len(rows) == 0 {
+				return nil, res, err
+			}
+			s.Logger.Warn("订单索引同步失败，返回本地数据: "+err.Error(), "server_control")
+			return rows, res, nil
+		}
+		st.at = time.Now()
+		st.pending = pending
+		res = OrderIndexSync{Synced: true, At: st.at, NewOrders: n, Rechecked: re, Pending: pending}
+		if pending > 0 && !st.backfilling {
+			st.backfilling = true
+			go s.backfillOrderIndex(accountID, client, st)
+		}
+	}
+	rows, err := s.DB.ListOrderIndex(accountID)
+	return rows, res, err
+}
+
+// backfillOrderIndex 后台分批补齐订单历史：每批与前台同步一样持有账户锁，但只拉 orderSyncMaxNew 个，
+// 批与批之间放开锁，前台请求最多等一批，读到的是已经进索引的部分
+func (s *State) backfillOrderIndex(accountID string, client *ovhsdk.Client, st *orderSyncState) {
+	for {
+		st.mu.Lock()
+		n, _, pending, err := s.syncOrderIndex(accountID, client)
+		if err == nil {
+			st.at = time.Now()
+			st.pending = pending
+		}
+		if err != nil || pending == 0 || n == 0 {
+			st.backfilling = false
+			st.mu.Unlock()
+			if err != nil {
+				s.Logger.Warn("订单历史后台补齐中断: "+err.Error(), "server_control")
+			} else {
+				s.Logger.Info("订单历史后台补齐完成", "server_control")
+			}
+			return
+		}
+		st.mu.Unlock()
+	}
+}
+
+func (s *State) orderSyncStateFor(accountID string) *orderSyncState {
+	s.orderSyncMu.Lock()
+	defer s.orderSyncMu.Unlock()
+	st, ok := s.orderSync[accountID]
+	if !ok {
+		st = &orderSyncState{}
+		s.orderSync[accountID] = st
+	}
+	return st
+}
+
+// syncOrderIndex 增量同步一次，返回新订单数、重新检查的订单数和留到下次的新订单数
+func (s *State) syncOrderIndex(accountID string, client *ovhsdk.Client) (newOrders, rechecked, pending int, err error) {
+	var ids []int64
+	if err := client.Get("/me/order", &ids); err != nil {
+		return 0, 0, 0, fmt.Errorf("获取订单列表失败: %w", err)
+	}
+	rows, err := s.DB.ListOrderIndex(accountID)
+	if err != nil {
+		return 0, 0, 0, err
+	}
+	known := make(map[int64]struct{}, len(rows))
+	now := time.Now()
+	var work []db.OrderIndexRow
+	for _, r := range rows {
+		known[r.OrderID] = struct{}{}
+		// 正文没拉到的（上次 GET 失败）不论状态都要重拉，否则终态订单永远缺正文、列表里看不到
+		if r.Body != "{}" && r.Body != "" {
+			// 已取消、或已交付且明细定稿的订单不会再变；明细没拉全的已交付订单补拉
+			done := OrderCancelled(r.Status) || (orderDelivered(r.Status) && r.DetailsFinal == 1)
+			if done || orderFrozen(r.OrderDate, now) {
+				continue
+			}
+		}
+		work = append(work, r)
+		rechecked++
+	}
+	var fresh []int64
+	for _, id := range ids {
+		if _, ok := known[id]; !ok {
+			known[id] = struct{}{}
+			fresh = append(fresh, id)
+		}
+	}
+	// 新订单按 ID 从新到旧，单次最多 orderSyncMaxNew 个
+	sort.Slice(fresh, func(i, j int) bool { return fresh[i] > fresh[j] })
+	if len(fresh) > orderSyncMaxNew {
+		pending = len(fresh) - orderSyncMaxNew
+		fresh = fresh[:orderSyncMaxNew]
+	}
+	for _, id := range fresh {
+		work = append(work, db.OrderIndexRow{AccountID: accountID, OrderID: id, Body: "{}", Details: "[]"})
+	}
+	newOrders = len(fresh)
+	if len(work) == 0 {
+		return 0, 0, 0, nil
+	}
+
+	// 分批拉取、每批落库：中途出错或请求超时，已拉到的订单不会丢
+	for start := 0; start < len(work); start += orderSyncBatch {
+		end := start + orderSyncBatch
+		if end > len(work) {
+			end = len(work)
+		}
+		batch := work[start:end]
+		sem := make(chan struct{}, orderSyncConcurrency)
+		var wg sync.WaitGroup
+		for i := range batch {
+			wg.Add(1)
+			sem <- struct{}{}
+			go func(r *db.OrderIndexRow) {
+				defer wg.Done()
+				defer func() { <-sem }()
+				refreshOrderRow(client, r)
+			}(&batch[i])
+		}
+		wg.Wait()
+		if err := s.DB.UpsertOrderIndex(batch); err != nil {
+			return 0, 0, 0, err
+		}
+	}
+	if newOrders > 0 {
+		s.Logger.Info(fmt.Sprintf("订单索引同步: 新订单 %d 个，重新检查 %d 个，待补齐 %d 个", newOrders, rechecked, pending), "server_control")
+	}
+	return newOrders, rechecked, pending, nil
+}
+
+// refreshOrderRow 补齐 / 刷新单个订单：还没有正文的拉正文，所有订单拉 status；
+// 未取消且明细未定稿的，第一次见到或状态变化时拉明细，到终态后明细定稿。
+func refreshOrderRow(client *ovhsdk.Client, r *db.OrderIndexRow) {
+	base := fmt.Sprintf("/me/order/%d", r.OrderID)
+	if r.Body == "{}" {
+		var body json.RawMessage
+		if err := client.Get(base, &body); err == nil {
+			r.Body = string(body)
+			var head struct {
+				Date string `json:"date"`
+			}
+			_ = json.Unmarshal(body, &head)
+			r.OrderDate = head.Date
+		}
+	}
+	prev := r.Status
+	var status string
+	if err := client.Get(base+"/status", &status); err == nil && status != "" {
+		r.Status = status
+	} else if r.Status == "" {
+		r.Status = "unknown"
+	}
+	r.CheckedAt = time.Now().UnixMilli()
+
+	if OrderCancelled(r.Status) || r.DetailsFinal == 1 {
+		return
+	}
+	if r.Details != "[]" && r.Status == prev {
+		return
+	}
+	var detailIDs []int64
+	if err := client.Get(base+"/details", &detailIDs); err != nil {
+		return
+	}
+	details := make([]map[string]interface{}, 0, len(detailIDs))
+	for _, did := range detailIDs {
+		var d map[string]interface{}
+		if err := client.Get(fmt.Sprintf("%s/details/%d", base, did), &d); err != nil {
+			return // 明细不完整，下次再拉
+		}
+		d["detailId"] = did
+		details = append(details, d)
+	}
+	raw, err := json.Marshal(details)
+	if err != nil {
+		return
+	}
+	r.Details = string(raw)
+	if orderTerminal(r.Status) {
+		r.DetailsFinal = 1
+	}
+}
+
+func orderFrozen(orderDate string, now time.Time) bool {
+	t, err := time.Parse(time.RFC3339, orderDate)
+	return err == nil && now.Sub(t) > orderFrozenAfter
+}
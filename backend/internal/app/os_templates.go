@@ -0,0 +1,165 @@
+package app
+
+import (
+	"encoding/json"
+	"sync"
+	"time"
+
+	ovhsdk "github.com/ovh/go-ovh/ovh"
+)
+
+const (
+	// osTemplateFreshFor 模板详情在这个时间内直接使用；超过后先返回缓存，再后台重新拉取
+	osTemplateFreshFor = 7 * 24 * time.Hour
+	// osTemplateMaxAge 超过这个时间的缓存不再使用，按缺失同步拉取
+	osTemplateMaxAge = 30 * 24 * time.Hour
+	// osTemplateFetchConcurrency 同步 / 后台拉模板详情的并发数
+	osTemplateFetchConcurrency = 10
+)
+
+type osTemplateEntry struct {
+	detail    map[string]interface{}
+	fetchedAt time.Time
+}
+
+// osTemplateCache 安装模板详情的进程级缓存。模板定义全局共享，与服务器、账户无关，
+// 任意账户拉到的结果所有服务器共用；SQLite 持久化，重启后不需要重新拉。
+type osTemplateCache struct {
+	once       sync.Once
+	mu         sync.Mutex
+	entries    map[string]osTemplateEntry
+	refreshing map[string]struct{}
+	// gen 每次 ClearOSTemplates 加一：清空前发出的拉取回来时代数已变，结果丢弃，不会写回旧数据
+	gen uint64
+}
+
+// OSTemplateDetails 按 names 顺序返回模板详情（拉取失败的位置为 nil）。
+// 缺失或过旧的同步拉取；过了新鲜期的先返回缓存，并用同一个 client 后台重新拉取。
+func (s *State) OSTemplateDetails(client *ovhsdk.Client, names []string) []map[string]interface{} {
+	c := &s.osTemplates
+	c.once.Do(func() { s.loadOSTemplates() })
+
+	now := time.Now()
+	out := make([]map[string]interface{}, len(names))
+	var missing []int
+	var stale []string
+	c.mu.Lock()
+	for i, n := range names {
+		e, ok := c.entries[n]
+		age := now.Sub(e.fetchedAt)
+		switch {
+		case !ok || age > osTemplateMaxAge:
+			missing = append(missing, i)
+		case age > osTemplateFreshFor:
+			out[i] = e.detail
+			if _, busy := c.refreshing[n]; !busy {
+				c.refreshing[n] = struct{}{}
+				stale = append(stale, n)
+			}
+		default:
+			out[i] = e.detail
+		}
+	}
+	gen := c.gen
+	c.mu.Unlock()
+
+	if len(missing) > 0 {
+		fetchNames := make([]string, len(missing))
+		for j, i := range missing {
+			fetchNames[j] = names[i]
+		}
+		fetched := s.fetchOSTemplates(client, fetchNames, gen)
+		for j, i := range missing {
+			out[i] = fetched[j]
+		}
+	}
+	if len(stale) > 0 {
+		go func() {
+			s.fetchOSTemplates(client, stale, gen)
+			c.mu.Lock()
+			if c.gen == gen {
+				for _, n := range stale {
+					delete(c.refreshing, n)
+				}
+			}
+			c.mu.Unlock()
+		}()
+	}
+	return out
+}
+
+// ClearOSTemplates 清空模板详情缓存（内存 + SQLite）。进行中的拉取（含后台刷新）结果作废。
+func (s *State) ClearOSTemplates() error {
+	c := &s.osTemplates
+	c.once.Do(func() { s.loadOSTemplates() })
+	c.mu.Lock()
+	defer c.mu.Unlock()
+	c.entries = map[string]osTemplateEntry{}
+	c.refreshing = map[string]struct{}{}
+	c.gen++
+	return s.DB.ClearOSTemplates()
+}
+
+func (s *State) loadOSTemplates() {
+	c := &s.osTemplates
+	entries := map[string]osTemplateEntry{}
+	rows, err := s.DB.ListOSTemplates()
+	if err != nil {
+		s.Logger.Warn("加载系统模板缓存失败: "+err.Error(), "server_control")
+	}
+	for _, r := range rows {
+		var d map[string]interface{}
+		if json.Unmarshal([]byte(r.Detail), &d) != nil {
+			continue
+		}
+		entries[r.Name] = osTemplateEntry{detail: d, fetchedAt: time.UnixMilli(r.UpdatedAt)}
+	}
+	c.mu.Lock()
+	c.entries = entries
+	c.refreshing = map[string]struct{}{}
+	c.mu.Unlock()
+}
+
+// fetchOSTemplates 并发拉模板详情，成功的写入内存并落库；返回值按 names 顺序，失败为 nil。
+// gen 为发起时的缓存代数，期间缓存被清空过则只返回结果、不写回。
+func (s *State) fetchOSTemplates(client *ovhsdk.Client, names []string, gen uint64) []map[string]interface{} {
+	out := make([]map[string]interface{}, len(names))
+	sem := make(chan struct{}, osTemplateFetchConcurrency)
+	var wg sync.WaitGroup
+	for i, name := range names {
+		wg.Add(1)
+		sem <- struct{}{}
+		go func(idx int, nm string) {
+			defer wg.Done()
+			defer func() { <-sem }()
+			var d map[string]interface{}
+			if err := client.Get("/dedicated/installationTemplate/"+nm, &d); err == nil {
+				out[idx] = d
+			}
+		}(i, name)
+	}
+	wg.Wait()
+
+	now := time.Now()
+	persist := make(map[string]string, len(names))
+	c := &s.osTemplates
+	// 检查代数与落库在同一把锁内，与 ClearOSTemplates 串行，清空后不会再写回
+	c.mu.Lock()
+	defer c.mu.Unlock()
+	if c.gen != gen {
+		return out
+	}
+	for i, d := range out {
+		if d == nil {
+			continue
+		}
+		c.entries[names[i]] = osTemplateEntry{detail: d, fetchedAt: now}
+		if raw, err := json.Marshal(d); err == nil {
+			persist[names[i]] = string(raw)
+		}
+	}
+	if err := s.DB.UpsertOSTemplates(persist); err != nil {
+		s.Logger.Error("保存系统模板缓存失败: "+err.Error(), "server_control")
+	}
+	return out
+}
@@ -0,0 +1,128 @@
+package app
+
+import (
+	"sort"
+	"sync"
+	"time"
+)
+
+// 启动阶段状态
+const (
+	PhasePending  = "pending"
+	PhaseLoading  = "loading"
+	PhaseReady    = "ready"
+	PhaseFailed   = "failed"
+	PhaseDeferred = "deferred" // 非关键数据：后台或首次使用时才加载
+)
+
+// Phase 单个启动阶段的状态快照（/health 原样输出）
+type Phase struct {
+	Name       string `json:"name"`
+	Status     string `json:"status"`
+	Critical   bool   `json:"critical"`
+	StartedAt  string `json:"startedAt,omitempty"`
+	DurationMs int64  `json:"durationMs"`
+	Error      string `json:"error,omitempty"`
+}
+
+// Readiness 记录启动各阶段进度。
+// 关键阶段全部 ready（或 failed，失败不阻塞启动，只记录）后 Ready() 才为 true；
+// 非关键阶段（history 计数器 / 服务器目录 / 日志文件）以 deferred 登记，后台或首次使用时才转入 loading。
+type Readiness struct {
+	mu      sync.Mutex
+	phases  map[string]*Phase
+	started time.Time
+	readyAt time.Time
+	ready   bool
+}
+
+// NewReadiness 进程启动时创建
+func NewReadiness() *Readiness {
+	return &Readiness{phases: make(map[string]*Phase), started: time.Now()}
+}
+
+// Register 预登记阶段（/health 能看到尚未开始的阶段）
+func (r *Readiness) Register(name string, critical bool) {
+	r.mu.Lock()
+	defer r.mu.Unlock()
+	if _, ok := r.phases[name]; ok {
+		return
+	}
+	status := PhasePending
+	if !critical {
+		status = PhaseDeferred
+	}
+	r.phases[name] = &Phase{Name: name, Status: status, Critical: critical}
+}
+
+// Run 执行一个阶段并记录耗时。fn 返回 error 时该阶段标 failed。
+func (r *Readiness) Run(name string, fn func() error) error {
+	r.mu.Lock()
+	p, ok := r.phases[name]
+	if !ok {
+		p = &Phase{Name: name, Critical: true}
+		r.phases[name] = p
+	}
+	t0 := time.Now()
+	p.Status = PhaseLoading
+	p.StartedAt = t0.Format(time.RFC3339Nano)
+	r.mu.Unlock()
+
+	err := fn()
+
+	r.mu.Lock()
+	p.DurationMs = time.Since(t0).Milliseconds()
+	if err != nil {
+		p.Status = PhaseFailed
+		p.Error = err.Error()
+	} else {
+		p.Status = PhaseReady
+	}
+	r.mu.Unlock()
+	return err
+}
+
+// RunParallel 并发执行一组互不依赖的阶段，全部结束后返回
+func (r *Readiness) RunParallel(steps map[string]func() error) {
+	var wg sync.WaitGroup
+	for name, fn := range steps {
+		wg.Add(1)
+		go func(name string, fn func() error) {
+			defer wg.Done()
+			_ = r.Run(name, fn)
+		}(name, fn)
+	}
+	wg.Wait()
+}
+
+// MarkReady 关键阶段全部跑完后由 main 调用（之后 /api/* 才放行）
+func (r *Readiness) MarkReady() {
+	r.mu.Lock()
+	defer r.mu.Unlock()
+	if !r.ready {
+		r.ready = true
+		r.readyAt = time.Now()
+	}
+}
+
+// Ready 关键阶段是否都已完成
+func (r *Readiness) Ready() bool {
+	r.mu.Lock()
+	defer r.mu.Unlock()
+	return r.ready
+}
+
+// Snapshot 返回 ready 标志、启动到 ready 的耗时（未 ready 时为已用时长）和各阶段副本（按名称排序）
+func (r *Readiness) Snapshot() (ready bool, elapsedMs int64, phases []Phase) {
+	r.mu.Lock()
+	defer r.mu.Unlock()
+	phases = make([]Phase, 0, len(r.phases))
+	for _, p := range r.phases {
+		phases = append(phases, *p)
+	}
+	sort.Slice(phases, func(i, j int) bool { return phases[i].Name < phases[j].Name })
+	if r.ready {
+		return true, r.readyAt.Sub(r.started).Milliseconds(), phases
+	}
+	return false, time.Since(r.started).Milliseconds(), phases
+}
@@ -0,0 +1,378 @@
+// Package availability 按 (机房, 配置) 保存补货状态变化的紧凑时间序列：
+// 时间戳只在写入时解析一次（Unix 秒），每种变化类型最近一次的时刻单独索引，历时查询 O(1)；
+// 超过保留期的明细折叠成按天（UTC）的汇总（在货秒数、补货次数），供补货统计查询。
+package availability
+
+import (
+	"sort"
+	"sync"
+	"time"
+)
+
+// Kind 状态（同时也是变化类型：变成了什么状态）
+type Kind uint8
+
+const (
+	KindAvailable Kind = iota
+	KindUnavailable
+	KindPriceCheckFailed
+	kindCount
+)
+
+var kindNames = [kindCount]string{"available", "unavailable", "price_check_failed"}
+
+func (k Kind) String() string {
+	if k < kindCount {
+		return kindNames[k]
+	}
+	return "unknown"
+}
+
+// ParseKind 解析 "available" / "unavailable" / "price_check_failed"
+func ParseKind(s string) (Kind, bool) {
+	for i, n := range kindNames {
+		if n == s {
+			return Kind(i), true
+		}
+	}
+	return 0, false
+}
+
+const daySeconds = 86400
+
+// Key 一条序列：机房 + 配置（配置用 "内存 + 存储" 的展示串）
+type Key struct {
+	Datacenter string
+	Config     string
+}
+
+// Transition 一次状态变化
+type Transition struct {
+	At   int64 // Unix 秒
+	Kind Kind
+}
+
+// Day 一天（UTC）的汇总。Until 为这一天已累计到的时刻（最后一天可能只折叠了一部分），
+// EndInStock 为 Until 时刻是否在货，恢复时据此接着折叠。
+type Day struct {
+	Start      int64 `json:"start"`
+	Until      int64 `json:"until"`
+	InStockSec int64 `json:"inStockSec"`
+	Restocks   int   `json:"restocks"`
+	EndInStock bool  `json:"endInStock"`
+}
+
+type track struct {
+	raw         []Transition     // 未折叠的明细，按时间升序
+	last        [kindCount]int64 // 每种状态最近一次变成它的时刻，0 = 没有
+	days        []Day            // 按 Start 升序
+	foldAt      int64            // 明细已折叠到的时刻，0 = 还没折叠过
+	foldInStock bool             // foldAt 时刻是否在货
+}
+
+// Timeline 一个订阅的全部序列，并发安全
+type Timeline struct {
+	mu      sync.RWMutex
+	tracks  map[Key]*track
+	maxDays int
+}
+
+// New maxDays 为日汇总保留的天数（<= 0 不裁剪）
+func New(maxDays int) *Timeline {
+	return &Timeline{tracks: make(map[Key]*track), maxDays: maxDays}
+}
+
+func (t *Timeline) trackLocked(k Key) *track {
+	tr := t.tracks[k]
+	if tr == nil {
+		tr = &track{}
+		t.tracks[k] = tr
+	}
+	return tr
+}
+
+// Record 记录一次状态变化。已折叠区间内的（早于 foldAt）忽略；乱序写入按时间插入。
+func (t *Timeline) Record(k Key, kind Kind, at time.Time) {
+	if kind >= kindCount {
+		return
+	}
+	sec := at.Unix()
+	t.mu.Lock()
+	defer t.mu.Unlock()
+	tr := t.trackLocked(k)
+	if tr.foldAt != 0 && sec < tr.foldAt {
+		return
+	}
+	p := Transition{At: sec, Kind: kind}
+	if n := len(tr.raw); n == 0 || tr.raw[n-1].At <= sec {
+		tr.raw = append(tr.raw, p)
+	} else {
+		i := sort.Search(n, func(i int) bool { return tr.raw[i].At > sec })
+		tr.raw = append(tr.raw, Transition{})
+		copy(tr.raw[i+1:], tr.raw[i:])
+		tr.raw[i] = p
+	}
+	if sec > tr.last[kind] {
+		tr.last[kind] = sec
+	}
+}
+
+// RestoreDay 从持久化恢复一天的汇总（按任意顺序调用均可）
+func (t *Timeline) RestoreDay(k Key, d Day) {
+	t.mu.Lock()
+	defer t.mu.Unlock()
+	tr := t.trackLocked(k)
+	i := sort.Search(len(tr.days), func(i int) bool { return tr.days[i].Start >= d.Start })
+	if i < len(tr.days) && tr.days[i].Start == d.Start {
+		tr.days[i] = d
+	} else {
+		tr.days = append(tr.days, Day{})
+		copy(tr.days[i+1:], tr.days[i:])
+		tr.days[i] = d
+	}
+	if d.Until >= tr.foldAt {
+		tr.foldAt = d.Until
+		tr.foldInStock = d.EndInStock
+	}
+}
+
+// RestoreLast 从持久化恢复某状态最近一次的时刻（只更新索引，不产生明细；早于现有值时忽略）。
+// 明细折叠进日汇总后没有精确时刻，重启后靠它继续算历时。
+func (t *Timeline) RestoreLast(k Key, kind Kind, at time.Time) {
+	if kind >= kindCount {
+		return
+	}
+	sec := at.Unix()
+	t.mu.Lock()
+	defer t.mu.Unlock()
+	tr := t.trackLocked(k)
+	if sec > tr.last[kind] {
+		tr.last[kind] = sec
+	}
+}
+
+// LastAt 给定状态中最近一次变成其中之一的时刻
+func (t *Timeline) LastAt(k Key, kinds ...Kind) (time.Time, bool) {
+	t.mu.RLock()
+	defer t.mu.RUnlock()
+	tr := t.tracks[k]
+	if tr == nil {
+		return time.Time{}, false
+	}
+	var best int64
+	for _, kind := range kinds {
+		if kind < kindCount && tr.last[kind] > best {
+			best = tr.last[kind]
+		}
+	}
+	if best == 0 {
+		return time.Time{}, false
+	}
+	return time.Unix(best, 0), true
+}
+
+// Len 未折叠的明细条数
+func (t *Timeline) Len() int {
+	t.mu.RLock()
+	defer t.mu.RUnlock()
+	n := 0
+	for _, tr := range t.tracks {
+		n += len(tr.raw)
+	}
+	return n
+}
+
+// Compact 把 before 之前的明细折叠进日汇总，并裁掉超出 maxDays 的旧汇总。
+// 返回各序列本次改动过的日汇总（调用方持久化用）；没有改动的序列不出现。
+func (t *Timeline) Compact(before time.Time) map[Key][]Day {
+	cut := before.Unix()
+	t.mu.Lock()
+	defer t.mu.Unlock()
+	out := map[Key][]Day{}
+	for k, tr := range t.tracks {
+		if touched := tr.fold(cut); len(touched) > 0 {
+			out[k] = touched
+		}
+		if t.maxDays > 0 && len(tr.days) > t.maxDays {
+			tr.days = append([]Day(nil), tr.days[len(tr.days)-t.maxDays:]...)
+		}
+	}
+	return out
+}
+
+// fold 折叠 cut 之前的明细，返回改动过的日汇总副本
+func (tr *track) fold(cut int64) []Day {
+	i := sort.Search(len(tr.raw), func(i int) bool { return tr.raw[i].At >= cut })
+	cur, in := tr.foldAt, tr.foldInStock
+	if cur == 0 && i == 0 {
+		return nil // 从没有过明细，也就没有起点
+	}
+	if cur >= cut {
+		return nil
+	}
+	touched := map[int64]bool{}
+	for _, p := range tr.raw[:i] {
+		if cur == 0 {
+			cur = p.At
+		}
+		tr.addSpan(cur, p.At, in, touched)
+		if p.Kind == KindAvailable && !in {
+			tr.day(p.At).Restocks++
+			touched[dayStart(p.At)] = true
+		}
+		in = p.Kind == KindAvailable
+		cur = p.At
+	}
+	tr.addSpan(cur, cut, in, touched)
+	tr.foldAt, tr.foldInStock = cut, in
+	// 换新底层数组，已折叠的明细随旧数组一起释放
+	tr.raw = append([]Transition(nil), tr.raw[i:]...)
+
+	days := make([]Day, 0, len(touched))
+	for _, d := range tr.days {
+		if touched[d.Start] {
+			days = append(days, d)
+		}
+	}
+	return days
+}
+
+// addSpan 把 [from, to) 计入所跨的每一天；每段都更新该天的 Until / EndInStock
+func (tr *track) addSpan(from, to int64, in bool, touched map[int64]bool) {
+	for from < to {
+		end := dayStart(from) + daySeconds
+		if end > to {
+			end = to
+		}
+		d := tr.day(from)
+		if in {
+			d.InStockSec += end - from
+		}
+		d.Until, d.EndInStock = end, in
+		touched[d.Start] = true
+		from = end
+	}
+}
+
+// day 取（必要时创建）包含 sec 的那一天
+func (tr *track) day(sec int64) *Day {
+	start := dayStart(sec)
+	n := len(tr.days)
+	if n > 0 && tr.days[n-1].Start == start {
+		return &tr.days[n-1]
+	}
+	i := sort.Search(n, func(i int) bool { return tr.days[i].Start >= start })
+	if i == n || tr.days[i].Start != start {
+		tr.days = append(tr.days, Day{})
+		copy(tr.days[i+1:], tr.days[i:])
+		tr.days[i] = Day{Start: start}
+	}
+	return &tr.days[i]
+}
+
+func dayStart(sec int64) int64 {
+	return sec - ((sec%daySeconds)+daySeconds)%daySeconds
+}
+
+// DCStats 某机房在统计窗口内的补货统计（该机房下所有配置合计）
+type DCStats struct {
+	Datacenter     string  `json:"datacenter"`
+	Configs        int     `json:"configs"`
+	Restocks       int     `json:"restocks"`
+	InStockSec     int64   `json:"inStockSec"`
+	MeanInStockSec int64   `json:"meanInStockSec"` // 平均每次补货在货时长 = InStockSec / Restocks
+	InStockRatio   float64 `json:"inStockRatio"`   // 在货时间占已观测时间的比例
+	InStockNow     bool    `json:"inStockNow"`
+	LastRestock    string  `json:"lastRestock,omitempty"` // RFC3339
+}
+
+// Stats 按机房汇总 [since, now] 的补货统计，按机房名排序。
+// 日汇总部分按天粒度计入（since 所在那天整天算进来），明细部分精确到秒。
+func (t *Timeline) Stats(since, now time.Time) []DCStats {
+	from, to := since.Unix(), now.Unix()
+	fromDay := dayStart(from)
+	t.mu.RLock()
+	defer t.mu.RUnlock()
+	byDC := map[string]*DCStats{}
+	observed := map[string]int64{}
+	lastRestock := map[string]int64{}
+	for k, tr := range t.tracks {
+		s := byDC[k.Datacenter]
+		if s == nil {
+			s = &DCStats{Datacenter: k.Datacenter}
+			byDC[k.Datacenter] = s
+		}
+		s.Configs++
+
+		for _, d := range tr.days {
+			if d.Start >= fromDay {
+				s.InStockSec += d.InStockSec
+				s.Restocks += d.Restocks
+			}
+		}
+		cur, in := tr.foldAt, tr.foldInStock
+		for _, p := range tr.raw {
+			if cur == 0 {
+				cur = p.At
+			}
+			if in {
+				s.InStockSec += overlap(cur, p.At, from, to)
+			}
+			if p.Kind == KindAvailable && !in && p.At >= from && p.At <= to {
+				s.Restocks++
+			}
+			in = p.Kind == KindAvailable
+			cur = p.At
+		}
+		if cur != 0 && in {
+			s.InStockSec += overlap(cur, to, from, to)
+		}
+		s.InStockNow = s.InStockNow || in
+		// 已观测时间：从这条序列最早有记录的时刻（不早于 since）到 now
+		var first int64
+		if len(tr.days) > 0 {
+			first = tr.days[0].Start
+		} else if len(tr.raw) > 0 {
+			first = tr.raw[0].At
+		}
+		if first != 0 {
+			observed[k.Datacenter] += overlap(first, to, from, to)
+		}
+		if la := tr.last[KindAvailable]; la > lastRestock[k.Datacenter] {
+			lastRestock[k.Datacenter] = la
+		}
+	}
+
+	out := make([]DCStats, 0, len(byDC))
+	for dc, s := range byDC {
+		if s.Restocks > 0 {
+			s.MeanInStockSec = s.InStockSec / int64(s.Restocks)
+		}
+		if obs := observed[dc]; obs > 0 {
+			s.InStockRatio = float64(s.InStockSec) / float64(obs)
+			if s.InStockRatio > 1 {
+				s.InStockRatio = 1
+			}
+		}
+		if la := lastRestock[dc]; la > 0 {
+			s.LastRestock = time.Unix(la, 0).UTC().Format(time.RFC3339)
+		}
+		out = append(out, *s)
+	}
+	sort.Slice(out, func(i, j int) bool { return out[i].Datacenter < out[j].Datacenter })
+	return out
+}
+
+// overlap [a, b) 与 [lo, hi) 的交集长度
+func overlap(a, b, lo, hi int64) int64 {
+	if a < lo {
+		a = lo
+	}
+	if b > hi {
+		b = hi
+	}
+	if b <= a {
+		return 0
+	}
+	return b - a
+}
@@ -0,0 +1,65 @@
+package availability
+
+import (
+	"testing"
+	"time"
+)
+
+func TestTimelineCompactKeepsStats(t *testing.T) {
+	t0 := time.Date(2026, 1, 1, 0, 0, 0, 0, time.UTC)
+	k := Key{Datacenter: "gra", Config: "32g + 2x1t"}
+	tl := New(0)
+	tl.Record(k, KindUnavailable, t0)
+	tl.Record(k, KindAvailable, t0.Add(2*time.Hour))
+	tl.Record(k, KindUnavailable, t0.Add(5*time.Hour))
+	tl.Record(k, KindAvailable, t0.Add(26*time.Hour))
+
+	if at, ok := tl.LastAt(k, KindUnavailable, KindPriceCheckFailed); !ok || !at.Equal(t0.Add(5*time.Hour)) {
+		t.Fatalf("LastAt=%v %v", at, ok)
+	}
+	if _, ok := tl.LastAt(Key{Datacenter: "bhs"}, KindAvailable); ok {
+		t.Fatal("unknown key must miss")
+	}
+
+	now := t0.Add(27 * time.Hour)
+	check := func(tl *Timeline, label string) {
+		st := tl.Stats(t0, now)
+		if len(st) != 1 {
+			t.Fatalf("%s: stats=%+v", label, st)
+		}
+		s := st[0]
+		if s.Restocks != 2 || s.InStockSec != int64(4*time.Hour/time.Second) || !s.InStockNow ||
+			s.MeanInStockSec != int64(2*time.Hour/time.Second) {
+			t.Fatalf("%s: %+v", label, s)
+		}
+	}
+	check(tl, "raw")
+
+	changed := tl.Compact(t0.Add(25 * time.Hour))
+	if tl.Len() != 1 || len(changed[k]) != 2 {
+		t.Fatalf("len=%d changed=%+v", tl.Len(), changed)
+	}
+	check(tl, "compacted")
+
+	// 从持久化的日汇总 + 剩余明细恢复，结果一致；折叠点之前的明细被忽略
+	re := New(0)
+	for _, d := range changed[k] {
+		re.RestoreDay(k, d)
+	}
+	re.Record(k, KindAvailable, t0.Add(2*time.Hour))
+	re.Record(k, KindAvailable, t0.Add(26*time.Hour))
+	if re.Len() != 1 {
+		t.Fatalf("restored len=%d", re.Len())
+	}
+	check(re, "restored")
+
+	// 折叠掉的明细不恢复最近时刻，需 RestoreLast 补上；更早的值不会覆盖
+	if _, ok := re.LastAt(k, KindUnavailable); ok {
+		t.Fatal("folded transition must not restore LastAt")
+	}
+	re.RestoreLast(k, KindUnavailable, t0.Add(5*time.Hour))
+	re.RestoreLast(k, KindUnavailable, t0)
+	if at, ok := re.LastAt(k, KindUnavailable, KindPriceCheckFailed); !ok || !at.Equal(t0.Add(5*time.Hour)) {
+		t.Fatalf("restored LastAt=%v %v", at, ok)
+	}
+}
@@ -26,13 +26,14 @@ type ConfigAvailability struct {
 }
 
 // CheckServerAvailabilityWithConfigs 返回每个配置组合的可用性 + 匹配到的 API2 options。
-//   - accountID:决定用哪个账户的 OVH client 和 zone 拉 catalog。空 = 默认账户。
-//     `/dedicated/server/datacenter/availabilities` 是全局接口,client 走哪个账户无所谓;
+//   - accountID:决定用哪个账户的 zone 拉 catalog。空 = 默认账户。
+//     `/dedicated/server/datacenter/availabilities` 是全局接口,client 走哪个账户无所谓,
+//     所以由 OVH.ReadClientFor 在同 endpoint 的账户间按额度余量分流;
 //     但 `/order/catalog/public/eco` 必须用对应 subsidiary 拉,否则跨子公司账户的 options 匹配会失败。
 //   - monitor 检查 loop 没有"当前账户"概念,直接传 "",意味着只能保证默认账户 + 同 subsidiary 账户准确;
 //     quick-order / Telegram 这种已知 account_id 的调用方应该传具体 ID。
 func CheckServerAvailabilityWithConfigs(state *app.State, planCode string, accountID string) map[string]*ConfigAvailability {
-	client, err := state.OVH.ClientFor(accountID)
+	client, _, err := state.OVH.ReadClientFor(accountID)
 	if err != nil {
 		return map[string]*ConfigAvailability{}
 	}
@@ -60,8 +61,9 @@ func CheckServerAvailabilityWithConfigs(state *app.State, planCode string, accou
 	if subsidiary == "" {
 		subsidiary = "IE"
 	}
-	var catalogResp map[string]interface{}
-	_ = client.Get("/order/catalog/public/eco?ovhSubsidiary="+subsidiary, &catalogResp)
+	// 拉一次、解码一次；plan 查找走索引，addon 标准化表在多个配置组合之间复用
+	cat, _ := FetchEcoCatalog(client, subsidiary)
+	plan := cat.Plan(planCode)
 
 	result := map[string]*ConfigAvailability{}
 	for _, item := range availabilities {
@@ -99,68 +101,11 @@ func CheckServerAvailabilityWithConfigs(state *app.State, planCode string, accou
 		state.Logger.Debug(fmt.Sprintf("[配置监控] 提取选项: memory=%s (标准化: %s), storage=%s (标准化: %s)",
 			memory, memoryStd, storage, storageStd), "monitor")
 
-		if (memoryStd != "" || storageStd != "") && catalogResp != nil {
-			if plans, ok := catalogResp["plans"].([]interface{}); ok {
-				planFound := false
-				for _, planRaw := range plans {
-					plan, ok := planRaw.(map[string]interface{})
-					if !ok {
-						continue
-					}
-					if getString(plan, "planCode", "") != planCode {
-						continue
-					}
-					planFound = true
-					addonFamilies, _ := plan["addonFamilies"].([]interface{})
-					for _, familyRaw := range addonFamilies {
-						family, ok := familyRaw.(map[string]interface{})
-						if !ok {
-							continue
-						}
-						familyName := strings.ToLower(getString(family, "name", ""))
-						addons, _ := family["addons"].([]interface{})
-
-						if familyName == "memory" && memoryStd != "" {
-							for _, addonRaw := range addons {
-								addon, ok := addonRaw.(string)
-								if !ok {
-									continue
-								}
-								addonStd := StandardizeConfig(addon)
-								if addonStd == memoryStd {
-									if !contains(api2Options, addon) {
-										api2Options = append(api2Options, addon)
-									}
-								} else if memoryStd != "" && strings.Contains(addonStd, memoryStd) {
-									if !contains(api2Options, addon) {
-										api2Options = append(api2Options, addon)
-									}
-								}
-							}
-						} else if familyName == "storage" && storageStd != "" {
-							for _, addonRaw := range addons {
-								addon, ok := addonRaw.(string)
-								if !ok {
-									continue
-								}
-								addonStd := StandardizeConfig(addon)
-								if addonStd == storageStd {
-									if !contains(api2Options, addon) {
-										api2Options = append(api2Options, addon)
-									}
-								} else if storageStd != "" && strings.Contains(addonStd, storageStd) {
-									if !contains(api2Options, addon) {
-										api2Options = append(api2Options, addon)
-									}
-								}
-							}
-						}
-					}
-					break
-				}
-				if !planFound {
-					state.Logger.Warn(fmt.Sprintf("[配置监控] 在 catalog 中未找到 planCode: %s", planCode), "monitor")
-				}
+		if (memoryStd != "" || storageStd != "") && cat != nil {
+			if plan != nil {
+				api2Options = plan.matchAddons(memoryStd, storageStd)
+			} else {
+				state.Logger.Warn(fmt.Sprintf("[配置监控] 在 catalog 中未找到 planCode: %s", planCode), "monitor")
 			}
 		}
 
@@ -184,7 +129,7 @@ func CheckServerAvailabilityWithConfigs(state *app.State, planCode string, accou
 
 // CheckServerAvailability 对应 Python: check_server_availability（带 options 精确匹配）
 func CheckServerAvailability(state *app.State, planCode string, options []string) (map[string]string, error) {
-	client, err := state.OVH.ClientFor("")
+	client, _, err := state.OVH.ReadClientFor("")
 	if err != nil {
 		return nil, err
 	}
@@ -358,7 +303,7 @@ var dcNameMap = map[string][2]string{
 // LoadServerList 对应 Python: load_server_list。
 // 多账户:用默认账户的 zone 作 ovhSubsidiary,不读全局 state.Config(新建账户不会写 kv['config'])
 func LoadServerList(state *app.State) []types.ServerPlan {
-	client, err := state.OVH.ClientFor("")
+	client, _, err := state.OVH.ReadClientFor("")
 	if err != nil {
 		state.Logger.Error("Failed to load server list: "+err.Error(), "")
 		return nil
@@ -369,28 +314,20 @@ func LoadServerList(state *app.State) []types.ServerPlan {
 		subsidiary = "IE"
 	}
 
-	var catalogResp map[string]interface{}
-	if err := client.Get("/order/catalog/public/eco?ovhSubsidiary="+subsidiary, &catalogResp); err != nil {
+	cat, err := FetchEcoCatalog(client, subsidiary)
+	if err != nil {
 		state.Logger.Error("Failed to load server list: "+err.Error(), "")
 		return nil
 	}
 
-	plans, _ := catalogResp["plans"].([]interface{})
-	result := []types.ServerPlan{}
-
 	// 并发预拉所有 plan 的 availabilities（这是循环里唯一的网络 IO）
 	// 96 个 plan × 200ms 串行 = 20 秒；改 15 并发 ≈ 1.5 秒
-	type availEntry struct {
-		availabilities []map[string]interface{}
-	}
-	availByPlan := make(map[string]*availEntry, len(plans))
+	availByPlan := make(map[string][]EcoAvailability, len(cat.Plans))
 	var availMu sync.Mutex
-	planCodes := make([]string, 0, len(plans))
-	for _, planRaw := range plans {
-		if p, ok := planRaw.(map[string]interface{}); ok {
-			if pc := getString(p, "planCode", ""); pc != "" {
-				planCodes = append(planCodes, pc)
-			}
+	planCodes := make([]string, 0, len(cat.Plans))
+	for i := range cat.Plans {
+		if pc := cat.Plans[i].PlanCode; pc != "" {
+			planCodes = append(planCodes, pc)
 		}
 	}
 	sem := make(chan struct{}, 15)
@@ -401,46 +338,82 @@ func LoadServerList(state *app.State) []types.ServerPlan {
 		go func(planCode string) {
 			defer wg.Done()
 			defer func() { <-sem }()
-			var avs []map[string]interface{}
+			var avs []EcoAvailability
 			q := url.Values{}
 			q.Set("planCode", planCode)
 			_ = client.Get("/dedicated/server/datacenter/availabilities?"+q.Encode(), &avs)
 			availMu.Lock()
-			availByPlan[planCode] = &availEntry{availabilities: avs}
+			availByPlan[planCode] = avs
 			availMu.Unlock()
 		}(pc)
 	}
 	wg.Wait()
 	state.Logger.Info(fmt.Sprintf("已并发预拉 %d 个 plan 的可用性", len(planCodes)), "")
 
-	for _, planRaw := range plans {
-		plan, ok := planRaw.(map[string]interface{})
-		if !ok {
-			continue
-		}
-		planCode := getString(plan, "planCode", "")
+	return buildServerPlans(cat, availByPlan, func(msg string) { state.Logger.Info(msg, "") })
+}
+
+// 硬件信息抽取用的正则（包级预编译，每次刷新不再重复编译）
+var (
+	reRAMAddon = regexp.MustCompile(`(?i)ram-(\d+)g`)
+
+	// 从名称/描述兜底提取内存，按顺序取第一个命中
+	memoryNamePatterns = []*regexp.Regexp{
+		regexp.MustCompile(`(?i)(\d+)\s*GB\s*RAM`),
+		regexp.MustCompile(`(?i)RAM\s*(\d+)\s*GB`),
+		regexp.MustCompile(`(?i)(\d+)\s*G\s*RAM`),
+		regexp.MustCompile(`(?i)RAM\s*(\d+)\s*G`),
+		regexp.MustCompile(`(?i)(\d+)\s*GB`),
+	}
+	// 从名称/描述兜底提取存储
+	storageNamePatterns = []*regexp.Regexp{
+		regexp.MustCompile(`(?i)(\d+)\s*[xX]\s*(\d+)\s*GB\s*(SSD|HDD|NVMe)`),
+		regexp.MustCompile(`(?i)(\d+)\s*TB\s*(SSD|HDD|NVMe)`),
+		regexp.MustCompile(`(?i)(\d+)\s*(SSD|HDD|NVMe)`),
+	}
+
+	reTrafficSpeed  = regexp.MustCompile(`(?i)traffic-(\d+)(tb|gb|mb)-(\d+)`)
+	reTrafficOnly   = regexp.MustCompile(`(?i)traffic-(\d+)(tb|gb|mb)$`)
+	reBandwidthMbps = regexp.MustCompile(`(?i)bandwidth-(\d+)`)
+	reFirstNumber   = regexp.MustCompile(`(\d+)`)
+	reVrackMbps     = regexp.MustCompile(`(?i)vrack-bandwidth-(\d+)`)
+)
+
+// isLicenseAddon 许可证类 addon 不进可选项
+func isLicenseAddon(lcAddon string) bool {
+	return strings.Contains(lcAddon, "windows-server") ||
+		strings.Contains(lcAddon, "sql-server") ||
+		strings.Contains(lcAddon, "cpanel-license") ||
+		strings.Contains(lcAddon, "plesk-") ||
+		strings.Contains(lcAddon, "-license-") ||
+		strings.HasPrefix(lcAddon, "os-") ||
+		strings.Contains(lcAddon, "control-panel") ||
+		strings.Contains(lcAddon, "panel")
+}
+
+// buildServerPlans 把解码后的 catalog + 预拉的可用性组装成 ServerPlan 列表（纯计算，不做网络 IO）。
+// logInfo 接收解析过程中的提示日志。
+func buildServerPlans(cat *EcoCatalog, availByPlan map[string][]EcoAvailability, logInfo func(string)) []types.ServerPlan {
+	result := make([]types.ServerPlan, 0, len(cat.Plans))
+	for pi := range cat.Plans {
+		plan := &cat.Plans[pi]
+		planCode := plan.PlanCode
 		if planCode == "" {
 			continue
 		}
 
 		// 从预拉结果取（保持串行解析以确保 1:1）
 		datacenters := []types.Datacenter{}
-		var availabilities []map[string]interface{}
-		if entry, ok := availByPlan[planCode]; ok {
-			availabilities = entry.availabilities
-		}
-		for _, item := range availabilities {
-			if dcsRaw, ok := item["datacenters"].([]interface{}); ok {
-				for _, dcRaw := range dcsRaw {
-					dc, ok := dcRaw.(map[string]interface{})
-					if !ok {
-						continue
-					}
-					datacenters = append(datacenters, types.Datacenter{
-						Datacenter:   getString(dc, "datacenter", ""),
-						Availability: getString(dc, "availability", "unknown"),
-					})
+		for _, item := range availByPlan[planCode] {
+			for _, dc := range item.Datacenters {
+				availability := dc.Availability
+				if availability == "" {
+					availability = "unknown"
 				}
+				datacenters = append(datacenters, types.Datacenter{
+					Datacenter:   dc.Datacenter,
+					Availability: availability,
+				})
 			}
 		}
 		// 填充中文名/region
@@ -463,8 +436,8 @@ func LoadServerList(state *app.State) []types.ServerPlan {
 
 		serverInfo := types.ServerPlan{
 			PlanCode:         planCode,
-			Name:             getString(plan, "invoiceName", ""),
-			Description:      getString(plan, "description", ""),
+			Name:             plan.InvoiceName,
+			Description:      plan.Description,
 			CPU:              "N/A",
 			Memory:           "N/A",
 			Storage:          "N/A",
@@ -478,7 +451,7 @@ func LoadServerList(state *app.State) []types.ServerPlan {
 		// 特殊系列：SYSLE / SK
 		lcPlan := strings.ToLower(planCode)
 		if strings.Contains(lcPlan, "sysle") {
-			state.Logger.Info(fmt.Sprintf("检测到SYSLE系列服务器: %s", planCode), "")
+			logInfo(fmt.Sprintf("检测到SYSLE系列服务器: %s", planCode))
 			switch {
 			case strings.Contains(planCode, "011"):
 				serverInfo.CPU = "SYSLE 011系列 (入门级服务器CPU)"
@@ -489,14 +462,11 @@ func LoadServerList(state *app.State) []types.ServerPlan {
 			default:
 				serverInfo.CPU = "SYSLE系列CPU"
 			}
-			extractCPUFromNames(plan, &serverInfo, state)
+			extractCPUFromNames(plan, &serverInfo, logInfo)
 		} else if strings.Contains(lcPlan, "sk") {
-			state.Logger.Info(fmt.Sprintf("检测到SK系列服务器: %s", planCode), "")
-			displayName := getString(plan, "displayName", "")
-			invoiceName := getString(plan, "invoiceName", "")
-			description := getString(plan, "description", "")
+			logInfo(fmt.Sprintf("检测到SK系列服务器: %s", planCode))
 			foundCPU := false
-			for _, name := range []string{displayName, invoiceName, description} {
+			for _, name := range []string{plan.DisplayName, plan.InvoiceName, plan.Description} {
 				if name == "" {
 					continue
 				}
@@ -507,7 +477,7 @@ func LoadServerList(state *app.State) []types.ServerPlan {
 						lc := strings.ToLower(cpuPart)
 						if strings.Contains(lc, "intel") || strings.Contains(lc, "amd") || strings.Contains(lc, "xeon") || strings.Contains(lc, "i7") {
 							serverInfo.CPU = cpuPart
-							state.Logger.Info(fmt.Sprintf("从名称中提取CPU型号: %s 给 %s", cpuPart, planCode), "")
+							logInfo(fmt.Sprintf("从名称中提取CPU型号: %s 给 %s", cpuPart, planCode))
 							foundCPU = true
 						}
 					}
@@ -522,8 +492,8 @@ func LoadServerList(state *app.State) []types.ServerPlan {
 		}
 
 		if serverInfo.CPU == "N/A" {
-			state.Logger.Info(fmt.Sprintf("服务器 %s 无法从API提取CPU信息，尝试从名称提取", planCode), "")
-			extractCPUFromNames(plan, &serverInfo, state)
+			logInfo(fmt.Sprintf("服务器 %s 无法从API提取CPU信息，尝试从名称提取", planCode))
+			extractCPUFromNames(plan, &serverInfo, logInfo)
 			if serverInfo.CPU == "N/A" {
 				switch {
 				case strings.Contains(lcPlan, "sysle"):
@@ -539,42 +509,28 @@ func LoadServerList(state *app.State) []types.ServerPlan {
 		}
 
 		if serverInfo.Name == "" {
-			serverInfo.Name = getString(plan, "displayName", "")
+			serverInfo.Name = plan.DisplayName
 		}
 		if serverInfo.Description == "" {
-			serverInfo.Description = getString(plan, "displayName", "")
+			serverInfo.Description = plan.DisplayName
 		}
 
 		// 从 addonFamilies 提取硬件 + 选项
-		if afRaw, ok := plan["addonFamilies"].([]interface{}); ok {
+		if plan.AddonFamilies != nil {
 			tempAvailable := []types.ServerOption{}
-			for _, familyRaw := range afRaw {
-				family, ok := familyRaw.(map[string]interface{})
-				if !ok {
-					continue
-				}
-				familyName := strings.ToLower(getString(family, "name", ""))
-				defaultAddon := getString(family, "default", "")
-				addons, _ := family["addons"].([]interface{})
+			for _, family := range plan.AddonFamilies {
+				familyName := strings.ToLower(family.Name)
+				defaultAddon := family.Default
 
-				for _, addonRaw := range addons {
-					addonCode, ok := addonRaw.(string)
-					if !ok {
+				for _, addonCode := range family.Addons {
+					if addonCode == "" {
 						continue
 					}
-					isDefault := addonCode == defaultAddon
-					lcAddon := strings.ToLower(addonCode)
 					// 过滤许可证
-					if strings.Contains(lcAddon, "windows-server") ||
-						strings.Contains(lcAddon, "sql-server") ||
-						strings.Contains(lcAddon, "cpanel-license") ||
-						strings.Contains(lcAddon, "plesk-") ||
-						strings.Contains(lcAddon, "-license-") ||
-						strings.HasPrefix(lcAddon, "os-") ||
-						strings.Contains(lcAddon, "control-panel") ||
-						strings.Contains(lcAddon, "panel") {
+					if isLicenseAddon(strings.ToLower(addonCode)) {
 						continue
 					}
+					isDefault := addonCode == defaultAddon
 					tempAvailable = append(tempAvailable, types.ServerOption{
 						Label:     addonCode,
 						Value:     addonCode,
@@ -594,7 +550,7 @@ func LoadServerList(state *app.State) []types.ServerPlan {
 					case (strings.Contains(familyName, "cpu") || strings.Contains(familyName, "processor")) && serverInfo.CPU == "N/A":
 						serverInfo.CPU = defaultAddon
 					case (strings.Contains(familyName, "memory") || strings.Contains(familyName, "ram")) && serverInfo.Memory == "N/A":
-						if m := regexp.MustCompile(`(?i)ram-(\d+)g`).FindStringSubmatch(defaultAddon); m != nil {
+						if m := reRAMAddon.FindStringSubmatch(defaultAddon); m != nil {
 							serverInfo.Memory = m[1] + " GB"
 						} else {
 							serverInfo.Memory = defaultAddon
@@ -619,67 +575,51 @@ func LoadServerList(state *app.State) []types.ServerPlan {
 		}
 
 		// 解析方法 2: 从 plan.details.properties 提取（1:1 对应 app.py:2010-2040）
-		if details, ok := plan["details"].(map[string]interface{}); ok {
-			if propsRaw, ok := details["properties"].([]interface{}); ok {
-				for _, pRaw := range propsRaw {
-					prop, ok := pRaw.(map[string]interface{})
-					if !ok {
-						continue
-					}
-					propName := strings.ToLower(getString(prop, "name", ""))
-					value := getString(prop, "value", "N/A")
-					if value == "" || value == "N/A" {
-						continue
-					}
-					switch {
-					case (strings.Contains(propName, "cpu") || strings.Contains(propName, "processor")) && serverInfo.CPU == "N/A":
-						serverInfo.CPU = value
-					case (strings.Contains(propName, "memory") || strings.Contains(propName, "ram")) && serverInfo.Memory == "N/A":
-						serverInfo.Memory = value
-					case (strings.Contains(propName, "storage") || strings.Contains(propName, "disk") || strings.Contains(propName, "hdd") || strings.Contains(propName, "ssd")) && serverInfo.Storage == "N/A":
-						serverInfo.Storage = value
-					case strings.Contains(propName, "bandwidth"):
-						if strings.Contains(propName, "vrack") || strings.Contains(propName, "private") || strings.Contains(propName, "internal") {
-							if serverInfo.VrackBandwidth == "N/A" {
-								serverInfo.VrackBandwidth = value
-							}
-						} else if serverInfo.Bandwidth == "N/A" {
-							serverInfo.Bandwidth = value
-						}
+		for _, prop := range plan.Details.Properties {
+			propName := strings.ToLower(prop.Name)
+			value := prop.Value
+			if value == "" || value == "N/A" {
+				continue
+			}
+			switch {
+			case (strings.Contains(propName, "cpu") || strings.Contains(propName, "processor")) && serverInfo.CPU == "N/A":
+				serverInfo.CPU = value
+			case (strings.Contains(propName, "memory") || strings.Contains(propName, "ram")) && serverInfo.Memory == "N/A":
+				serverInfo.Memory = value
+			case (strings.Contains(propName, "storage") || strings.Contains(propName, "disk") || strings.Contains(propName, "hdd") || strings.Contains(propName, "ssd")) && serverInfo.Storage == "N/A":
+				serverInfo.Storage = value
+			case strings.Contains(propName, "bandwidth"):
+				if strings.Contains(propName, "vrack") || strings.Contains(propName, "private") || strings.Contains(propName, "internal") {
+					if serverInfo.VrackBandwidth == "N/A" {
+						serverInfo.VrackBandwidth = value
 					}
+				} else if serverInfo.Bandwidth == "N/A" {
+					serverInfo.Bandwidth = value
 				}
 			}
 		}
 
 		// 解析方法 3: 从 plan.product.configurations 提取（1:1 对应 app.py:2154-2184）
-		if product, ok := plan["product"].(map[string]interface{}); ok {
-			if cfgs, ok := product["configurations"].([]interface{}); ok {
-				for _, cRaw := range cfgs {
-					cfg, ok := cRaw.(map[string]interface{})
-					if !ok {
-						continue
-					}
-					cfgName := strings.ToLower(getString(cfg, "name", ""))
-					value := getString(cfg, "value", "")
-					if value == "" {
-						continue
-					}
-					switch {
-					case (strings.Contains(cfgName, "cpu") || strings.Contains(cfgName, "processor")) && serverInfo.CPU == "N/A":
-						serverInfo.CPU = value
-					case (strings.Contains(cfgName, "memory") || strings.Contains(cfgName, "ram")) && serverInfo.Memory == "N/A":
-						serverInfo.Memory = value
-					case (strings.Contains(cfgName, "storage") || strings.Contains(cfgName, "disk") || strings.Contains(cfgName, "hdd") || strings.Contains(cfgName, "ssd")) && serverInfo.Storage == "N/A":
-						serverInfo.Storage = value
-					case strings.Contains(cfgName, "bandwidth") && serverInfo.Bandwidth == "N/A":
-						serverInfo.Bandwidth = value
-					}
-				}
+		for _, cfg := range plan.Product.Configurations {
+			cfgName := strings.ToLower(cfg.Name)
+			value := cfg.Value
+			if value == "" {
+				continue
+			}
+			switch {
+			case (strings.Contains(cfgName, "cpu") || strings.Contains(cfgName, "processor")) && serverInfo.CPU == "N/A":
+				serverInfo.CPU = value
+			case (strings.Contains(cfgName, "memory") || strings.Contains(cfgName, "ram")) && serverInfo.Memory == "N/A":
+				serverInfo.Memory = value
+			case (strings.Contains(cfgName, "storage") || strings.Contains(cfgName, "disk") || strings.Contains(cfgName, "hdd") || strings.Contains(cfgName, "ssd")) && serverInfo.Storage == "N/A":
+				serverInfo.Storage = value
+			case strings.Contains(cfgName, "bandwidth") && serverInfo.Bandwidth == "N/A":
+				serverInfo.Bandwidth = value
 			}
 		}
 
 		// 解析方法 4: 从 plan.description 逗号分割解析（1:1 对应 app.py:2186-2211）
-		if desc := getString(plan, "description", ""); desc != "" {
+		if desc := plan.Description; desc != "" {
 			for _, part := range strings.Split(desc, ",") {
 				part = strings.ToLower(strings.TrimSpace(part))
 				if part == "" {
@@ -704,42 +644,27 @@ func LoadServerList(state *app.State) []types.ServerPlan {
 		}
 
 		// 解析方法 5: 从 plan.pricing.configurations 提取（1:1 对应 app.py:2213-2242）
-		if pricing, ok := plan["pricing"].(map[string]interface{}); ok {
-			if cfgs, ok := pricing["configurations"].([]interface{}); ok {
-				for _, cRaw := range cfgs {
-					cfg, ok := cRaw.(map[string]interface{})
-					if !ok {
-						continue
-					}
-					cfgName := strings.ToLower(getString(cfg, "name", ""))
-					value := getString(cfg, "value", "")
-					if value == "" {
-						continue
-					}
-					switch {
-					case strings.Contains(cfgName, "processor") && serverInfo.CPU == "N/A":
-						serverInfo.CPU = value
-					case strings.Contains(cfgName, "memory") && serverInfo.Memory == "N/A":
-						serverInfo.Memory = value
-					case strings.Contains(cfgName, "storage") && serverInfo.Storage == "N/A":
-						serverInfo.Storage = value
-					}
-				}
+		for _, cfg := range plan.Pricing.Configurations {
+			cfgName := strings.ToLower(cfg.Name)
+			value := cfg.Value
+			if value == "" {
+				continue
+			}
+			switch {
+			case strings.Contains(cfgName, "processor") && serverInfo.CPU == "N/A":
+				serverInfo.CPU = value
+			case strings.Contains(cfgName, "memory") && serverInfo.Memory == "N/A":
+				serverInfo.Memory = value
+			case strings.Contains(cfgName, "storage") && serverInfo.Storage == "N/A":
+				serverInfo.Storage = value
 			}
 		}
 
 		// 从名称提取内存/存储（次要）
 		if serverInfo.Memory == "N/A" {
 			fullText := serverInfo.Name + " " + serverInfo.Description
-			patterns := []string{
-				`(\d+)\s*GB\s*RAM`,
-				`RAM\s*(\d+)\s*GB`,
-				`(\d+)\s*G\s*RAM`,
-				`RAM\s*(\d+)\s*G`,
-				`(\d+)\s*GB`,
-			}
-			for _, p := range patterns {
-				if m := regexp.MustCompile(`(?i)` + p).FindStringSubmatch(fullText); m != nil {
+			for _, re := range memoryNamePatterns {
+				if m := re.FindStringSubmatch(fullText); m != nil {
 					serverInfo.Memory = m[1] + " GB"
 					break
 				}
@@ -747,13 +672,8 @@ func LoadServerList(state *app.State) []types.ServerPlan {
 		}
 		if serverInfo.Storage == "N/A" {
 			fullText := serverInfo.Name + " " + serverInfo.Description
-			patterns := []string{
-				`(\d+)\s*[xX]\s*(\d+)\s*GB\s*(SSD|HDD|NVMe)`,
-				`(\d+)\s*TB\s*(SSD|HDD|NVMe)`,
-				`(\d+)\s*(SSD|HDD|NVMe)`,
-			}
-			for _, p := range patterns {
-				if m := regexp.MustCompile(`(?i)` + p).FindStringSubmatch(fullText); m != nil {
+			for _, re := range storageNamePatterns {
+				if m := re.FindStringSubmatch(fullText); m != nil {
 					if len(m) >= 4 && m[3] != "" {
 						serverInfo.Storage = fmt.Sprintf("%sx %sGB %s", m[1], m[2], strings.ToUpper(m[3]))
 					} else if len(m) >= 3 {
@@ -776,15 +696,15 @@ func parseBandwidthValue(defaultValue string, sv *types.ServerPlan) string {
 	lc := strings.ToLower(defaultValue)
 
 	// 1) traffic-Xtb-Y: X 流量 + Y Mbps
-	if m := regexp.MustCompile(`(?i)traffic-(\d+)(tb|gb|mb)-(\d+)`).FindStringSubmatch(defaultValue); m != nil {
+	if m := reTrafficSpeed.FindStringSubmatch(defaultValue); m != nil {
 		return fmt.Sprintf("%s Mbps / %s %s流量", m[3], m[1], strings.ToUpper(m[2]))
 	}
 	// 2) traffic-X(tb|gb|mb)$: 仅流量限制
-	if m := regexp.MustCompile(`(?i)traffic-(\d+)(tb|gb|mb)$`).FindStringSubmatch(defaultValue); m != nil {
+	if m := reTrafficOnly.FindStringSubmatch(defaultValue); m != nil {
 		return fmt.Sprintf("%s %s流量", m[1], strings.ToUpper(m[2]))
 	}
 	// 3) bandwidth-N: 仅带宽 N Mbps，≥1000 自动转 Gbps
-	if m := regexp.MustCompile(`(?i)bandwidth-(\d+)`).FindStringSubmatch(defaultValue); m != nil {
+	if m := reBandwidthMbps.FindStringSubmatch(defaultValue); m != nil {
 		if n, err := strconv.Atoi(m[1]); err == nil {
 			if n >= 1000 {
 				gbps := float64(n) / 1000.0
@@ -798,21 +718,21 @@ func parseBandwidthValue(defaultValue string, sv *types.ServerPlan) string {
 	}
 	// 4) unlimited 流量（含数字时 → "N Mbps / 无限流量"）
 	if strings.Contains(lc, "traffic-unlimited") || strings.Contains(lc, "unlimited") {
-		if m := regexp.MustCompile(`(\d+)`).FindStringSubmatch(defaultValue); m != nil {
+		if m := reFirstNumber.FindStringSubmatch(defaultValue); m != nil {
 			return m[1] + " Mbps / 无限流量"
 		}
 		return "无限流量"
 	}
 	// 5) guarantee / guaranteed: 保证带宽
 	if strings.Contains(lc, "guarantee") || strings.Contains(lc, "guaranteed") {
-		if m := regexp.MustCompile(`(\d+)`).FindStringSubmatch(defaultValue); m != nil {
+		if m := reFirstNumber.FindStringSubmatch(defaultValue); m != nil {
 			return m[1] + " Mbps (保证带宽)"
 		}
 		return "保证带宽"
 	}
 	// 6) vrack-bandwidth-X: 内部网络带宽（写到 VrackBandwidth 字段）
 	if strings.Contains(lc, "vrack") {
-		if m := regexp.MustCompile(`(?i)vrack-bandwidth-(\d+)`).FindStringSubmatch(defaultValue); m != nil {
+		if m := reVrackMbps.FindStringSubmatch(defaultValue); m != nil {
 			if n, err := strconv.Atoi(m[1]); err == nil && n >= 1000 {
 				gbps := float64(n) / 1000.0
 				s := strconv.FormatFloat(gbps, 'f', 1, 64)
@@ -827,19 +747,15 @@ func parseBandwidthValue(defaultValue string, sv *types.ServerPlan) string {
 	return defaultValue
 }
 
-func extractCPUFromNames(plan map[string]interface{}, info *types.ServerPlan, state *app.State) {
-	displayName := getString(plan, "displayName", "")
-	invoiceName := getString(plan, "invoiceName", "")
-	description := getString(plan, "description", "")
-	cpuKeywords := []string{"i7-", "i9-", "i5-", "xeon", "epyc", "ryzen"}
-	for _, name := range []string{displayName, invoiceName, description} {
+// extractCPUFromNames 从 displayName / invoiceName / description 中按关键词截取 CPU 型号
+func extractCPUFromNames(plan *EcoPlan, info *types.ServerPlan, logInfo func(string)) {
+	for _, name := range []string{plan.DisplayName, plan.InvoiceName, plan.Description} {
 		if name == "" {
 			continue
 		}
 		lcName := strings.ToLower(name)
 		for _, kw := range cpuKeywords {
-			if strings.Contains(lcName, kw) {
-				pos := strings.Index(lcName, kw)
+			if pos := strings.Index(lcName, kw); pos >= 0 {
 				end := pos + 30
 				if end > len(name) {
 					end = len(name)
@@ -847,7 +763,7 @@ func extractCPUFromNames(plan map[string]interface{}, info *types.ServerPlan, st
 				cpuInfo := strings.TrimSpace(strings.Split(name[pos:end], ",")[0])
 				if cpuInfo != "" {
 					info.CPU = cpuInfo
-					state.Logger.Info(fmt.Sprintf("从关键词中提取CPU型号: %s 给 %s", cpuInfo, info.PlanCode), "")
+					logInfo(fmt.Sprintf("从关键词中提取CPU型号: %s 给 %s", cpuInfo, info.PlanCode))
 					return
 				}
 			}
@@ -855,6 +771,8 @@ func extractCPUFromNames(plan map[string]interface{}, info *types.ServerPlan, st
 	}
 }
 
+var cpuKeywords = []string{"i7-", "i9-", "i5-", "xeon", "epyc", "ryzen"}
+
 func getString(m map[string]interface{}, key, fallback string) string {
 	if v, ok := m[key].(string); ok {
 		return v
@@ -862,15 +780,6 @@ func getString(m map[string]interface{}, key, fallback string) string {
 	return fallback
 }
 
-func contains(list []string, s string) bool {
-	for _, x := range list {
-		if x == s {
-			return true
-		}
-	}
-	return false
-}
-
 // PassthroughAvailability 用 SDK 直接传请求（用于 sniper 监控）
 func PassthroughAvailability(client *ovhsdk.Client, planCode string) ([]map[string]interface{}, error) {
 	var out []map[string]interface{}
@@ -0,0 +1,195 @@
+package catalog
+
+import (
+	"encoding/json"
+	"errors"
+	"strings"
+	"sync"
+
+	ovhsdk "github.com/ovh/go-ovh/ovh"
+)
+
+// /order/catalog/public/eco 的强类型子集：只声明 LoadServerList / 配置匹配 / 多 subsidiary 比价真正用到的字段，
+// 其余（blobs、addons 明细等大块数据）由 encoding/json 直接跳过，不再整体解码成 map[string]interface{}。
+
+// EcoCatalog eco catalog 顶层
+type EcoCatalog struct {
+	Locale struct {
+		CurrencyCode string `json:"currencyCode"`
+		Subsidiary   string `json:"subsidiary"`
+	} `json:"locale"`
+	Plans []EcoPlan `json:"plans"`
+
+	byCode map[string]*EcoPlan // planCode → plan，DecodeEcoCatalog 时建好
+}
+
+// EcoPlan 单个 plan
+type EcoPlan struct {
+	PlanCode      string           `json:"planCode"`
+	InvoiceName   string           `json:"invoiceName"`
+	DisplayName   string           `json:"displayName"`
+	Description   string           `json:"description"`
+	AddonFamilies []EcoAddonFamily `json:"addonFamilies"`
+	Details       struct {
+		Properties []ecoNameValue `json:"properties"`
+	} `json:"details"`
+	Product struct {
+		Configurations []ecoNameValue `json:"configurations"`
+	} `json:"product"`
+	Pricing struct {
+		Configurations []ecoNameValue `json:"configurations"`
+	} `json:"pricing"`
+	Pricings []EcoPricing `json:"pricings"`
+
+	stdOnce sync.Once
+	std     []stdFamily // memory / storage 家族的标准化 addon 表（懒建）
+}
+
+// EcoAddonFamily plan 下的一个 addon 家族（memory / storage / bandwidth ...）
+type EcoAddonFamily struct {
+	Name    string   `json:"name"`
+	Default string   `json:"default"`
+	Addons  []string `json:"addons"`
+}
+
+// EcoPricing plan 的一条价格（price 单位为 1e-8 货币单位，不含税）
+type EcoPricing struct {
+	Capacities   []string `json:"capacities"`
+	Mode         string   `json:"mode"`
+	Interval     int      `json:"interval"`
+	IntervalUnit string   `json:"intervalUnit"`
+	Commitment   int      `json:"commitment"`
+	Price        int64    `json:"price"`
+}
+
+type ecoNameValue struct {
+	Name  string `json:"name"`
+	Value string `json:"value"`
+}
+
+// EcoAvailability /dedicated/server/datacenter/availabilities 的一项
+type EcoAvailability struct {
+	FQN         string `json:"fqn"`
+	PlanCode    string `json:"planCode"`
+	Memory      string `json:"memory"`
+	Storage     string `json:"storage"`
+	Datacenters []struct {
+		Datacenter   string `json:"datacenter"`
+		Availability string `json:"availability"`
+	} `json:"datacenters"`
+}
+
+type stdFamily struct {
+	name   string
+	addons []stdAddon
+}
+
+type stdAddon struct {
+	code string
+	std  string
+}
+
+// DecodeEcoCatalog 解码 eco catalog 原文并建 planCode 索引。
+// 个别字段类型和声明不符（例如 value 是数字）时 encoding/json 会跳过该字段继续解码，
+// 这里忽略这类 UnmarshalTypeError，行为与旧的 getString 取不到就用默认值一致。
+func DecodeEcoCatalog(raw []byte) (*EcoCatalog, error) {
+	var cat EcoCatalog
+	if err := json.Unmarshal(raw, &cat); err != nil {
+		var typeErr *json.UnmarshalTypeError
+		if !errors.As(err, &typeErr) {
+			return nil, err
+		}
+	}
+	cat.byCode = make(map[string]*EcoPlan, len(cat.Plans))
+	for i := range cat.Plans {
+		if pc := cat.Plans[i].PlanCode; pc != "" {
+			if _, dup := cat.byCode[pc]; !dup {
+				cat.byCode[pc] = &cat.Plans[i]
+			}
+		}
+	}
+	return &cat, nil
+}
+
+// FetchEcoCatalog 拉取指定 subsidiary 的 eco catalog 并解码
+func FetchEcoCatalog(client *ovhsdk.Client, subsidiary string) (*EcoCatalog, error) {
+	var raw json.RawMessage
+	if err := client.Get("/order/catalog/public/eco?ovhSubsidiary="+subsidiary, &raw); err != nil {
+		return nil, err
+	}
+	return DecodeEcoCatalog(raw)
+}
+
+// Plan 按 planCode 查 plan（O(1)），没有返回 nil
+func (c *EcoCatalog) Plan(planCode string) *EcoPlan {
+	if c == nil {
+		return nil
+	}
+	return c.byCode[planCode]
+}
+
+// Prices 无承诺期的月租与安装费（货币单位，不含税）；目录里没有对应价格时为 0
+func (p *EcoPlan) Prices() (monthly, setup float64) {
+	for _, pr := range p.Pricings {
+		if pr.Commitment != 0 || (pr.Mode != "" && pr.Mode != "default") {
+			continue
+		}
+		for _, c := range pr.Capacities {
+			switch {
+			case c == "renew" && monthly == 0 && pr.Interval <= 1 && (pr.IntervalUnit == "" || pr.IntervalUnit == "month"):
+				monthly = float64(pr.Price) / 1e8
+			case c == "installation" && setup == 0:
+				setup = float64(pr.Price) / 1e8
+			}
+		}
+	}
+	return monthly, setup
+}
+
+// standardizedFamilies 返回 memory / storage 家族下每个 addon 的 StandardizeConfig 结果（保持 catalog 顺序）。
+// 第一次调用时对整个 plan 建表，同一份 catalog 内多个配置组合复用，不再逐项重复跑正则。
+func (p *EcoPlan) standardizedFamilies() []stdFamily {
+	p.stdOnce.Do(func() {
+		for _, f := range p.AddonFamilies {
+			name := strings.ToLower(f.Name)
+			if name != "memory" && name != "storage" {
+				continue
+			}
+			fam := stdFamily{name: name, addons: make([]stdAddon, 0, len(f.Addons))}
+			for _, a := range f.Addons {
+				if a == "" {
+					continue
+				}
+				fam.addons = append(fam.addons, stdAddon{code: a, std: StandardizeConfig(a)})
+			}
+			p.std = append(p.std, fam)
+		}
+	})
+	return p.std
+}
+
+// matchAddons 找出与标准化后的 memory / storage 相等或包含它的 addon（按 catalog 顺序、去重）
+func (p *EcoPlan) matchAddons(memoryStd, storageStd string) []string {
+	out := []string{}
+	seen := map[string]struct{}{}
+	for _, fam := range p.standardizedFamilies() {
+		want := memoryStd
+		if fam.name == "storage" {
+			want = storageStd
+		}
+		if want == "" {
+			continue
+		}
+		for _, a := range fam.addons {
+			if a.std != want && !strings.Contains(a.std, want) {
+				continue
+			}
+			if _, ok := seen[a.code]; ok {
+				continue
+			}
+			seen[a.code] = struct{}{}
+			out = append(out, a.code)
+		}
+	}
+	return out
+}
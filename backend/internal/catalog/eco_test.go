@@ -0,0 +1,182 @@
+package catalog
+
+import (
+	"encoding/json"
+	"fmt"
+	"os"
+	"path/filepath"
+	"reflect"
+	"strings"
+	"testing"
+)
+
+// synthEcoCatalog 生成与真实 eco catalog 形状一致的 JSON：plans 带 addonFamilies / details / product，
+// 外加 addons / pricings 等我们不解析的大块字段（真实 catalog 体积主要在这里）。
+func synthEcoCatalog(nPlans int) []byte {
+	plans := make([]map[string]interface{}, 0, nPlans)
+	addons := make([]map[string]interface{}, 0, nPlans*8)
+	for i := 0; i < nPlans; i++ {
+		pc := fmt.Sprintf("24sk%02d", i)
+		mem := []string{"ram-32g-ecc-2666-" + pc, "ram-64g-ecc-2666-" + pc}
+		stor := []string{"softraid-2x512nvme-" + pc, "softraid-2x2000sa-" + pc}
+		bw := []string{"bandwidth-500-" + pc, "bandwidth-1000-" + pc}
+		for _, a := range append(append(append([]string{}, mem...), stor...), bw...) {
+			addons = append(addons, map[string]interface{}{
+				"planCode":    a,
+				"invoiceName": strings.ToUpper(a),
+				"pricings":    []map[string]interface{}{{"price": 1000 + i, "interval": 1, "capacities": []string{"renew"}}},
+				"blobs":       map[string]interface{}{"technical": map[string]interface{}{"memory": map[string]interface{}{"size": 32}}},
+			})
+		}
+		plans = append(plans, map[string]interface{}{
+			"planCode":    pc,
+			"invoiceName": fmt.Sprintf("KS-%d | Intel Xeon-E 2136", i),
+			"description": "Intel Xeon-E 2136, 32GB RAM, 2x512GB NVMe",
+			"addonFamilies": []map[string]interface{}{
+				{"name": "memory", "default": mem[0], "addons": mem, "mandatory": true},
+				{"name": "storage", "default": stor[0], "addons": stor, "mandatory": true},
+				{"name": "bandwidth", "default": bw[0], "addons": bw, "mandatory": true},
+				{"name": "system-storage", "addons": []string{"os-windows-server-" + pc}},
+			},
+			"details": map[string]interface{}{"properties": []map[string]interface{}{
+				{"name": "cpu_cores", "value": 6},
+				{"name": "vrack_bandwidth", "value": "1 Gbps"},
+			}},
+			"product":  map[string]interface{}{"configurations": []map[string]interface{}{{"name": "region", "value": "europe", "isCustom": false}}},
+			"pricings": []map[string]interface{}{{"price": 2500, "interval": 1, "capacities": []string{"installation", "renew"}}},
+			"blobs":    map[string]interface{}{"commercial": map[string]interface{}{"range": "kimsufi"}},
+		})
+	}
+	raw, _ := json.Marshal(map[string]interface{}{"plans": plans, "addons": addons, "catalogId": 1, "locale": map[string]string{"currencyCode": "EUR"}})
+	return raw
+}
+
+// recordedEcoCatalogs testdata/eco-*.json 里录制的真实 catalog（scripts/bench_catalog.py record 生成），没有就用合成数据
+func recordedEcoCatalogs(tb testing.TB) map[string][]byte {
+	out := map[string][]byte{}
+	files, _ := filepath.Glob(filepath.Join("testdata", "eco-*.json"))
+	for _, f := range files {
+		raw, err := os.ReadFile(f)
+		if err != nil {
+			tb.Fatal(err)
+		}
+		out[strings.TrimSuffix(filepath.Base(f), ".json")] = raw
+	}
+	if len(out) == 0 {
+		out["synthetic-120"] = synthEcoCatalog(120)
+	}
+	return out
+}
+
+func TestDecodeEcoCatalogToleratesTypeMismatch(t *testing.T) {
+	cat, err := DecodeEcoCatalog(synthEcoCatalog(3))
+	if err != nil {
+		t.Fatalf("decode: %v", err)
+	}
+	p := cat.Plan("24sk01")
+	if p == nil || len(p.AddonFamilies) != 4 {
+		t.Fatalf("plan lookup failed: %+v", p)
+	}
+	// 数字 value 被跳过（旧 getString 的默认值语义），字符串 value 照常
+	if got := p.Details.Properties; got[0].Value != "" || got[1].Value != "1 Gbps" {
+		t.Fatalf("properties = %+v", got)
+	}
+	if cat.Plan("missing") != nil {
+		t.Fatal("unknown plan should be nil")
+	}
+	if _, err := DecodeEcoCatalog([]byte(`{"plans": [`)); err == nil {
+		t.Fatal("truncated JSON should fail")
+	}
+}
+
+func TestEcoPlanMatchAddons(t *testing.T) {
+	cat, err := DecodeEcoCatalog(synthEcoCatalog(2))
+	if err != nil {
+		t.Fatal(err)
+	}
+	p := cat.Plan("24sk00")
+	got := p.matchAddons(StandardizeConfig("ram-64g-ecc-2666"), StandardizeConfig("softraid-2x2000sa"))
+	want := []string{"ram-64g-ecc-2666-24sk00", "softraid-2x2000sa-24sk00"}
+	if !reflect.DeepEqual(got, want) {
+		t.Fatalf("matchAddons = %v, want %v", got, want)
+	}
+	if got := p.matchAddons("", ""); len(got) != 0 {
+		t.Fatalf("empty wants should match nothing, got %v", got)
+	}
+}
+
+func TestBuildServerPlans(t *testing.T) {
+	cat, err := DecodeEcoCatalog(synthEcoCatalog(2))
+	if err != nil {
+		t.Fatal(err)
+	}
+	avail := map[string][]EcoAvailability{}
+	var av []EcoAvailability
+	if err := json.Unmarshal([]byte(`[{"fqn":"x","datacenters":[{"datacenter":"gra","availability":"1H-low"},{"datacenter":"zzz1"}]}]`), &av); err != nil {
+		t.Fatal(err)
+	}
+	avail["24sk00"] = av
+
+	plans := buildServerPlans(cat, avail, func(string) {})
+	if len(plans) != 2 {
+		t.Fatalf("plans = %d", len(plans))
+	}
+	p := plans[0]
+	if p.CPU != "Intel Xeon-E 2136" || p.Memory != "32 GB" || p.Bandwidth != "500 Mbps" || p.VrackBandwidth != "1 Gbps" {
+		t.Fatalf("hardware = cpu %q mem %q bw %q vrack %q", p.CPU, p.Memory, p.Bandwidth, p.VrackBandwidth)
+	}
+	if len(p.Datacenters) != 2 || p.Datacenters[0].Region != "法国" || p.Datacenters[1].Availability != "unknown" {
+		t.Fatalf("datacenters = %+v", p.Datacenters)
+	}
+	// 许可证 addon 不进可选项
+	for _, o := range p.AvailableOptions {
+		if strings.HasPrefix(o.Value, "os-") {
+			t.Fatalf("license addon leaked: %s", o.Value)
+		}
+	}
+	if len(p.DefaultOptions) != 3 || len(p.AvailableOptions) != 6 {
+		t.Fatalf("options default=%d available=%d", len(p.DefaultOptions), len(p.AvailableOptions))
+	}
+}
+
+// 对比基准（scripts/bench_catalog.py bench 会调用并汇总）：
+//
+//	go test ./internal/catalog -run '^$' -bench EcoCatalog -benchmem
+//
+// MapDecode 是旧实现的解码方式（整份 catalog 解成 map[string]interface{}），作为参照；
+// TypedDecode 为新解码；Build 为解码 + 组装 ServerPlan 的完整刷新 CPU 开销（不含网络）。
+func BenchmarkEcoCatalog(b *testing.B) {
+	for name, raw := range recordedEcoCatalogs(b) {
+		raw := raw
+		b.Run(name+"/MapDecode", func(b *testing.B) {
+			b.ReportAllocs()
+			b.SetBytes(int64(len(raw)))
+			for i := 0; i < b.N; i++ {
+				var m map[string]interface{}
+				if err := json.Unmarshal(raw, &m); err != nil {
+					b.Fatal(err)
+				}
+			}
+		})
+		b.Run(name+"/TypedDecode", func(b *testing.B) {
+			b.ReportAllocs()
+			b.SetBytes(int64(len(raw)))
+			for i := 0; i < b.N; i++ {
+				if _, err := DecodeEcoCatalog(raw); err != nil {
+					b.Fatal(err)
+				}
+			}
+		})
+		b.Run(name+"/Build", func(b *testing.B) {
+			b.ReportAllocs()
+			b.SetBytes(int64(len(raw)))
+			for i := 0; i < b.N; i++ {
+				cat, err := DecodeEcoCatalog(raw)
+				if err != nil {
+					b.Fatal(err)
+				}
+				_ = buildServerPlans(cat, nil, func(string) {})
+			}
+		})
+	}
+}
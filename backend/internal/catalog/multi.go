@@ -0,0 +1,271 @@
+package catalog
+
+import (
+	"encoding/json"
+	"fmt"
+	"io"
+	"net/http"
+	"sort"
+	"strings"
+	"sync"
+	"time"
+
+	"github.com/ovh-webui/server/internal/app"
+	"github.com/ovh-webui/server/internal/types"
+)
+
+// PublicCatalogTTL OVH 公开 catalog 的 SQLite 缓存时长，与前端 useOvhCatalog 的 staleTime 对齐
+const PublicCatalogTTL = 2 * time.Hour
+
+// publicHTTP 公开 catalog / 可用性接口（无需账户凭据）共用的 client：
+// 各 subsidiary 并发拉取时复用同一个连接池，同站点（eu / ca / us）走 keep-alive 连接
+var publicHTTP = newPublicHTTPClient()
+
+func newPublicHTTPClient() *http.Client {
+	t := http.DefaultTransport.(*http.Transport).Clone()
+	t.MaxIdleConns = 32
+	t.MaxIdleConnsPerHost = 8
+	return &http.Client{Timeout: 30 * time.Second, Transport: t}
+}
+
+// PublicAPIBase 把 subsidiary 映射成对应站点的 base URL。
+// 同一个 catalog 只能从对应站点查，跨站点 404。
+func PublicAPIBase(sub string) string {
+	switch strings.ToUpper(sub) {
+	case "US":
+		return "https://api.us.ovhcloud.com"
+	case "CA", "QC", "ASIA", "SG", "AU", "IN":
+		return "https://ca.api.ovh.com"
+	default:
+		return "https://eu.api.ovh.com"
+	}
+}
+
+// UpstreamStatusError OVH 返回非 200
+type UpstreamStatusError struct {
+	StatusCode int
+}
+
+func (e *UpstreamStatusError) Error() string {
+	return fmt.Sprintf("upstream returned %d", e.StatusCode)
+}
+
+func getPublic(url string) ([]byte, error) {
+	req, _ := http.NewRequest(http.MethodGet, url, nil)
+	req.Header.Set("accept", "application/json")
+	resp, err := publicHTTP.Do(req)
+	if err != nil {
+		return nil, err
+	}
+	defer resp.Body.Close()
+	body, err := io.ReadAll(resp.Body)
+	if err != nil {
+		return nil, err
+	}
+	if resp.StatusCode != http.StatusOK {
+		return nil, &UpstreamStatusError{StatusCode: resp.StatusCode}
+	}
+	return body, nil
+}
+
+// PublicCatalog 一个 subsidiary 的 eco catalog 原文
+type PublicCatalog struct {
+	Raw       []byte
+	UpdatedAt time.Time
+	Stale     bool // 上游拉取失败，返回的是过期缓存
+}
+
+// LoadPublicCatalog 取 subsidiary 的公开 eco catalog：SQLite 缓存（按 subsidiary 独立，PublicCatalogTTL）
+// 未过期直接返回；过期或 force 时直连 OVH 并回写缓存，拉取失败时退回过期缓存（Stale=true）。
+func LoadPublicCatalog(state *app.State, sub string, force bool) (PublicCatalog, error) {
+	raw, ts, cached, err := state.DB.GetCatalog(sub)
+	if err != nil {
+		cached = false
+	}
+	if cached && !force && time.Since(time.UnixMilli(ts)) < PublicCatalogTTL {
+		return PublicCatalog{Raw: []byte(raw), UpdatedAt: time.UnixMilli(ts)}, nil
+	}
+	body, err := getPublic(fmt.Sprintf("%s/v1/order/catalog/public/eco?ovhSubsidiary=%s", PublicAPIBase(sub), sub))
+	if err != nil {
+		if cached {
+			return PublicCatalog{Raw: []byte(raw), UpdatedAt: time.UnixMilli(ts), Stale: true}, nil
+		}
+		state.Logger.Error("catalog 拉取失败 "+sub+": "+err.Error(), "catalog")
+		return PublicCatalog{}, err
+	}
+	if err := state.DB.UpsertCatalog(sub, string(body)); err != nil {
+		state.Logger.Warn("catalog 写库失败 "+sub+": "+err.Error(), "catalog")
+	} else {
+		state.Logger.Info(fmt.Sprintf("catalog %s 已缓存 (%d KB)", sub, len(body)/1024), "catalog")
+	}
+	return PublicCatalog{Raw: body, UpdatedAt: time.Now()}, nil
+}
+
+// decodedCatalogs 解码结果按 (subsidiary, 缓存时间) 复用：缓存没刷新时聚合不再重复解码几 MB 的 JSON
+var (
+	decodedMu       sync.Mutex
+	decodedCatalogs = map[string]decodedCatalog{}
+)
+
+type decodedCatalog struct {
+	updatedAt time.Time
+	cat       *EcoCatalog
+}
+
+func decodePublicCatalog(sub string, pc PublicCatalog) (*EcoCatalog, error) {
+	decodedMu.Lock()
+	d, ok := decodedCatalogs[sub]
+	decodedMu.Unlock()
+	if ok && d.updatedAt.Equal(pc.UpdatedAt) {
+		return d.cat, nil
+	}
+	cat, err := DecodeEcoCatalog(pc.Raw)
+	if err != nil {
+		return nil, err
+	}
+	decodedMu.Lock()
+	decodedCatalogs[sub] = decodedCatalog{updatedAt: pc.UpdatedAt, cat: cat}
+	decodedMu.Unlock()
+	return cat, nil
+}
+
+// fetchPublicAvailabilities 一次拉取站点下全部 plan 的可用性（公开接口），按 planCode 分组
+func fetchPublicAvailabilities(base string) (map[string][]EcoAvailability, error) {
+	body, err := getPublic(base + "/v1/dedicated/server/datacenter/availabilities")
+	if err != nil {
+		return nil, err
+	}
+	var avs []EcoAvailability
+	if err := json.Unmarshal(body, &avs); err != nil {
+		return nil, err
+	}
+	out := make(map[string][]EcoAvailability)
+	for _, a := range avs {
+		out[a.PlanCode] = append(out[a.PlanCode], a)
+	}
+	return out, nil
+}
+
+// SubsidiaryOffer 一个 plan 在某个 subsidiary 下的价格与各机房可用性
+type SubsidiaryOffer struct {
+	Subsidiary   string             `json:"subsidiary"`
+	Currency     string             `json:"currency"`
+	MonthlyPrice float64            `json:"monthlyPrice"` // 无承诺期月租，不含税；0 = 目录里没有
+	SetupPrice   float64            `json:"setupPrice"`
+	Datacenters  []types.Datacenter `json:"datacenters"`
+}
+
+// AggregatedPlan 跨 subsidiary 合并后的 plan：硬件与选项取第一个上架该 plan 的 subsidiary，
+// 价格与可用性按 subsidiary 列在 Offers（顺序同请求）
+type AggregatedPlan struct {
+	types.ServerPlan
+	Offers []SubsidiaryOffer `json:"offers"`
+}
+
+// AggregatedCatalog 多 subsidiary 目录聚合结果
+type AggregatedCatalog struct {
+	Subsidiaries []string          `json:"subsidiaries"`
+	Plans        []AggregatedPlan  `json:"plans"`
+	CacheAge     map[string]int64  `json:"cacheAgeSeconds"`  // subsidiary → catalog 缓存年龄（秒）
+	Stale        []string          `json:"stale,omitempty"`  // 上游失败、用了过期缓存的 subsidiary
+	Errors       map[string]string `json:"errors,omitempty"` // subsidiary / 站点 → 失败原因
+}
+
+// LoadAggregatedCatalog 并发拉取多个 subsidiary 的 catalog（各自走 SQLite 缓存）与各站点的可用性
+// （每个站点一次请求覆盖全部 plan，同站点的 subsidiary 共用），合并成一份 plan 索引。
+// 单个 subsidiary / 站点失败不影响其它，原因记在 Errors。
+func LoadAggregatedCatalog(state *app.State, subs []string, force bool) *AggregatedCatalog {
+	out := &AggregatedCatalog{Subsidiaries: subs, CacheAge: map[string]int64{}, Errors: map[string]string{}}
+	cats := make(map[string]*EcoCatalog, len(subs))
+	availByBase := map[string]map[string][]EcoAvailability{}
+	var mu sync.Mutex
+	var wg sync.WaitGroup
+	now := time.Now()
+	for _, sub := range subs {
+		wg.Add(1)
+		go func(sub string) {
+			defer wg.Done()
+			pc, err := LoadPublicCatalog(state, sub, force)
+			var cat *EcoCatalog
+			if err == nil {
+				cat, err = decodePublicCatalog(sub, pc)
+			}
+			mu.Lock()
+			defer mu.Unlock()
+			if err != nil {
+				out.Errors[sub] = err.Error()
+				return
+			}
+			cats[sub] = cat
+			out.CacheAge[sub] = int64(now.Sub(pc.UpdatedAt).Seconds())
+			if pc.Stale {
+				out.Stale = append(out.Stale, sub)
+			}
+		}(sub)
+	}
+	for _, base := range distinctBases(subs) {
+		wg.Add(1)
+		go func(base string) {
+			defer wg.Done()
+			avail, err := fetchPublicAvailabilities(base)
+			mu.Lock()
+			defer mu.Unlock()
+			if err != nil {
+				out.Errors[base] = err.Error()
+				state.Logger.Warn("可用性拉取失败 "+base+": "+err.Error(), "catalog")
+				return
+			}
+			availByBase[base] = avail
+		}(base)
+	}
+	wg.Wait()
+	sort.Strings(out.Stale)
+	out.Plans = mergeSubsidiaries(subs, cats, availByBase)
+	return out
+}
+
+func distinctBases(subs []string) []string {
+	var out []string
+	seen := map[string]bool{}
+	for _, s := range subs {
+		if b := PublicAPIBase(s); !seen[b] {
+			seen[b] = true
+			out = append(out, b)
+		}
+	}
+	return out
+}
+
+// mergeSubsidiaries 按 subs 顺序逐个组装 ServerPlan 后按 planCode 合并（纯计算）。
+// plan 顺序：第一次出现的 subsidiary 里的 catalog 顺序。
+func mergeSubsidiaries(subs []string, cats map[string]*EcoCatalog, availByBase map[string]map[string][]EcoAvailability) []AggregatedPlan {
+	var plans []AggregatedPlan
+	index := map[string]int{}
+	for _, sub := range subs {
+		cat := cats[sub]
+		if cat == nil {
+			continue
+		}
+		currency := cat.Locale.CurrencyCode
+		for _, sp := range buildServerPlans(cat, availByBase[PublicAPIBase(sub)], func(string) {}) {
+			monthly, setup := cat.Plan(sp.PlanCode).Prices()
+			offer := SubsidiaryOffer{
+				Subsidiary:   sub,
+				Currency:     currency,
+				MonthlyPrice: monthly,
+				SetupPrice:   setup,
+				Datacenters:  sp.Datacenters,
+			}
+			if i, ok := index[sp.PlanCode]; ok {
+				plans[i].Offers = append(plans[i].Offers, offer)
+				continue
+			}
+			index[sp.PlanCode] = len(plans)
+			plans = append(plans, AggregatedPlan{ServerPlan: sp, Offers: []SubsidiaryOffer{offer}})
+		}
+	}
+	if plans == nil {
+		plans = []AggregatedPlan{}
+	}
+	return plans
+}
@@ -0,0 +1,58 @@
+package catalog
+
+import (
+	"bytes"
+	"testing"
+)
+
+func TestMergeSubsidiaries(t *testing.T) {
+	ie, err := DecodeEcoCatalog(synthEcoCatalog(2))
+	if err != nil {
+		t.Fatal(err)
+	}
+	// CA 站点只上架 24sk01，价格与币种不同
+	caRaw := bytes.Replace(synthEcoCatalog(2), []byte(`"currencyCode":"EUR"`), []byte(`"currencyCode":"CAD"`), 1)
+	caRaw = bytes.Replace(caRaw, []byte(`"planCode":"24sk00"`), []byte(`"planCode":"24sk99"`), 1)
+	ca, err := DecodeEcoCatalog(caRaw)
+	if err != nil {
+		t.Fatal(err)
+	}
+	ca.Plan("24sk01").Pricings = []EcoPricing{
+		{Capacities: []string{"renew"}, Mode: "default", Interval: 1, IntervalUnit: "month", Price: 1999000000},
+		{Capacities: []string{"renew"}, Mode: "default", Interval: 1, IntervalUnit: "month", Commitment: 12, Price: 1500000000},
+		{Capacities: []string{"installation"}, Mode: "default", Price: 4999000000},
+	}
+	dc := func(name, a string) EcoAvailability {
+		av := EcoAvailability{PlanCode: "24sk01"}
+		av.Datacenters = append(av.Datacenters, struct {
+			Datacenter   string `json:"datacenter"`
+			Availability string `json:"availability"`
+		}{name, a})
+		return av
+	}
+	avail := map[string]map[string][]EcoAvailability{
+		PublicAPIBase("IE"): {"24sk01": {dc("gra", "1H-low")}},
+		PublicAPIBase("CA"): {"24sk01": {dc("bhs", "unavailable")}},
+	}
+
+	plans := mergeSubsidiaries([]string{"IE", "FR", "CA"},
+		map[string]*EcoCatalog{"IE": ie, "CA": ca}, avail)
+	if len(plans) != 3 || plans[0].PlanCode != "24sk00" || plans[1].PlanCode != "24sk01" || plans[2].PlanCode != "24sk99" {
+		t.Fatalf("plans = %+v", plans)
+	}
+	p := plans[1]
+	if len(p.Offers) != 2 || p.Offers[0].Subsidiary != "IE" || p.Offers[1].Subsidiary != "CA" {
+		t.Fatalf("offers = %+v", p.Offers)
+	}
+	ieOffer, caOffer := p.Offers[0], p.Offers[1]
+	if ieOffer.Currency != "EUR" || len(ieOffer.Datacenters) != 1 || ieOffer.Datacenters[0].Datacenter != "gra" {
+		t.Fatalf("IE offer = %+v", ieOffer)
+	}
+	if caOffer.Currency != "CAD" || caOffer.MonthlyPrice != 19.99 || caOffer.SetupPrice != 49.99 ||
+		len(caOffer.Datacenters) != 1 || caOffer.Datacenters[0].Availability != "unavailable" {
+		t.Fatalf("CA offer = %+v", caOffer)
+	}
+	if len(plans[0].Offers) != 1 || len(plans[2].Offers) != 1 {
+		t.Fatalf("single-subsidiary plans = %+v / %+v", plans[0].Offers, plans[2].Offers)
+	}
+}
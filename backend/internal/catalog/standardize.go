@@ -33,6 +33,7 @@ var (
 	// sas 必须在 sa 前，避免 -sas 被当成 -sa
 	reStorSfx   = regexp.MustCompile(`-(sas|ssd|nvme|hdd|sa)$`)
 	reSpecDigit = regexp.MustCompile(`-\d{4,5}$`)
+	reMemGB     = regexp.MustCompile(`(?i)(\d+)g`)
 )
 
 // StandardizeConfig 对应 Python: standardize_config
@@ -52,7 +53,7 @@ func StandardizeConfig(config string) string {
 
 // FormatMemoryDisplay 对应 Python: format_memory_display
 func FormatMemoryDisplay(memoryCode string) string {
-	if m := regexp.MustCompile(`(?i)(\d+)g`).FindStringSubmatch(memoryCode); m != nil {
+	if m := reMemGB.FindStringSubmatch(memoryCode); m != nil {
 		return m[1] + "GB RAM"
 	}
 	return memoryCode
@@ -0,0 +1,390 @@
+// Package cluster 多实例部署的分片租约协调（可选，CLUSTER_MODE=true 开启）。
+//
+// 订阅 / 队列等工作按 key 哈希到固定数量的分片上，每个实例在共享的协调存储里
+// 为分片持有可续期的租约，只处理自己持有分片上的 key。实例定期心跳，按存活实例数
+// 计算自己应持有的份额：多了释放、少了去抢空闲或已过期的租约；实例宕机后其租约到期，
+// 由其它实例接管，实现重新均衡。
+//
+// 本地认为租约有效的截止时间比存储里的 expires_at 提前 ttl/3，
+// 抵消时钟偏差与续约延迟，保证同一分片不会同时被两个实例认为归自己。
+package cluster
+
+import (
+	"hash/fnv"
+	"sort"
+	"sync"
+	"time"
+)
+
+// Lease 分片租约
+type Lease struct {
+	Shard     int       `json:"shard"`
+	Owner     string    `json:"owner"`
+	ExpiresAt time.Time `json:"expiresAt"`
+}
+
+// Store 协调存储。SQLite 共享库的实现在 db 包；MemoryStore 供单进程与测试使用。
+type Store interface {
+	// Heartbeat 记录实例存活
+	Heartbeat(instance string, now time.Time) error
+	// LiveMembers 心跳不早于 since 的实例
+	LiveMembers(since time.Time) ([]string, error)
+	// Leave 实例退出：删除心跳并释放其全部租约
+	Leave(instance string) error
+	// Leases 全部分片租约（含已过期的）
+	Leases() ([]Lease, error)
+	// Acquire 分片无租约、租约已过期（expires_at <= now）或已归 owner 时写入 owner / until 并返回 true
+	Acquire(shard int, owner string, now, until time.Time) (bool, error)
+	// Release owner 主动释放分片
+	Release(shard int, owner string) error
+	// TryClaim 一次性认领 key（下单去重）：无记录、已过期或已归 owner 时成功
+	TryClaim(key, owner string, now, until time.Time) (bool, error)
+}
+
+// Status 协调状态快照（/api/cluster/status）
+type Status struct {
+	InstanceID  string   `json:"instanceId"`
+	Shards      int      `json:"shards"`
+	Target      int      `json:"target"`
+	OwnedShards []int    `json:"ownedShards"`
+	Members     []string `json:"members"`
+	LastTick    string   `json:"lastTick,omitempty"`
+	LastError   string   `json:"lastError,omitempty"`
+}
+
+// Coordinator 一个实例的分片持有者
+type Coordinator struct {
+	store  Store
+	id     string
+	shards int
+	ttl    time.Duration
+
+	mu       sync.RWMutex
+	owned    map[int]time.Time // 分片 → 本地认为有效的截止时间
+	members  []string
+	target   int
+	lastTick time.Time
+	lastErr  string
+	epoch    int64 // 从失联（两次成功协调间隔超过本地有效期）恢复的次数
+}
+
+// New shards 为分片总数（所有实例必须一致），ttl 为租约时长
+func New(store Store, instanceID string, shards int, ttl time.Duration) *Coordinator {
+	if shards < 1 {
+		shards = 1
+	}
+	return &Coordinator{store: store, id: instanceID, shards: shards, ttl: ttl, owned: map[int]time.Time{}}
+}
+
+// ID 本实例 ID
+func (c *Coordinator) ID() string { return c.id }
+
+// Shard key 所在分片
+func (c *Coordinator) Shard(key string) int {
+	h := fnv.New32a()
+	_, _ = h.Write([]byte(key))
+	return int(h.Sum32() % uint32(c.shards))
+}
+
+// Owns 本实例当前是否持有 key 所在分片
+func (c *Coordinator) Owns(key string) bool {
+	return c.ownsShardAt(c.Shard(key), time.Now())
+}
+
+func (c *Coordinator) ownsShardAt(shard int, now time.Time) bool {
+	c.mu.RLock()
+	defer c.mu.RUnlock()
+	until, ok := c.owned[shard]
+	return ok && now.Before(until)
+}
+
+// Claim 一次性认领 key，ttl 内其它实例认领同一 key 会失败（本实例可重复认领并续期）
+func (c *Coordinator) Claim(key string, ttl time.Duration) bool {
+	now := time.Now()
+	ok, err := c.store.TryClaim(key, c.id, now, now.Add(ttl))
+	if err != nil {
+		c.setErr(err)
+		return false
+	}
+	return ok
+}
+
+// Tick 一轮协调：心跳、续约、按份额抢占或释放分片
+func (c *Coordinator) Tick(now time.Time) error {
+	if err := c.store.Heartbeat(c.id, now); err != nil {
+		return c.setErr(err)
+	}
+	members, err := c.store.LiveMembers(now.Add(-c.ttl))
+	if err != nil {
+		return c.setErr(err)
+	}
+	members = withMember(members, c.id)
+	target := fairShare(c.shards, members, c.id)
+
+	leases, err := c.store.Leases()
+	if err != nil {
+		return c.setErr(err)
+	}
+	taken := make(map[int]bool, len(leases))
+	var mine []int
+	for _, l := range leases {
+		if l.Owner == c.id {
+			mine = append(mine, l.Shard)
+		} else if l.ExpiresAt.After(now) {
+			taken[l.Shard] = true
+		}
+	}
+	sort.Ints(mine)
+	// 多出份额的先释放（编号大的），别的实例下一轮就能拿到
+	if len(mine) > target {
+		for _, s := range mine[target:] {
+			c.drop(s)
+			if err := c.store.Release(s, c.id); err != nil {
+				return c.setErr(err)
+			}
+		}
+		mine = mine[:target]
+	}
+
+	until := now.Add(c.ttl)
+	localUntil := now.Add(c.validity())
+	held := map[int]time.Time{}
+	for _, s := range mine {
+		ok, err := c.store.Acquire(s, c.id, now, until)
+		if err != nil {
+			return c.setErr(err)
+		}
+		if ok {
+			held[s] = localUntil
+		}
+		taken[s] = true
+	}
+	for s := 0; s < c.shards && len(held) < target; s++ {
+		if taken[s] {
+			continue
+		}
+		ok, err := c.store.Acquire(s, c.id, now, until)
+		if err != nil {
+			return c.setErr(err)
+		}
+		if ok {
+			held[s] = localUntil
+		}
+	}
+
+	c.mu.Lock()
+	if !c.lastTick.IsZero() && now.Sub(c.lastTick) >= c.validity() {
+		c.epoch++
+	}
+	c.owned = held
+	c.members = members
+	c.target = target
+	c.lastTick = now
+	c.lastErr = ""
+	c.mu.Unlock()
+	return nil
+}
+
+// Fresh 最近一次协调成功仍在本地有效期内。为 false 时别的实例可能已判定本实例失联，
+// 不应再做有副作用的工作（下单）。
+func (c *Coordinator) Fresh(now time.Time) bool {
+	c.mu.RLock()
+	defer c.mu.RUnlock()
+	return !c.lastTick.IsZero() && now.Sub(c.lastTick) < c.validity()
+}
+
+// Epoch 从失联恢复的次数；变化后调用方应丢弃可能已被接管的本地工作，从存储重新加载
+func (c *Coordinator) Epoch() int64 {
+	c.mu.RLock()
+	defer c.mu.RUnlock()
+	return c.epoch
+}
+
+// Members 心跳在 within 内的实例（含本实例）
+func (c *Coordinator) Members(within time.Duration) ([]string, error) {
+	ids, err := c.store.LiveMembers(time.Now().Add(-within))
+	if err != nil {
+		return nil, c.setErr(err)
+	}
+	return withMember(ids, c.id), nil
+}
+
+// TTL 租约时长
+func (c *Coordinator) TTL() time.Duration { return c.ttl }
+
+// validity 本地认为租约有效的时长
+func (c *Coordinator) validity() time.Duration { return c.ttl - c.ttl/3 }
+
+// Run 每 ttl/3 协调一轮，直到 stop 关闭（优雅退出时调用方随后调 Leave）
+func (c *Coordinator) Run(stop <-chan struct{}) {
+	interval := c.ttl / 3
+	if interval < time.Second {
+		interval = time.Second
+	}
+	_ = c.Tick(time.Now())
+	ticker := time.NewTicker(interval)
+	defer ticker.Stop()
+	for {
+		select {
+		case <-stop:
+			return
+		case <-ticker.C:
+			_ = c.Tick(time.Now())
+		}
+	}
+}
+
+// Leave 放弃全部分片并注销（优雅退出时调用，其它实例无需等租约过期）。之后 Fresh 为 false。
+func (c *Coordinator) Leave() {
+	c.mu.Lock()
+	c.owned = map[int]time.Time{}
+	c.lastTick = time.Time{}
+	c.mu.Unlock()
+	if err := c.store.Leave(c.id); err != nil {
+		c.setErr(err)
+	}
+}
+
+// Status 当前状态
+func (c *Coordinator) Status() Status {
+	now := time.Now()
+	c.mu.RLock()
+	defer c.mu.RUnlock()
+	st := Status{
+		InstanceID:  c.id,
+		Shards:      c.shards,
+		Target:      c.target,
+		OwnedShards: []int{},
+		Members:     append([]string{}, c.members...),
+		LastError:   c.lastErr,
+	}
+	for s, until := range c.owned {
+		if now.Before(until) {
+			st.OwnedShards = append(st.OwnedShards, s)
+		}
+	}
+	sort.Ints(st.OwnedShards)
+	if !c.lastTick.IsZero() {
+		st.LastTick = c.lastTick.Format(time.RFC3339)
+	}
+	return st
+}
+
+func (c *Coordinator) drop(shard int) {
+	c.mu.Lock()
+	delete(c.owned, shard)
+	c.mu.Unlock()
+}
+
+func (c *Coordinator) setErr(err error) error {
+	c.mu.Lock()
+	c.lastErr = err.Error()
+	c.mu.Unlock()
+	return err
+}
+
+// fairShare 按实例 ID 排序后平分：前 shards%n 个实例多拿一个，总和恰好等于 shards
+func fairShare(shards int, members []string, id string) int {
+	sorted := append([]string(nil), members...)
+	sort.Strings(sorted)
+	n := len(sorted)
+	share := shards / n
+	for i, m := range sorted {
+		if m == id && i < shards%n {
+			share++
+		}
+	}
+	return share
+}
+
+func withMember(members []string, id string) []string {
+	for _, m := range members {
+		if m == id {
+			return members
+		}
+	}
+	return append(members, id)
+}
+
+// MemoryStore 进程内协调存储（单进程多协调者 / 测试）
+type MemoryStore struct {
+	mu      sync.Mutex
+	members map[string]time.Time
+	leases  map[int]Lease
+	claims  map[string]Lease
+}
+
+// NewMemoryStore 创建空存储
+func NewMemoryStore() *MemoryStore {
+	return &MemoryStore{members: map[string]time.Time{}, leases: map[int]Lease{}, claims: map[string]Lease{}}
+}
+
+func (s *MemoryStore) Heartbeat(instance string, now time.Time) error {
+	s.mu.Lock()
+	defer s.mu.Unlock()
+	s.members[instance] = now
+	return nil
+}
+
+func (s *MemoryStore) LiveMembers(since time.Time) ([]string, error) {
+	s.mu.Lock()
+	defer s.mu.Unlock()
+	out := []string{}
+	for id, at := range s.members {
+		if !at.Before(since) {
+			out = append(out, id)
+		}
+	}
+	return out, nil
+}
+
+func (s *MemoryStore) Leave(instance string) error {
+	s.mu.Lock()
+	defer s.mu.Unlock()
+	delete(s.members, instance)
+	for shard, l := range s.leases {
+		if l.Owner == instance {
+			delete(s.leases, shard)
+		}
+	}
+	return nil
+}
+
+func (s *MemoryStore) Leases() ([]Lease, error) {
+	s.mu.Lock()
+	defer s.mu.Unlock()
+	out := make([]Lease, 0, len(s.leases))
+	for _, l := range s.leases {
+		out = append(out, l)
+	}
+	return out, nil
+}
+
+func (s *MemoryStore) Acquire(shard int, owner string, now, until time.Time) (bool, error) {
+	s.mu.Lock()
+	defer s.mu.Unlock()
+	if l, ok := s.leases[shard]; ok && l.Owner != owner && l.ExpiresAt.After(now) {
+		return false, nil
+	}
+	s.leases[shard] = Lease{Shard: shard, Owner: owner, ExpiresAt: until}
+	return true, nil
+}
+
+func (s *MemoryStore) Release(shard int, owner string) error {
+	s.mu.Lock()
+	defer s.mu.Unlock()
+	if l, ok := s.leases[shard]; ok && l.Owner == owner {
+		delete(s.leases, shard)
+	}
+	return nil
+}
+
+func (s *MemoryStore) TryClaim(key, owner string, now, until time.Time) (bool, error) {
+	s.mu.Lock()
+	defer s.mu.Unlock()
+	if l, ok := s.claims[key]; ok && l.Owner != owner && l.ExpiresAt.After(now) {
+		return false, nil
+	}
+	s.claims[key] = Lease{Owner: owner, ExpiresAt: until}
+	return true, nil
+}
@@ -0,0 +1,79 @@
+package cluster
+
+import (
+	"testing"
+	"time"
+)
+
+// owners 每个分片此刻被哪些协调者认为归自己
+func owners(cs []*Coordinator, shards int, now time.Time) [][]string {
+	out := make([][]string, shards)
+	for s := 0; s < shards; s++ {
+		for _, c := range cs {
+			if c.ownsShardAt(s, now) {
+				out[s] = append(out[s], c.ID())
+			}
+		}
+	}
+	return out
+}
+
+func TestCoordinatorBalancesAndRebalances(t *testing.T) {
+	const shards = 16
+	ttl := 30 * time.Second
+	store := NewMemoryStore()
+	cs := []*Coordinator{
+		New(store, "a", shards, ttl),
+		New(store, "b", shards, ttl),
+		New(store, "c", shards, ttl),
+	}
+	now := time.Unix(1_700_000_000, 0)
+	tick := func(list []*Coordinator) {
+		for _, c := range list {
+			if err := c.Tick(now); err != nil {
+				t.Fatal(err)
+			}
+		}
+		now = now.Add(ttl / 3)
+	}
+	// 首轮 a 抢光，后两轮按份额释放 / 接管
+	for i := 0; i < 3; i++ {
+		tick(cs)
+	}
+	count := map[string]int{}
+	for s, o := range owners(cs, shards, now) {
+		if len(o) != 1 {
+			t.Fatalf("shard %d owners=%v", s, o)
+		}
+		count[o[0]]++
+	}
+	if count["a"] != 6 || count["b"] != 5 || count["c"] != 5 {
+		t.Fatalf("unbalanced: %v", count)
+	}
+
+	// c 停止心跳：租约过期前它的分片没人接管，过期后 a / b 分掉
+	survivors := cs[:2]
+	tick(survivors)
+	for s, o := range owners(survivors, shards, now) {
+		if len(o) > 1 {
+			t.Fatalf("shard %d double-owned: %v", s, o)
+		}
+	}
+	for i := 0; i < 4; i++ {
+		tick(survivors)
+	}
+	count = map[string]int{}
+	for s, o := range owners(survivors, shards, now) {
+		if len(o) != 1 {
+			t.Fatalf("after failover shard %d owners=%v", s, o)
+		}
+		count[o[0]]++
+	}
+	if count["a"] != 8 || count["b"] != 8 {
+		t.Fatalf("failover unbalanced: %v", count)
+	}
+
+	if !cs[0].Claim("order:x", time.Minute) || cs[1].Claim("order:x", time.Minute) || !cs[0].Claim("order:x", time.Minute) {
+		t.Fatal("claim must be exclusive but re-entrant")
+	}
+}
@@ -0,0 +1,97 @@
+package db
+
+import (
+	"fmt"
+	"strings"
+)
+
+// AccountResourceRow ovh_account_resources 表一行（body 为原始 JSON）
+type AccountResourceRow struct {
+	AccountID string `db:"account_id"`
+	Kind      string `db:"kind"`
+	ResID     string `db:"res_id"`
+	SortKey   string `db:"sort_key"`
+	Body      string `db:"body"`
+	Final     int    `db:"final"` // 0/1
+	FetchedAt int64  `db:"fetched_at"`
+}
+
+// AccountResourceFinal 某账户某类资源本地已有的 res_id → 是否已定稿（同步时判断哪些要拉正文）
+func (db *DB) AccountResourceFinal(accountID, kind string) (map[string]bool, error) {
+	var rows []struct {
+		ResID string `db:"res_id"`
+		Final int    `db:"final"`
+	}
+	if err := db.Select(&rows,
+		`SELECT res_id, final FROM ovh_account_resources WHERE account_id = ? AND kind = ?`,
+		accountID, kind); err != nil {
+		return nil, fmt.Errorf("list account resources %s/%s: %w", accountID, kind, err)
+	}
+	out := make(map[string]bool, len(rows))
+	for _, r := range rows {
+		out[r.ResID] = r.Final == 1
+	}
+	return out, nil
+}
+
+// PageAccountResources 按 sort_key、res_id 倒序（新的在前）取一页，同时返回该类资源总数
+func (db *DB) PageAccountResources(accountID, kind string, offset, limit int) ([]AccountResourceRow, int, error) {
+	var total int
+	if err := db.Get(&total,
+		`SELECT COUNT(*) FROM ovh_account_resources WHERE account_id = ? AND kind = ?`,
+		accountID, kind); err != nil {
+		return nil, 0, fmt.Errorf("count account resources %s/%s: %w", accountID, kind, err)
+	}
+	var rows []AccountResourceRow
+	if err := db.Select(&rows,
+		`SELECT account_id, kind, res_id, sort_key, body, final, fetched_at
+		 FROM ovh_account_resources WHERE account_id = ? AND kind = ?
+		 ORDER BY sort_key DESC, res_id DESC LIMIT ? OFFSET ?`,
+		accountID, kind, limit, offset); err != nil {
+		return nil, 0, fmt.Errorf("page account resources %s/%s: %w", accountID, kind, err)
+	}
+	return rows, total, nil
+}
+
+// SyncAccountResources 同一事务里 upsert 新拉到的正文、删掉 OVH 列表里已经没有的 res_id
+func (db *DB) SyncAccountResources(accountID, kind string, rows []AccountResourceRow, removed []string) error {
+	if len(rows) == 0 && len(removed) == 0 {
+		return nil
+	}
+	tx, err := db.Beginx()
+	if err != nil {
+		return err
+	}
+	defer tx.Rollback()
+	for _, r := range rows {
+		if _, err := tx.Exec(
+			`INSERT INTO ovh_account_resources(account_id, kind, res_id, sort_key, body, final, fetched_at)
+			 VALUES(?, ?, ?, ?, ?, ?, ?)
+			 ON CONFLICT(account_id, kind, res_id) DO UPDATE SET
+			   sort_key=excluded.sort_key, body=excluded.body, final=excluded.final, fetched_at=excluded.fetched_at`,
+			accountID, kind, r.ResID, r.SortKey, r.Body, r.Final, r.FetchedAt,
+		); err != nil {
+			return fmt.Errorf("upsert account resource %s/%s/%s: %w", accountID, kind, r.ResID, err)
+		}
+	}
+	// 分批删，避免超过 SQLite 变量上限
+	for start := 0; start < len(removed); start += 500 {
+		end := start + 500
+		if end > len(removed) {
+			end = len(removed)
+		}
+		batch := removed[start:end]
+		args := make([]interface{}, 0, len(batch)+2)
+		args = append(args, accountID, kind)
+		for _, id := range batch {
+			args = append(args, id)
+		}
+		if _, err := tx.Exec(
+			`DELETE FROM ovh_account_resources WHERE account_id = ? AND kind = ? AND res_id IN (?`+
+				strings.Repeat(",?", len(batch)-1)+`)`, args...,
+		); err != nil {
+			return fmt.Errorf("delete account resources %s/%s: %w", accountID, kind, err)
+		}
+	}
+	return tx.Commit()
+}
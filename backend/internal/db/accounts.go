@@ -183,6 +183,15 @@ func (db *DB) DeleteAccount(id string) error {
 	if _, err := tx.Exec(`DELETE FROM queue WHERE account_id = ?`, id); err != nil {
 		return fmt.Errorf("cascade delete queue: %w", err)
 	}
+	if _, err := tx.Exec(`DELETE FROM server_inventory WHERE account_id = ?`, id); err != nil {
+		return fmt.Errorf("cascade delete server inventory: %w", err)
+	}
+	if _, err := tx.Exec(`DELETE FROM ovh_orders WHERE account_id = ?`, id); err != nil {
+		return fmt.Errorf("cascade delete order index: %w", err)
+	}
+	if _, err := tx.Exec(`DELETE FROM ovh_account_resources WHERE account_id = ?`, id); err != nil {
+		return fmt.Errorf("cascade delete account resources: %w", err)
+	}
 	if _, err := tx.Exec(
 		`UPDATE monitor_subscriptions SET auto_order_account_id = '' WHERE auto_order_account_id = ?`, id,
 	); err != nil {
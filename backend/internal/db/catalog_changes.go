@@ -0,0 +1,134 @@
+package db
+
+import (
+	"encoding/json"
+	"fmt"
+	"strings"
+
+	"github.com/ovh-webui/server/internal/types"
+)
+
+// catalogChangesKeep 变更日志保留的最大行数（超出按 seq 从旧到新裁掉）
+const catalogChangesKeep = 10000
+
+// catalogChangeDetail detail 列：CatalogChange 去掉 seq / at / plan_code / kind 后的差异部分
+type catalogChangeDetail struct {
+	Name               string   `json:"name,omitempty"`
+	Fields             []string `json:"fields,omitempty"`
+	AddedDatacenters   []string `json:"addedDatacenters,omitempty"`
+	RemovedDatacenters []string `json:"removedDatacenters,omitempty"`
+	AddedOptions       []string `json:"addedOptions,omitempty"`
+	RemovedOptions     []string `json:"removedOptions,omitempty"`
+}
+
+type catalogChangeRow struct {
+	Seq       int64  `db:"seq"`
+	CreatedAt string `db:"created_at"`
+	PlanCode  string `db:"plan_code"`
+	Kind      string `db:"kind"`
+	Detail    string `db:"detail"`
+}
+
+func (r catalogChangeRow) toType() types.CatalogChange {
+	var d catalogChangeDetail
+	_ = json.Unmarshal([]byte(r.Detail), &d)
+	return types.CatalogChange{
+		Seq:                r.Seq,
+		At:                 r.CreatedAt,
+		PlanCode:           r.PlanCode,
+		Kind:               r.Kind,
+		Name:               d.Name,
+		Fields:             d.Fields,
+		AddedDatacenters:   d.AddedDatacenters,
+		RemovedDatacenters: d.RemovedDatacenters,
+		AddedOptions:       d.AddedOptions,
+		RemovedOptions:     d.RemovedOptions,
+	}
+}
+
+// AppendCatalogChanges 追加一次刷新产生的全部变化（同一事务，同一 created_at），
+// 写入后回填 Seq，并裁掉超出保留行数的旧记录。
+func (db *DB) AppendCatalogChanges(changes []types.CatalogChange) error {
+	if len(changes) == 0 {
+		return nil
+	}
+	tx, err := db.Beginx()
+	if err != nil {
+		return err
+	}
+	defer tx.Rollback()
+	stmt, err := tx.Preparex(`INSERT INTO catalog_changes(created_at, plan_code, kind, detail) VALUES(?, ?, ?, ?)`)
+	if err != nil {
+		return err
+	}
+	defer stmt.Close()
+	for i := range changes {
+		c := &changes[i]
+		raw, err := json.Marshal(catalogChangeDetail{
+			Name:               c.Name,
+			Fields:             c.Fields,
+			AddedDatacenters:   c.AddedDatacenters,
+			RemovedDatacenters: c.RemovedDatacenters,
+			AddedOptions:       c.AddedOptions,
+			RemovedOptions:     c.RemovedOptions,
+		})
+		if err != nil {
+			return fmt.Errorf("marshal catalog change %s: %w", c.PlanCode, err)
+		}
+		res, err := stmt.Exec(c.At, c.PlanCode, c.Kind, string(raw))
+		if err != nil {
+			return fmt.Errorf("insert catalog change %s: %w", c.PlanCode, err)
+		}
+		c.Seq, _ = res.LastInsertId()
+	}
+	if _, err := tx.Exec(
+		`DELETE FROM catalog_changes WHERE seq <= (SELECT COALESCE(MAX(seq), 0) FROM catalog_changes) - ?`,
+		catalogChangesKeep,
+	); err != nil {
+		return fmt.Errorf("prune catalog changes: %w", err)
+	}
+	return tx.Commit()
+}
+
+// CatalogChangeFilter 变更日志查询条件（空字段不过滤）
+type CatalogChangeFilter struct {
+	SinceSeq int64 // 只取 seq > SinceSeq（回放游标）
+	PlanCode string
+	Kind     string
+}
+
+// ListCatalogChanges 按 seq 升序取变更，最多 limit 条（<=0 表示不限）
+func (db *DB) ListCatalogChanges(f CatalogChangeFilter, limit int) ([]types.CatalogChange, error) {
+	conds := []string{"seq > ?"}
+	args := []interface{}{f.SinceSeq}
+	if f.PlanCode != "" {
+		conds = append(conds, "plan_code = ?")
+		args = append(args, f.PlanCode)
+	}
+	if f.Kind != "" {
+		conds = append(conds, "kind = ?")
+		args = append(args, f.Kind)
+	}
+	q := `SELECT seq, created_at, plan_code, kind, detail FROM catalog_changes WHERE ` +
+		strings.Join(conds, " AND ") + ` ORDER BY seq`
+	if limit > 0 {
+		q += ` LIMIT ?`
+		args = append(args, limit)
+	}
+	var rows []catalogChangeRow
+	if err := db.Select(&rows, q, args...); err != nil {
+		return nil, fmt.Errorf("list catalog changes: %w", err)
+	}
+	out := make([]types.CatalogChange, 0, len(rows))
+	for _, r := range rows {
+		out = append(out, r.toType())
+	}
+	return out, nil
+}
+
+// LatestCatalogChangeSeq 最新一条变更的 seq（没有记录为 0），客户端据此建立回放起点
+func (db *DB) LatestCatalogChangeSeq() (int64, error) {
+	var seq int64
+	err := db.Get(&seq, `SELECT COALESCE(MAX(seq), 0) FROM catalog_changes`)
+	return seq, err
+}
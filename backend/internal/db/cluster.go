@@ -0,0 +1,102 @@
+package db
+
+import (
+	"fmt"
+	"time"
+
+	"github.com/ovh-webui/server/internal/cluster"
+)
+
+// clusterStore 用共享 SQLite 实现 cluster.Store。多个进程打开同一个库文件即可协调
+// （WAL 需要各进程在同一台主机 / 同一块本地盘上，网络文件系统不适用）。
+type clusterStore struct{ db *DB }
+
+// ClusterStore 分片协调存储
+func (db *DB) ClusterStore() cluster.Store { return clusterStore{db: db} }
+
+func (s clusterStore) Heartbeat(instance string, now time.Time) error {
+	ms := now.UnixMilli()
+	if _, err := s.db.Exec(`
+		INSERT INTO cluster_members(instance_id, heartbeat_at) VALUES(?, ?)
+		ON CONFLICT(instance_id) DO UPDATE SET heartbeat_at = excluded.heartbeat_at
+	`, instance, ms); err != nil {
+		return fmt.Errorf("cluster heartbeat: %w", err)
+	}
+	if _, err := s.db.Exec(`DELETE FROM cluster_claims WHERE expires_at <= ?`, ms); err != nil {
+		return fmt.Errorf("prune cluster claims: %w", err)
+	}
+	return nil
+}
+
+func (s clusterStore) LiveMembers(since time.Time) ([]string, error) {
+	var ids []string
+	if err := s.db.Select(&ids, `SELECT instance_id FROM cluster_members WHERE heartbeat_at >= ? ORDER BY instance_id`, since.UnixMilli()); err != nil {
+		return nil, fmt.Errorf("list cluster members: %w", err)
+	}
+	return ids, nil
+}
+
+func (s clusterStore) Leave(instance string) error {
+	tx, err := s.db.Beginx()
+	if err != nil {
+		return err
+	}
+	defer tx.Rollback()
+	if _, err := tx.Exec(`DELETE FROM cluster_leases WHERE owner = ?`, instance); err != nil {
+		return fmt.Errorf("release cluster leases: %w", err)
+	}
+	if _, err := tx.Exec(`DELETE FROM cluster_members WHERE instance_id = ?`, instance); err != nil {
+		return fmt.Errorf("leave cluster: %w", err)
+	}
+	return tx.Commit()
+}
+
+func (s clusterStore) Leases() ([]cluster.Lease, error) {
+	var rows []struct {
+		Shard     int    `db:"shard"`
+		Owner     string `db:"owner"`
+		ExpiresAt int64  `db:"expires_at"`
+	}
+	if err := s.db.Select(&rows, `SELECT shard, owner, expires_at FROM cluster_leases`); err != nil {
+		return nil, fmt.Errorf("list cluster leases: %w", err)
+	}
+	out := make([]cluster.Lease, 0, len(rows))
+	for _, r := range rows {
+		out = append(out, cluster.Lease{Shard: r.Shard, Owner: r.Owner, ExpiresAt: time.UnixMilli(r.ExpiresAt)})
+	}
+	return out, nil
+}
+
+// Acquire 单条 upsert：冲突时只有原主是自己或已过期才覆盖，靠影响行数判断是否拿到
+func (s clusterStore) Acquire(shard int, owner string, now, until time.Time) (bool, error) {
+	res, err := s.db.Exec(`
+		INSERT INTO cluster_leases(shard, owner, expires_at) VALUES(?, ?, ?)
+		ON CONFLICT(shard) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at
+		WHERE cluster_leases.owner = excluded.owner OR cluster_leases.expires_at <= ?
+	`, shard, owner, until.UnixMilli(), now.UnixMilli())
+	if err != nil {
+		return false, fmt.Errorf("acquire cluster lease %d: %w", shard, err)
+	}
+	n, err := res.RowsAffected()
+	return n == 1, err
+}
+
+func (s clusterStore) Release(shard int, owner string) error {
+	if _, err := s.db.Exec(`DELETE FROM cluster_leases WHERE shard = ? AND owner = ?`, shard, owner); err != nil {
+		return fmt.Errorf("release cluster lease %d: %w", shard, err)
+	}
+	return nil
+}
+
+func (s clusterStore) TryClaim(key, owner string, now, until time.Time) (bool, error) {
+	res, err := s.db.Exec(`
+		INSERT INTO cluster_claims(key, owner, expires_at) VALUES(?, ?, ?)
+		ON CONFLICT(key) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at
+		WHERE cluster_claims.owner = excluded.owner OR cluster_claims.expires_at <= ?
+	`, key, owner, until.UnixMilli(), now.UnixMilli())
+	if err != nil {
+		return false, fmt.Errorf("cluster claim %s: %w", key, err)
+	}
+	n, err := res.RowsAffected()
+	return n == 1, err
+}
@@ -67,6 +67,10 @@ func (db *DB) migrate() error {
 	if err := db.addColumnIfMissing("history", "account_id", "TEXT NOT NULL DEFAULT ''"); err != nil {
 		return err
 	}
+	// account_id 列是增量加的，依赖它的索引只能在加列之后建
+	if _, err := db.Exec(`CREATE INDEX IF NOT EXISTS idx_history_account_time ON history(account_id, purchase_time DESC)`); err != nil {
+		return fmt.Errorf("create history account index: %w", err)
+	}
 	if err := db.addColumnIfMissing("monitor_subscriptions", "auto_order_account_id", "TEXT NOT NULL DEFAULT ''"); err != nil {
 		return err
 	}
@@ -76,6 +80,17 @@ func (db *DB) migrate() error {
 	if err := db.addColumnIfMissing("telegram_order_buttons", "used_at", "REAL NOT NULL DEFAULT 0"); err != nil {
 		return err
 	}
+	if err := db.addColumnIfMissing("queue", "owner", "TEXT NOT NULL DEFAULT ''"); err != nil {
+		return err
+	}
+	// monitor_last_transitions 是后加的表：首次建表时用还没折叠的明细回填
+	if _, err := db.Exec(`
+		INSERT INTO monitor_last_transitions(plan_code, datacenter, config, kind, at)
+		SELECT plan_code, datacenter, config, kind, MAX(at) FROM monitor_transitions
+		WHERE NOT EXISTS (SELECT 1 FROM monitor_last_transitions)
+		GROUP BY plan_code, datacenter, config, kind`); err != nil {
+		return fmt.Errorf("backfill monitor last transitions: %w", err)
+	}
 	return nil
 }
 
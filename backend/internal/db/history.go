@@ -2,8 +2,11 @@ package db
 
 import (
 	"database/sql"
+	"encoding/base64"
 	"encoding/json"
+	"errors"
 	"fmt"
+	"strings"
 
 	"github.com/ovh-webui/server/internal/types"
 )
@@ -111,6 +114,180 @@ func (db *DB) ListHistory() ([]types.PurchaseHistoryEntry, error) {
 	return out, nil
 }
 
+// historyInsertSQL 单行 upsert（按主键 id 覆盖），UpsertHistory / ReplaceHistory 共用
+const historyInsertSQL = `
+	INSERT INTO history
+	(id, account_id, task_id, plan_code, datacenter, options, status, order_id, order_url,
+	 error_message, purchase_time, attempt_count, expiration_time, price)
+	VALUES
+	(:id, :account_id, :task_id, :plan_code, :datacenter, :options, :status, :order_id, :order_url,
+	 :error_message, :purchase_time, :attempt_count, :expiration_time, :price)
+	ON CONFLICT(id) DO UPDATE SET
+	  account_id = excluded.account_id, task_id = excluded.task_id,
+	  plan_code = excluded.plan_code, datacenter = excluded.datacenter,
+	  options = excluded.options, status = excluded.status,
+	  order_id = excluded.order_id, order_url = excluded.order_url,
+	  error_message = excluded.error_message, purchase_time = excluded.purchase_time,
+	  attempt_count = excluded.attempt_count, expiration_time = excluded.expiration_time,
+	  price = excluded.price
+`
+
+// UpsertHistory 单条写入（按 id upsert）。下单成功/失败每次只动一行，不再整表覆盖。
+func (db *DB) UpsertHistory(h types.PurchaseHistoryEntry) error {
+	r, err := historyToRow(h)
+	if err != nil {
+		return err
+	}
+	if _, err := db.NamedExec(historyInsertSQL, r); err != nil {
+		return fmt.Errorf("upsert history %s: %w", h.ID, err)
+	}
+	return nil
+}
+
+// GetHistoryByTaskID 取某个队列任务对应的最新一条历史；不存在时 ok=false
+func (db *DB) GetHistoryByTaskID(taskID string) (types.PurchaseHistoryEntry, bool, error) {
+	var r historyRow
+	err := db.Get(&r, `SELECT * FROM history WHERE task_id = ? ORDER BY purchase_time DESC LIMIT 1`, taskID)
+	if err == sql.ErrNoRows {
+		return types.PurchaseHistoryEntry{}, false, nil
+	}
+	if err != nil {
+		return types.PurchaseHistoryEntry{}, false, fmt.Errorf("get history by task %s: %w", taskID, err)
+	}
+	return rowToHistory(r), true, nil
+}
+
+// HistoryFilter 抢购历史查询条件，空字段表示不过滤。
+// Since/Until 与 purchase_time 同格式（types.NowISO），按字符串比较即可（定长、字典序=时间序）。
+type HistoryFilter struct {
+	AccountID  string
+	Status     string
+	PlanCode   string
+	Datacenter string
+	Since      string
+	Until      string
+}
+
+func (f HistoryFilter) where() (string, []interface{}) {
+	var conds []string
+	var args []interface{}
+	add := func(cond string, v string) {
+		if v != "" {
+			conds = append(conds, cond)
+			args = append(args, v)
+		}
+	}
+	add("account_id = ?", f.AccountID)
+	add("status = ?", f.Status)
+	add("plan_code = ?", f.PlanCode)
+	add("datacenter = ?", f.Datacenter)
+	add("purchase_time >= ?", f.Since)
+	add("purchase_time < ?", f.Until)
+	if len(conds) == 0 {
+		return "1=1", nil
+	}
+	return strings.Join(conds, " AND "), args
+}
+
+// ErrInvalidCursor 分页游标解析失败（客户端传了篡改/过期格式的 cursor）
+var ErrInvalidCursor = errors.New("invalid cursor")
+
+// encodeHistoryCursor 游标 = 最后一行的 (purchase_time, id)，base64 包一层避免前端误解析
+func encodeHistoryCursor(h types.PurchaseHistoryEntry) string {
+	return base64.RawURLEncoding.EncodeToString([]byte(h.PurchaseTime + "\x00" + h.ID))
+}
+
+func decodeHistoryCursor(cursor string) (purchaseTime, id string, err error) {
+	raw, err := base64.RawURLEncoding.DecodeString(cursor)
+	if err != nil {
+		return "", "", ErrInvalidCursor
+	}
+	parts := strings.SplitN(string(raw), "\x00", 2)
+	if len(parts) != 2 {
+		return "", "", ErrInvalidCursor
+	}
+	return parts[0], parts[1], nil
+}
+
+// QueryHistory 按条件游标分页取历史，按 (purchase_time, id) 倒序。
+// cursor 为空取第一页；返回的 next 为空表示没有更多。
+func (db *DB) QueryHistory(f HistoryFilter, cursor string, limit int) (items []types.PurchaseHistoryEntry, next string, err error) {
+	where, args := f.where()
+	if cursor != "" {
+		pt, id, err := decodeHistoryCursor(cursor)
+		if err != nil {
+			return nil, "", err
+		}
+		where += " AND (purchase_time < ? OR (purchase_time = ? AND id < ?))"
+		args = append(args, pt, pt, id)
+	}
+	q := `SELECT * FROM history WHERE ` + where + ` ORDER BY purchase_time DESC, id DESC`
+	if limit > 0 {
+		// 多取一行判断是否还有下一页
+		q += fmt.Sprintf(" LIMIT %d", limit+1)
+	}
+	var rows []historyRow
+	if err := db.Select(&rows, q, args...); err != nil {
+		return nil, "", fmt.Errorf("query history: %w", err)
+	}
+	hasMore := limit > 0 && len(rows) > limit
+	if hasMore {
+		rows = rows[:limit]
+	}
+	items = make([]types.PurchaseHistoryEntry, 0, len(rows))
+	for _, r := range rows {
+		items = append(items, rowToHistory(r))
+	}
+	if hasMore {
+		next = encodeHistoryCursor(items[len(items)-1])
+	}
+	return items, next, nil
+}
+
+// HistoryPlanStat 按型号聚合的成功/失败数
+type HistoryPlanStat struct {
+	PlanCode string `json:"planCode" db:"plan_code"`
+	Success  int    `json:"success" db:"success"`
+	Failed   int    `json:"failed" db:"failed"`
+}
+
+// HistoryAggregates 某个过滤条件下的汇总
+type HistoryAggregates struct {
+	Total   int               `json:"total"`
+	Success int               `json:"success"`
+	Failed  int               `json:"failed"`
+	ByPlan  []HistoryPlanStat `json:"byPlan"`
+}
+
+// AggregateHistory 在 SQLite 侧做 GROUP BY 汇总，不把明细拉进内存
+func (db *DB) AggregateHistory(f HistoryFilter) (HistoryAggregates, error) {
+	where, args := f.where()
+	out := HistoryAggregates{ByPlan: []HistoryPlanStat{}}
+	var plans []HistoryPlanStat
+	err := db.Select(&plans, `
+		SELECT plan_code,
+		       SUM(CASE WHEN status = 'success' THEN 1 ELSE 0 END) AS success,
+		       SUM(CASE WHEN status = 'failed'  THEN 1 ELSE 0 END) AS failed
+		FROM history WHERE `+where+`
+		GROUP BY plan_code ORDER BY COUNT(*) DESC, plan_code`, args...)
+	if err != nil {
+		return out, fmt.Errorf("aggregate history: %w", err)
+	}
+	if plans != nil {
+		out.ByPlan = plans
+	}
+	var total int
+	if err := db.Get(&total, `SELECT COUNT(*) FROM history WHERE `+where, args...); err != nil {
+		return out, fmt.Errorf("count history: %w", err)
+	}
+	out.Total = total
+	for _, p := range out.ByPlan {
+		out.Success += p.Success
+		out.Failed += p.Failed
+	}
+	return out, nil
+}
+
 // ReplaceHistory 全表覆盖（保留 ReplaceX API 一致）
 func (db *DB) ReplaceHistory(items []types.PurchaseHistoryEntry) error {
 	tx, err := db.Beginx()
@@ -126,14 +303,7 @@ func (db *DB) ReplaceHistory(items []types.PurchaseHistoryEntry) error {
 		if err != nil {
 			return err
 		}
-		_, err = tx.NamedExec(`
-			INSERT INTO history
-			(id, account_id, task_id, plan_code, datacenter, options, status, order_id, order_url,
-			 error_message, purchase_time, attempt_count, expiration_time, price)
-			VALUES
-			(:id, :account_id, :task_id, :plan_code, :datacenter, :options, :status, :order_id, :order_url,
-			 :error_message, :purchase_time, :attempt_count, :expiration_time, :price)
-		`, r)
+		_, err = tx.NamedExec(historyInsertSQL, r)
 		if err != nil {
 			return fmt.Errorf("insert history %s: %w", h.ID, err)
 		}
@@ -0,0 +1,36 @@
+package db
+
+import (
+	"strings"
+	"testing"
+
+	"github.com/ovh-webui/server/internal/types"
+)
+
+func TestHistoryCursorRoundTrip(t *testing.T) {
+	h := types.PurchaseHistoryEntry{ID: "abc-123", PurchaseTime: "2026-07-11T10:00:00.000000"}
+	pt, id, err := decodeHistoryCursor(encodeHistoryCursor(h))
+	if err != nil {
+		t.Fatalf("decode: %v", err)
+	}
+	if pt != h.PurchaseTime || id != h.ID {
+		t.Fatalf("got (%q, %q), want (%q, %q)", pt, id, h.PurchaseTime, h.ID)
+	}
+	if _, _, err := decodeHistoryCursor("not base64!"); err != ErrInvalidCursor {
+		t.Fatalf("bad cursor err = %v, want ErrInvalidCursor", err)
+	}
+}
+
+func TestHistoryFilterWhere(t *testing.T) {
+	where, args := HistoryFilter{}.where()
+	if where != "1=1" || len(args) != 0 {
+		t.Fatalf("empty filter = %q %v", where, args)
+	}
+	where, args = HistoryFilter{AccountID: "a1", Status: "success", Since: "2026-01-01T00:00:00.000000"}.where()
+	if strings.Count(where, "?") != 3 || len(args) != 3 {
+		t.Fatalf("where = %q args = %v", where, args)
+	}
+	if args[0] != "a1" || args[1] != "success" {
+		t.Fatalf("args order = %v", args)
+	}
+}
@@ -0,0 +1,86 @@
+package db
+
+import (
+	"fmt"
+	"strings"
+)
+
+// ServerInventoryRow server_inventory 表一行（info / service_infos 为原始 JSON）
+type ServerInventoryRow struct {
+	AccountID    string `db:"account_id"`
+	ServiceName  string `db:"service_name"`
+	Info         string `db:"info"`
+	ServiceInfos string `db:"service_infos"`
+	RefreshedAt  int64  `db:"refreshed_at"`
+}
+
+// ListServerInventory 取某账户缓存的全部独服详情
+func (db *DB) ListServerInventory(accountID string) ([]ServerInventoryRow, error) {
+	var rows []ServerInventoryRow
+	err := db.Select(&rows,
+		`SELECT account_id, service_name, info, service_infos, refreshed_at
+		 FROM server_inventory WHERE account_id = ?`, accountID)
+	if err != nil {
+		return nil, fmt.Errorf("list server inventory %s: %w", accountID, err)
+	}
+	return rows, nil
+}
+
+// UpsertServerInventory 批量 upsert（同一事务）
+func (db *DB) UpsertServerInventory(rows []ServerInventoryRow) error {
+	if len(rows) == 0 {
+		return nil
+	}
+	tx, err := db.Beginx()
+	if err != nil {
+		return err
+	}
+	defer tx.Rollback()
+	for _, r := range rows {
+		if _, err := tx.Exec(
+			`INSERT INTO server_inventory(account_id, service_name, info, service_infos, refreshed_at)
+			 VALUES(?, ?, ?, ?, ?)
+			 ON CONFLICT(account_id, service_name) DO UPDATE SET
+			   info=excluded.info, service_infos=excluded.service_infos, refreshed_at=excluded.refreshed_at`,
+			r.AccountID, r.ServiceName, r.Info, r.ServiceInfos, r.RefreshedAt,
+		); err != nil {
+			return fmt.Errorf("upsert server inventory %s/%s: %w", r.AccountID, r.ServiceName, err)
+		}
+	}
+	return tx.Commit()
+}
+
+// DeleteServerInventory 删除某账户下指定的独服（已不在 /dedicated/server 列表里）
+func (db *DB) DeleteServerInventory(accountID string, names []string) error {
+	if len(names) == 0 {
+		return nil
+	}
+	args := make([]interface{}, 0, len(names)+1)
+	args = append(args, accountID)
+	for _, n := range names {
+		args = append(args, n)
+	}
+	_, err := db.Exec(
+		`DELETE FROM server_inventory WHERE account_id = ? AND service_name IN (?`+strings.Repeat(", ?", len(names)-1)+`)`,
+		args...,
+	)
+	if err != nil {
+		return fmt.Errorf("delete server inventory %s: %w", accountID, err)
+	}
+	return nil
+}
+
+// ExpireServerInventory 把单台独服标记为失效（refreshed_at=0），下次列表时后台刷新
+func (db *DB) ExpireServerInventory(accountID, serviceName string) error {
+	_, err := db.Exec(
+		`UPDATE server_inventory SET refreshed_at = 0 WHERE account_id = ? AND service_name = ?`,
+		accountID, serviceName,
+	)
+	return err
+}
+
+// ClearServerInventory 清空全部账户的独服详情缓存，缓存管理"清除全部"会调
+func (db *DB) ClearServerInventory() error {
+	_, err := db.Exec(`DELETE FROM server_inventory`)
+	return err
+}
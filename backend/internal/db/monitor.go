@@ -132,6 +132,50 @@ func (db *DB) UpsertMonitorSubscription(s types.Subscription) error {
 	return nil
 }
 
+// UpsertMonitorSubscriptionConfig 按 plan_code upsert，已存在时只更新用户配置列，
+// 不动 last_status / history（集群模式下这两列只由负责该订阅的实例写）
+func (db *DB) UpsertMonitorSubscriptionConfig(s types.Subscription) error {
+	r, err := monitorSubToRow(s)
+	if err != nil {
+		return err
+	}
+	_, err = db.NamedExec(`
+		INSERT INTO monitor_subscriptions
+		(plan_code, datacenters, notify_available, notify_unavailable, last_status,
+		 created_at, history, server_name, auto_order, quantity, auto_order_account_id)
+		VALUES
+		(:plan_code, :datacenters, :notify_available, :notify_unavailable, :last_status,
+		 :created_at, :history, :server_name, :auto_order, :quantity, :auto_order_account_id)
+		ON CONFLICT(plan_code) DO UPDATE SET
+		  datacenters           = excluded.datacenters,
+		  notify_available      = excluded.notify_available,
+		  notify_unavailable    = excluded.notify_unavailable,
+		  server_name           = excluded.server_name,
+		  auto_order            = excluded.auto_order,
+		  quantity              = excluded.quantity,
+		  auto_order_account_id = excluded.auto_order_account_id
+	`, r)
+	if err != nil {
+		return fmt.Errorf("upsert monitor sub config %s: %w", s.PlanCode, err)
+	}
+	return nil
+}
+
+// UpdateMonitorSubscriptionState 只更新 last_status / history（集群模式下负责该订阅的实例写回检查结果）
+func (db *DB) UpdateMonitorSubscriptionState(s types.Subscription) error {
+	r, err := monitorSubToRow(s)
+	if err != nil {
+		return err
+	}
+	if _, err := db.NamedExec(`
+		UPDATE monitor_subscriptions SET last_status = :last_status, history = :history
+		WHERE plan_code = :plan_code
+	`, r); err != nil {
+		return fmt.Errorf("update monitor sub state %s: %w", s.PlanCode, err)
+	}
+	return nil
+}
+
 // ReplaceMonitorSubscriptions 全表覆盖
 func (db *DB) ReplaceMonitorSubscriptions(subs []types.Subscription) error {
 	tx, err := db.Beginx()
@@ -0,0 +1,140 @@
+package db
+
+import (
+	"fmt"
+	"strings"
+)
+
+// MonitorTransition monitor_transitions 一行
+type MonitorTransition struct {
+	PlanCode   string `db:"plan_code"`
+	Datacenter string `db:"datacenter"`
+	Config     string `db:"config"`
+	At         int64  `db:"at"`
+	Kind       string `db:"kind"`
+}
+
+// MonitorAvailabilityDay monitor_availability_daily 一行
+type MonitorAvailabilityDay struct {
+	PlanCode   string `db:"plan_code"`
+	Datacenter string `db:"datacenter"`
+	Config     string `db:"config"`
+	Day        int64  `db:"day"`
+	Until      int64  `db:"until"`
+	InStockSec int64  `db:"in_stock_sec"`
+	Restocks   int    `db:"restocks"`
+	EndInStock int    `db:"end_in_stock"`
+}
+
+// AppendMonitorTransitions 追加一批状态变化，并更新各状态最近一次的时刻（同一事务）
+func (db *DB) AppendMonitorTransitions(rows []MonitorTransition) error {
+	if len(rows) == 0 {
+		return nil
+	}
+	tx, err := db.Beginx()
+	if err != nil {
+		return err
+	}
+	defer tx.Rollback()
+	stmt, err := tx.Preparex(`INSERT INTO monitor_transitions(plan_code, datacenter, config, at, kind) VALUES(?, ?, ?, ?, ?)`)
+	if err != nil {
+		return err
+	}
+	defer stmt.Close()
+	last, err := tx.Preparex(`
+		INSERT INTO monitor_last_transitions(plan_code, datacenter, config, kind, at) VALUES(?, ?, ?, ?, ?)
+		ON CONFLICT(plan_code, datacenter, config, kind) DO UPDATE SET at = MAX(at, excluded.at)`)
+	if err != nil {
+		return err
+	}
+	defer last.Close()
+	for _, r := range rows {
+		if _, err := stmt.Exec(r.PlanCode, r.Datacenter, r.Config, r.At, r.Kind); err != nil {
+			return fmt.Errorf("insert monitor transition %s: %w", r.PlanCode, err)
+		}
+		if _, err := last.Exec(r.PlanCode, r.Datacenter, r.Config, r.Kind, r.At); err != nil {
+			return fmt.Errorf("upsert monitor last transition %s: %w", r.PlanCode, err)
+		}
+	}
+	return tx.Commit()
+}
+
+// ListMonitorLastTransitions 取各 (订阅, 机房, 配置) 每种状态最近一次的时刻（Kind / At 有效）
+func (db *DB) ListMonitorLastTransitions() ([]MonitorTransition, error) {
+	var rows []MonitorTransition
+	if err := db.Select(&rows, `SELECT plan_code, datacenter, config, at, kind FROM monitor_last_transitions`); err != nil {
+		return nil, fmt.Errorf("list monitor last transitions: %w", err)
+	}
+	return rows, nil
+}
+
+// ListMonitorTransitions 取全部未折叠的状态变化，按时间升序
+func (db *DB) ListMonitorTransitions() ([]MonitorTransition, error) {
+	var rows []MonitorTransition
+	if err := db.Select(&rows, `SELECT plan_code, datacenter, config, at, kind FROM monitor_transitions ORDER BY at, rowid`); err != nil {
+		return nil, fmt.Errorf("list monitor transitions: %w", err)
+	}
+	return rows, nil
+}
+
+// ListMonitorAvailabilityDays 取全部日汇总
+func (db *DB) ListMonitorAvailabilityDays() ([]MonitorAvailabilityDay, error) {
+	var rows []MonitorAvailabilityDay
+	if err := db.Select(&rows, `SELECT * FROM monitor_availability_daily ORDER BY day`); err != nil {
+		return nil, fmt.Errorf("list monitor availability days: %w", err)
+	}
+	return rows, nil
+}
+
+// CompactMonitorAvailability 一个事务内：写入折叠后的日汇总、删除 plans（本次折叠过的订阅）
+// 已折叠（at < before）的明细、删除早于 keepDaysFrom 的日汇总，以及已不在 monitor_subscriptions 里的订阅的全部记录。
+// 明细只删 plans 的：集群模式下别的实例负责的订阅由负责方折叠，这里删掉会丢它还没折叠的明细。
+func (db *DB) CompactMonitorAvailability(days []MonitorAvailabilityDay, plans []string, before, keepDaysFrom int64) error {
+	tx, err := db.Beginx()
+	if err != nil {
+		return err
+	}
+	defer tx.Rollback()
+	for _, d := range days {
+		_, err := tx.NamedExec(`
+			INSERT INTO monitor_availability_daily
+			(plan_code, datacenter, config, day, until, in_stock_sec, restocks, end_in_stock)
+			VALUES
+			(:plan_code, :datacenter, :config, :day, :until, :in_stock_sec, :restocks, :end_in_stock)
+			ON CONFLICT(plan_code, datacenter, config, day) DO UPDATE SET
+			  until        = excluded.until,
+			  in_stock_sec = excluded.in_stock_sec,
+			  restocks     = excluded.restocks,
+			  end_in_stock = excluded.end_in_stock
+		`, d)
+		if err != nil {
+			return fmt.Errorf("upsert monitor availability day %s: %w", d.PlanCode, err)
+		}
+	}
+	// 分批删，避免超过 SQLite 变量上限
+	for start := 0; start < len(plans); start += 500 {
+		end := start + 500
+		if end > len(plans) {
+			end = len(plans)
+		}
+		batch := plans[start:end]
+		args := make([]interface{}, 0, len(batch)+1)
+		args = append(args, before)
+		for _, pc := range batch {
+			args = append(args, pc)
+		}
+		if _, err := tx.Exec(`DELETE FROM monitor_transitions WHERE at < ? AND plan_code IN (?`+
+			strings.Repeat(",?", len(batch)-1)+`)`, args...); err != nil {
+			return fmt.Errorf("prune monitor transitions: %w", err)
+		}
+	}
+	if _, err := tx.Exec(`DELETE FROM monitor_availability_daily WHERE day < ?`, keepDaysFrom); err != nil {
+		return fmt.Errorf("prune monitor availability days: %w", err)
+	}
+	for _, table := range []string{"monitor_transitions", "monitor_availability_daily", "monitor_last_transitions"} {
+		if _, err := tx.Exec(`DELETE FROM ` + table + ` WHERE plan_code NOT IN (SELECT plan_code FROM monitor_subscriptions)`); err != nil {
+			return fmt.Errorf("prune %s: %w", table, err)
+		}
+	}
+	return tx.Commit()
+}
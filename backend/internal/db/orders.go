@@ -0,0 +1,52 @@
+package db
+
+import "fmt"
+
+// OrderIndexRow ovh_orders 表一行（body / details 为原始 JSON）
+type OrderIndexRow struct {
+	AccountID    string `db:"account_id"`
+	OrderID      int64  `db:"order_id"`
+	OrderDate    string `db:"order_date"`
+	Status       string `db:"status"`
+	Body         string `db:"body"`
+	Details      string `db:"details"`
+	DetailsFinal int    `db:"details_final"` // 0/1
+	CheckedAt    int64  `db:"checked_at"`
+}
+
+// ListOrderIndex 取某账户的全部订单索引，按订单 ID 倒序（新订单在前）
+func (db *DB) ListOrderIndex(accountID string) ([]OrderIndexRow, error) {
+	var rows []OrderIndexRow
+	err := db.Select(&rows,
+		`SELECT account_id, order_id, order_date, status, body, details, details_final, checked_at
+		 FROM ovh_orders WHERE account_id = ? ORDER BY order_id DESC`, accountID)
+	if err != nil {
+		return nil, fmt.Errorf("list order index %s: %w", accountID, err)
+	}
+	return rows, nil
+}
+
+// UpsertOrderIndex 批量 upsert 订单索引（同一事务）
+func (db *DB) UpsertOrderIndex(rows []OrderIndexRow) error {
+	if len(rows) == 0 {
+		return nil
+	}
+	tx, err := db.Beginx()
+	if err != nil {
+		return err
+	}
+	defer tx.Rollback()
+	for _, r := range rows {
+		if _, err := tx.Exec(
+			`INSERT INTO ovh_orders(account_id, order_id, order_date, status, body, details, details_final, checked_at)
+			 VALUES(?, ?, ?, ?, ?, ?, ?, ?)
+			 ON CONFLICT(account_id, order_id) DO UPDATE SET
+			   order_date=excluded.order_date, status=excluded.status, body=excluded.body,
+			   details=excluded.details, details_final=excluded.details_final, checked_at=excluded.checked_at`,
+			r.AccountID, r.OrderID, r.OrderDate, r.Status, r.Body, r.Details, r.DetailsFinal, r.CheckedAt,
+		); err != nil {
+			return fmt.Errorf("upsert order %s/%d: %w", r.AccountID, r.OrderID, err)
+		}
+	}
+	return tx.Commit()
+}
@@ -0,0 +1,51 @@
+package db
+
+import (
+	"fmt"
+	"time"
+)
+
+// OSTemplateRow os_templates 表一行（detail 为原始 JSON）
+type OSTemplateRow struct {
+	Name      string `db:"name"`
+	Detail    string `db:"detail"`
+	UpdatedAt int64  `db:"updated_at"`
+}
+
+// ListOSTemplates 取全部缓存的安装模板详情（启动后首次用到时整表装载，几百行以内）
+func (db *DB) ListOSTemplates() ([]OSTemplateRow, error) {
+	var rows []OSTemplateRow
+	if err := db.Select(&rows, `SELECT name, detail, updated_at FROM os_templates`); err != nil {
+		return nil, fmt.Errorf("list os templates: %w", err)
+	}
+	return rows, nil
+}
+
+// UpsertOSTemplates 批量 upsert 模板详情，updated_at = now ms
+func (db *DB) UpsertOSTemplates(details map[string]string) error {
+	if len(details) == 0 {
+		return nil
+	}
+	tx, err := db.Beginx()
+	if err != nil {
+		return err
+	}
+	defer tx.Rollback()
+	now := time.Now().UnixMilli()
+	for name, detail := range details {
+		if _, err := tx.Exec(
+			`INSERT INTO os_templates(name, detail, updated_at) VALUES(?, ?, ?)
+			 ON CONFLICT(name) DO UPDATE SET detail=excluded.detail, updated_at=excluded.updated_at`,
+			name, detail, now,
+		); err != nil {
+			return fmt.Errorf("upsert os template %s: %w", name, err)
+		}
+	}
+	return tx.Commit()
+}
+
+// ClearOSTemplates 清空模板详情缓存，缓存管理"清除全部"会调
+func (db *DB) ClearOSTemplates() error {
+	_, err := db.Exec(`DELETE FROM os_templates`)
+	return err
+}
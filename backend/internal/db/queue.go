@@ -1,8 +1,10 @@
 package db
 
 import (
+	"database/sql"
 	"encoding/json"
 	"fmt"
+	"strings"
 
 	"github.com/ovh-webui/server/internal/types"
 )
@@ -25,6 +27,7 @@ type queueRow struct {
 	Priority           int     `db:"priority"`
 	FromTelegram       int     `db:"from_telegram"`
 	ConfigSniperTaskID string  `db:"config_sniper_task_id"`
+	Owner              string  `db:"owner"` // 集群模式下负责该任务的实例 ID；单实例为空
 }
 
 func rowToQueueItem(r queueRow) types.QueueItem {
@@ -105,28 +108,58 @@ func (db *DB) ListQueue() ([]types.QueueItem, error) {
 // ReplaceQueue 用给定列表覆盖整张表（事务内 DELETE + 批量 INSERT）。
 // 与原 storage.WriteJSON 语义对齐。
 func (db *DB) ReplaceQueue(items []types.QueueItem) error {
+	return db.replaceQueue("", items, nil)
+}
+
+// ReplaceQueueOwned 集群模式：只覆盖 owner 名下的任务，其它实例的行不动。
+// 不会把任务写回成 owner 的：同 id 的行已归别的实例（被接管）、已有墓碑（到过终态），
+// 或 persisted 里的（本实例落过盘）而库里已不归 owner（被接管后完成 / 删除）。
+func (db *DB) ReplaceQueueOwned(owner string, items []types.QueueItem, persisted map[string]bool) error {
+	return db.replaceQueue(owner, items, persisted)
+}
+
+func (db *DB) replaceQueue(owner string, items []types.QueueItem, persisted map[string]bool) error {
 	tx, err := db.Beginx()
 	if err != nil {
 		return err
 	}
 	defer tx.Rollback()
-	if _, err := tx.Exec(`DELETE FROM queue`); err != nil {
+	owned := map[string]bool{}
+	if owner == "" {
+		_, err = tx.Exec(`DELETE FROM queue`)
+	} else {
+		var ids []string
+		if err = tx.Select(&ids, `SELECT id FROM queue WHERE owner = ?`, owner); err != nil {
+			return fmt.Errorf("list owned queue: %w", err)
+		}
+		for _, id := range ids {
+			owned[id] = true
+		}
+		_, err = tx.Exec(`DELETE FROM queue WHERE owner = ?`, owner)
+	}
+	if err != nil {
 		return fmt.Errorf("clear queue: %w", err)
 	}
 	for _, q := range items {
+		if owner != "" && persisted[q.ID] && !owned[q.ID] {
+			continue
+		}
 		r, err := queueItemToRow(q)
 		if err != nil {
 			return err
 		}
+		r.Owner = owner
 		_, err = tx.NamedExec(`
 			INSERT INTO queue
 			(id, account_id, plan_code, datacenter, options, status, created_at, updated_at,
 			 retry_interval, retry_count, max_retries, last_check_time,
-			 quick_order, priority, from_telegram, config_sniper_task_id)
-			VALUES
-			(:id, :account_id, :plan_code, :datacenter, :options, :status, :created_at, :updated_at,
+			 quick_order, priority, from_telegram, config_sniper_task_id, owner)
+			SELECT
+			 :id, :account_id, :plan_code, :datacenter, :options, :status, :created_at, :updated_at,
 			 :retry_interval, :retry_count, :max_retries, :last_check_time,
-			 :quick_order, :priority, :from_telegram, :config_sniper_task_id)
+			 :quick_order, :priority, :from_telegram, :config_sniper_task_id, :owner
+			WHERE NOT EXISTS (SELECT 1 FROM queue_tombstones WHERE id = :id)
+			ON CONFLICT(id) DO NOTHING
 		`, r)
 		if err != nil {
 			return fmt.Errorf("insert queue %s: %w", q.ID, err)
@@ -135,6 +168,78 @@ func (db *DB) ReplaceQueue(items []types.QueueItem) error {
 	return tx.Commit()
 }
 
+// ListQueueOwned 集群模式：取 owner 名下的队列任务
+func (db *DB) ListQueueOwned(owner string) ([]types.QueueItem, error) {
+	var rows []queueRow
+	if err := db.Select(&rows, `SELECT * FROM queue WHERE owner = ? ORDER BY created_at`, owner); err != nil {
+		return nil, fmt.Errorf("list queue of %s: %w", owner, err)
+	}
+	out := make([]types.QueueItem, 0, len(rows))
+	for _, r := range rows {
+		out = append(out, rowToQueueItem(r))
+	}
+	return out, nil
+}
+
+// AdoptQueue 集群模式：把 owner 不在 live 里的任务（失联实例的、或单实例时期留下的）转给 owner。
+// 单条 UPDATE，多个实例同时接管也不会把同一行分给两个实例。
+func (db *DB) AdoptQueue(owner string, live []string) (int64, error) {
+	q := `UPDATE queue SET owner = ? WHERE owner NOT IN (?` + strings.Repeat(", ?", len(live)) + `)`
+	args := make([]interface{}, 0, len(live)+2)
+	args = append(args, owner, owner)
+	for _, id := range live {
+		args = append(args, id)
+	}
+	res, err := db.Exec(q, args...)
+	if err != nil {
+		return 0, fmt.Errorf("adopt queue: %w", err)
+	}
+	return res.RowsAffected()
+}
+
+// QueueOwner 任务当前归属；exists=false 表示库里已没有这条（被别的实例完成 / 删除，或尚未落盘）
+func (db *DB) QueueOwner(id string) (owner string, exists bool, err error) {
+	err = db.Get(&owner, `SELECT owner FROM queue WHERE id = ?`, id)
+	if err == sql.ErrNoRows {
+		return "", false, nil
+	}
+	if err != nil {
+		return "", false, fmt.Errorf("queue owner %s: %w", id, err)
+	}
+	return owner, true, nil
+}
+
+// FinishQueueItem 集群模式：任务到终态，删行并留墓碑（同一事务），之后任何实例都不会再写回或下单。
+// 顺带清理早于 pruneBefore（Unix ms）的墓碑。
+func (db *DB) FinishQueueItem(id string, now, pruneBefore int64) error {
+	tx, err := db.Beginx()
+	if err != nil {
+		return err
+	}
+	defer tx.Rollback()
+	if _, err := tx.Exec(
+		`INSERT INTO queue_tombstones(id, finished_at) VALUES(?, ?)
+		 ON CONFLICT(id) DO UPDATE SET finished_at = excluded.finished_at`, id, now); err != nil {
+		return fmt.Errorf("tombstone queue %s: %w", id, err)
+	}
+	if _, err := tx.Exec(`DELETE FROM queue WHERE id = ?`, id); err != nil {
+		return fmt.Errorf("delete queue %s: %w", id, err)
+	}
+	if _, err := tx.Exec(`DELETE FROM queue_tombstones WHERE finished_at < ?`, pruneBefore); err != nil {
+		return fmt.Errorf("prune queue tombstones: %w", err)
+	}
+	return tx.Commit()
+}
+
+// QueueItemFinished 任务是否已留墓碑（到过终态）
+func (db *DB) QueueItemFinished(id string) (bool, error) {
+	var n int
+	if err := db.Get(&n, `SELECT COUNT(*) FROM queue_tombstones WHERE id = ?`, id); err != nil {
+		return false, fmt.Errorf("queue tombstone %s: %w", id, err)
+	}
+	return n > 0, nil
+}
+
 // DeleteQueueItem 按 id 删除单条
 func (db *DB) DeleteQueueItem(id string) error {
 	_, err := db.Exec(`DELETE FROM queue WHERE id = ?`, id)
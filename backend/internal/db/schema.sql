@@ -105,6 +105,48 @@ CREATE TABLE IF NOT EXISTS monitor_subscriptions (
   quantity            INTEGER NOT NULL DEFAULT 1
 );
 
+-- ===========================================
+-- monitor_transitions: 服务器监控每个 (机房, 配置) 的状态变化明细，只追加
+-- at = Unix 秒；超过保留期的由监控循环折叠进 monitor_availability_daily 后删除
+-- ===========================================
+CREATE TABLE IF NOT EXISTS monitor_transitions (
+  plan_code   TEXT NOT NULL,
+  datacenter  TEXT NOT NULL,
+  config      TEXT NOT NULL,
+  at          INTEGER NOT NULL,
+  kind        TEXT NOT NULL               -- available / unavailable / price_check_failed
+);
+CREATE INDEX IF NOT EXISTS idx_monitor_transitions_at ON monitor_transitions(at);
+
+-- ===========================================
+-- monitor_last_transitions: 每个 (机房, 配置) 每种状态最近一次变成它的时刻（Unix 秒），
+-- 随 monitor_transitions 一起写入；明细折叠后日汇总里没有精确时刻，重启后靠它恢复通知里的"历时"
+-- ===========================================
+CREATE TABLE IF NOT EXISTS monitor_last_transitions (
+  plan_code   TEXT NOT NULL,
+  datacenter  TEXT NOT NULL,
+  config      TEXT NOT NULL,
+  kind        TEXT NOT NULL,
+  at          INTEGER NOT NULL,
+  PRIMARY KEY (plan_code, datacenter, config, kind)
+);
+
+-- ===========================================
+-- monitor_availability_daily: 状态变化明细按天（UTC）降采样后的汇总
+-- day = 当天 0 点 Unix 秒；until / end_in_stock 为已折叠到的时刻及该时刻是否在货
+-- ===========================================
+CREATE TABLE IF NOT EXISTS monitor_availability_daily (
+  plan_code     TEXT NOT NULL,
+  datacenter    TEXT NOT NULL,
+  config        TEXT NOT NULL,
+  day           INTEGER NOT NULL,
+  until         INTEGER NOT NULL,
+  in_stock_sec  INTEGER NOT NULL DEFAULT 0,
+  restocks      INTEGER NOT NULL DEFAULT 0,
+  end_in_stock  INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (plan_code, datacenter, config, day)
+);
+
 -- ===========================================
 -- vps_subscriptions: VPS 补货监控订阅
 -- ===========================================
@@ -174,3 +216,100 @@ CREATE TABLE IF NOT EXISTS telegram_updates (
   processed_at REAL NOT NULL
 );
 CREATE INDEX IF NOT EXISTS idx_tg_updates_processed ON telegram_updates(processed_at);
+
+-- ===========================================
+-- catalog_changes: 服务器目录变更日志（两次刷新之间 added / removed / changed 的 plan）
+-- 每个变化的 plan 一行，detail 只存差异（字段名 + 增删的机房 / 选项），按 seq 递增可回放
+-- ===========================================
+CREATE TABLE IF NOT EXISTS catalog_changes (
+  seq        INTEGER PRIMARY KEY AUTOINCREMENT,
+  created_at TEXT NOT NULL,
+  plan_code  TEXT NOT NULL,
+  kind       TEXT NOT NULL,              -- added / removed / changed
+  detail     TEXT NOT NULL DEFAULT '{}'  -- JSON: name / fields / added|removed datacenters|options
+);
+CREATE INDEX IF NOT EXISTS idx_catalog_changes_plan ON catalog_changes(plan_code, seq);
+
+-- ===========================================
+-- server_inventory: 各账户名下独服的详情缓存（/api/server-control/list）
+-- info / service_infos 为 OVH /dedicated/server/{name} 与 /serviceInfos 的原始 JSON；
+-- refreshed_at = Unix ms，0 表示已失效（控制操作后）待后台刷新
+-- ===========================================
+CREATE TABLE IF NOT EXISTS server_inventory (
+  account_id    TEXT NOT NULL,
+  service_name  TEXT NOT NULL,
+  info          TEXT NOT NULL DEFAULT '{}',
+  service_infos TEXT NOT NULL DEFAULT '{}',
+  refreshed_at  INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (account_id, service_name)
+);
+
+-- ===========================================
+-- os_templates: 独服安装模板详情缓存（/dedicated/installationTemplate/{name}）
+-- 模板定义全局共享、与账户无关；detail 为 OVH 原始 JSON，updated_at = Unix ms
+-- ===========================================
+CREATE TABLE IF NOT EXISTS os_templates (
+  name       TEXT PRIMARY KEY,
+  detail     TEXT NOT NULL,
+  updated_at INTEGER NOT NULL
+);
+
+-- ===========================================
+-- ovh_orders: OVH 订单本地索引（/me/order），增量同步
+-- body = /me/order/{id} 原始 JSON；details = 订单明细数组 JSON（/me/order/{id}/details/{detailId}）
+-- details_final=1 表示订单已到终态、明细不会再变，不再重新拉取
+-- ===========================================
+CREATE TABLE IF NOT EXISTS ovh_orders (
+  account_id     TEXT    NOT NULL,
+  order_id       INTEGER NOT NULL,
+  order_date     TEXT    NOT NULL DEFAULT '',
+  status         TEXT    NOT NULL DEFAULT '',
+  body           TEXT    NOT NULL DEFAULT '{}',
+  details        TEXT    NOT NULL DEFAULT '[]',
+  details_final  INTEGER NOT NULL DEFAULT 0,
+  checked_at     INTEGER NOT NULL DEFAULT 0, -- 最近一次拉 status 的 Unix ms
+  PRIMARY KEY (account_id, order_id)
+);
+
+-- ===========================================
+-- ovh_account_resources: 账户下"列 ID + 逐条 GET 正文"类资源的本地副本，增量同步
+-- kind = bill / refund / email / contact_change / sub_account；body = 正文原始 JSON
+-- final=1 表示正文不会再变（账单 / 退款 / 已发邮件、到终态的联系人变更），不再重新拉取
+-- sort_key 取正文里的日期，分页按 sort_key、res_id 倒序
+-- ===========================================
+CREATE TABLE IF NOT EXISTS ovh_account_resources (
+  account_id  TEXT    NOT NULL,
+  kind        TEXT    NOT NULL,
+  res_id      TEXT    NOT NULL,
+  sort_key    TEXT    NOT NULL DEFAULT '',
+  body        TEXT    NOT NULL DEFAULT '{}',
+  final       INTEGER NOT NULL DEFAULT 0,
+  fetched_at  INTEGER NOT NULL DEFAULT 0, -- 最近一次拉正文的 Unix ms
+  PRIMARY KEY (account_id, kind, res_id)
+);
+CREATE INDEX IF NOT EXISTS idx_account_resources_sort ON ovh_account_resources(account_id, kind, sort_key DESC, res_id DESC);
+
+-- ===========================================
+-- 多实例分片协调（CLUSTER_MODE=true 时使用，见 internal/cluster）
+-- 时间均为 Unix ms。cluster_members 为实例心跳；cluster_leases 为分片租约；
+-- cluster_claims 为一次性认领（下单去重），过期行在心跳时顺带清理；
+-- queue_tombstones 为已到终态的队列任务 id：行删掉后留下墓碑，失联恢复的实例不会把它重新写回再下一次单
+-- ===========================================
+CREATE TABLE IF NOT EXISTS cluster_members (
+  instance_id  TEXT PRIMARY KEY,
+  heartbeat_at INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS cluster_leases (
+  shard      INTEGER PRIMARY KEY,
+  owner      TEXT NOT NULL,
+  expires_at INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS cluster_claims (
+  key        TEXT PRIMARY KEY,
+  owner      TEXT NOT NULL,
+  expires_at INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS queue_tombstones (
+  id          TEXT PRIMARY KEY,
+  finished_at INTEGER NOT NULL
+);
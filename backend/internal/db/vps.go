@@ -108,10 +108,10 @@ func (db *DB) UpsertVPSSubscription(s types.VPSSubscription) error {
 	_, err = db.NamedExec(`
 		INSERT INTO vps_subscriptions
 		(id, plan_code, ovh_subsidiary, datacenters, monitor_linux, monitor_windows,
-		 notify_available, notify_unavailable, last_status, history, created_at)
+		 notify_available, notify_unavailable, last_status, history, created_at, auto_order_account_id)
 		VALUES
 		(:id, :plan_code, :ovh_subsidiary, :datacenters, :monitor_linux, :monitor_windows,
-		 :notify_available, :notify_unavailable, :last_status, :history, :created_at)
+		 :notify_available, :notify_unavailable, :last_status, :history, :created_at, :auto_order_account_id)
 		ON CONFLICT(id) DO UPDATE SET
 		  plan_code          = excluded.plan_code,
 		  ovh_subsidiary     = excluded.ovh_subsidiary,
@@ -130,6 +130,51 @@ func (db *DB) UpsertVPSSubscription(s types.VPSSubscription) error {
 	return nil
 }
 
+// UpsertVPSSubscriptionConfig 按 id upsert，已存在时只更新用户配置列，
+// 不动 last_status / history（集群模式下这两列只由负责该订阅的实例写）
+func (db *DB) UpsertVPSSubscriptionConfig(s types.VPSSubscription) error {
+	r, err := vpsSubToRow(s)
+	if err != nil {
+		return err
+	}
+	_, err = db.NamedExec(`
+		INSERT INTO vps_subscriptions
+		(id, plan_code, ovh_subsidiary, datacenters, monitor_linux, monitor_windows,
+		 notify_available, notify_unavailable, last_status, history, created_at, auto_order_account_id)
+		VALUES
+		(:id, :plan_code, :ovh_subsidiary, :datacenters, :monitor_linux, :monitor_windows,
+		 :notify_available, :notify_unavailable, :last_status, :history, :created_at, :auto_order_account_id)
+		ON CONFLICT(id) DO UPDATE SET
+		  plan_code              = excluded.plan_code,
+		  ovh_subsidiary         = excluded.ovh_subsidiary,
+		  datacenters            = excluded.datacenters,
+		  monitor_linux          = excluded.monitor_linux,
+		  monitor_windows        = excluded.monitor_windows,
+		  notify_available       = excluded.notify_available,
+		  notify_unavailable     = excluded.notify_unavailable,
+		  auto_order_account_id  = excluded.auto_order_account_id
+	`, r)
+	if err != nil {
+		return fmt.Errorf("upsert vps sub config %s: %w", s.ID, err)
+	}
+	return nil
+}
+
+// UpdateVPSSubscriptionState 只更新 last_status / history；行已被删除时什么也不做（不会重新插入）
+func (db *DB) UpdateVPSSubscriptionState(s types.VPSSubscription) error {
+	r, err := vpsSubToRow(s)
+	if err != nil {
+		return err
+	}
+	if _, err := db.NamedExec(`
+		UPDATE vps_subscriptions SET last_status = :last_status, history = :history
+		WHERE id = :id
+	`, r); err != nil {
+		return fmt.Errorf("update vps sub state %s: %w", s.ID, err)
+	}
+	return nil
+}
+
 // ReplaceVPSSubscriptions 全表覆盖
 func (db *DB) ReplaceVPSSubscriptions(subs []types.VPSSubscription) error {
 	tx, err := db.Beginx()
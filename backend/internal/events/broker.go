@@ -0,0 +1,139 @@
+// Package events 进程内事件总线：各组件（日志 / 队列 / 抢购 / 监控）发布变化，
+// /api/events 以 Server-Sent Events 推给前端，前端不必再轮询各状态端点。
+package events
+
+import (
+	"encoding/json"
+	"sync"
+	"sync/atomic"
+	"time"
+)
+
+// 事件类型
+const (
+	TypeLog        = "log"         // 新日志：types.LogEntry
+	TypeQueue      = "queue"       // 队列任务增删 / 状态变化：{op, item}
+	TypePurchase   = "purchase"    // 抢购历史新增 / 更新：types.PurchaseHistoryEntry
+	TypeMonitor    = "monitor"     // 独服监控启停 / 订阅可用性变化
+	TypeVPSMonitor = "vps_monitor" // VPS 监控启停 / 订阅可用性变化
+	TypeStats      = "stats"       // 仪表盘统计（合并发送）：types.Stats
+	// TypeResync 订阅者缓冲区满丢过事件，前端应重新拉一次全量状态
+	TypeResync = "resync"
+)
+
+// Event 一条已编码的事件；Data 为 JSON，同一事件所有订阅者共用
+type Event struct {
+	ID   uint64
+	Type string
+	Data []byte
+}
+
+// Subscriber 一个推送连接
+type Subscriber struct {
+	C       chan Event
+	types   map[string]struct{} // nil = 全部类型
+	dropped atomic.Bool
+}
+
+// TakeDropped 自上次调用以来是否丢过事件（读后清零）
+func (s *Subscriber) TakeDropped() bool { return s.dropped.Swap(false) }
+
+func (s *Subscriber) wants(typ string) bool {
+	if s.types == nil {
+		return true
+	}
+	_, ok := s.types[typ]
+	return ok
+}
+
+// Broker 事件分发。Publish 不阻塞：订阅者处理不过来时丢事件并标记，由连接补发 resync。
+// 没有订阅者时 Publish 直接返回，不做 JSON 编码。
+type Broker struct {
+	mu    sync.Mutex
+	subs  map[*Subscriber]struct{}
+	seq   uint64
+	count atomic.Int32
+
+	debounceMu sync.Mutex
+	pending    map[string]bool
+}
+
+// NewBroker 创建事件总线
+func NewBroker() *Broker {
+	return &Broker{subs: map[*Subscriber]struct{}{}, pending: map[string]bool{}}
+}
+
+// Subscribe 新建订阅；types 为空表示接收全部类型，buf 为缓冲事件数
+func (b *Broker) Subscribe(types []string, buf int) *Subscriber {
+	s := &Subscriber{C: make(chan Event, buf)}
+	if len(types) > 0 {
+		s.types = make(map[string]struct{}, len(types)+1)
+		for _, t := range types {
+			s.types[t] = struct{}{}
+		}
+		s.types[TypeResync] = struct{}{}
+	}
+	b.mu.Lock()
+	b.subs[s] = struct{}{}
+	b.mu.Unlock()
+	b.count.Add(1)
+	return s
+}
+
+// Unsubscribe 取消订阅（可重复调用）
+func (b *Broker) Unsubscribe(s *Subscriber) {
+	b.mu.Lock()
+	if _, ok := b.subs[s]; ok {
+		delete(b.subs, s)
+		b.count.Add(-1)
+	}
+	b.mu.Unlock()
+}
+
+// Subscribers 当前订阅数
+func (b *Broker) Subscribers() int { return int(b.count.Load()) }
+
+// Publish 发布一条事件。v 编码失败时丢弃。
+func (b *Broker) Publish(typ string, v interface{}) {
+	if b == nil || b.count.Load() == 0 {
+		return
+	}
+	data, err := json.Marshal(v)
+	if err != nil {
+		return
+	}
+	b.mu.Lock()
+	defer b.mu.Unlock()
+	b.seq++
+	ev := Event{ID: b.seq, Type: typ, Data: data}
+	for s := range b.subs {
+		if !s.wants(typ) {
+			continue
+		}
+		select {
+		case s.C <- ev:
+		default:
+			s.dropped.Store(true)
+		}
+	}
+}
+
+// PublishDebounced delay 内多次调用只在到期时发布一次，数据由 fn 在发布时生成。
+// 用于统计这类由多处变化触发、只关心最新值的事件。
+func (b *Broker) PublishDebounced(typ string, delay time.Duration, fn func() interface{}) {
+	if b == nil || b.count.Load() == 0 {
+		return
+	}
+	b.debounceMu.Lock()
+	defer b.debounceMu.Unlock()
+	if b.pending[typ] {
+		return
+	}
+	b.pending[typ] = true
+	time.AfterFunc(delay, func() {
+		b.debounceMu.Lock()
+		delete(b.pending, typ)
+		b.debounceMu.Unlock()
+		b.Publish(typ, fn())
+	})
+}
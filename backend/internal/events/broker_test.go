@@ -0,0 +1,34 @@
+package events
+
+import "testing"
+
+func TestPublishFilterAndDrop(t *testing.T) {
+	b := NewBroker()
+	b.Publish(TypeLog, "no subscribers")
+
+	all := b.Subscribe(nil, 1)
+	queueOnly := b.Subscribe([]string{TypeQueue}, 4)
+	b.Publish(TypeLog, map[string]string{"message": "hi"})
+	b.Publish(TypeQueue, map[string]string{"op": "added"})
+
+	ev := <-all.C
+	if ev.Type != TypeLog || string(ev.Data) != `{"message":"hi"}` {
+		t.Fatalf("unexpected first event %+v", ev)
+	}
+	if !all.TakeDropped() || all.TakeDropped() {
+		t.Fatal("full buffer should mark dropped once")
+	}
+	ev = <-queueOnly.C
+	if ev.Type != TypeQueue || ev.ID != 2 {
+		t.Fatalf("queue subscriber got %+v", ev)
+	}
+	if len(queueOnly.C) != 0 || queueOnly.TakeDropped() {
+		t.Fatal("filtered subscriber should only see queue events")
+	}
+
+	b.Unsubscribe(all)
+	b.Unsubscribe(all)
+	if b.Subscribers() != 1 {
+		t.Fatalf("Subscribers()=%d want 1", b.Subscribers())
+	}
+}
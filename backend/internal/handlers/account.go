@@ -1,10 +1,11 @@
 package handlers
 
 import (
+	"encoding/json"
 	"fmt"
 	"net/http"
-	"sort"
 	"strconv"
+	"strings"
 
 	"github.com/gin-gonic/gin"
 
@@ -42,7 +43,8 @@ func GetAccountInfo(state *app.State) gin.HandlerFunc {
 }
 
 // GetAccountOrders GET /api/ovh/account/orders
-// 拉取 OVH /me/order 最近订单详情（默认最多 30 条，?limit= 可调）
+// 最近订单正文（默认最多 30 条，?limit= 可调，最大 100）。
+// 读本地订单索引（State.OrderIndex 增量同步），订单正文下单后不变，不再逐条请求 OVH。
 func GetAccountOrders(state *app.State) gin.HandlerFunc {
 	return func(c *gin.Context) {
 		client, err := ovhClientFor(state, c)
@@ -50,16 +52,17 @@ func GetAccountOrders(state *app.State) gin.HandlerFunc {
 			noOVHRespAccount(c)
 			return
 		}
-		var ids []interface{}
-		if err := client.Get("/me/order", &ids); err != nil {
+		acc, ok := ovhAccountFor(state, c)
+		if !ok {
+			noOVHRespAccount(c)
+			return
+		}
+		rows, _, err := state.OrderIndex(acc.ID, client, false)
+		if err != nil {
 			state.Logger.Error("获取订单列表失败: "+err.Error(), "account_management")
 			c.JSON(http.StatusInternalServerError, gin.H{"error": "获取订单列表失败: " + err.Error()})
 			return
 		}
-		// 新订单通常 ID 更大，倒序取最近
-		sort.Slice(ids, func(i, j int) bool {
-			return idToInt64(ids[i]) > idToInt64(ids[j])
-		})
 		limit := 30
 		if raw := c.Query("limit"); raw != "" {
 			if n, err := strconv.Atoi(raw); err == nil && n > 0 {
@@ -69,17 +72,16 @@ func GetAccountOrders(state *app.State) gin.HandlerFunc {
 				}
 			}
 		}
-		if len(ids) < limit {
-			limit = len(ids)
-		}
-		details := parallelGetDetails(client, ids[:limit], func(k interface{}) string {
-			return "/me/order/" + idToString(k)
-		}, 10)
-		list := []map[string]interface{}{}
-		for _, d := range details {
-			if d != nil {
-				list = append(list, d)
+		// 索引按订单 ID 倒序（新订单在前）
+		list := make([]json.RawMessage, 0, limit)
+		for _, r := range rows {
+			if len(list) >= limit {
+				break
+			}
+			if r.Body == "" || r.Body == "{}" {
+				continue
 			}
+			list = append(list, json.RawMessage(r.Body))
 		}
 		state.Logger.Info(fmt.Sprintf("成功获取 %d 条订单记录", len(list)), "account_management")
 		c.JSON(http.StatusOK, list)
@@ -87,36 +89,11 @@ func GetAccountOrders(state *app.State) gin.HandlerFunc {
 }
 
 // GetAccountRefunds GET /api/ovh/account/refunds
+// 读本地副本（State.AccountResources 增量同步），分页参数见 serveAccountResources
 func GetAccountRefunds(state *app.State) gin.HandlerFunc {
-	return func(c *gin.Context) {
-		client, err := ovhClientFor(state, c)
-		if err != nil {
-			noOVHRespAccount(c)
-			return
-		}
-		var ids []interface{}
-		if err := client.Get("/me/refund", &ids); err != nil {
-			state.Logger.Error("获取退款列表失败: "+err.Error(), "account_management")
-			c.JSON(http.StatusInternalServerError, gin.H{"error": "获取退款列表失败: " + err.Error()})
-			return
-		}
-		max := 20
-		if len(ids) < max {
-			max = len(ids)
-		}
-		// 并发拉详情：10 并发，原 20 * 200ms = 4 秒 -> 2 * 200ms = 0.4 秒
-		details := parallelGetDetails(client, ids[:max], func(k interface{}) string {
-			return "/me/refund/" + idToString(k)
-		}, 10)
-		list := []map[string]interface{}{}
-		for _, d := range details {
-			if d != nil {
-				list = append(list, d)
-			}
-		}
-		state.Logger.Info(fmt.Sprintf("成功获取 %d 条退款记录", len(list)), "account_management")
-		c.JSON(http.StatusOK, list)
-	}
+	return serveAccountResources(state, accountResourceEndpoint{
+		kind: app.ResourceRefunds, label: "退款列表", logCategory: "account_management", legacyLimit: 20,
+	})
 }
 
 // GetCreditBalance GET /api/ovh/account/credit-balance
@@ -149,74 +126,19 @@ func GetCreditBalance(state *app.State) gin.HandlerFunc {
 }
 
 // GetEmailHistory GET /api/ovh/account/email-history
+// 读本地副本，不带分页参数时返回最新 50 封
 func GetEmailHistory(state *app.State) gin.HandlerFunc {
-	return func(c *gin.Context) {
-		client, err := ovhClientFor(state, c)
-		if err != nil {
-			noOVHRespAccount(c)
-			return
-		}
-		var ids []interface{}
-		if err := client.Get("/me/notification/email/history", &ids); err != nil {
-			state.Logger.Error("获取邮件历史失败: "+err.Error(), "account_management")
-			c.JSON(http.StatusInternalServerError, gin.H{"error": "获取邮件历史失败: " + err.Error()})
-			return
-		}
-		// 倒序
-		for i, j := 0, len(ids)-1; i < j; i, j = i+1, j-1 {
-			ids[i], ids[j] = ids[j], ids[i]
-		}
-		max := 50
-		if len(ids) < max {
-			max = len(ids)
-		}
-		// 并发拉 50 封邮件详情：原 50 * 200ms = 10 秒 -> 5 * 200ms = 1 秒
-		details := parallelGetDetails(client, ids[:max], func(k interface{}) string {
-			return "/me/notification/email/history/" + idToString(k)
-		}, 10)
-		list := []map[string]interface{}{}
-		for _, d := range details {
-			if d != nil {
-				list = append(list, d)
-			}
-		}
-		state.Logger.Info(fmt.Sprintf("成功获取 %d 封邮件（总共 %d 封）", len(list), len(ids)), "account_management")
-		c.JSON(http.StatusOK, list)
-	}
+	return serveAccountResources(state, accountResourceEndpoint{
+		kind: app.ResourceEmails, label: "邮件历史", logCategory: "account_management", legacyLimit: 50,
+	})
 }
 
 // GetContactChangeRequests GET /api/ovh/contact-change-requests
+// 读本地副本，按 dateRequest 倒序；未完成（非 done / refused）的请求每次同步重拉
 func GetContactChangeRequests(state *app.State) gin.HandlerFunc {
-	return func(c *gin.Context) {
-		client, err := ovhClientFor(state, c)
-		if err != nil {
-			noOVHRespAccount(c)
-			return
-		}
-		var ids []interface{}
-		if err := client.Get("/me/task/contactChange", &ids); err != nil {
-			state.Logger.Error("获取联系人变更请求列表失败: "+err.Error(), "server_control")
-			c.JSON(http.StatusInternalServerError, gin.H{"status": "error", "message": "获取联系人变更请求列表失败: " + err.Error()})
-			return
-		}
-		// 并发拉详情
-		details := parallelGetDetails(client, ids, func(k interface{}) string {
-			return "/me/task/contactChange/" + idToString(k)
-		}, 10)
-		list := []map[string]interface{}{}
-		for _, d := range details {
-			if d != nil {
-				list = append(list, d)
-			}
-		}
-		sort.SliceStable(list, func(i, j int) bool {
-			a, _ := list[i]["dateRequest"].(string)
-			b, _ := list[j]["dateRequest"].(string)
-			return a > b
-		})
-		state.Logger.Info(fmt.Sprintf("成功获取 %d 个联系人变更请求", len(list)), "server_control")
-		c.JSON(http.StatusOK, gin.H{"status": "success", "data": list})
-	}
+	return serveAccountResources(state, accountResourceEndpoint{
+		kind: app.ResourceContactChanges, label: "联系人变更请求列表", logCategory: "server_control", wrapped: true,
+	})
 }
 
 // GetContactChangeRequestDetail GET /api/ovh/contact-change-requests/:task_id
@@ -321,63 +243,121 @@ func ResendContactChangeEmail(state *app.State) gin.HandlerFunc {
 }
 
 // GetSubAccounts GET /api/ovh/account/sub-accounts
+// 读本地副本；子账户描述可改，每次同步都重拉正文
 func GetSubAccounts(state *app.State) gin.HandlerFunc {
+	return serveAccountResources(state, accountResourceEndpoint{
+		kind: app.ResourceSubAccounts, label: "子账户列表", logCategory: "account_management", wrapped: true,
+	})
+}
+
+// GetAccountBills GET /api/ovh/account/bills
+// 读本地副本，不带分页参数时返回最新 20 条
+func GetAccountBills(state *app.State) gin.HandlerFunc {
+	return serveAccountResources(state, accountResourceEndpoint{
+		kind: app.ResourceBills, label: "账单列表", logCategory: "account_management", legacyLimit: 20, wrapped: true,
+	})
+}
+
+// accountResourceEndpoint 一个"账户资源列表"接口的配置
+type accountResourceEndpoint struct {
+	kind        app.AccountResourceKind
+	label       string // 日志 / 错误信息里的名字
+	logCategory string
+	legacyLimit int  // 不分页时最多返回的条数，0 = 全部
+	wrapped     bool // 旧响应为 {status, data}（否则为裸数组），错误为 {status, message}（否则为 {error}）
+}
+
+// serveAccountResources 账单 / 退款 / 邮件 / 联系人变更 / 子账户列表的通用 handler。
+// 先 State.AccountResources 增量同步（只列 ID、拉新 ID 与未定稿资源的正文），再从 SQLite 读：
+//   - 不带 limit / offset：旧响应格式，新的在前，最多 legacyLimit 条
+//   - 带 limit（默认 50，最大 500）/ offset：{ items, total, offset, limit, hasMore, pending, syncTime }
+//   - forceRefresh=true 忽略同步间隔，立即向 OVH 增量同步
+func serveAccountResources(state *app.State, ep accountResourceEndpoint) gin.HandlerFunc {
 	return func(c *gin.Context) {
 		client, err := ovhClientFor(state, c)
 		if err != nil {
 			noOVHRespAccount(c)
 			return
 		}
-		var ids []interface{}
-		if err := client.Get("/me/subAccount", &ids); err != nil {
-			state.Logger.Error("获取子账户列表失败: "+err.Error(), "account_management")
-			c.JSON(http.StatusInternalServerError, gin.H{"status": "error", "message": "获取子账户列表失败: " + err.Error()})
+		acc, ok := ovhAccountFor(state, c)
+		if !ok {
+			noOVHRespAccount(c)
 			return
 		}
-		// 并发拉详情
-		details := parallelGetDetails(client, ids, func(k interface{}) string {
-			return "/me/subAccount/" + idToString(k)
-		}, 10)
-		list := []map[string]interface{}{}
-		for _, d := range details {
-			if d != nil {
-				list = append(list, d)
+		respondErr := func(code int, msg string) {
+			if ep.wrapped {
+				c.JSON(code, gin.H{"status": "error", "message": msg})
+			} else {
+				c.JSON(code, gin.H{"error": msg})
 			}
 		}
-		state.Logger.Info(fmt.Sprintf("成功获取 %d 个子账户", len(list)), "account_management")
-		c.JSON(http.StatusOK, gin.H{"status": "success", "data": list})
-	}
-}
+		fail := func(err error) {
+			msg := "获取" + ep.label + "失败: " + err.Error()
+			state.Logger.Error(msg, ep.logCategory)
+			respondErr(http.StatusInternalServerError, msg)
+		}
 
-// GetAccountBills GET /api/ovh/account/bills
-func GetAccountBills(state *app.State) gin.HandlerFunc {
-	return func(c *gin.Context) {
-		client, err := ovhClientFor(state, c)
+		paged := c.Query("limit") != "" || c.Query("offset") != ""
+		offset, limit := 0, ep.legacyLimit
+		if limit == 0 {
+			limit = -1 // SQLite LIMIT -1 = 不限
+		}
+		if paged {
+			limit, _ = strconv.Atoi(c.DefaultQuery("limit", "50"))
+			if limit <= 0 {
+				limit = 50
+			}
+			if limit > 500 {
+				limit = 500
+			}
+			if raw := c.Query("offset"); raw != "" {
+				offset, err = strconv.Atoi(raw)
+				if err != nil || offset < 0 {
+					respondErr(http.StatusBadRequest, "offset 无效")
+					return
+				}
+			}
+		}
+
+		force := strings.EqualFold(c.Query("forceRefresh"), "true")
+		res, err := state.AccountResources(acc.ID, ep.kind, client, force)
 		if err != nil {
-			noOVHRespAccount(c)
+			fail(err)
 			return
 		}
-		var ids []string
-		if err := client.Get("/me/bill", &ids); err != nil {
-			state.Logger.Error("获取账单列表失败: "+err.Error(), "account_management")
-			c.JSON(http.StatusInternalServerError, gin.H{"status": "error", "message": "获取账单列表失败: " + err.Error()})
+		rows, total, err := state.DB.PageAccountResources(acc.ID, ep.kind.Name, offset, limit)
+		if err != nil {
+			fail(err)
 			return
 		}
-		max := 20
-		if len(ids) < max {
-			max = len(ids)
+		items := make([]json.RawMessage, 0, len(rows))
+		for _, r := range rows {
+			items = append(items, json.RawMessage(r.Body))
 		}
-		// 并发拉 20 个账单详情
-		details := parallelGetStringKeys(client, ids[:max], func(s string) string {
-			return "/me/bill/" + s
-		}, 10)
-		list := []map[string]interface{}{}
-		for _, d := range details {
-			if d != nil {
-				list = append(list, d)
+		if res.Synced {
+			state.Logger.Info(fmt.Sprintf("成功获取%s: 共 %d 条，本次拉取 %d 条正文", ep.label, total, res.Fetched), ep.logCategory)
+		}
+
+		if !paged {
+			if ep.wrapped {
+				c.JSON(http.StatusOK, gin.H{"status": "success", "data": items})
+			} else {
+				c.JSON(http.StatusOK, items)
 			}
+			return
 		}
-		state.Logger.Info(fmt.Sprintf("成功获取 %d 条账单记录", len(list)), "account_management")
-		c.JSON(http.StatusOK, gin.H{"status": "success", "data": list})
+		var syncTime int64
+		if !res.At.IsZero() {
+			syncTime = res.At.UnixMilli()
+		}
+		c.JSON(http.StatusOK, gin.H{
+			"items":    items,
+			"total":    total,
+			"offset":   offset,
+			"limit":    limit,
+			"hasMore":  offset+len(items) < total,
+			"pending":  res.Pending,
+			"syncTime": syncTime,
+		})
 	}
 }
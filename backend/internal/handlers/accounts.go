@@ -267,9 +267,9 @@ func verifyAccountCreds(state *app.State, accountID string) bool {
 	return true
 }
 
-// reloadAfterAccountDelete 删账户后,把内存里关联的 queue/history/sniper_tasks
-// 重新从 SQLite 加载(级联删除已经把这些行删掉了)
-func reloadAfterAccountDelete(state *app.State, _ string) {
+// reloadAfterAccountDelete 删账户后,把内存里关联的 queue/sniper_tasks 重新从 SQLite 加载、
+// 重建 history 计数器(级联删除已经把这些行删掉了)
+func reloadAfterAccountDelete(state *app.State, id string) {
 	if items, err := state.DB.ListQueue(); err == nil {
 		state.QueueMu.Lock()
 		state.Queue = items
@@ -278,14 +278,10 @@ func reloadAfterAccountDelete(state *app.State, _ string) {
 		}
 		state.QueueMu.Unlock()
 	}
-	if items, err := state.DB.ListHistory(); err == nil {
-		state.HistoryMu.Lock()
-		state.History = items
-		if state.History == nil {
-			state.History = []types.PurchaseHistoryEntry{}
-		}
-		state.HistoryMu.Unlock()
-	}
+	// history 明细本就只在 SQLite，只需重建计数器
+	state.ReloadHistoryCounters()
+	// 独服列表缓存的 SQLite 行已随账户级联删除
+	state.DropServerInventory(id)
 	// 监控订阅内存由 DeleteAccountByID 调用 mon.LoadFromDB() 刷新
 	if subs, err := state.DB.ListVPSSubscriptions(); err == nil {
 		state.VPSSubsMu.Lock()
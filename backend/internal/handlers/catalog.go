@@ -1,8 +1,7 @@
 package handlers
 
 import (
-	"fmt"
-	"io"
+	"errors"
 	"net/http"
 	"strconv"
 	"strings"
@@ -11,23 +10,12 @@ import (
 	"github.com/gin-gonic/gin"
 
 	"github.com/ovh-webui/server/internal/app"
+	"github.com/ovh-webui/server/internal/catalog"
+	"github.com/ovh-webui/server/internal/db"
 )
 
-// catalogTTL OVH 公开 catalog 缓存时长，与前端 useOvhCatalog 的 staleTime 对齐
-const catalogTTL = 2 * time.Hour
-
-// catalogBaseURLForSubsidiary 把 subsidiary 映射成对应站点的 base URL。
-// 同一个 catalog 只能从对应站点查，跨站点 404。
-func catalogBaseURLForSubsidiary(sub string) string {
-	switch strings.ToUpper(sub) {
-	case "US":
-		return "https://api.us.ovhcloud.com"
-	case "CA", "QC", "ASIA", "SG", "AU", "IN":
-		return "https://ca.api.ovh.com"
-	default:
-		return "https://eu.api.ovh.com"
-	}
-}
+// maxAggregateSubsidiaries /api/catalog/aggregate 一次最多聚合的 subsidiary 数
+const maxAggregateSubsidiaries = 12
 
 // GetCatalog GET /api/catalog?subsidiary=IE[&forceRefresh=true]
 // 返回 OVH 公开 eco catalog 的原始 JSON。优先走 SQLite 缓存（2 小时 TTL），
@@ -45,59 +33,118 @@ func GetCatalog(state *app.State) gin.HandlerFunc {
 		}
 		force := strings.EqualFold(c.Query("forceRefresh"), "true")
 
-		// 1. 命中 SQLite 缓存且未过期 → 直接返回
-		if !force {
-			raw, ts, ok, err := state.DB.GetCatalog(sub)
-			if err == nil && ok {
-				age := time.Since(time.UnixMilli(ts))
-				if age < catalogTTL {
-					c.Header("X-Cache-Age-Seconds", strconv.FormatInt(int64(age.Seconds()), 10))
-					c.Data(http.StatusOK, "application/json; charset=utf-8", []byte(raw))
-					return
-				}
+		pc, err := catalog.LoadPublicCatalog(state, sub, force)
+		if err != nil {
+			status := http.StatusBadGateway
+			var upstream *catalog.UpstreamStatusError
+			if errors.As(err, &upstream) {
+				status = upstream.StatusCode
 			}
+			c.JSON(status, gin.H{"error": err.Error()})
+			return
 		}
+		if pc.Stale {
+			// 拉失败时回退到 stale 缓存，比直接给 500 强
+			c.Header("X-Cache-Warning", "stale (upstream fetch failed)")
+		} else {
+			c.Header("X-Cache-Age-Seconds", strconv.FormatInt(int64(time.Since(pc.UpdatedAt).Seconds()), 10))
+		}
+		c.Data(http.StatusOK, "application/json; charset=utf-8", pc.Raw)
+	}
+}
 
-		// 2. 直连 OVH 拉新数据
-		baseURL := catalogBaseURLForSubsidiary(sub)
-		url := fmt.Sprintf("%s/v1/order/catalog/public/eco?ovhSubsidiary=%s", baseURL, sub)
-		client := &http.Client{Timeout: 30 * time.Second}
-		req, _ := http.NewRequest(http.MethodGet, url, nil)
-		req.Header.Set("accept", "application/json")
-
-		resp, err := client.Do(req)
-		if err != nil {
-			// 拉失败时回退到 stale 缓存（如果有），比直接给 500 强
-			if raw, _, ok, _ := state.DB.GetCatalog(sub); ok {
-				c.Header("X-Cache-Warning", "stale (upstream fetch failed)")
-				c.Data(http.StatusOK, "application/json; charset=utf-8", []byte(raw))
-				return
+// GetAggregatedCatalog GET /api/catalog/aggregate?subsidiaries=IE,FR,DE,CA,US[&forceRefresh=true]
+// 并发拉取多个 subsidiary 的 catalog（各自按 subsidiary 缓存在 SQLite）与各站点可用性，
+// 合并成一份 plan 列表，每个 plan 带各 subsidiary 的价格与机房可用性（offers）。
+// subsidiaries 省略时取全部账户的 zone。
+func GetAggregatedCatalog(state *app.State) gin.HandlerFunc {
+	return func(c *gin.Context) {
+		var subs []string
+		seen := map[string]bool{}
+		add := func(s string) {
+			s = strings.ToUpper(strings.TrimSpace(s))
+			if s != "" && !seen[s] {
+				seen[s] = true
+				subs = append(subs, s)
+			}
+		}
+		if q := c.Query("subsidiaries"); q != "" {
+			for _, s := range strings.Split(q, ",") {
+				add(s)
+			}
+		} else {
+			state.AccountsMu.RLock()
+			for _, a := range state.Accounts {
+				add(a.Zone)
+			}
+			state.AccountsMu.RUnlock()
+			if len(subs) == 0 {
+				add("IE")
 			}
-			state.Logger.Error("catalog 拉取失败 "+sub+": "+err.Error(), "catalog")
-			c.JSON(http.StatusBadGateway, gin.H{"error": err.Error()})
+		}
+		if len(subs) > maxAggregateSubsidiaries {
+			c.JSON(http.StatusBadRequest, gin.H{"status": "error", "error": "subsidiaries 最多 " + strconv.Itoa(maxAggregateSubsidiaries) + " 个"})
 			return
 		}
-		defer resp.Body.Close()
+		force := strings.EqualFold(c.Query("forceRefresh"), "true")
+		res := catalog.LoadAggregatedCatalog(state, subs, force)
+		if len(res.CacheAge) == 0 {
+			c.JSON(http.StatusBadGateway, gin.H{"status": "error", "error": "所有 subsidiary 的 catalog 均拉取失败", "errors": res.Errors})
+			return
+		}
+		c.JSON(http.StatusOK, res)
+	}
+}
 
-		body, err := io.ReadAll(resp.Body)
+// GetCatalogChanges GET /api/catalog/changes
+// 服务器目录（/api/servers 刷新得到的 plan 列表）的增量变更日志，按 seq 升序：
+//   - since    只返回 seq > since 的记录（上次响应的 lastSeq，首次不传）
+//   - limit    每页条数（默认 100，最大 1000）
+//   - planCode / kind(added|removed|changed) 过滤
+//
+// 返回 { items, lastSeq, hasMore }；hasMore=true 时用 lastSeq 作为 since 继续取。
+func GetCatalogChanges(state *app.State) gin.HandlerFunc {
+	return func(c *gin.Context) {
+		var since int64
+		if s := strings.TrimSpace(c.Query("since")); s != "" {
+			v, err := strconv.ParseInt(s, 10, 64)
+			if err != nil || v < 0 {
+				c.JSON(http.StatusBadRequest, gin.H{"status": "error", "error": "since 无效"})
+				return
+			}
+			since = v
+		}
+		limit, _ := strconv.Atoi(c.DefaultQuery("limit", "100"))
+		if limit <= 0 {
+			limit = 100
+		}
+		if limit > 1000 {
+			limit = 1000
+		}
+		f := db.CatalogChangeFilter{
+			SinceSeq: since,
+			PlanCode: strings.TrimSpace(c.Query("planCode")),
+			Kind:     strings.TrimSpace(c.Query("kind")),
+		}
+		// 多取一条判断是否还有下一页
+		items, err := state.DB.ListCatalogChanges(f, limit+1)
 		if err != nil {
-			state.Logger.Error("catalog 读取响应失败 "+sub+": "+err.Error(), "catalog")
-			c.JSON(http.StatusBadGateway, gin.H{"error": err.Error()})
+			c.JSON(http.StatusInternalServerError, gin.H{"status": "error", "error": err.Error()})
 			return
 		}
-		if resp.StatusCode != http.StatusOK {
-			state.Logger.Error(fmt.Sprintf("catalog 上游 HTTP %d: %s", resp.StatusCode, sub), "catalog")
-			c.JSON(resp.StatusCode, gin.H{"error": fmt.Sprintf("upstream returned %d", resp.StatusCode)})
-			return
+		hasMore := len(items) > limit
+		if hasMore {
+			items = items[:limit]
 		}
-
-		// 3. 落 SQLite + 回写响应
-		if err := state.DB.UpsertCatalog(sub, string(body)); err != nil {
-			state.Logger.Warn("catalog 写库失败 "+sub+": "+err.Error(), "catalog")
-		} else {
-			state.Logger.Info(fmt.Sprintf("catalog %s 已缓存 (%d KB)", sub, len(body)/1024), "catalog")
+		lastSeq := since
+		if len(items) > 0 {
+			lastSeq = items[len(items)-1].Seq
+		} else if !hasMore && f.PlanCode == "" && f.Kind == "" {
+			// 没有新记录：返回当前最新 seq，客户端下次从这里开始
+			if latest, err := state.DB.LatestCatalogChangeSeq(); err == nil && latest > lastSeq {
+				lastSeq = latest
+			}
 		}
-		c.Header("X-Cache-Age-Seconds", "0")
-		c.Data(http.StatusOK, "application/json; charset=utf-8", body)
+		c.JSON(http.StatusOK, gin.H{"items": items, "lastSeq": lastSeq, "hasMore": hasMore})
 	}
 }
@@ -0,0 +1,40 @@
+package handlers
+
+import (
+	"net/http"
+
+	"github.com/gin-gonic/gin"
+
+	"github.com/ovh-webui/server/internal/app"
+	"github.com/ovh-webui/server/internal/monitor"
+)
+
+// GetClusterStatus GET /api/cluster/status
+// 本实例的分片租约（集群模式）与监控负责的订阅数、累计检查次数；单实例模式 enabled=false，
+// 监控负责全部订阅。
+func GetClusterStatus(state *app.State, mon *monitor.Monitor) gin.HandlerFunc {
+	return func(c *gin.Context) {
+		owned, total, checks := mon.ClusterStats()
+		busy, max, lastCycle := mon.WorkerStats()
+		resp := gin.H{
+			"status":  "success",
+			"enabled": state.Cluster != nil,
+			"monitor": gin.H{
+				"running":     mon.Running(),
+				"ownedPlans":  owned,
+				"totalPlans":  total,
+				"checksTotal": checks,
+				"busyWorkers": busy,
+				"maxWorkers":  max,
+				"lastCycleMs": lastCycle.Milliseconds(),
+			},
+		}
+		if state.Cluster != nil {
+			resp["cluster"] = state.Cluster.Status()
+		}
+		state.QueueMu.Lock()
+		resp["queueLength"] = len(state.Queue)
+		state.QueueMu.Unlock()
+		c.JSON(http.StatusOK, resp)
+	}
+}
@@ -0,0 +1,162 @@
+package handlers
+
+import (
+	"compress/gzip"
+	"net/http"
+	"strconv"
+	"strings"
+	"sync"
+
+	"github.com/gin-gonic/gin"
+)
+
+// compressMinSize 响应体达到这个字节数才压缩；小 JSON 压缩收益抵不过 gzip 头和 CPU
+const compressMinSize = 1024
+
+var gzipWriterPool = sync.Pool{
+	New: func() interface{} {
+		w, _ := gzip.NewWriterLevel(nil, gzip.DefaultCompression)
+		return w
+	},
+}
+
+// CompressResponses /api 响应压缩：客户端接受 gzip 且响应体超过 compressMinSize 时 gzip 输出。
+// 先缓冲 compressMinSize 字节再决定，小响应原样返回；gzip.Writer 从池里取，避免每个请求分配压缩窗口。
+// 已带 Content-Encoding 的响应、SSE 流（/api/events）、pprof（/api/debug/，profile 本身已 gzip，trace 为长流）、HEAD 请求不处理。
+func CompressResponses() gin.HandlerFunc {
+	return func(c *gin.Context) {
+		if c.Request.Method == http.MethodHead || !AcceptsEncoding(c.Request.Header.Get("Accept-Encoding"), "gzip") ||
+			c.Request.URL.Path == "/api/events" || strings.HasPrefix(c.Request.URL.Path, "/api/debug/") {
+			c.Next()
+			return
+		}
+		w := &compressWriter{ResponseWriter: c.Writer}
+		c.Writer = w
+		defer func() {
+			w.finish()
+			c.Writer = w.ResponseWriter
+		}()
+		c.Next()
+	}
+}
+
+// AcceptsEncoding 按 Accept-Encoding 判断是否接受 enc（支持 q=0 拒绝与 * 通配）
+func AcceptsEncoding(header, enc string) bool {
+	wildcard := false
+	for _, part := range strings.Split(header, ",") {
+		name, params, _ := strings.Cut(strings.TrimSpace(part), ";")
+		name = strings.ToLower(strings.TrimSpace(name))
+		if name != enc && name != "*" {
+			continue
+		}
+		ok := true
+		if q, found := strings.CutPrefix(strings.TrimSpace(params), "q="); found {
+			if v, err := strconv.ParseFloat(strings.TrimSpace(q), 64); err == nil && v == 0 {
+				ok = false
+			}
+		}
+		if name == enc {
+			return ok
+		}
+		wildcard = ok
+	}
+	return wildcard
+}
+
+// compressWriter 缓冲响应开头，超过阈值切换到 gzip，否则原样写出
+type compressWriter struct {
+	gin.ResponseWriter
+	buf     []byte
+	decided bool
+	gz      *gzip.Writer
+}
+
+func (w *compressWriter) Write(p []byte) (int, error) {
+	if w.decided {
+		if w.gz != nil {
+			return w.gz.Write(p)
+		}
+		return w.ResponseWriter.Write(p)
+	}
+	w.buf = append(w.buf, p...)
+	if len(w.buf) >= compressMinSize {
+		if err := w.decide(true); err != nil {
+			return 0, err
+		}
+	}
+	return len(p), nil
+}
+
+func (w *compressWriter) WriteString(s string) (int, error) {
+	return w.Write([]byte(s))
+}
+
+// Written 缓冲中的数据也算已写，保证 gin 的 c.Writer.Written() 判断不变
+func (w *compressWriter) Written() bool {
+	return len(w.buf) > 0 || w.decided || w.ResponseWriter.Written()
+}
+
+// Flush 主动 flush 的是流式响应：不再压缩，缓冲原样写出
+func (w *compressWriter) Flush() {
+	if !w.decided {
+		_ = w.decide(false)
+	}
+	if w.gz != nil {
+		_ = w.gz.Flush()
+	}
+	w.ResponseWriter.Flush()
+}
+
+// decide 决定是否压缩并写出缓冲
+func (w *compressWriter) decide(compress bool) error {
+	w.decided = true
+	h := w.ResponseWriter.Header()
+	if compress && h.Get("Content-Encoding") == "" && compressibleType(h.Get("Content-Type")) {
+		h.Set("Content-Encoding", "gzip")
+		h.Add("Vary", "Accept-Encoding")
+		h.Del("Content-Length")
+		gz := gzipWriterPool.Get().(*gzip.Writer)
+		gz.Reset(w.ResponseWriter)
+		w.gz = gz
+	}
+	buf := w.buf
+	w.buf = nil
+	if len(buf) == 0 {
+		return nil
+	}
+	var err error
+	if w.gz != nil {
+		_, err = w.gz.Write(buf)
+	} else {
+		_, err = w.ResponseWriter.Write(buf)
+	}
+	return err
+}
+
+// finish 请求结束：未到阈值的原样写出，gzip 收尾并还回池
+func (w *compressWriter) finish() {
+	if !w.decided {
+		_ = w.decide(false)
+	}
+	if w.gz != nil {
+		_ = w.gz.Close()
+		w.gz.Reset(nil)
+		gzipWriterPool.Put(w.gz)
+		w.gz = nil
+	}
+}
+
+// compressibleType 已压缩格式（图片 / 压缩包）和流式响应不再 gzip
+func compressibleType(ct string) bool {
+	ct = strings.ToLower(ct)
+	switch {
+	case ct == "":
+		return true
+	case strings.HasPrefix(ct, "text/event-stream"):
+		return false
+	case strings.HasPrefix(ct, "text/"), strings.Contains(ct, "json"),
+		strings.Contains(ct, "javascript"), strings.Contains(ct, "xml"):
+		return true
+	}
+	return false
+}
@@ -0,0 +1,102 @@
+package handlers
+
+import (
+	"context"
+	"net/http"
+	"net/http/pprof"
+	"runtime"
+	"strconv"
+	"strings"
+	"sync/atomic"
+	"time"
+
+	"github.com/gin-gonic/gin"
+)
+
+// 采样型 profile（CPU / trace / 带 seconds 的差量 profile）最长时长
+const maxProfileSeconds = 300
+
+// blockProfileRate runtime 没有读取 block profile 采样率的接口，这里记一份
+var blockProfileRate atomic.Int64
+
+// DebugPprof GET /api/debug/pprof/*name
+// net/http/pprof 挂在 /api 下，与其它接口一样走 X-API-Key 认证：
+//
+//	/api/debug/pprof/                        profile 列表
+//	/api/debug/pprof/profile?seconds=30      CPU
+//	/api/debug/pprof/trace?seconds=5         执行 trace
+//	/api/debug/pprof/heap|goroutine|mutex|block|allocs|threadcreate[?seconds=N 差量][&debug=1 文本]
+//	/api/debug/pprof/symbol
+//
+// mutex / block 默认不采样，先用 PUT /api/debug/profile-rates 打开。
+func DebugPprof() gin.HandlerFunc {
+	return func(c *gin.Context) {
+		name := strings.Trim(c.Param("name"), "/")
+		if sec, err := strconv.ParseFloat(c.Query("seconds"), 64); err == nil {
+			if sec <= 0 || sec > maxProfileSeconds {
+				c.JSON(http.StatusBadRequest, gin.H{"status": "error", "error": "seconds 须在 (0, 300] 内"})
+				return
+			}
+			// 采样期间不受 http.Server 的 WriteTimeout 限制：放宽本连接写超时，
+			// 并让 pprof 看到一个没有 WriteTimeout 的 Server（否则它会直接拒绝超过 WriteTimeout 的采样）
+			_ = http.NewResponseController(c.Writer).SetWriteDeadline(time.Now().Add(time.Duration(sec*float64(time.Second)) + 30*time.Second))
+			c.Request = c.Request.WithContext(context.WithValue(c.Request.Context(), http.ServerContextKey, &http.Server{}))
+		}
+
+		switch name {
+		case "":
+			pprof.Index(c.Writer, c.Request)
+		case "profile":
+			pprof.Profile(c.Writer, c.Request)
+		case "trace":
+			pprof.Trace(c.Writer, c.Request)
+		case "symbol":
+			pprof.Symbol(c.Writer, c.Request)
+		default:
+			pprof.Handler(name).ServeHTTP(c.Writer, c.Request)
+		}
+	}
+}
+
+type profileRatesReq struct {
+	MutexFraction *int   `json:"mutexFraction"` // 每 N 次锁竞争采 1 次；0 = 关闭
+	BlockRateNs   *int64 `json:"blockRateNs"`   // 平均每阻塞 N 纳秒采 1 次；0 = 关闭
+}
+
+func profileRates() gin.H {
+	return gin.H{
+		"mutexFraction": runtime.SetMutexProfileFraction(-1),
+		"blockRateNs":   blockProfileRate.Load(),
+	}
+}
+
+// GetProfileRates GET /api/debug/profile-rates
+func GetProfileRates() gin.HandlerFunc {
+	return func(c *gin.Context) {
+		c.JSON(http.StatusOK, gin.H{"status": "success", "rates": profileRates()})
+	}
+}
+
+// SetProfileRates PUT /api/debug/profile-rates
+// 打开 / 关闭 mutex、block profile 采样。两者都有运行时开销，抓完应恢复为 0。
+func SetProfileRates() gin.HandlerFunc {
+	return func(c *gin.Context) {
+		var req profileRatesReq
+		if err := c.ShouldBindJSON(&req); err != nil {
+			c.JSON(http.StatusBadRequest, gin.H{"status": "error", "error": "请求体格式错误: " + err.Error()})
+			return
+		}
+		if (req.MutexFraction != nil && *req.MutexFraction < 0) || (req.BlockRateNs != nil && *req.BlockRateNs < 0) {
+			c.JSON(http.StatusBadRequest, gin.H{"status": "error", "error": "采样率不能为负"})
+			return
+		}
+		if req.MutexFraction != nil {
+			runtime.SetMutexProfileFraction(*req.MutexFraction)
+		}
+		if req.BlockRateNs != nil {
+			runtime.SetBlockProfileRate(int(*req.BlockRateNs))
+			blockProfileRate.Store(*req.BlockRateNs)
+		}
+		c.JSON(http.StatusOK, gin.H{"status": "success", "rates": profileRates()})
+	}
+}
@@ -0,0 +1,88 @@
+package handlers
+
+import (
+	"bufio"
+	"encoding/json"
+	"fmt"
+	"net/http"
+	"strings"
+	"time"
+
+	"github.com/gin-gonic/gin"
+
+	"github.com/ovh-webui/server/internal/app"
+	"github.com/ovh-webui/server/internal/events"
+)
+
+const (
+	// eventsHeartbeat 空闲时的心跳间隔，防止反向代理按空闲超时断开
+	eventsHeartbeat = 25 * time.Second
+	// eventsBuffer 单个连接的事件缓冲；写不过来时丢事件并补发 resync
+	eventsBuffer = 256
+)
+
+// StreamEvents GET /api/events[?types=queue,log,...]
+// Server-Sent Events 推送通道：连上先发一条 hello（含当前 stats），之后按发生顺序推送
+// log / queue / purchase / monitor / vps_monitor / stats 事件。
+// 与其它 /api 一样走 X-API-Key 认证；浏览器原生 EventSource 不能带请求头，前端用 fetch 读流。
+func StreamEvents(state *app.State) gin.HandlerFunc {
+	return func(c *gin.Context) {
+		var filter []string
+		for _, t := range strings.Split(c.Query("types"), ",") {
+			if t = strings.TrimSpace(t); t != "" {
+				filter = append(filter, t)
+			}
+		}
+		sub := state.Events.Subscribe(filter, eventsBuffer)
+		defer state.Events.Unsubscribe(sub)
+
+		// 长连接不受 http.Server 的 WriteTimeout 限制
+		_ = http.NewResponseController(c.Writer).SetWriteDeadline(time.Time{})
+		h := c.Writer.Header()
+		h.Set("Content-Type", "text/event-stream")
+		h.Set("Cache-Control", "no-cache")
+		h.Set("Connection", "keep-alive")
+		h.Set("X-Accel-Buffering", "no")
+		c.Status(http.StatusOK)
+
+		w := bufio.NewWriter(c.Writer)
+		hello, _ := json.Marshal(gin.H{"stats": state.StatsSnapshot(), "types": filter})
+		writeSSE(w, events.Event{Type: "hello", Data: hello})
+		if w.Flush() != nil {
+			return
+		}
+		c.Writer.Flush()
+
+		heartbeat := time.NewTicker(eventsHeartbeat)
+		defer heartbeat.Stop()
+		for {
+			select {
+			case <-c.Request.Context().Done():
+				return
+			case ev := <-sub.C:
+				if sub.TakeDropped() {
+					writeSSE(w, events.Event{ID: ev.ID, Type: events.TypeResync, Data: []byte("{}")})
+				}
+				writeSSE(w, ev)
+				// 把缓冲里已到的事件一起写出，减少 flush 次数
+				for n := len(sub.C); n > 0; n-- {
+					writeSSE(w, <-sub.C)
+				}
+			case <-heartbeat.C:
+				_, _ = w.WriteString(": ping\n\n")
+			}
+			if w.Flush() != nil {
+				return
+			}
+			c.Writer.Flush()
+		}
+	}
+}
+
+// writeSSE 按 text/event-stream 格式写一条事件（Data 是单行 JSON）
+func writeSSE(w *bufio.Writer, ev events.Event) {
+	if ev.ID > 0 {
+		fmt.Fprintf(w, "id: %d\n", ev.ID)
+	}
+	fmt.Fprintf(w, "event: %s\ndata: %s\n\n", ev.Type, ev.Data)
+}
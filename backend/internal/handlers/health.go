@@ -3,18 +3,32 @@ package handlers
 import (
 	"net/http"
 	"os"
+	"strings"
 	"time"
 
 	"github.com/gin-gonic/gin"
+
+	"github.com/ovh-webui/server/internal/app"
 )
 
 // Health 健康检查（GET /health 与 GET /api/health 共用）
 // Docker / K8s / 负载均衡探活用；免鉴权。
-func Health() gin.HandlerFunc {
+// 关键数据（账户 / 队列 / 订阅）加载完成前返回 503 + status=starting，phases 里是各启动阶段进度。
+func Health(state *app.State) gin.HandlerFunc {
 	started := time.Now()
 	return func(c *gin.Context) {
-		c.JSON(http.StatusOK, gin.H{
-			"status":  "ok",
+		ready, readyMs, phases := state.Startup.Snapshot()
+		status := "ok"
+		code := http.StatusOK
+		if !ready {
+			status = "starting"
+			code = http.StatusServiceUnavailable
+		}
+		c.JSON(code, gin.H{
+			"status":  status,
+			"ready":   ready,
+			"readyMs": readyMs,
+			"phases":  phases,
 			"time":    time.Now().Format(time.RFC3339),
 			"uptime":  int(time.Since(started).Seconds()),
 			"port":    os.Getenv("PORT"),
@@ -22,3 +36,36 @@ func Health() gin.HandlerFunc {
 		})
 	}
 }
+
+// startupOpenPaths 启动未完成时仍放行的 /api 路径（探活 / 版本号）
+var startupOpenPaths = map[string]struct{}{
+	"/api/health":               {},
+	"/api/version":              {},
+	"/api/version/check-update": {},
+}
+
+// StartupGate 关键数据加载完成前，/api/* 一律 503（STARTING），避免读到半加载的内存状态。
+// 非 /api 路径（前端静态文件）照常放行，前端拿到 503 会自行重试。
+func StartupGate(state *app.State) gin.HandlerFunc {
+	return func(c *gin.Context) {
+		if state.Startup.Ready() {
+			c.Next()
+			return
+		}
+		path := c.Request.URL.Path
+		if !strings.HasPrefix(path, "/api/") {
+			c.Next()
+			return
+		}
+		if _, ok := startupOpenPaths[path]; ok {
+			c.Next()
+			return
+		}
+		c.Header("Retry-After", "1")
+		c.AbortWithStatusJSON(http.StatusServiceUnavailable, gin.H{
+			"error":   "Service starting",
+			"message": "服务启动中，数据加载尚未完成，请稍后重试",
+			"code":    "STARTING",
+		})
+	}
+}
@@ -62,6 +62,7 @@ func AddSubscription(state *app.State, mon *monitor.Monitor) gin.HandlerFunc {
 		}
 
 		var serverName string
+		state.EnsureServerCatalog()
 		state.ServerPlansMu.RLock()
 		for _, s := range state.ServerPlans {
 			if s.PlanCode == body.PlanCode {
@@ -100,6 +101,7 @@ func BatchAddAll(state *app.State, mon *monitor.Monitor) gin.HandlerFunc {
 			c.JSON(http.StatusBadRequest, gin.H{"status": "error", "message": "Telegram 通知未配置或无效:" + reason})
 			return
 		}
+		state.EnsureServerCatalog()
 		state.ServerPlansMu.RLock()
 		hasServers := len(state.ServerPlans) > 0
 		state.ServerPlansMu.RUnlock()
@@ -292,6 +294,32 @@ func GetSubscriptionHistory(state *app.State, mon *monitor.Monitor) gin.HandlerF
 	}
 }
 
+// GetRestockStats GET /api/monitor/restock-stats
+// 按机房统计最近 days 天（默认 30，1~365）的补货情况：补货次数、在货总时长 / 平均每次在货时长、在货比例。
+// planCode 为空时返回全部订阅。数据来自状态变化时间序列，30 天以前的按天汇总。
+func GetRestockStats(state *app.State, mon *monitor.Monitor) gin.HandlerFunc {
+	return func(c *gin.Context) {
+		days, err := strconv.Atoi(c.DefaultQuery("days", "30"))
+		if err != nil || days < 1 || days > 365 {
+			c.JSON(http.StatusBadRequest, gin.H{"status": "error", "error": "days 须为 1~365"})
+			return
+		}
+		planCode := c.Query("planCode")
+		if planCode != "" && mon.FindSubscription(planCode) == nil {
+			c.JSON(http.StatusNotFound, gin.H{"status": "error", "error": "订阅不存在"})
+			return
+		}
+		now := time.Now()
+		since := now.Add(-time.Duration(days) * 24 * time.Hour)
+		c.JSON(http.StatusOK, gin.H{
+			"status": "success",
+			"since":  since.UTC().Format(time.RFC3339),
+			"days":   days,
+			"plans":  mon.RestockStats(planCode, since, now),
+		})
+	}
+}
+
 // StartMonitor POST /api/monitor/start
 func StartMonitor(state *app.State, mon *monitor.Monitor) gin.HandlerFunc {
 	return func(c *gin.Context) {
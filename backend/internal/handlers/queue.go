@@ -143,10 +143,10 @@ func UpdateQueueStatus(state *app.State) gin.HandlerFunc {
 // ClearPurchaseHistory DELETE /api/purchase-history
 func ClearPurchaseHistory(state *app.State) gin.HandlerFunc {
 	return func(c *gin.Context) {
-		state.HistoryMu.Lock()
-		state.History = state.History[:0]
-		state.HistoryMu.Unlock()
-		_ = state.SaveHistory()
+		if err := state.ClearHistory(); err != nil {
+			c.JSON(http.StatusInternalServerError, gin.H{"status": "error", "error": err.Error()})
+			return
+		}
 		state.Logger.Info("Purchase history cleared", "")
 		c.JSON(http.StatusOK, gin.H{"status": "success"})
 	}
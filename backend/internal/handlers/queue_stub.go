@@ -1,11 +1,14 @@
 package handlers
 
 import (
+	"errors"
 	"net/http"
+	"strconv"
 
 	"github.com/gin-gonic/gin"
 
 	"github.com/ovh-webui/server/internal/app"
+	"github.com/ovh-webui/server/internal/db"
 )
 
 // GetQueue GET /api/queue
@@ -23,14 +26,63 @@ func GetQueue(state *app.State) gin.HandlerFunc {
 }
 
 // GetPurchaseHistory GET /api/purchase-history
+//
+// Query（均可选，服务端在 SQLite 上按索引过滤）:
+//   - account / status / planCode / datacenter  精确匹配
+//   - since / until  purchase_time 区间（与 NowISO 同格式，until 不含）
+//   - limit  每页条数（最大 500）；cursor 上一页返回的 nextCursor
+//
+// 兼容：没带 limit/cursor 时仍返回数组（旧前端直接当数组用）；
+// 带了则返回 { items, nextCursor, aggregates }，aggregates 是同一过滤条件下的汇总。
 func GetPurchaseHistory(state *app.State) gin.HandlerFunc {
 	return func(c *gin.Context) {
-		state.HistoryMu.Lock()
-		defer state.HistoryMu.Unlock()
-		cp := make([]interface{}, 0, len(state.History))
-		for _, h := range state.History {
-			cp = append(cp, h)
+		f := db.HistoryFilter{
+			AccountID:  c.Query("account"),
+			Status:     c.Query("status"),
+			PlanCode:   c.Query("planCode"),
+			Datacenter: c.Query("datacenter"),
+			Since:      c.Query("since"),
+			Until:      c.Query("until"),
 		}
-		c.JSON(http.StatusOK, cp)
+		cursor := c.Query("cursor")
+		_, paged := c.GetQuery("limit")
+		if !paged && cursor == "" {
+			items, _, err := state.DB.QueryHistory(f, "", 0)
+			if err != nil {
+				c.JSON(http.StatusInternalServerError, gin.H{"status": "error", "error": err.Error()})
+				return
+			}
+			c.JSON(http.StatusOK, items)
+			return
+		}
+
+		limit, _ := strconv.Atoi(c.DefaultQuery("limit", "50"))
+		if limit <= 0 {
+			limit = 50
+		}
+		if limit > 500 {
+			limit = 500
+		}
+		items, next, err := state.DB.QueryHistory(f, cursor, limit)
+		if errors.Is(err, db.ErrInvalidCursor) {
+			c.JSON(http.StatusBadRequest, gin.H{"status": "error", "error": "cursor 无效"})
+			return
+		}
+		if err != nil {
+			c.JSON(http.StatusInternalServerError, gin.H{"status": "error", "error": err.Error()})
+			return
+		}
+		agg, err := state.DB.AggregateHistory(f)
+		if err != nil {
+			c.JSON(http.StatusInternalServerError, gin.H{"status": "error", "error": err.Error()})
+			return
+		}
+		c.JSON(http.StatusOK, gin.H{
+			"items":      items,
+			"nextCursor": next,
+			"hasMore":    next != "",
+			"limit":      limit,
+			"aggregates": agg,
+		})
 	}
 }
@@ -108,23 +108,14 @@ func QuickOrder(state *app.State) gin.HandlerFunc {
 			}
 			state.QueueMu.Unlock()
 
-			nowTS := time.Now().Unix()
-			state.HistoryMu.Lock()
-			for i := len(state.History) - 1; i >= 0; i-- {
-				h := state.History[i]
-				if h.PlanCode == body.PlanCode && h.Datacenter == body.Datacenter && h.Status == "success" &&
+			for _, h := range state.RecentSuccessHistory(120 * time.Second) {
+				if h.PlanCode == body.PlanCode && h.Datacenter == body.Datacenter &&
 					fingerprint(h.Options) == fp {
-					if t, err := time.Parse(time.RFC3339Nano, h.PurchaseTime); err == nil {
-						if nowTS-t.Unix() < 120 {
-							state.HistoryMu.Unlock()
-							state.Logger.Info("检测到近期成功订单，拒绝再次入队", "quick_order")
-							c.JSON(http.StatusTooManyRequests, gin.H{"success": false, "error": "刚刚已成功下过同配置订单，稍后再试"})
-							return
-						}
-					}
+					state.Logger.Info("检测到近期成功订单，拒绝再次入队", "quick_order")
+					c.JSON(http.StatusTooManyRequests, gin.H{"success": false, "error": "刚刚已成功下过同配置订单，稍后再试"})
+					return
 				}
 			}
-			state.HistoryMu.Unlock()
 		} else {
 			state.Logger.Info("来自监控的批量下单，跳过重复检查", "quick_order")
 		}
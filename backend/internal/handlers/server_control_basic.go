@@ -15,6 +15,7 @@ import (
 	"time"
 
 	"github.com/gin-gonic/gin"
+	ovhsdk "github.com/ovh/go-ovh/ovh"
 
 	"github.com/ovh-webui/server/internal/app"
 	"github.com/ovh-webui/server/internal/numconv"
@@ -33,7 +34,9 @@ func noOVHResp(c *gin.Context) {
 	})
 }
 
-// ListMyServers GET /api/server-control/list
+// ListMyServers GET /api/server-control/list[?refresh=true]
+// 详情走 State 的独服缓存（SQLite 持久化）：每次只请求一次 /dedicated/server 对齐增删，
+// 新增的独服同步拉详情，过期 / 控制操作后失效的先返回缓存再后台刷新；refresh=true 全部重新拉。
 func ListMyServers(state *app.State) gin.HandlerFunc {
 	return func(c *gin.Context) {
 		client, err := ovhClientFor(state, c)
@@ -41,51 +44,30 @@ func ListMyServers(state *app.State) gin.HandlerFunc {
 			noOVHResp(c)
 			return
 		}
-		var names []string
-		if err := client.Get("/dedicated/server", &names); err != nil {
+		acc, ok := ovhAccountFor(state, c)
+		if !ok {
+			noOVHResp(c)
+			return
+		}
+		force := strings.EqualFold(c.Query("refresh"), "true")
+		list, err := state.ListServerInventory(acc.ID, client, force)
+		if err != nil {
 			state.Logger.Error("获取服务器列表失败: "+err.Error(), "server_control")
 			c.JSON(http.StatusInternalServerError, gin.H{"success": false, "error": err.Error()})
 			return
 		}
-		state.Logger.Info(fmt.Sprintf("获取服务器列表成功，共 %d 台", len(names)), "server_control")
-
-		// 并发拉 detail + serviceInfos：N 台服务器 × 2 GET × 串行 ~200ms => 改 10 并发 ≈ N/5 * 200ms
-		type srvResult struct {
-			info        map[string]interface{}
-			svcInfo     map[string]interface{}
-			detailError error
-		}
-		results := make([]srvResult, len(names))
-		sem := make(chan struct{}, 10)
-		var wg sync.WaitGroup
-		for i, name := range names {
-			wg.Add(1)
-			sem <- struct{}{}
-			go func(idx int, nm string) {
-				defer wg.Done()
-				defer func() { <-sem }()
-				var info map[string]interface{}
-				if err := client.Get("/dedicated/server/"+nm, &info); err != nil {
-					results[idx].detailError = err
-					return
-				}
-				results[idx].info = info
-				var svc map[string]interface{}
-				_ = client.Get("/dedicated/server/"+nm+"/serviceInfos", &svc)
-				results[idx].svcInfo = svc
-			}(i, name)
-		}
-		wg.Wait()
+		state.Logger.Info(fmt.Sprintf("获取服务器列表成功，共 %d 台（拉取详情 %d 台，后台刷新 %d 台）",
+			len(list.Entries), list.Fetched, list.Refreshing), "server_control")
 
 		servers := []gin.H{}
-		for i, name := range names {
-			r := results[i]
-			if r.detailError != nil {
-				state.Logger.Error("获取服务器 "+name+" 详情失败: "+r.detailError.Error(), "server_control")
-				servers = append(servers, gin.H{"serviceName": name, "name": name, "error": r.detailError.Error()})
+		for _, e := range list.Entries {
+			name := e.ServiceName
+			if e.Err != "" {
+				state.Logger.Error("获取服务器 "+name+" 详情失败: "+e.Err, "server_control")
+				servers = append(servers, gin.H{"serviceName": name, "name": name, "error": e.Err})
 				continue
 			}
-			info, svcInfo := r.info, r.svcInfo
+			info, svcInfo := e.Info, e.ServiceInfos
 			renewalType := false
 			if svcInfo != nil {
 				if rn, ok := svcInfo["renew"].(map[string]interface{}); ok {
@@ -119,7 +101,26 @@ func ListMyServers(state *app.State) gin.HandlerFunc {
 				"renewalType":     renewalType,
 			})
 		}
-		c.JSON(http.StatusOK, gin.H{"success": true, "servers": servers, "total": len(servers)})
+		c.JSON(http.StatusOK, gin.H{"success": true, "servers": servers, "total": len(servers), "refreshing": list.Refreshing})
+	}
+}
+
+// ExpireInventoryOnWrite server-control 分组中间件：针对单台独服的写操作（非 GET）成功后，
+// 标记该独服的列表缓存失效并丢掉概览缓存。本地别名不涉及 OVH 状态，跳过。
+func ExpireInventoryOnWrite(state *app.State) gin.HandlerFunc {
+	return func(c *gin.Context) {
+		c.Next()
+		svc := c.Param("service_name")
+		if svc == "" || c.Request.Method == http.MethodGet || c.Writer.Status() >= http.StatusBadRequest {
+			return
+		}
+		if strings.HasSuffix(c.FullPath(), "/alias") {
+			return
+		}
+		if acc, ok := ovhAccountFor(state, c); ok {
+			state.ExpireServerInventory(acc.ID, svc)
+			expireServerOverview(acc.ID, svc)
+		}
 	}
 }
 
@@ -154,7 +155,7 @@ func Reboot(state *app.State) gin.HandlerFunc {
 	}
 }
 
-// GetOSTemplates GET /api/server-control/:service_name/templates
+// GetOSTemplates GET /api/server-control/:service_name/templates[?refresh=true]
 func GetOSTemplates(state *app.State) gin.HandlerFunc {
 	return func(c *gin.Context) {
 		svc := c.Param("service_name")
@@ -163,57 +164,47 @@ func GetOSTemplates(state *app.State) gin.HandlerFunc {
 			noOVHResp(c)
 			return
 		}
-		var templates map[string]interface{}
-		if err := client.Get("/dedicated/server/"+svc+"/install/compatibleTemplates", &templates); err != nil {
+		acc, ok := ovhAccountFor(state, c)
+		if !ok {
+			noOVHResp(c)
+			return
+		}
+		force := strings.EqualFold(c.Query("refresh"), "true")
+		allNames, err := compatibleTemplateNames(client, acc.ID, svc, force)
+		if err != nil {
 			state.Logger.Error("获取服务器 "+svc+" 系统模板失败: "+err.Error(), "server_control")
 			c.JSON(http.StatusInternalServerError, gin.H{"success": false, "error": err.Error()})
 			return
 		}
-		var allNames []string
-		if ovhArr, ok := templates["ovh"].([]interface{}); ok {
-			for _, t := range ovhArr {
-				if s, ok := t.(string); ok {
-					allNames = append(allNames, s)
-				}
-			}
-		}
 		state.Logger.Info(fmt.Sprintf("获取服务器 %s 可用系统模板成功，共 %d 个", svc, len(allNames)), "server_control")
 
-		// Python app.py:5432 是串行逐个 GET 模板详情，50-100 模板要 10-50 秒。
-		// 这里改成 10 路并发（OVH 通常允许 10-20 RPS），返回结构完全一致，仅顺序后排
+		// 模板详情全局共享缓存（SQLite 持久化，长 TTL + 后台重新拉取），
+		// 只有从没见过的模板才会同步请求 OVH
+		raw := state.OSTemplateDetails(client, allNames)
 		details := make([]gin.H, len(allNames))
-		sem := make(chan struct{}, 10)
-		var wg sync.WaitGroup
-		for i, tn := range allNames {
-			wg.Add(1)
-			sem <- struct{}{}
-			go func(idx int, name string) {
-				defer wg.Done()
-				defer func() { <-sem }()
-				var detail map[string]interface{}
-				if err := client.Get("/dedicated/installationTemplate/"+name, &detail); err != nil {
-					details[idx] = gin.H{
-						"templateName": name,
-						"distribution": name,
-						"family":       "unknown",
-						"bitFormat":    64,
-					}
-					return
-				}
-				bf := 64
-				if v, ok := numconv.ToInt64(detail["bitFormat"]); ok {
-					bf = int(v)
-				}
-				details[idx] = gin.H{
+		for i, name := range allNames {
+			detail := raw[i]
+			if detail == nil {
+				details[i] = gin.H{
 					"templateName": name,
-					"distribution": valueOr(detail, "distribution", "N/A"),
-					"family":       valueOr(detail, "family", "N/A"),
-					"description":  valueOr(detail, "description", ""),
-					"bitFormat":    bf,
+					"distribution": name,
+					"family":       "unknown",
+					"bitFormat":    64,
 				}
-			}(i, tn)
+				continue
+			}
+			bf := 64
+			if v, ok := numconv.ToInt64(detail["bitFormat"]); ok {
+				bf = int(v)
+			}
+			details[i] = gin.H{
+				"templateName": name,
+				"distribution": valueOr(detail, "distribution", "N/A"),
+				"family":       valueOr(detail, "family", "N/A"),
+				"description":  valueOr(detail, "description", ""),
+				"bitFormat":    bf,
+			}
 		}
-		wg.Wait()
 
 		// 排序：常用优先
 		priority := []string{"debian", "ubuntu", "centos", "rocky", "almalinux", "windows"}
@@ -244,6 +235,36 @@ func GetOSTemplates(state *app.State) gin.HandlerFunc {
 	}
 }
 
+// compatibleTemplatesTTL 单台服务器兼容模板列表的缓存时长
+const compatibleTemplatesTTL = 5 * time.Minute
+
+// compatibleTemplateNames /install/compatibleTemplates 的 ovh 模板名，按服务器短时缓存
+// （与概览共用缓存，写操作后随该机其它概览分区一起失效）
+func compatibleTemplateNames(client *ovhsdk.Client, accountID, svc string, force bool) ([]string, error) {
+	key := overviewCacheKey(accountID, svc, "compatibleTemplates")
+	if !force {
+		if e, ok := overviewCached(key); ok {
+			if names, ok := e.data.([]string); ok {
+				return names, nil
+			}
+		}
+	}
+	var templates map[string]interface{}
+	if err := client.Get("/dedicated/server/"+svc+"/install/compatibleTemplates", &templates); err != nil {
+		return nil, err
+	}
+	var names []string
+	if ovhArr, ok := templates["ovh"].([]interface{}); ok {
+		for _, t := range ovhArr {
+			if s, ok := t.(string); ok {
+				names = append(names, s)
+			}
+		}
+	}
+	storeOverview(key, names, compatibleTemplatesTTL)
+	return names, nil
+}
+
 // installOSLocks 按 service_name 分别加锁，防同一台机器并发重装。
 // 不同机器互不阻塞。TryLock 失败立即返回 409，不让前端干等。
 var installOSLocks sync.Map // service_name → *sync.Mutex
@@ -0,0 +1,284 @@
+package handlers
+
+import (
+	"fmt"
+	"net/http"
+	"strings"
+	"sync"
+	"time"
+
+	"github.com/gin-gonic/gin"
+	ovhsdk "github.com/ovh/go-ovh/ovh"
+
+	"github.com/ovh-webui/server/internal/app"
+	"github.com/ovh-webui/server/internal/numconv"
+)
+
+// overviewSection 概览的一个分区：对应单机页面原先的一个独立请求。
+// fetch 返回原始 OVH 数据（与各单项端点取的是同一个 OVH 路径）。
+type overviewSection struct {
+	ttl   time.Duration
+	fetch func(client *ovhsdk.Client, accountID, svc string) (interface{}, error)
+}
+
+// overviewSections 按数据变化频率给 TTL：硬件规格几乎不变按天缓存，任务状态只缓存几秒。
+var overviewSections = map[string]overviewSection{
+	"info":                 {time.Minute, overviewGet("")},
+	"serviceInfo":          {10 * time.Minute, overviewGet("/serviceInfos")},
+	"hardware":             {7 * 24 * time.Hour, overviewGet("/specifications/hardware")},
+	"network":              {24 * time.Hour, overviewGet("/specifications/network")},
+	"networkInterfaces":    {24 * time.Hour, overviewGet("/networkInterfaceController")},
+	"ips":                  {10 * time.Minute, overviewGet("/ips")},
+	"boot":                 {time.Hour, overviewGet("/boot")},
+	"tasks":                {5 * time.Second, overviewTasks},
+	"interventions":        {time.Hour, overviewGet("/intervention")},
+	"plannedInterventions": {time.Hour, overviewGet("/plannedIntervention")},
+	"engagement":           {time.Hour, overviewEngagement},
+	"vrack":                {time.Hour, overviewGet("/vrack")},
+	"virtualMac":           {time.Hour, overviewGet("/virtualMac")},
+	"ipmi":                 {time.Hour, overviewGet("/features/ipmi")},
+	"burst":                {10 * time.Minute, overviewGet("/burst")},
+	"firewall":             {10 * time.Minute, overviewGet("/features/firewall")},
+	"backupFtp":            {10 * time.Minute, overviewGet("/features/backupFTP")},
+}
+
+// overviewDefaultSections 不带 sections 参数时返回的分区（单机详情页首屏）
+var overviewDefaultSections = []string{
+	"info", "serviceInfo", "hardware", "network", "ips", "boot",
+	"tasks", "interventions", "engagement", "vrack", "virtualMac",
+}
+
+// overviewAccountConcurrency 单账户同时进行的 OVH 请求数上限（多个概览请求共享）
+const overviewAccountConcurrency = 6
+
+// overviewCacheSweepAt 缓存条目达到这个数时写入前清理过期项
+const overviewCacheSweepAt = 4096
+
+type overviewCacheEntry struct {
+	data      interface{}
+	fetchedAt time.Time
+	expires   time.Time
+}
+
+var (
+	overviewCacheMu sync.Mutex
+	overviewCache   = map[string]overviewCacheEntry{} // account|svc|section → 数据
+	overviewBudgets = map[string]chan struct{}{}      // account → 并发令牌
+)
+
+func overviewCacheKey(accountID, svc, section string) string {
+	return accountID + "|" + svc + "|" + section
+}
+
+func overviewBudget(accountID string) chan struct{} {
+	overviewCacheMu.Lock()
+	defer overviewCacheMu.Unlock()
+	b, ok := overviewBudgets[accountID]
+	if !ok {
+		b = make(chan struct{}, overviewAccountConcurrency)
+		overviewBudgets[accountID] = b
+	}
+	return b
+}
+
+func overviewCached(key string) (overviewCacheEntry, bool) {
+	overviewCacheMu.Lock()
+	defer overviewCacheMu.Unlock()
+	e, ok := overviewCache[key]
+	if !ok || time.Now().After(e.expires) {
+		return overviewCacheEntry{}, false
+	}
+	return e, true
+}
+
+// storeOverview 写入分区缓存；条目较多时顺手清掉已过期的
+func storeOverview(key string, data interface{}, ttl time.Duration) {
+	now := time.Now()
+	overviewCacheMu.Lock()
+	defer overviewCacheMu.Unlock()
+	if len(overviewCache) >= overviewCacheSweepAt {
+		for k, e := range overviewCache {
+			if now.After(e.expires) {
+				delete(overviewCache, k)
+			}
+		}
+	}
+	overviewCache[key] = overviewCacheEntry{data: data, fetchedAt: now, expires: now.Add(ttl)}
+}
+
+// expireServerOverview 控制操作后丢掉该独服的全部概览缓存（由 ExpireInventoryOnWrite 调用）
+func expireServerOverview(accountID, svc string) {
+	prefix := accountID + "|" + svc + "|"
+	overviewCacheMu.Lock()
+	for k := range overviewCache {
+		if strings.HasPrefix(k, prefix) {
+			delete(overviewCache, k)
+		}
+	}
+	overviewCacheMu.Unlock()
+}
+
+// overviewGet 单个 GET /dedicated/server/{svc}{suffix}
+func overviewGet(suffix string) func(*ovhsdk.Client, string, string) (interface{}, error) {
+	return func(client *ovhsdk.Client, _, svc string) (interface{}, error) {
+		var d interface{}
+		if err := client.Get("/dedicated/server/"+svc+suffix, &d); err != nil {
+			return nil, err
+		}
+		return d, nil
+	}
+}
+
+// overviewTasks 最近 10 个任务详情（与 GetServerTasks 相同取法）。
+// 分区 goroutine 已持有 1 个账户并发令牌；明细并发数只按实际持有的令牌数，
+// 额外令牌非阻塞地借（借不到就少并发），避免等待令牌时与其他分区互相卡死。
+func overviewTasks(client *ovhsdk.Client, accountID, svc string) (interface{}, error) {
+	var taskIDs []interface{}
+	if err := client.Get("/dedicated/server/"+svc+"/task", &taskIDs); err != nil {
+		return nil, err
+	}
+	start := len(taskIDs) - 10
+	if start < 0 {
+		start = 0
+	}
+	recent := taskIDs[start:]
+	budget := overviewBudget(accountID)
+	extra := 0
+borrow:
+	for extra < len(recent)-1 {
+		select {
+		case budget <- struct{}{}:
+			extra++
+		default:
+			break borrow
+		}
+	}
+	defer func() {
+		for i := 0; i < extra; i++ {
+			<-budget
+		}
+	}()
+	details := parallelGetDetails(client, recent, func(k interface{}) string {
+		return "/dedicated/server/" + svc + "/task/" + idToString(k)
+	}, 1+extra)
+	tasks := []map[string]interface{}{}
+	for _, d := range details {
+		if d != nil {
+			tasks = append(tasks, d)
+		}
+	}
+	return tasks, nil
+}
+
+// overviewEngagement engagement 需要 serviceId：优先用已缓存的 serviceInfo 分区，省一次请求。
+// 无 engagement（OVH 404）返回 null，与 GetEngagement 一致。
+func overviewEngagement(client *ovhsdk.Client, accountID, svc string) (interface{}, error) {
+	var serviceID int64
+	if e, ok := overviewCached(overviewCacheKey(accountID, svc, "serviceInfo")); ok {
+		if m, ok := e.data.(map[string]interface{}); ok {
+			serviceID, _ = numconv.ToInt64(m["serviceId"])
+		}
+	}
+	if serviceID <= 0 {
+		id, err := serviceIDForDedicated(client, svc)
+		if err != nil {
+			return nil, err
+		}
+		serviceID = id
+	}
+	var eng map[string]interface{}
+	if err := client.Get(fmt.Sprintf("/services/%d/billing/engagement", serviceID), &eng); err != nil {
+		return nil, nil
+	}
+	return eng, nil
+}
+
+// GetServerOverview GET /api/server-control/:service_name/overview[?sections=a,b,c][&refresh=true]
+// 单机详情页一次取齐多个分区：各分区并发请求 OVH（受账户级并发上限约束），
+// 按分区 TTL 缓存；单个分区失败不影响其它分区，每个分区带 status / cached / ms。
+func GetServerOverview(state *app.State) gin.HandlerFunc {
+	return func(c *gin.Context) {
+		svc := c.Param("service_name")
+		client, err := ovhClientFor(state, c)
+		if err != nil {
+			noOVHResp(c)
+			return
+		}
+		acc, ok := ovhAccountFor(state, c)
+		if !ok {
+			noOVHResp(c)
+			return
+		}
+		names := overviewDefaultSections
+		if raw := strings.TrimSpace(c.Query("sections")); raw != "" {
+			names = nil
+			seen := map[string]struct{}{}
+			for _, n := range strings.Split(raw, ",") {
+				n = strings.TrimSpace(n)
+				if _, dup := seen[n]; n == "" || dup {
+					continue
+				}
+				seen[n] = struct{}{}
+				names = append(names, n)
+			}
+		}
+		force := strings.EqualFold(c.Query("refresh"), "true")
+		budget := overviewBudget(acc.ID)
+		start := time.Now()
+
+		results := make([]gin.H, len(names))
+		var wg sync.WaitGroup
+		for i, name := range names {
+			sec, known := overviewSections[name]
+			if !known {
+				results[i] = gin.H{"status": "error", "error": "unknown section"}
+				continue
+			}
+			key := overviewCacheKey(acc.ID, svc, name)
+			if !force {
+				if e, ok := overviewCached(key); ok {
+					results[i] = gin.H{
+						"status": "ok", "cached": true, "ms": 0,
+						"ageSec": int64(time.Since(e.fetchedAt).Seconds()), "data": e.data,
+					}
+					continue
+				}
+			}
+			wg.Add(1)
+			go func(idx int, sec overviewSection, key string) {
+				defer wg.Done()
+				budget <- struct{}{}
+				defer func() { <-budget }()
+				t0 := time.Now()
+				data, err := sec.fetch(client, acc.ID, svc)
+				ms := time.Since(t0).Milliseconds()
+				if err != nil {
+					results[idx] = gin.H{"status": "error", "cached": false, "ms": ms, "error": err.Error()}
+					return
+				}
+				storeOverview(key, data, sec.ttl)
+				results[idx] = gin.H{"status": "ok", "cached": false, "ms": ms, "ageSec": 0, "data": data}
+			}(i, sec, key)
+		}
+		wg.Wait()
+
+		sections := gin.H{}
+		failed := 0
+		for i, name := range names {
+			if results[i]["status"] != "ok" {
+				failed++
+			}
+			sections[name] = results[i]
+		}
+		if failed > 0 {
+			state.Logger.Warn(fmt.Sprintf("服务器 %s 概览: %d/%d 个分区失败", svc, failed, len(names)), "server_control")
+		}
+		c.JSON(http.StatusOK, gin.H{
+			"success":     true,
+			"serviceName": svc,
+			"sections":    sections,
+			"failed":      failed,
+			"elapsedMs":   time.Since(start).Milliseconds(),
+		})
+	}
+}
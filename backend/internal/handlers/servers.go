@@ -12,6 +12,7 @@ import (
 	"github.com/ovh-webui/server/internal/app"
 	"github.com/ovh-webui/server/internal/catalog"
 	"github.com/ovh-webui/server/internal/price"
+	"github.com/ovh-webui/server/internal/storage"
 	"github.com/ovh-webui/server/internal/types"
 )
 
@@ -24,6 +25,7 @@ func GetServers(state *app.State) gin.HandlerFunc {
 		usingExpiredCache := false
 		cacheAgeMinutes := 0
 
+		state.EnsureServerCatalog()
 		cached, valid := state.ServerCache.Get()
 		if state.ServerCache.Timestamp != nil {
 			cacheAgeMinutes = int(time.Since(*state.ServerCache.Timestamp).Minutes())
@@ -40,11 +42,7 @@ func GetServers(state *app.State) gin.HandlerFunc {
 			state.Logger.Info("正在从OVH API重新加载服务器列表...", "")
 			apiServers := catalog.LoadServerList(state)
 			if len(apiServers) > 0 {
-				state.ServerPlansMu.Lock()
-				state.ServerPlans = apiServers
-				state.ServerPlansMu.Unlock()
-				state.ServerCache.Set(apiServers)
-				_ = state.SaveServers()
+				state.ReplaceServerCatalog(apiServers)
 				serverPlans = apiServers
 				state.Logger.Info("从OVH API加载了 "+strconv.Itoa(len(apiServers))+" 台服务器，已更新缓存", "")
 			} else {
@@ -259,6 +257,7 @@ func MonitorPrice(state *app.State) gin.HandlerFunc {
 // CacheInfo GET /api/cache/info
 func CacheInfo(state *app.State) gin.HandlerFunc {
 	return func(c *gin.Context) {
+		state.EnsureServerCatalog()
 		cached, valid := state.ServerCache.Get()
 		var ts *float64
 		var age *int
@@ -289,6 +288,11 @@ func CacheInfo(state *app.State) gin.HandlerFunc {
 				"cacheDir": state.Paths.CacheDir,
 				"logsDir":  state.Paths.LogsDir,
 			},
+			"snapshot": gin.H{
+				"path":   state.ServerSnapshotPath(),
+				"exists": storage.FileExists(state.ServerSnapshotPath()),
+				"mmap":   state.CatalogMmap,
+			},
 		})
 	}
 }
@@ -312,11 +316,7 @@ func ClearCache(state *app.State) gin.HandlerFunc {
 		cleared := []string{}
 
 		if cacheType == "all" || cacheType == "memory" {
-			state.ServerPlansMu.Lock()
-			state.ServerPlans = []types.ServerPlan{}
-			state.ServerPlansMu.Unlock()
-			state.ServerCache.Set(nil)
-			state.ServerCache.Timestamp = nil
+			state.ResetServerCatalog()
 			cleared = append(cleared, "memory")
 			state.Logger.Info("已清除内存缓存", "")
 		}
@@ -328,6 +328,19 @@ func ClearCache(state *app.State) gin.HandlerFunc {
 				cleared = append(cleared, "sqlite_servers")
 				state.Logger.Info("已清除 SQLite 服务器缓存", "")
 			}
+			if err := storage.RemoveServerSnapshot(state.ServerSnapshotPath()); err != nil {
+				state.Logger.Error("删除服务器目录快照失败: "+err.Error(), "")
+			}
+			if err := state.ClearServerInventory(); err != nil {
+				state.Logger.Error("清除独服列表缓存失败: "+err.Error(), "")
+			} else {
+				cleared = append(cleared, "sqlite_server_inventory")
+			}
+			if err := state.ClearOSTemplates(); err != nil {
+				state.Logger.Error("清除系统模板缓存失败: "+err.Error(), "")
+			} else {
+				cleared = append(cleared, "sqlite_os_templates")
+			}
 			if err := state.DB.ClearCatalogs(); err != nil {
 				state.Logger.Error("清除 SQLite catalog 缓存失败: "+err.Error(), "")
 			} else {
@@ -15,19 +15,25 @@ import (
 // 这样 monitor goroutine 异常退出时 UI 能立刻反映 false
 func GetStats(state *app.State, mon *monitor.Monitor) gin.HandlerFunc {
 	return func(c *gin.Context) {
-		success, failed := state.CountPurchase()
-		state.ServerPlansMu.RLock()
-		total := len(state.ServerPlans)
-		state.ServerPlansMu.RUnlock()
-		s := types.Stats{
-			ActiveQueues:          state.CountActiveQueues(),
-			TotalServers:          total,
-			AvailableServers:      state.CountAvailableServers(),
-			PurchaseSuccess:       success,
-			PurchaseFailed:        failed,
-			QueueProcessorRunning: state.QueueProcessorRunning,
-			MonitorRunning:        mon != nil && mon.Running(),
-		}
-		c.JSON(http.StatusOK, s)
+		c.JSON(http.StatusOK, StatsSnapshot(state, mon))
+	}
+}
+
+// StatsSnapshot 计算仪表盘统计；/api/stats 与 stats 推送事件共用
+func StatsSnapshot(state *app.State, mon *monitor.Monitor) types.Stats {
+	success, failed := state.CountPurchase()
+	state.EnsureServerCatalog()
+	state.ServerPlansMu.RLock()
+	total := len(state.ServerPlans)
+	state.ServerPlansMu.RUnlock()
+	return types.Stats{
+		ActiveQueues:          state.CountActiveQueues(),
+		TotalServers:          total,
+		AvailableServers:      state.CountAvailableServers(),
+		PurchaseSuccess:       success,
+		PurchaseFailed:        failed,
+		QueueProcessorRunning: state.QueueProcessorRunning,
+		MonitorRunning:        mon != nil && mon.Running(),
+		OVHClient:             state.OVH.ClientStats(),
 	}
 }
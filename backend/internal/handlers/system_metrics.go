@@ -2,6 +2,7 @@ package handlers
 
 import (
 	"net/http"
+	"os"
 	"runtime"
 
 	"github.com/gin-gonic/gin"
@@ -9,15 +10,154 @@ import (
 	psDisk "github.com/shirou/gopsutil/v4/disk"
 	psHost "github.com/shirou/gopsutil/v4/host"
 	psMem "github.com/shirou/gopsutil/v4/mem"
+	psProcess "github.com/shirou/gopsutil/v4/process"
 
 	"github.com/ovh-webui/server/internal/app"
+	"github.com/ovh-webui/server/internal/metrics"
+	"github.com/ovh-webui/server/internal/monitor"
 )
 
-// GetSystemMetrics GET /api/system/metrics
+// RegisterRuntimeMetrics 注册进程运行指标到 series：goroutine / 堆 / GC 停顿、SQLite 连接、
+// 进程 RSS / CPU / 文件描述符、队列深度、监控 worker 占用、SSE 订阅数、常驻缓存条目数。在 series.Start 之前调用。
+func RegisterRuntimeMetrics(series *metrics.Series, state *app.State, mon *monitor.Monitor) {
+	// Go runtime：GC 停顿取两次采样之间新增 GC 的最大停顿（PauseNs 是 256 项环形缓冲）
+	var lastNumGC uint32
+	series.Register([]metrics.Metric{
+		{Name: "goroutines", Agg: metrics.AggAvg},
+		{Name: "heapInuseBytes", Agg: metrics.AggAvg},
+		{Name: "heapObjects", Agg: metrics.AggAvg},
+		{Name: "gcPauseMaxMs", Agg: metrics.AggMax},
+		{Name: "gcCount", Agg: metrics.AggSum},
+	}, func(out []float64) {
+		var ms runtime.MemStats
+		runtime.ReadMemStats(&ms)
+		out[0] = float64(runtime.NumGoroutine())
+		out[1] = float64(ms.HeapInuse)
+		out[2] = float64(ms.HeapObjects)
+		// 首次采样没有基线，只看最近一次 GC；新增超过 256 次时只能看到最近 256 次
+		n := ms.NumGC - lastNumGC
+		if lastNumGC == 0 && n > 0 {
+			n = 1
+		}
+		if n > uint32(len(ms.PauseNs)) {
+			n = uint32(len(ms.PauseNs))
+		}
+		var maxPause uint64
+		for i := uint32(0); i < n; i++ {
+			// 第 k 次 GC（从 1 计）的停顿在 PauseNs[(k+255)%256]
+			if p := ms.PauseNs[(ms.NumGC-i+255)%256]; p > maxPause {
+				maxPause = p
+			}
+		}
+		out[3] = float64(maxPause) / 1e6
+		if lastNumGC != 0 {
+			out[4] = float64(ms.NumGC - lastNumGC)
+		}
+		lastNumGC = ms.NumGC
+	})
+
+	// SQLite 连接池
+	series.Register([]metrics.Metric{
+		{Name: "dbOpenConns", Agg: metrics.AggAvg},
+		{Name: "dbInUseConns", Agg: metrics.AggMax},
+		{Name: "dbWaitCount", Agg: metrics.AggLast},
+	}, func(out []float64) {
+		if state.DB == nil {
+			return
+		}
+		st := state.DB.Stats()
+		out[0] = float64(st.OpenConnections)
+		out[1] = float64(st.InUse)
+		out[2] = float64(st.WaitCount)
+	})
+
+	// 进程 RSS / CPU（Percent(0) 用上次调用到现在的差值）/ 打开的文件描述符（Windows 上为 0）
+	proc, _ := psProcess.NewProcess(int32(os.Getpid()))
+	series.Register([]metrics.Metric{
+		{Name: "processRssBytes", Agg: metrics.AggAvg},
+		{Name: "processCpuPercent", Agg: metrics.AggAvg},
+		{Name: "openFds", Agg: metrics.AggAvg},
+	}, func(out []float64) {
+		if proc == nil {
+			return
+		}
+		if mi, err := proc.MemoryInfo(); err == nil {
+			out[0] = float64(mi.RSS)
+		}
+		if pct, err := proc.Percent(0); err == nil {
+			out[1] = pct
+		}
+		if n, err := proc.NumFDs(); err == nil {
+			out[2] = float64(n)
+		}
+	})
+
+	// 队列深度 / 监控 worker / SSE
+	series.Register([]metrics.Metric{
+		{Name: "queueTotal", Agg: metrics.AggAvg},
+		{Name: "queueActive", Agg: metrics.AggAvg},
+		{Name: "monitorBusyWorkers", Agg: metrics.AggMax},
+		{Name: "monitorMaxWorkers", Agg: metrics.AggLast},
+		{Name: "monitorCycleMs", Agg: metrics.AggMax},
+		{Name: "sseSubscribers", Agg: metrics.AggAvg},
+	}, func(out []float64) {
+		state.QueueMu.Lock()
+		out[0] = float64(len(state.Queue))
+		state.QueueMu.Unlock()
+		out[1] = float64(state.CountActiveQueues())
+		if mon != nil {
+			busy, maxW, cycle := mon.WorkerStats()
+			out[2] = float64(busy)
+			out[3] = float64(maxW)
+			out[4] = float64(cycle.Milliseconds())
+		}
+		out[5] = float64(state.Events.Subscribers())
+	})
+
+	// 常驻缓存条目数：长期运行只增不减即为泄漏（soak 测试看这几项的趋势）
+	series.Register([]metrics.Metric{
+		{Name: "monitorUUIDCache", Agg: metrics.AggLast},
+		{Name: "monitorOptionsCache", Agg: metrics.AggLast},
+		{Name: "deletedTaskIds", Agg: metrics.AggLast},
+		{Name: "logEntries", Agg: metrics.AggLast},
+		{Name: "monitorUUIDCacheHits", Agg: metrics.AggLast},
+		{Name: "monitorUUIDCacheMisses", Agg: metrics.AggLast},
+		{Name: "monitorUUIDCacheEvictions", Agg: metrics.AggLast},
+	}, func(out []float64) {
+		if mon != nil {
+			uuids, opts := mon.CacheStats()
+			out[0], out[1] = float64(uuids.Size), float64(opts.Size)
+			out[4], out[5], out[6] = float64(uuids.Hits), float64(uuids.Misses), float64(uuids.Evictions)
+		}
+		state.DeletedTaskIDsMu.Lock()
+		out[2] = float64(len(state.DeletedTaskIDs))
+		state.DeletedTaskIDsMu.Unlock()
+		out[3] = float64(state.Logger.Len())
+	})
+}
+
+// GetSystemMetrics GET /api/system/metrics?window=1m|1h|24h
 // 返回宿主机当前 CPU / 内存 / 磁盘 + 宿主机基础信息。
 // 前端 dashboard 每 2 秒拉一次,做三个圆环。
-func GetSystemMetrics(state *app.State) gin.HandlerFunc {
+// runtime 字段为进程运行指标的当前值与 window 档历史（默认 1m）。
+func GetSystemMetrics(state *app.State, series *metrics.Series) gin.HandlerFunc {
 	return func(c *gin.Context) {
+		window := c.DefaultQuery("window", "1m")
+		var runtimeInfo gin.H
+		if series != nil {
+			history, ok := series.History(window)
+			if !ok {
+				c.JSON(http.StatusBadRequest, gin.H{"status": "error", "error": "window 只支持 1m / 1h / 24h"})
+				return
+			}
+			current, at := series.Current()
+			runtimeInfo = gin.H{
+				"current":   current,
+				"sampledAt": at.UnixMilli(),
+				"history":   history,
+			}
+		}
+
 		// ── CPU ─────────────────────────────────────────────────────
 		// percpu=false 取整机平均；interval=0 用上一次采样到现在的差值，几乎瞬时
 		cpuPct := 0.0
@@ -82,6 +222,7 @@ func GetSystemMetrics(state *app.State) gin.HandlerFunc {
 				"platform":  platform,
 				"uptimeSec": uptimeSec,
 			},
+			"runtime": runtimeInfo,
 		})
 	}
 }
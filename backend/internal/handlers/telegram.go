@@ -7,6 +7,7 @@ import (
 	"io"
 	"net/http"
 	"strings"
+	"sync/atomic"
 	"time"
 
 	"github.com/gin-gonic/gin"
@@ -16,6 +17,14 @@ import (
 	"github.com/ovh-webui/server/internal/telegram"
 )
 
+const (
+	// webhookRecentUpdates 内存去重保留的最近 update_id 数
+	webhookRecentUpdates = 4096
+	// webhookWorkers / webhookQueueSize update 异步处理并发与每条优先级队列长度
+	webhookWorkers   = 4
+	webhookQueueSize = 256
+)
+
 // SetTelegramWebhook POST /api/telegram/set-webhook
 func SetTelegramWebhook(state *app.State) gin.HandlerFunc {
 	return func(c *gin.Context) {
@@ -55,7 +64,17 @@ func GetTelegramWebhookInfo(state *app.State) gin.HandlerFunc {
 
 // TelegramWebhook POST /api/telegram/webhook
 // 安全链：secret_token → body 大小 → update_id 幂等 → Chat/User 白名单 → 业务
+//
+// 快速路径：校验 secret、解析 JSON、查内存 LRU 去重后立即 200，业务（SQLite 幂等写入、
+// 回调入队、命令回复）放进有界 worker 池异步处理；按钮回调（一键下单）走高优先级队列。
+// 队列满时返回 503 并从 LRU 移除该 update_id，让 Telegram 稍后重投。
 func TelegramWebhook(state *app.State, mon *monitor.Monitor) gin.HandlerFunc {
+	recent := telegram.NewRecentUpdates(webhookRecentUpdates)
+	pool := telegram.NewUpdatePool(webhookWorkers, webhookQueueSize, func(r interface{}) {
+		state.Logger.Error(fmt.Sprintf("处理 Telegram update 时异常: %v", r), "telegram")
+	})
+	var lastCleanup atomic.Int64
+
 	return func(c *gin.Context) {
 		// 1) secret_token：伪造来源直接 401（Telegram 不会伪造错误 secret）
 		secretHdr := c.GetHeader(telegram.SecretTokenHeader)
@@ -78,7 +97,7 @@ func TelegramWebhook(state *app.State, mon *monitor.Monitor) gin.HandlerFunc {
 			return
 		}
 
-		// 3) update_id 幂等（重放直接 200 吞掉）
+		// 3) update_id 幂等：内存 LRU 挡住近期重放，不碰 SQLite
 		var updateID int64
 		switch v := data["update_id"].(type) {
 		case float64:
@@ -87,63 +106,78 @@ func TelegramWebhook(state *app.State, mon *monitor.Monitor) gin.HandlerFunc {
 			n, _ := v.Int64()
 			updateID = n
 		}
-		if state.DB != nil && updateID > 0 {
-			claimed, err := state.DB.TryClaimTelegramUpdate(updateID)
-			if err != nil {
-				state.Logger.Warn("update_id 幂等写入失败: "+err.Error(), "telegram")
-			} else if !claimed {
-				state.Logger.Info(fmt.Sprintf("忽略重复 update_id=%d", updateID), "telegram")
-				c.JSON(http.StatusOK, gin.H{"ok": true, "duplicate": true})
-				return
-			}
-			// 偶发清理 7 天前记录
-			if updateID%50 == 0 {
-				before := float64(time.Now().Add(-time.Duration(telegram.UpdateIDRetentionDays) * 24 * time.Hour).Unix())
-				_, _ = state.DB.CleanupTelegramUpdates(before)
+		if updateID > 0 && recent.Seen(updateID) {
+			c.JSON(http.StatusOK, gin.H{"ok": true, "duplicate": true})
+			return
+		}
+
+		_, isCallback := data["callback_query"].(map[string]interface{})
+		if !pool.Submit(isCallback, func() { processTelegramUpdate(state, mon, data, updateID, &lastCleanup) }) {
+			if updateID > 0 {
+				recent.Forget(updateID)
 			}
+			state.Logger.Warn(fmt.Sprintf("Telegram update 处理队列已满，update_id=%d 交由 Telegram 重投", updateID), "telegram")
+			c.JSON(http.StatusServiceUnavailable, gin.H{"ok": false, "error": "busy"})
+			return
 		}
+		c.JSON(http.StatusOK, gin.H{"ok": true})
+	}
+}
 
-		// 处理 callback_query
-		if cb, ok := data["callback_query"].(map[string]interface{}); ok {
-			handleCallbackQuery(state, mon, cb, c)
+// processTelegramUpdate worker 池里处理一条 update：SQLite 幂等（跨重启 / LRU 淘汰后的重放）→ 业务
+func processTelegramUpdate(state *app.State, mon *monitor.Monitor, data map[string]interface{}, updateID int64, lastCleanup *atomic.Int64) {
+	if state.DB != nil && updateID > 0 {
+		claimed, err := state.DB.TryClaimTelegramUpdate(updateID)
+		if err != nil {
+			state.Logger.Warn("update_id 幂等写入失败: "+err.Error(), "telegram")
+		} else if !claimed {
+			state.Logger.Info(fmt.Sprintf("忽略重复 update_id=%d", updateID), "telegram")
 			return
 		}
+		// 每小时最多清理一次 7 天前记录
+		now := time.Now().Unix()
+		if last := lastCleanup.Load(); now-last >= 3600 && lastCleanup.CompareAndSwap(last, now) {
+			before := float64(time.Now().Add(-time.Duration(telegram.UpdateIDRetentionDays) * 24 * time.Hour).Unix())
+			_, _ = state.DB.CleanupTelegramUpdates(before)
+		}
+	}
 
-		// 处理普通消息
-		if msg, ok := data["message"].(map[string]interface{}); ok {
-			text, _ := msg["text"].(string)
-			text = strings.TrimSpace(text)
-			chatID := getNested(msg, "chat", "id")
-			messageID, _ := getNumOrFloat(msg["message_id"])
-			fromUser, _ := msg["from"].(map[string]interface{})
-			userID, _ := getNumOrFloat(fromUser["id"])
-			username, _ := fromUser["username"].(string)
-			if username == "" {
-				username = "未知用户"
-			}
-			state.Logger.Info(fmt.Sprintf("收到Telegram普通消息: user_id=%v, username=%s, text=%s",
-				userID, username, truncate(text, 100)), "telegram")
+	// 处理 callback_query
+	if cb, ok := data["callback_query"].(map[string]interface{}); ok {
+		handleCallbackQuery(state, mon, cb)
+		return
+	}
 
-			// 频率限制
-			rateKey := telegram.ChatIDString(chatID)
-			if rateKey == "" {
-				rateKey = fmt.Sprintf("%v", userID)
-			}
-			if !telegram.AllowRate(rateKey) {
-				telegram.SendReply(state, chatID, "⚠️ 操作过于频繁，请稍后再试", int64(messageID))
-				c.JSON(http.StatusOK, gin.H{"ok": true, "error": "rate_limited"})
-				return
-			}
+	// 处理普通消息
+	if msg, ok := data["message"].(map[string]interface{}); ok {
+		text, _ := msg["text"].(string)
+		text = strings.TrimSpace(text)
+		chatID := getNested(msg, "chat", "id")
+		messageID, _ := getNumOrFloat(msg["message_id"])
+		fromUser, _ := msg["from"].(map[string]interface{})
+		userID, _ := getNumOrFloat(fromUser["id"])
+		username, _ := fromUser["username"].(string)
+		if username == "" {
+			username = "未知用户"
+		}
+		state.Logger.Info(fmt.Sprintf("收到Telegram普通消息: user_id=%v, username=%s, text=%s",
+			userID, username, truncate(text, 100)), "telegram")
 
-			handleTelegramText(state, mon, text, chatID, userID, messageID)
-			c.JSON(http.StatusOK, gin.H{"ok": true})
+		// 频率限制
+		rateKey := telegram.ChatIDString(chatID)
+		if rateKey == "" {
+			rateKey = fmt.Sprintf("%v", userID)
+		}
+		if !telegram.AllowRate(rateKey) {
+			telegram.SendReply(state, chatID, "⚠️ 操作过于频繁，请稍后再试", int64(messageID))
 			return
 		}
-		c.JSON(http.StatusOK, gin.H{"ok": true})
+
+		handleTelegramText(state, mon, text, chatID, userID, messageID)
 	}
 }
 
-func handleCallbackQuery(state *app.State, mon *monitor.Monitor, cb map[string]interface{}, c *gin.Context) {
+func handleCallbackQuery(state *app.State, mon *monitor.Monitor, cb map[string]interface{}) {
 	cbData, _ := cb["data"].(string)
 	message, _ := cb["message"].(map[string]interface{})
 	chatID := getNested(message, "chat", "id")
@@ -157,7 +191,6 @@ func handleCallbackQuery(state *app.State, mon *monitor.Monitor, cb map[string]i
 	// 频率限制
 	if !telegram.AllowRate(fmt.Sprintf("cb:%v", userID)) {
 		telegram.AnswerCallback(state, cbID, "操作过于频繁", true)
-		c.JSON(http.StatusOK, gin.H{"ok": true, "error": "rate_limited"})
 		return
 	}
 
@@ -165,7 +198,6 @@ func handleCallbackQuery(state *app.State, mon *monitor.Monitor, cb map[string]i
 	if !telegram.IsAuthorizedActor(state, chatID, userID) {
 		state.Logger.Warn(fmt.Sprintf("拒绝未授权一键下单: chat=%v user=%v", chatID, userID), "telegram")
 		telegram.AnswerCallback(state, cbID, "未授权的会话", true)
-		c.JSON(http.StatusOK, gin.H{"ok": true, "error": "unauthorized"})
 		return
 	}
 
@@ -178,18 +210,15 @@ func handleCallbackQuery(state *app.State, mon *monitor.Monitor, cb map[string]i
 		decoded, err := base64.StdEncoding.DecodeString(base64Part)
 		if err != nil {
 			telegram.AnswerCallback(state, cbID, "按钮数据无效", true)
-			c.JSON(http.StatusOK, gin.H{"ok": true, "error": "callback_decode_failed"})
 			return
 		}
 		if err := json.Unmarshal(decoded, &callbackObj); err != nil {
 			telegram.AnswerCallback(state, cbID, "按钮数据无效", true)
-			c.JSON(http.StatusOK, gin.H{"ok": true, "error": "invalid_callback_json"})
 			return
 		}
 	} else {
 		if err := json.Unmarshal([]byte(cbData), &callbackObj); err != nil {
 			telegram.AnswerCallback(state, cbID, "按钮数据无效", true)
-			c.JSON(http.StatusOK, gin.H{"ok": true, "error": "invalid_callback_json"})
 			return
 		}
 	}
@@ -203,14 +232,12 @@ func handleCallbackQuery(state *app.State, mon *monitor.Monitor, cb map[string]i
 	if action != "add_to_queue" {
 		state.Logger.Warn("未知的action: "+action, "telegram")
 		telegram.AnswerCallback(state, cbID, "未知操作", true)
-		c.JSON(http.StatusOK, gin.H{"ok": true, "error": "unknown_action"})
 		return
 	}
 
 	accountID := telegram.DefaultAccountID(state)
 	if accountID == "" {
 		telegram.AnswerCallback(state, cbID, "未配置 OVH 账户", true)
-		c.JSON(http.StatusOK, gin.H{"ok": true, "error": "no_account"})
 		return
 	}
 
@@ -228,7 +255,6 @@ func handleCallbackQuery(state *app.State, mon *monitor.Monitor, cb map[string]i
 		telegram.SendReply(state, chatID,
 			"❌ 该按钮协议过旧或数据无效。\n请等待新的上架通知后使用「一键下单」。",
 			int64(messageID))
-		c.JSON(http.StatusOK, gin.H{"ok": true, "error": "uuid_required"})
 		return
 	}
 
@@ -243,7 +269,6 @@ func handleCallbackQuery(state *app.State, mon *monitor.Monitor, cb map[string]i
 		if used, exists, _ := state.DB.IsTelegramButtonUsed(messageUUID); exists && used {
 			telegram.AnswerCallback(state, cbID, "该按钮已使用过", true)
 			telegram.SendReply(state, chatID, "⚠️ 该一键下单按钮已使用，请等待新的上架通知。", int64(messageID))
-			c.JSON(http.StatusOK, gin.H{"ok": true, "error": "button_already_used"})
 			return
 		}
 	}
@@ -270,7 +295,6 @@ func handleCallbackQuery(state *app.State, mon *monitor.Monitor, cb map[string]i
 		telegram.SendReply(state, chatID,
 			"❌ 一键下单失败：该通知按钮已过期或无效。\n\n请等待新的上架通知后重试。",
 			int64(messageID))
-		c.JSON(http.StatusOK, gin.H{"ok": true, "error": "button_expired"})
 		return
 	}
 
@@ -282,7 +306,6 @@ func handleCallbackQuery(state *app.State, mon *monitor.Monitor, cb map[string]i
 		}
 		telegram.AnswerCallback(state, cbID, "入队失败", true)
 		telegram.SendReply(state, chatID, "❌ "+result.Message, int64(messageID))
-		c.JSON(http.StatusOK, gin.H{"ok": true, "error": "enqueue_failed"})
 		return
 	}
 
@@ -305,7 +328,6 @@ func handleCallbackQuery(state *app.State, mon *monitor.Monitor, cb map[string]i
 		planCode, strings.ToUpper(dc), optsStr)
 	telegram.AnswerCallback(state, cbID, "已添加到队列！", false)
 	telegram.SendReply(state, chatID, confirmMsg, int64(messageID))
-	c.JSON(http.StatusOK, gin.H{"ok": true})
 }
 
 func dbParseOptions(raw string) []string {
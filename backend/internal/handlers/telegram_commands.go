@@ -165,6 +165,7 @@ func cmdMonitor(state *app.State, mon *monitor.Monitor, args []string) string {
 	}
 
 	var serverName string
+	state.EnsureServerCatalog()
 	state.ServerPlansMu.RLock()
 	for _, s := range state.ServerPlans {
 		if s.PlanCode == planCode {
@@ -112,7 +112,7 @@ func AddVPSSubscription(state *app.State) gin.HandlerFunc {
 		}
 		state.VPSSubscriptions = append(state.VPSSubscriptions, sub)
 		state.VPSSubsMu.Unlock()
-		_ = vps.SaveSubscriptions(state)
+		_ = vps.SaveSubscription(state, sub)
 		state.Logger.Info("添加VPS订阅: "+body.PlanCode+" (subsidiary: "+body.OvhSubsidiary+")", "vps_monitor")
 
 		if !vps.Running() {
@@ -182,7 +182,7 @@ func UpdateVPSSubscription(state *app.State) gin.HandlerFunc {
 			c.JSON(http.StatusNotFound, gin.H{"status": "error", "message": "订阅不存在"})
 			return
 		}
-		_ = vps.SaveSubscriptions(state)
+		_ = vps.SaveSubscription(state, copySub)
 		state.Logger.Info("更新VPS订阅: "+id, "vps_monitor")
 		c.JSON(http.StatusOK, gin.H{"status": "success", "message": "订阅已更新", "subscription": copySub})
 	}
@@ -208,7 +208,7 @@ func RemoveVPSSubscription(state *app.State) gin.HandlerFunc {
 			c.JSON(http.StatusNotFound, gin.H{"status": "error", "message": "订阅不存在"})
 			return
 		}
-		_ = vps.SaveSubscriptions(state)
+		_ = vps.DeleteSubscription(state, id)
 		state.Logger.Info("删除VPS订阅: "+id, "vps_monitor")
 		if empty && vps.Running() {
 			vps.Stop(state)
@@ -225,7 +225,7 @@ func ClearVPSSubscriptions(state *app.State) gin.HandlerFunc {
 		count := len(state.VPSSubscriptions)
 		state.VPSSubscriptions = []types.VPSSubscription{}
 		state.VPSSubsMu.Unlock()
-		_ = vps.SaveSubscriptions(state)
+		_ = vps.ClearSubscriptions(state)
 		state.Logger.Info("清空所有VPS订阅 ("+strconv.Itoa(count)+" 项)", "vps_monitor")
 		if vps.Running() {
 			vps.Stop(state)
@@ -27,9 +27,15 @@ type Logger struct {
 	writeCounter int
 	logsFile     string
 	stdlog       *slog.Logger
+	// loaded 在 Load 完成后关闭。之前不写盘，否则会用启动后的少量新日志覆盖掉旧文件
+	loaded   chan struct{}
+	loadOnce sync.Once
+	// hook 每条新日志的回调（事件推送），在锁外调用
+	hook func(types.LogEntry)
 }
 
-// New 创建 logger
+// New 创建 logger。不读旧日志文件：由调用方择机（启动后台）调用 Load，
+// 期间 Add 照常进内存，Load 完成时旧日志插到前面。
 func New(logsFile string, console *slog.Logger) *Logger {
 	if console == nil {
 		console = slog.New(slog.NewTextHandler(os.Stdout, &slog.HandlerOptions{Level: slog.LevelInfo}))
@@ -38,25 +44,48 @@ func New(logsFile string, console *slog.Logger) *Logger {
 		entries:  make([]types.LogEntry, 0, maxLogs),
 		logsFile: logsFile,
 		stdlog:   console,
+		loaded:   make(chan struct{}),
 	}
-	l.Load()
 	return l
 }
 
-// Load 启动时读取已有日志（最多保留 maxLogs 条）
-func (l *Logger) Load() {
+// Load 读取已有日志（最多保留 maxLogs 条），与 Load 之前 Add 的新日志合并（旧在前）。
+// 解码在锁外进行，不阻塞并发的 Add。只生效一次。
+func (l *Logger) Load() error {
+	var err error
+	l.loadOnce.Do(func() {
+		defer close(l.loaded)
+		var existing []types.LogEntry
+		if err = storage.ReadJSON(l.logsFile, &existing); err != nil {
+			l.stdlog.Warn("read logs file", "err", err)
+			return
+		}
+		l.mu.Lock()
+		merged := append(existing, l.entries...)
+		if len(merged) > maxLogs {
+			merged = merged[len(merged)-maxLogs:]
+		}
+		l.entries = merged
+		l.mu.Unlock()
+	})
+	return err
+}
+
+// SetHook 设置新日志回调（nil 取消）。回调在 Add 的调用方 goroutine 里执行，不能阻塞。
+func (l *Logger) SetHook(fn func(types.LogEntry)) {
 	l.mu.Lock()
-	defer l.mu.Unlock()
+	l.hook = fn
+	l.mu.Unlock()
+}
 
-	var existing []types.LogEntry
-	if err := storage.ReadJSON(l.logsFile, &existing); err != nil {
-		l.stdlog.Warn("read logs file", "err", err)
-		return
-	}
-	if len(existing) > maxLogs {
-		existing = existing[len(existing)-maxLogs:]
+// isLoaded Load 是否已完成
+func (l *Logger) isLoaded() bool {
+	select {
+	case <-l.loaded:
+		return true
+	default:
+		return false
 	}
-	l.entries = existing
 }
 
 // Add 添加一条日志
@@ -80,8 +109,13 @@ func (l *Logger) Add(level, message, source string) {
 	l.writeCounter++
 	shouldWrite := l.writeCounter >= writeThreshold || level == "ERROR"
 	snapshot := l.entries // 直接引用，下面 Flush 会复制
+	hook := l.hook
 	l.mu.Unlock()
 
+	if hook != nil {
+		hook(entry)
+	}
+
 	if shouldWrite {
 		l.flush(snapshot)
 	}
@@ -106,8 +140,12 @@ func (l *Logger) Warn(msg, source string)  { l.Add("WARNING", msg, source) }
 func (l *Logger) Error(msg, source string) { l.Add("ERROR", msg, source) }
 func (l *Logger) Debug(msg, source string) { l.Add("DEBUG", msg, source) }
 
-// Flush 强制刷盘
+// Flush 强制刷盘（旧日志还在加载时最多等 5 秒）
 func (l *Logger) Flush() {
+	select {
+	case <-l.loaded:
+	case <-time.After(5 * time.Second):
+	}
 	l.mu.Lock()
 	snapshot := make([]types.LogEntry, len(l.entries))
 	copy(snapshot, l.entries)
@@ -117,6 +155,10 @@ func (l *Logger) Flush() {
 }
 
 func (l *Logger) flush(entries []types.LogEntry) {
+	if !l.isLoaded() {
+		// 旧日志尚未读入：先不写，writeCounter 保留，下一次 Add 再触发
+		return
+	}
 	// 复制后写盘，避免与 Add 竞争
 	cp := make([]types.LogEntry, len(entries))
 	copy(cp, entries)
@@ -128,6 +170,13 @@ func (l *Logger) flush(entries []types.LogEntry) {
 	l.mu.Unlock()
 }
 
+// Len 内存中的日志条数
+func (l *Logger) Len() int {
+	l.mu.Lock()
+	defer l.mu.Unlock()
+	return len(l.entries)
+}
+
 // Snapshot 取当前内存中的日志副本
 func (l *Logger) Snapshot() []types.LogEntry {
 	l.mu.Lock()
@@ -204,6 +253,8 @@ func (l *Logger) Query(opts QueryOpts) (items []types.LogEntry, total int) {
 
 // Clear 清空所有日志（含文件）
 func (l *Logger) Clear() error {
+	// 等旧日志读完，避免 Load 在清空之后又把旧条目合并回来
+	<-l.loaded
 	l.mu.Lock()
 	l.entries = l.entries[:0]
 	l.writeCounter = 0
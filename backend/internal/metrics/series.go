@@ -0,0 +1,227 @@
+// Package metrics 进程内时间序列：固定间隔采样一组指标，按 1m / 1h / 24h 三档降采样存进环形缓冲，
+// 给 /api/system/metrics 返回历史，不依赖外部监控系统就能看出泄漏和饱和趋势。
+package metrics
+
+import (
+	"sync"
+	"time"
+)
+
+// Agg 降采样时一个桶内多个样本的合并方式
+type Agg int
+
+const (
+	AggAvg  Agg = iota // 平均（goroutine 数、堆大小等量表）
+	AggMax             // 最大（GC 停顿）
+	AggSum             // 求和（区间内 GC 次数等增量）
+	AggLast            // 取最后一个
+)
+
+// Metric 指标定义
+type Metric struct {
+	Name string
+	Agg  Agg
+}
+
+// Collector 一次采样写出一组指标的值（同组指标共用一次昂贵读取，如 ReadMemStats）
+type Collector func(out []float64)
+
+// Tier 一档保留窗口：Step 一个点，共 Points 个点
+type Tier struct {
+	Name   string
+	Step   time.Duration
+	Points int
+}
+
+// DefaultTiers 1 分钟逐秒、1 小时逐分钟、24 小时每 15 分钟
+var DefaultTiers = []Tier{
+	{Name: "1m", Step: time.Second, Points: 60},
+	{Name: "1h", Step: time.Minute, Points: 60},
+	{Name: "24h", Step: 15 * time.Minute, Points: 96},
+}
+
+type group struct {
+	offset  int
+	size    int
+	collect Collector
+}
+
+type ring struct {
+	Tier
+	at     []int64 // 每个点的桶起始时间（毫秒）
+	values [][]float64
+	head   int // 下一个写入位置
+	n      int
+
+	bucket  int64 // 当前累积桶编号（时间 / Step）
+	acc     []float64
+	samples int
+}
+
+// Series 采样器 + 多档环形缓冲。先 Register 再 Start。
+type Series struct {
+	interval time.Duration
+
+	mu      sync.Mutex
+	metrics []Metric
+	groups  []group
+	rings   []*ring
+	last    []float64
+	lastAt  time.Time
+	started bool
+}
+
+// NewSeries interval 为采样间隔（应不大于最细一档的 Step）
+func NewSeries(interval time.Duration, tiers []Tier) *Series {
+	s := &Series{interval: interval}
+	for _, t := range tiers {
+		s.rings = append(s.rings, &ring{
+			Tier:   t,
+			at:     make([]int64, t.Points),
+			values: make([][]float64, t.Points),
+			bucket: -1,
+		})
+	}
+	return s
+}
+
+// Register 注册一组指标；collect 每次采样按 metrics 顺序写 out
+func (s *Series) Register(metrics []Metric, collect Collector) {
+	s.mu.Lock()
+	defer s.mu.Unlock()
+	if s.started {
+		panic("metrics: Register after Start")
+	}
+	s.groups = append(s.groups, group{offset: len(s.metrics), size: len(metrics), collect: collect})
+	s.metrics = append(s.metrics, metrics...)
+	for _, r := range s.rings {
+		r.acc = make([]float64, len(s.metrics))
+	}
+}
+
+// Start 后台按 interval 采样，进程生命周期内一直运行
+func (s *Series) Start() {
+	s.mu.Lock()
+	if s.started {
+		s.mu.Unlock()
+		return
+	}
+	s.started = true
+	s.mu.Unlock()
+
+	go func() {
+		t := time.NewTicker(s.interval)
+		defer t.Stop()
+		s.Sample(time.Now())
+		for now := range t.C {
+			s.Sample(now)
+		}
+	}()
+}
+
+// Sample 采一次样（Start 的 goroutine 调用；测试可直接调）。Register 须在第一次 Sample 之前完成。
+func (s *Series) Sample(now time.Time) {
+	vals := make([]float64, len(s.metrics))
+	for _, g := range s.groups {
+		g.collect(vals[g.offset : g.offset+g.size])
+	}
+	s.mu.Lock()
+	defer s.mu.Unlock()
+	s.last, s.lastAt = vals, now
+	ms := now.UnixMilli()
+	for _, r := range s.rings {
+		b := ms / r.Step.Milliseconds()
+		if r.bucket != b {
+			if r.samples > 0 {
+				r.push(r.bucket*r.Step.Milliseconds(), s.finish(r))
+			}
+			r.bucket = b
+			r.samples = 0
+		}
+		s.accumulate(r, vals)
+	}
+}
+
+func (s *Series) accumulate(r *ring, vals []float64) {
+	for i, v := range vals {
+		switch s.metrics[i].Agg {
+		case AggMax:
+			if r.samples == 0 || v > r.acc[i] {
+				r.acc[i] = v
+			}
+		case AggLast:
+			r.acc[i] = v
+		default:
+			if r.samples == 0 {
+				r.acc[i] = 0
+			}
+			r.acc[i] += v
+		}
+	}
+	r.samples++
+}
+
+func (s *Series) finish(r *ring) []float64 {
+	out := make([]float64, len(r.acc))
+	for i, v := range r.acc {
+		if s.metrics[i].Agg == AggAvg {
+			v /= float64(r.samples)
+		}
+		out[i] = v
+	}
+	return out
+}
+
+func (r *ring) push(at int64, vals []float64) {
+	r.at[r.head] = at
+	r.values[r.head] = vals
+	r.head = (r.head + 1) % r.Points
+	if r.n < r.Points {
+		r.n++
+	}
+}
+
+// Window 一档历史：Points 每项为 [时间戳毫秒, 指标1, 指标2, ...]，顺序同 Names，旧在前
+type Window struct {
+	Window  string      `json:"window"`
+	StepSec float64     `json:"stepSec"`
+	Names   []string    `json:"names"`
+	Points  [][]float64 `json:"points"`
+}
+
+// Current 最近一次采样（名称 → 值）与采样时间
+func (s *Series) Current() (map[string]float64, time.Time) {
+	s.mu.Lock()
+	defer s.mu.Unlock()
+	out := make(map[string]float64, len(s.metrics))
+	for i, v := range s.last {
+		out[s.metrics[i].Name] = v
+	}
+	return out, s.lastAt
+}
+
+// History 返回名为 name 的一档历史（不含正在累积的桶）；未知档返回 false
+func (s *Series) History(name string) (Window, bool) {
+	s.mu.Lock()
+	defer s.mu.Unlock()
+	for _, r := range s.rings {
+		if r.Name != name {
+			continue
+		}
+		w := Window{Window: r.Name, StepSec: r.Step.Seconds(), Names: make([]string, len(s.metrics))}
+		for i, m := range s.metrics {
+			w.Names[i] = m.Name
+		}
+		w.Points = make([][]float64, 0, r.n)
+		start := (r.head - r.n + r.Points) % r.Points
+		for k := 0; k < r.n; k++ {
+			i := (start + k) % r.Points
+			p := make([]float64, 0, len(r.values[i])+1)
+			p = append(p, float64(r.at[i]))
+			p = append(p, r.values[i]...)
+			w.Points = append(w.Points, p)
+		}
+		return w, true
+	}
+	return Window{}, false
+}
@@ -0,0 +1,39 @@
+package metrics
+
+import (
+	"testing"
+	"time"
+)
+
+func TestSeriesDownsample(t *testing.T) {
+	s := NewSeries(time.Second, []Tier{
+		{Name: "fine", Step: time.Second, Points: 3},
+		{Name: "coarse", Step: 10 * time.Second, Points: 2},
+	})
+	n := 0.0
+	s.Register([]Metric{{"avg", AggAvg}, {"max", AggMax}, {"sum", AggSum}}, func(out []float64) {
+		n++
+		out[0], out[1], out[2] = n, n, 1
+	})
+	base := time.UnixMilli(1_000_000_000_000) // 10 秒整
+	for i := 0; i < 25; i++ {
+		s.Sample(base.Add(time.Duration(i) * time.Second))
+	}
+
+	fine, _ := s.History("fine")
+	if len(fine.Points) != 3 || fine.Points[2][1] < 20 {
+		t.Fatalf("fine ring should keep the last 3 closed seconds, got %v", fine.Points)
+	}
+	coarse, ok := s.History("coarse")
+	if !ok || len(coarse.Points) != 2 {
+		t.Fatalf("coarse points=%v", coarse.Points)
+	}
+	// 第二个 10 秒桶：第 11..20 次采样
+	p := coarse.Points[1]
+	if p[1] != 15.5 || p[2] != 20 || p[3] != 10 {
+		t.Fatalf("coarse bucket avg/max/sum = %v", p)
+	}
+	if cur, _ := s.Current(); cur["sum"] != 1 {
+		t.Fatalf("current=%v", cur)
+	}
+}
@@ -0,0 +1,213 @@
+package monitor
+
+import (
+	"fmt"
+	"time"
+
+	"github.com/ovh-webui/server/internal/availability"
+	"github.com/ovh-webui/server/internal/db"
+)
+
+const (
+	// availabilityRawRetention 状态变化明细保留期，更早的折叠成日汇总
+	availabilityRawRetention = 30 * 24 * time.Hour
+	// availabilityKeepDays 日汇总保留天数
+	availabilityKeepDays = 365
+	// availabilityCompactInterval 折叠 / 清理的节流间隔（在监控循环里顺带执行）
+	availabilityCompactInterval = time.Hour
+)
+
+// PlanRestockStats 一个订阅的补货统计（按机房）
+type PlanRestockStats struct {
+	PlanCode    string                 `json:"planCode"`
+	ServerName  string                 `json:"serverName,omitempty"`
+	Datacenters []availability.DCStats `json:"datacenters"`
+}
+
+func newTimeline() *availability.Timeline {
+	return availability.New(availabilityKeepDays)
+}
+
+// recordTransition 把一次状态变化记入订阅的时间序列，返回对应的持久化行
+func recordTransition(sub *Subscription, dc, config, status string, at time.Time) (db.MonitorTransition, bool) {
+	kind, ok := availability.ParseKind(status)
+	if !ok {
+		return db.MonitorTransition{}, false
+	}
+	sub.timeline.Record(availability.Key{Datacenter: dc, Config: config}, kind, at)
+	return db.MonitorTransition{
+		PlanCode:   sub.PlanCode,
+		Datacenter: dc,
+		Config:     config,
+		At:         at.Unix(),
+		Kind:       status,
+	}, true
+}
+
+// loadAvailability 启动时从 SQLite 恢复各订阅的时间序列（日汇总 + 未折叠明细 + 各状态最近一次的时刻）。
+// 库里没有记录的订阅用旧版 History 播种一次并写回，之后不再依赖 History 计算历时。
+func (m *Monitor) loadAvailability(subs []*Subscription) {
+	if m.state.DB == nil || len(subs) == 0 {
+		return
+	}
+	days, err := m.state.DB.ListMonitorAvailabilityDays()
+	if err != nil {
+		m.state.Logger.Warn("加载补货日汇总失败: "+err.Error(), "monitor")
+		return
+	}
+	rows, err := m.state.DB.ListMonitorTransitions()
+	if err != nil {
+		m.state.Logger.Warn("加载补货状态明细失败: "+err.Error(), "monitor")
+		return
+	}
+	lasts, err := m.state.DB.ListMonitorLastTransitions()
+	if err != nil {
+		m.state.Logger.Warn("加载补货最近状态时刻失败: "+err.Error(), "monitor")
+		return
+	}
+	byPlan := make(map[string]*Subscription, len(subs))
+	for _, s := range subs {
+		byPlan[s.PlanCode] = s
+	}
+	seen := map[string]bool{}
+	for _, d := range days {
+		if s := byPlan[d.PlanCode]; s != nil {
+			seen[d.PlanCode] = true
+			s.timeline.RestoreDay(availability.Key{Datacenter: d.Datacenter, Config: d.Config}, availability.Day{
+				Start:      d.Day,
+				Until:      d.Until,
+				InStockSec: d.InStockSec,
+				Restocks:   d.Restocks,
+				EndInStock: d.EndInStock == 1,
+			})
+		}
+	}
+	for _, r := range rows {
+		s := byPlan[r.PlanCode]
+		kind, ok := availability.ParseKind(r.Kind)
+		if s == nil || !ok {
+			continue
+		}
+		seen[r.PlanCode] = true
+		s.timeline.Record(availability.Key{Datacenter: r.Datacenter, Config: r.Config}, kind, time.Unix(r.At, 0))
+	}
+	// 超过保留期的明细已折叠，最近一次的时刻从这里恢复（例如缺货已超过 30 天的机房）
+	for _, r := range lasts {
+		s := byPlan[r.PlanCode]
+		kind, ok := availability.ParseKind(r.Kind)
+		if s == nil || !ok {
+			continue
+		}
+		s.timeline.RestoreLast(availability.Key{Datacenter: r.Datacenter, Config: r.Config}, kind, time.Unix(r.At, 0))
+	}
+
+	var seeded []db.MonitorTransition
+	for _, s := range subs {
+		if seen[s.PlanCode] {
+			// 升级前已折叠掉的明细不在 monitor_last_transitions 里：用 History 补最近时刻（不补明细）
+			for _, h := range s.History {
+				at, err := time.Parse(time.RFC3339Nano, h.Timestamp)
+				kind, ok := availability.ParseKind(h.ChangeType)
+				if err != nil || !ok {
+					continue
+				}
+				config, _ := h.Config["display"].(string)
+				s.timeline.RestoreLast(availability.Key{Datacenter: h.Datacenter, Config: config}, kind, at)
+			}
+			continue
+		}
+		for _, h := range s.History {
+			at, err := time.Parse(time.RFC3339Nano, h.Timestamp)
+			if err != nil {
+				continue
+			}
+			config, _ := h.Config["display"].(string)
+			if row, ok := recordTransition(s, h.Datacenter, config, h.ChangeType, at); ok {
+				seeded = append(seeded, row)
+			}
+		}
+	}
+	if len(seeded) > 0 {
+		if err := m.state.DB.AppendMonitorTransitions(seeded); err != nil {
+			m.state.Logger.Warn("写入补货状态明细失败: "+err.Error(), "monitor")
+		} else {
+			m.state.Logger.Info(fmt.Sprintf("已从订阅历史导入 %d 条补货状态变化", len(seeded)), "monitor")
+		}
+	}
+}
+
+// persistTransitions 追加本轮的状态变化
+func (m *Monitor) persistTransitions(rows []db.MonitorTransition) {
+	if m.state.DB == nil || len(rows) == 0 {
+		return
+	}
+	if err := m.state.DB.AppendMonitorTransitions(rows); err != nil {
+		m.state.Logger.Warn("保存补货状态变化失败: "+err.Error(), "monitor")
+	}
+}
+
+// compactAvailability 节流执行：超过保留期的明细折叠进日汇总并从库里删除，清理已删订阅的记录
+func (m *Monitor) compactAvailability() {
+	now := time.Now()
+	if m.state.DB == nil || now.Unix()-m.lastAvailabilityCompact.Load() < int64(availabilityCompactInterval.Seconds()) {
+		return
+	}
+	m.lastAvailabilityCompact.Store(now.Unix())
+	before := now.Add(-availabilityRawRetention)
+	var days []db.MonitorAvailabilityDay
+	var folded []string
+	for _, sub := range m.Snapshot() {
+		// 集群模式下别的实例负责的订阅本地时间序列不是最新的，由负责方折叠
+		if !m.state.ClusterOwns(sub.PlanCode) {
+			continue
+		}
+		folded = append(folded, sub.PlanCode)
+		for k, changed := range sub.timeline.Compact(before) {
+			for _, d := range changed {
+				end := 0
+				if d.EndInStock {
+					end = 1
+				}
+				days = append(days, db.MonitorAvailabilityDay{
+					PlanCode:   sub.PlanCode,
+					Datacenter: k.Datacenter,
+					Config:     k.Config,
+					Day:        d.Start,
+					Until:      d.Until,
+					InStockSec: d.InStockSec,
+					Restocks:   d.Restocks,
+					EndInStock: end,
+				})
+			}
+		}
+	}
+	keepFrom := now.Add(-availabilityKeepDays * 24 * time.Hour).Unix()
+	if err := m.state.DB.CompactMonitorAvailability(days, folded, before.Unix(), keepFrom); err != nil {
+		m.state.Logger.Warn("折叠补货状态明细失败: "+err.Error(), "monitor")
+		return
+	}
+	if len(days) > 0 {
+		m.state.Logger.Debug(fmt.Sprintf("补货状态明细已折叠: %d 个日汇总", len(days)), "monitor")
+	}
+}
+
+// RestockStats 补货统计：planCode 为空时返回全部订阅
+func (m *Monitor) RestockStats(planCode string, since, now time.Time) []PlanRestockStats {
+	var subs []*Subscription
+	if planCode != "" {
+		if s := m.FindSubscription(planCode); s != nil {
+			subs = []*Subscription{s}
+		}
+	} else {
+		subs = m.Snapshot()
+	}
+	out := make([]PlanRestockStats, 0, len(subs))
+	for _, s := range subs {
+		out = append(out, PlanRestockStats{
+			PlanCode:    s.PlanCode,
+			ServerName:  s.ServerName,
+			Datacenters: s.timeline.Stats(since, now),
+		})
+	}
+	return out
+}
@@ -7,7 +7,10 @@ import (
 
 	"github.com/google/uuid"
 
+	"github.com/ovh-webui/server/internal/availability"
 	"github.com/ovh-webui/server/internal/catalog"
+	"github.com/ovh-webui/server/internal/db"
+	"github.com/ovh-webui/server/internal/events"
 )
 
 // notification 单次状态变化通知（内部）
@@ -49,6 +52,9 @@ func (m *Monitor) CheckAvailabilityChange(sub *Subscription, traceID string) {
 	}
 	lastStatus := sub.LastStatus
 	monitoredDCs := sub.Datacenters
+	var changes []HistoryEntry             // 本轮新增的历史记录，检查结束后推给前端
+	var transitions []db.MonitorTransition // 本轮的状态变化（含不通知的），追加到 monitor_transitions
+	statusDirty := false
 
 	m.state.Logger.Info(fmt.Sprintf("订阅 %s - 监控数据中心: %v", planCode, monitoredDCs), "monitor")
 	m.state.Logger.Info(fmt.Sprintf("订阅 %s - 当前发现 %d 个配置组合", planCode, len(currentAvailability)), "monitor")
@@ -233,11 +239,17 @@ func (m *Monitor) CheckAvailabilityChange(sub *Subscription, traceID string) {
 					detectedTime:     detectedTime,
 				}
 				if changeType == "available" && ds.oldStatus == "unavailable" {
-					n.durationText = m.calcDuration(sub, dc, configDisplay, []string{"unavailable", "price_check_failed"})
+					n.durationText = m.calcDuration(sub, dc, configDisplay, availability.KindUnavailable, availability.KindPriceCheckFailed)
 				}
 				notifications = append(notifications, n)
 			}
 
+			if !ds.hasOld || ds.oldStatus != actualStatus {
+				if row, ok := recordTransition(sub, dc, configDisplay, actualStatus, time.Now()); ok {
+					transitions = append(transitions, row)
+				}
+				statusDirty = true
+			}
 			lastStatus[ds.statusKey] = actualStatus
 		}
 
@@ -343,6 +355,7 @@ func (m *Monitor) CheckAvailabilityChange(sub *Subscription, traceID string) {
 					Config:     configInfo,
 				}
 				sub.History = append(sub.History, entry)
+				changes = append(changes, entry)
 			}
 		}
 
@@ -367,6 +380,7 @@ func (m *Monitor) CheckAvailabilityChange(sub *Subscription, traceID string) {
 				Config:     configInfo,
 			}
 			sub.History = append(sub.History, entry)
+			changes = append(changes, entry)
 		}
 
 		// 下架聚合通知
@@ -378,7 +392,7 @@ func (m *Monitor) CheckAvailabilityChange(sub *Subscription, traceID string) {
 				dcInfo := map[string]interface{}{"dc": n.dc, "status": n.status}
 				isBecame := n.changeType == "unavailable" && n.hasOld && n.oldStatus != "unavailable"
 				if isBecame {
-					if d := m.calcDuration(sub, n.dc, configDisplay, []string{"available"}); d != "" {
+					if d := m.calcDuration(sub, n.dc, configDisplay, availability.KindAvailable); d != "" {
 						dcInfo["duration_text"] = d
 					}
 				}
@@ -400,6 +414,7 @@ func (m *Monitor) CheckAvailabilityChange(sub *Subscription, traceID string) {
 					Config:     configInfo,
 				}
 				sub.History = append(sub.History, entry)
+				changes = append(changes, entry)
 			}
 		}
 
@@ -412,10 +427,24 @@ func (m *Monitor) CheckAvailabilityChange(sub *Subscription, traceID string) {
 			statusKey := dc + "|" + configKey
 			if _, ok := lastStatus[statusKey]; !ok {
 				lastStatus[statusKey] = status
+				statusDirty = true
 			}
 		}
 	}
 	sub.LastStatus = lastStatus
+	m.persistTransitions(transitions)
+	if statusDirty || len(changes) > 0 {
+		m.dirty.Store(true)
+	}
+
+	if len(changes) > 0 {
+		m.state.Events.Publish(events.TypeMonitor, map[string]interface{}{
+			"op":         "status",
+			"planCode":   planCode,
+			"serverName": sub.ServerName,
+			"changes":    changes,
+		})
+	}
 }
 
 func containsString(list []string, s string) bool {
@@ -435,44 +464,12 @@ func copyMap(m map[string]interface{}) map[string]interface{} {
 	return out
 }
 
-// calcDuration 计算最近一次相反状态到现在的历时
-func (m *Monitor) calcDuration(sub *Subscription, dc, configDisplay string, targetChangeTypes []string) string {
-	var lastTS string
-	for i := len(sub.History) - 1; i >= 0; i-- {
-		entry := sub.History[i]
-		if entry.Datacenter != dc {
-			continue
-		}
-		matched := false
-		for _, t := range targetChangeTypes {
-			if entry.ChangeType == t {
-				matched = true
-				break
-			}
-		}
-		if !matched {
-			continue
-		}
-		if configDisplay != "" && entry.Config != nil {
-			if d, ok := entry.Config["display"].(string); ok && d != configDisplay {
-				continue
-			}
-		}
-		lastTS = entry.Timestamp
-		if lastTS != "" {
-			break
-		}
-	}
-	if lastTS == "" {
+// calcDuration 计算最近一次相反状态到现在的历时（查时间序列的最近变化索引，不再倒序扫描 History）
+func (m *Monitor) calcDuration(sub *Subscription, dc, configDisplay string, targetChangeTypes ...availability.Kind) string {
+	startDT, ok := sub.timeline.LastAt(availability.Key{Datacenter: dc, Config: configDisplay}, targetChangeTypes...)
+	if !ok {
 		return ""
 	}
-	startDT, err := time.Parse(time.RFC3339Nano, lastTS)
-	if err != nil {
-		startDT, err = time.Parse(time.RFC3339, lastTS)
-		if err != nil {
-			return ""
-		}
-	}
 	delta := m.nowBeijing().Sub(startDT)
 	totalSec := int(delta.Seconds())
 	if totalSec < 0 {
@@ -0,0 +1,184 @@
+package monitor
+
+import (
+	"fmt"
+	"strings"
+	"time"
+
+	"github.com/ovh-webui/server/internal/types"
+)
+
+// monitorOrderClaimTTL 自动下单按 (型号, 机房, 配置) 认领的时长：
+// 订阅在实例间交接时新负责方可能基于稍旧的 LastStatus 再次看到“补货”，认领期内不会重复下单
+const monitorOrderClaimTTL = 2 * time.Minute
+
+// 集群模式（state.Cluster != nil）下订阅按 planCode 分片，各实例只检查分到自己的订阅。
+// 订阅表是各实例共享的：
+//   - 配置列（机房、通知开关、自动下单…）由改配置的实例写（UpsertMonitorSubscriptionConfig），
+//   - 状态列（last_status / history）只由负责该订阅的实例写（UpdateMonitorSubscriptionState），
+//
+// 两者互不覆盖；每轮检查前 syncFromDB 把别的实例写入的变化合并进本地注册表。
+
+// markEditedLocked 记录本实例改过配置、待写库的订阅。调用方持有 subsMu 写锁。
+func (m *Monitor) markEditedLocked(planCode string) {
+	if m.state.Cluster == nil {
+		return
+	}
+	m.clusterEdited[planCode] = true
+	delete(m.clusterRemoved, planCode)
+}
+
+// markRemovedLocked 记录本实例删除、待从库里删掉的订阅。调用方持有 subsMu 写锁。
+func (m *Monitor) markRemovedLocked(planCode string) {
+	if m.state.Cluster == nil {
+		return
+	}
+	m.clusterRemoved[planCode] = true
+	delete(m.clusterEdited, planCode)
+}
+
+// saveClusterToDB 集群模式的 SaveToDB：写本实例的配置改动与删除，以及自己负责的订阅状态，不整表覆盖
+func (m *Monitor) saveClusterToDB() {
+	m.subsMu.Lock()
+	edited, removed := m.clusterEdited, m.clusterRemoved
+	m.clusterEdited, m.clusterRemoved = map[string]bool{}, map[string]bool{}
+	var configs, states []types.Subscription
+	for _, s := range m.subscriptions {
+		if edited[s.PlanCode] {
+			configs = append(configs, toDBSub(s))
+		}
+		if m.state.ClusterOwns(s.PlanCode) {
+			states = append(states, toDBSub(s))
+		}
+	}
+	m.subsMu.Unlock()
+
+	failed := 0
+	for pc := range removed {
+		if err := m.state.DB.DeleteMonitorSubscription(pc); err != nil {
+			m.state.Logger.Error("删除监控订阅失败: "+err.Error(), "monitor")
+			m.requeueClusterWrite(pc, false)
+			failed++
+		}
+	}
+	for _, s := range configs {
+		if err := m.state.DB.UpsertMonitorSubscriptionConfig(s); err != nil {
+			m.state.Logger.Error("保存监控订阅配置失败: "+err.Error(), "monitor")
+			m.requeueClusterWrite(s.PlanCode, true)
+			failed++
+		}
+	}
+	for _, s := range states {
+		if err := m.state.DB.UpdateMonitorSubscriptionState(s); err != nil {
+			m.state.Logger.Error("保存监控订阅状态失败: "+err.Error(), "monitor")
+			failed++
+		}
+	}
+	if failed > 0 {
+		m.dirty.Store(true)
+		return
+	}
+	m.state.Logger.Info(fmt.Sprintf("订阅数据已保存（集群模式）: 配置 %d 条, 删除 %d 条, 状态 %d 条",
+		len(configs), len(removed), len(states)), "monitor")
+}
+
+// requeueClusterWrite 写库失败的改动放回待写集合，下次保存重试（期间若又有新改动以新的为准）
+func (m *Monitor) requeueClusterWrite(planCode string, edited bool) {
+	m.subsMu.Lock()
+	defer m.subsMu.Unlock()
+	if m.clusterEdited[planCode] || m.clusterRemoved[planCode] {
+		return
+	}
+	if edited {
+		m.clusterEdited[planCode] = true
+	} else {
+		m.clusterRemoved[planCode] = true
+	}
+}
+
+// syncFromDB 集群模式下每轮检查前与共享订阅表对齐：
+//   - 别的实例新增的订阅加入注册表，删除的（上次同步还在、这次没了）移出；
+//   - 本实例没有待写改动的订阅刷新配置；
+//   - 不归本实例的订阅、以及刚接手的订阅刷新 LastStatus / History，
+//     接手时并从库里重建状态时间序列，沿用前任的基线，不会把持续有货当成补货。
+func (m *Monitor) syncFromDB() {
+	rows, err := m.state.DB.ListMonitorSubscriptions()
+	if err != nil {
+		m.state.Logger.Warn("集群模式同步监控订阅失败: "+err.Error(), "monitor")
+		return
+	}
+	m.subsMu.Lock()
+	seen := make(map[string]bool, len(rows))
+	for _, r := range rows {
+		pc := r.PlanCode
+		if seen[pc] {
+			continue
+		}
+		seen[pc] = true
+		if m.clusterRemoved[pc] {
+			continue
+		}
+		fresh := fromDBSub(r)
+		cur := m.byPlan[pc]
+		if cur == nil {
+			m.putLocked(fresh)
+			continue
+		}
+		if !m.clusterEdited[pc] {
+			cur.Datacenters = fresh.Datacenters
+			cur.NotifyAvailable = fresh.NotifyAvailable
+			cur.NotifyUnavailable = fresh.NotifyUnavailable
+			cur.ServerName = fresh.ServerName
+			cur.AutoOrder = fresh.AutoOrder
+			cur.Quantity = fresh.Quantity
+			cur.AutoOrderAccountID = fresh.AutoOrderAccountID
+		}
+		if !m.state.ClusterOwns(pc) || !m.ownedPlans[pc] {
+			cur.LastStatus = fresh.LastStatus
+			cur.History = fresh.History
+		}
+	}
+	for pc := range m.syncedPlans {
+		if !seen[pc] && !m.clusterEdited[pc] && m.byPlan[pc] != nil {
+			m.removeLocked(pc)
+			m.state.Logger.Info("订阅已在其它实例删除: "+pc, "monitor")
+		}
+	}
+	m.syncedPlans = seen
+
+	owned := make(map[string]bool, len(m.ownedPlans))
+	var takeover []*Subscription
+	for _, s := range m.subscriptions {
+		if !m.state.ClusterOwns(s.PlanCode) {
+			continue
+		}
+		owned[s.PlanCode] = true
+		if !m.ownedPlans[s.PlanCode] {
+			s.timeline = newTimeline()
+			takeover = append(takeover, s)
+		}
+	}
+	m.ownedPlans = owned
+	m.subsMu.Unlock()
+
+	if len(takeover) > 0 {
+		m.loadAvailability(takeover)
+		m.state.Logger.Info(fmt.Sprintf("集群分片变化: 接手 %d 个订阅，当前负责 %d 个", len(takeover), len(owned)), "monitor")
+	}
+}
+
+// ClusterStats 本实例负责的订阅数、订阅总数与累计检查次数（单实例模式下负责全部订阅）
+func (m *Monitor) ClusterStats() (owned, total int, checks int64) {
+	for _, s := range m.Snapshot() {
+		total++
+		if m.state.ClusterOwns(s.PlanCode) {
+			owned++
+		}
+	}
+	return owned, total, m.checksTotal.Load()
+}
+
+// orderClaimKey 自动下单去重键
+func orderClaimKey(planCode, dc string, options []string) string {
+	return "order:" + planCode + "|" + dc + "|" + strings.Join(options, ",")
+}
@@ -11,6 +11,8 @@ import (
 
 	"github.com/google/uuid"
 
+	"github.com/ovh-webui/server/internal/app"
+	"github.com/ovh-webui/server/internal/events"
 	"github.com/ovh-webui/server/internal/telegram"
 )
 
@@ -39,37 +41,35 @@ func (m *Monitor) checkTGOrStop() bool {
 	return true
 }
 
-// CheckNewServers 对应 Python: check_new_servers
-func (m *Monitor) CheckNewServers(currentServerList []map[string]interface{}) {
-	current := map[string]struct{}{}
-	for _, s := range currentServerList {
-		if pc, ok := s["planCode"].(string); ok && pc != "" {
-			current[pc] = struct{}{}
-		}
-	}
-	m.subsMu.Lock()
-	defer m.subsMu.Unlock()
-	if len(m.knownServers) == 0 {
-		m.knownServers = current
-		m.state.Logger.Info(fmt.Sprintf("初始化已知服务器列表: %d 台", len(current)), "monitor")
+// HandleCatalogDiff 目录刷新回调（取代 Python 的 check_new_servers 全量集合比较）：
+// 新上架的型号发上新提醒；已订阅型号的机房 / 选项集合变化发变更提醒。
+// 监控未运行时只记日志不推送，与可用性提醒一致。
+func (m *Monitor) HandleCatalogDiff(diff app.CatalogDiff) {
+	if diff.Baseline || len(diff.Changes) == 0 || !m.Running() {
 		return
 	}
-	newServers := []string{}
-	for k := range current {
-		if _, ok := m.knownServers[k]; !ok {
-			newServers = append(newServers, k)
-		}
-	}
-	if len(newServers) > 0 {
-		for _, code := range newServers {
-			for _, s := range currentServerList {
-				if pc, _ := s["planCode"].(string); pc == code {
-					m.SendNewServerAlert(s)
-				}
+	added := 0
+	for _, c := range diff.Changes {
+		switch c.Kind {
+		case "added":
+			plan, ok := m.state.FindServerPlan(c.PlanCode)
+			if !ok {
+				continue
+			}
+			m.SendNewServerAlert(plan)
+			added++
+		case "changed":
+			if len(c.AddedDatacenters)+len(c.RemovedDatacenters)+len(c.AddedOptions)+len(c.RemovedOptions) == 0 {
+				continue
 			}
+			if m.FindSubscription(c.PlanCode) == nil {
+				continue
+			}
+			m.SendCatalogChangeAlert(c)
 		}
-		m.knownServers = current
-		m.state.Logger.Info(fmt.Sprintf("检测到 %d 台新服务器上架", len(newServers)), "monitor")
+	}
+	if added > 0 {
+		m.state.Logger.Info(fmt.Sprintf("检测到 %d 台新服务器上架", added), "monitor")
 	}
 }
 
@@ -81,14 +81,22 @@ func (m *Monitor) runSubscriptionCheck(sub *Subscription, traceID string) {
 	m.state.Logger.Info("完成处理订阅: "+planCode, "monitor")
 }
 
-// monitorLoop 对应 Python: monitor_loop
-func (m *Monitor) monitorLoop() {
+// stopped stop 已关闭（Stop 被调用）返回 true，不阻塞
+func stopped(stop <-chan struct{}) bool {
+	select {
+	case <-stop:
+		return true
+	default:
+		return false
+	}
+}
+
+// monitorLoop 对应 Python: monitor_loop。
+// stop 为本次 Start 创建的通道：循环只认自己的 stop，快速 Stop/Start 时旧循环不会被新的 running 标志“复活”。
+func (m *Monitor) monitorLoop(stop <-chan struct{}) {
 	m.state.Logger.Info("监控循环已启动", "monitor")
 	for {
-		m.subsMu.Lock()
-		running := m.running
-		m.subsMu.Unlock()
-		if !running {
+		if stopped(stop) {
 			break
 		}
 
@@ -98,16 +106,23 @@ func (m *Monitor) monitorLoop() {
 		}
 
 		m.cleanupExpiredCaches()
+		m.compactAvailability()
+
+		// 集群模式：先合并别的实例对订阅表的改动，再按分片只检查归本实例的订阅
+		if m.state.Cluster != nil {
+			m.syncFromDB()
+		}
 
-		m.subsMu.Lock()
-		count := len(m.subscriptions)
-		subsCopy := make([]*Subscription, count)
-		copy(subsCopy, m.subscriptions)
+		// 写时复制：注册表每次修改都换新切片，这里直接拿当前切片即为快照
+		m.subsMu.RLock()
+		subsCopy := m.subscriptions
 		interval := m.checkInterval
-		m.subsMu.Unlock()
+		m.subsMu.RUnlock()
+		count := len(subsCopy)
 
 		if count > 0 {
 			m.state.Logger.Info(fmt.Sprintf("开始检查 %d 个订阅...", count), "monitor")
+			cycleStart := time.Now()
 			workers := m.maxWorkers
 			if count < workers {
 				workers = count
@@ -117,17 +132,19 @@ func (m *Monitor) monitorLoop() {
 			}
 			sem := make(chan struct{}, workers)
 			var wg sync.WaitGroup
+			checked := 0
 			for _, sub := range subsCopy {
-				m.subsMu.Lock()
-				running := m.running
-				m.subsMu.Unlock()
-				if !running {
+				if stopped(stop) {
 					break
 				}
 				if !m.stillInSubscriptions(sub) {
 					m.state.Logger.Debug(fmt.Sprintf("订阅 %s 在检查期间被删除，跳过", sub.PlanCode), "monitor")
 					continue
 				}
+				if !m.state.ClusterOwns(sub.PlanCode) {
+					continue
+				}
+				checked++
 				traceID := uuid.NewString()
 				wg.Add(1)
 				sem <- struct{}{}
@@ -140,82 +157,96 @@ func (m *Monitor) monitorLoop() {
 								tid, s.PlanCode, r), "monitor")
 						}
 					}()
+					m.busyWorkers.Add(1)
+					defer m.busyWorkers.Add(-1)
 					m.runSubscriptionCheck(s, tid)
 				}(sub, traceID)
 			}
 			wg.Wait()
-			// 持久化 LastStatus / History，避免重启后空基线触发误下单
-			m.SaveToDB()
+			m.lastCycleNanos.Store(int64(time.Since(cycleStart)))
+			m.checksTotal.Add(int64(checked))
+			// 持久化 LastStatus / History，避免重启后空基线触发误下单；本轮没有变化就不整表重写
+			if m.dirty.Swap(false) {
+				m.SaveToDB()
+			}
 		} else {
 			m.state.Logger.Info("当前无订阅，跳过检查", "monitor")
 		}
 
-		// 等下次（可中断 sleep）
-		m.subsMu.Lock()
-		running = m.running
-		m.subsMu.Unlock()
-		if running {
-			m.state.Logger.Info(fmt.Sprintf("等待 %d 秒后进行下次检查...", interval), "monitor")
-			for i := 0; i < interval; i++ {
-				m.subsMu.Lock()
-				running = m.running
-				m.subsMu.Unlock()
-				if !running {
-					break
-				}
-				time.Sleep(time.Second)
-			}
+		// 等下次；Stop 关闭 stop 立即唤醒，不再每秒轮询加锁
+		if stopped(stop) {
+			break
+		}
+		m.state.Logger.Info(fmt.Sprintf("等待 %d 秒后进行下次检查...", interval), "monitor")
+		timer := time.NewTimer(time.Duration(interval) * time.Second)
+		select {
+		case <-stop:
+			timer.Stop()
+		case <-timer.C:
 		}
 	}
 	m.state.Logger.Info("监控循环已停止", "monitor")
 }
 
+// stillInSubscriptions 订阅仍在注册表中（按 planCode 索引 + 指针比较，删除后重新添加的同名订阅算新订阅）
 func (m *Monitor) stillInSubscriptions(sub *Subscription) bool {
-	m.subsMu.Lock()
-	defer m.subsMu.Unlock()
-	for _, s := range m.subscriptions {
-		if s == sub {
-			return true
-		}
-	}
-	return false
+	m.subsMu.RLock()
+	defer m.subsMu.RUnlock()
+	return m.byPlan[sub.PlanCode] == sub
 }
 
 // Start 对应 Python: start
 func (m *Monitor) Start() bool {
-	m.subsMu.Lock()
-	if m.running {
-		m.subsMu.Unlock()
+	m.runMu.Lock()
+	if m.running.Load() {
+		m.runMu.Unlock()
 		m.state.Logger.Warn("监控已在运行中", "monitor")
 		return false
 	}
-	m.running = true
-	m.subsMu.Unlock()
+	stop := make(chan struct{})
+	m.stopCh = stop
+	m.running.Store(true)
+	m.runMu.Unlock()
 	// 重置 TG 检查时间戳,保证启动后第一轮一定 verify
 	m.tgCheckMu.Lock()
 	m.lastTGCheck = time.Time{}
 	m.tgCheckMu.Unlock()
-	go m.monitorLoop()
+	go m.monitorLoop(stop)
 	m.state.Logger.Info(fmt.Sprintf("服务器监控已启动 (检查间隔: %d秒)", m.checkInterval), "monitor")
 	m.state.MonitorRunning = true
+	m.publishRunning(true)
 	return true
 }
 
 // Stop 对应 Python: stop
 func (m *Monitor) Stop() bool {
-	m.subsMu.Lock()
-	if !m.running {
-		m.subsMu.Unlock()
+	m.runMu.Lock()
+	if !m.running.Load() {
+		m.runMu.Unlock()
 		m.state.Logger.Warn("监控未运行", "monitor")
 		return false
 	}
-	m.running = false
-	m.subsMu.Unlock()
+	m.running.Store(false)
+	close(m.stopCh)
+	m.stopCh = nil
+	m.runMu.Unlock()
 	m.state.Logger.Info("正在停止服务器监控...", "monitor")
 	m.state.MonitorRunning = false
+	m.publishRunning(false)
 	return true
 }
 
+// WorkerStats 监控 worker 占用：正在检查的订阅数、并发上限、上一轮检查耗时
+func (m *Monitor) WorkerStats() (busy, max int, lastCycle time.Duration) {
+	return int(m.busyWorkers.Load()), m.maxWorkers, time.Duration(m.lastCycleNanos.Load())
+}
+
+// publishRunning 推送监控启停（stats 里的 monitorRunning 随之更新）
+func (m *Monitor) publishRunning(running bool) {
+	m.state.Events.Publish(events.TypeMonitor, map[string]interface{}{"op": "running", "running": running})
+	m.state.TouchStats()
+}
+
 // batchOrder 对应 Python: 监控->下单批量调用 quick-order。
 // accountID:auto_order 账户;空时 batchOrder 不应该被调到(check.go 的 guard 已挡住),
 // 这里再做一次防御性检查。
@@ -254,6 +285,11 @@ func (m *Monitor) batchOrder(planCode string, configInfo map[string]interface{},
 	}
 	tasks := make([]orderTask, 0, len(targets)*quantity)
 	for _, n := range targets {
+		// 集群模式：同一 (型号, 机房, 配置) 短时间内只有一个实例下单
+		if !m.state.ClusterClaim(orderClaimKey(planCode, n.dc, options), monitorOrderClaimTTL) {
+			m.state.Logger.Info(fmt.Sprintf("[monitor->order] %s@%s 已由其它实例下单，跳过", planCode, n.dc), "monitor")
+			continue
+		}
 		for i := 0; i < quantity; i++ {
 			tasks = append(tasks, orderTask{dc: n.dc, idx: i})
 		}
@@ -9,6 +9,7 @@ import (
 	"github.com/google/uuid"
 
 	"github.com/ovh-webui/server/internal/telegram"
+	"github.com/ovh-webui/server/internal/types"
 )
 
 var dcDisplayMapCN = map[string]string{
@@ -396,10 +397,31 @@ func (m *Monitor) SendAvailabilityAlert(planCode, datacenter, status, changeType
 }
 
 // SendNewServerAlert 对应 Python: send_new_server_alert
-func (m *Monitor) SendNewServerAlert(server map[string]interface{}) {
-	msg := fmt.Sprintf("🆕 新服务器上架通知！\n\n型号: %v\n名称: %v\nCPU: %v\n内存: %v\n存储: %v\n带宽: %v\n时间: %s\n\n💡 快去查看详情！",
-		server["planCode"], server["name"], server["cpu"], server["memory"], server["storage"], server["bandwidth"],
+func (m *Monitor) SendNewServerAlert(plan types.ServerPlan) {
+	msg := fmt.Sprintf("🆕 新服务器上架通知！\n\n型号: %s\n名称: %s\nCPU: %s\n内存: %s\n存储: %s\n带宽: %s\n时间: %s\n\n💡 快去查看详情！",
+		plan.PlanCode, plan.Name, plan.CPU, plan.Memory, plan.Storage, plan.Bandwidth,
 		m.nowBeijing().Format("2006-01-02 15:04:05"))
 	telegram.SendMessage(m.state, msg, nil)
-	m.state.Logger.Info(fmt.Sprintf("发送新服务器提醒: %v", server["planCode"]), "monitor")
+	m.state.Logger.Info("发送新服务器提醒: "+plan.PlanCode, "monitor")
+}
+
+// SendCatalogChangeAlert 已订阅型号的机房 / 选项集合变化提醒（只列增删项）
+func (m *Monitor) SendCatalogChangeAlert(c types.CatalogChange) {
+	var msg strings.Builder
+	msg.WriteString("🔧 订阅型号配置变化\n\n型号: " + c.PlanCode)
+	if c.Name != "" {
+		msg.WriteString("\n名称: " + c.Name)
+	}
+	line := func(label string, items []string) {
+		if len(items) > 0 {
+			msg.WriteString("\n" + label + strings.Join(items, ", "))
+		}
+	}
+	line("➕ 新增机房: ", c.AddedDatacenters)
+	line("➖ 移除机房: ", c.RemovedDatacenters)
+	line("➕ 新增选项: ", c.AddedOptions)
+	line("➖ 移除选项: ", c.RemovedOptions)
+	msg.WriteString("\n时间: " + m.nowBeijing().Format("2006-01-02 15:04:05"))
+	telegram.SendMessage(m.state, msg.String(), nil)
+	m.state.Logger.Info("发送型号配置变化提醒: "+c.PlanCode, "monitor")
 }
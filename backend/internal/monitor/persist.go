@@ -84,7 +84,7 @@ func fromDBSub(s types.Subscription) *Subscription {
 	}
 }
 
-// LoadFromDB 启动时从 SQLite 加载订阅 + known_servers
+// LoadFromDB 启动时从 SQLite 加载订阅（已知服务器集合由 catalog 增量比较取代，不再单独持久化）
 func (m *Monitor) LoadFromDB() {
 	subs, err := m.state.DB.ListMonitorSubscriptions()
 	if err != nil {
@@ -92,43 +92,48 @@ func (m *Monitor) LoadFromDB() {
 		m.state.Logger.Error("加载监控订阅失败（不会写回空列表）: "+err.Error(), "monitor")
 		subs = nil
 	}
-	known := []string{}
-	if _, err := m.state.DB.GetKV("monitor_known_servers", &known); err != nil {
-		m.state.Logger.Warn("加载已知服务器失败: "+err.Error(), "monitor")
-	}
 
-	m.subsMu.Lock()
-	defer m.subsMu.Unlock()
-	m.subscriptions = make([]*Subscription, 0, len(subs))
+	list := make([]*Subscription, 0, len(subs))
+	index := make(map[string]*Subscription, len(subs))
 	for _, s := range subs {
-		m.subscriptions = append(m.subscriptions, fromDBSub(s))
-	}
-	knownSet := map[string]struct{}{}
-	for _, k := range known {
-		knownSet[k] = struct{}{}
+		sub := fromDBSub(s)
+		if _, dup := index[sub.PlanCode]; dup {
+			continue
+		}
+		normalizeSub(sub)
+		list = append(list, sub)
+		index[sub.PlanCode] = sub
+	}
+	m.loadAvailability(list)
+
+	m.subsMu.Lock()
+	m.subscriptions = list
+	m.byPlan = index
+	m.syncedPlans = make(map[string]bool, len(index))
+	for pc := range index {
+		m.syncedPlans[pc] = true
 	}
-	m.knownServers = knownSet
 	// 全局强制 5 秒
 	m.checkInterval = 5
+	m.subsMu.Unlock()
 	m.state.Logger.Info("检查间隔已强制设置为: 5秒（全局固定值）", "monitor")
-	m.state.Logger.Info(fmt.Sprintf("已加载订阅: %d 条", len(m.subscriptions)), "monitor")
+	m.state.Logger.Info(fmt.Sprintf("已加载订阅: %d 条", len(list)), "monitor")
 	// TG 一键下单 UUID 在 LoadFromDB 返回后由调用方 LoadMessageUUIDCacheFromDB()
 }
 
-// SaveToDB 把订阅 + known_servers 写回 SQLite
+// SaveToDB 把订阅写回 SQLite
 func (m *Monitor) SaveToDB() {
-	m.subsMu.Lock()
+	if m.state.Cluster != nil {
+		m.saveClusterToDB()
+		return
+	}
+	m.subsMu.RLock()
 	subs := make([]types.Subscription, 0, len(m.subscriptions))
 	for _, s := range m.subscriptions {
 		subs = append(subs, toDBSub(s))
 	}
-	known := make([]string, 0, len(m.knownServers))
-	for k := range m.knownServers {
-		known = append(known, k)
-	}
-	m.checkInterval = 5
 	n := len(subs)
-	m.subsMu.Unlock()
+	m.subsMu.RUnlock()
 
 	// Replace 会先清空表再写入；允许空列表（用户主动 clear），但打醒目日志便于排查
 	if n == 0 {
@@ -138,10 +143,6 @@ func (m *Monitor) SaveToDB() {
 		m.state.Logger.Error("保存监控订阅失败: "+err.Error(), "monitor")
 		return
 	}
-	if err := m.state.DB.SetKV("monitor_known_servers", known); err != nil {
-		m.state.Logger.Error("保存已知服务器失败: "+err.Error(), "monitor")
-		return
-	}
 	m.state.Logger.Info(fmt.Sprintf("订阅数据已保存: %d 条（检查间隔固定为5秒）", n), "monitor")
 }
 
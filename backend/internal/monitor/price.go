@@ -8,7 +8,8 @@ import (
 	"github.com/ovh-webui/server/internal/price"
 )
 
-// resolvePriceAccount 询价账户：优先订阅 auto-order 账户，否则默认账户。
+// resolvePriceAccount 询价账户（决定 subsidiary）：优先订阅 auto-order 账户，否则默认账户。
+// 实际调 OVH 的凭据由 price.GetInternal 按额度分流；下单仍固定用订阅账户。
 func (m *Monitor) resolvePriceAccount(sub *Subscription) string {
 	if sub != nil && sub.AutoOrderAccountID != "" {
 		return sub.AutoOrderAccountID
@@ -5,6 +5,7 @@ import (
 	"time"
 
 	"github.com/ovh-webui/server/internal/db"
+	"github.com/ovh-webui/server/internal/ttlcache"
 )
 
 // AddSubscription 对应 Python: add_subscription
@@ -16,31 +17,28 @@ func (m *Monitor) AddSubscription(planCode string, datacenters []string, notifyA
 	m.subsMu.Lock()
 	defer m.subsMu.Unlock()
 
-	for _, s := range m.subscriptions {
-		if s.PlanCode == planCode {
-			m.state.Logger.Warn(fmt.Sprintf("订阅已存在: %s，将更新配置（不会重置状态，避免重复通知）", planCode), "monitor")
-			if datacenters == nil {
-				datacenters = []string{}
-			}
-			s.Datacenters = datacenters
-			s.NotifyAvailable = notifyAvailable
-			s.NotifyUnavailable = notifyUnavailable
-			s.AutoOrder = autoOrder
-			if autoOrder {
-				if quantity < 1 {
-					quantity = 1
-				}
-				s.Quantity = quantity
-			} else {
-				s.Quantity = 0
-			}
-			s.ServerName = serverName
-			s.AutoOrderAccountID = autoOrderAccountID
-			if s.History == nil {
-				s.History = []HistoryEntry{}
+	if s, ok := m.byPlan[planCode]; ok {
+		m.state.Logger.Warn(fmt.Sprintf("订阅已存在: %s，将更新配置（不会重置状态，避免重复通知）", planCode), "monitor")
+		if datacenters == nil {
+			datacenters = []string{}
+		}
+		s.Datacenters = datacenters
+		s.NotifyAvailable = notifyAvailable
+		s.NotifyUnavailable = notifyUnavailable
+		s.AutoOrder = autoOrder
+		if autoOrder {
+			if quantity < 1 {
+				quantity = 1
 			}
-			return
+			s.Quantity = quantity
+		} else {
+			s.Quantity = 0
 		}
+		s.ServerName = serverName
+		s.AutoOrderAccountID = autoOrderAccountID
+		normalizeSub(s)
+		m.markEditedLocked(planCode)
+		return
 	}
 
 	if datacenters == nil {
@@ -72,7 +70,8 @@ func (m *Monitor) AddSubscription(planCode string, datacenters []string, notifyA
 	if serverName != "" {
 		sub.ServerName = serverName
 	}
-	m.subscriptions = append(m.subscriptions, sub)
+	m.putLocked(sub)
+	m.markEditedLocked(planCode)
 	displayName := planCode
 	if serverName != "" {
 		displayName = planCode + " (" + serverName + ")"
@@ -88,7 +87,19 @@ func (m *Monitor) AddSubscription(planCode string, datacenters []string, notifyA
 func (m *Monitor) RemoveSubscription(planCode string) bool {
 	m.subsMu.Lock()
 	defer m.subsMu.Unlock()
-	original := len(m.subscriptions)
+	if _, ok := m.byPlan[planCode]; !ok {
+		return false
+	}
+	m.removeLocked(planCode)
+	m.markRemovedLocked(planCode)
+	m.state.Logger.Info("删除订阅: "+planCode, "monitor")
+	return true
+}
+
+// removeLocked 从注册表移除订阅。调用方持有 subsMu 写锁。
+func (m *Monitor) removeLocked(planCode string) {
+	delete(m.byPlan, planCode)
+	// 写时复制：新切片替换旧切片，循环里拿到的旧快照不受影响
 	kept := make([]*Subscription, 0, len(m.subscriptions))
 	for _, s := range m.subscriptions {
 		if s.PlanCode != planCode {
@@ -96,11 +107,6 @@ func (m *Monitor) RemoveSubscription(planCode string) bool {
 		}
 	}
 	m.subscriptions = kept
-	if len(m.subscriptions) < original {
-		m.state.Logger.Info("删除订阅: "+planCode, "monitor")
-		return true
-	}
-	return false
 }
 
 // ClearSubscriptions 对应 Python: clear_subscriptions
@@ -108,65 +114,56 @@ func (m *Monitor) ClearSubscriptions() int {
 	m.subsMu.Lock()
 	defer m.subsMu.Unlock()
 	count := len(m.subscriptions)
+	for _, s := range m.subscriptions {
+		m.markRemovedLocked(s.PlanCode)
+	}
 	m.subscriptions = []*Subscription{}
+	m.byPlan = map[string]*Subscription{}
 	m.state.Logger.Info(fmt.Sprintf("清空所有订阅 (%d 项)", count), "monitor")
 	return count
 }
 
 // FindSubscription 按 planCode 查找
 func (m *Monitor) FindSubscription(planCode string) *Subscription {
-	m.subsMu.Lock()
-	defer m.subsMu.Unlock()
-	for _, s := range m.subscriptions {
-		if s.PlanCode == planCode {
-			return s
-		}
-	}
-	return nil
+	m.subsMu.RLock()
+	defer m.subsMu.RUnlock()
+	return m.byPlan[planCode]
 }
 
-// SetKnownServers 用于从持久化恢复
-func (m *Monitor) SetKnownServers(set map[string]struct{}) {
-	m.subsMu.Lock()
-	m.knownServers = set
-	m.subsMu.Unlock()
+// putLocked 新订阅写入注册表（追加到列表尾并建索引）。调用方持有 subsMu 写锁。
+// 追加总是分配新切片，已发出去的快照不会看到后续写入。
+func (m *Monitor) putLocked(sub *Subscription) {
+	normalizeSub(sub)
+	next := make([]*Subscription, len(m.subscriptions), len(m.subscriptions)+1)
+	copy(next, m.subscriptions)
+	m.subscriptions = append(next, sub)
+	m.byPlan[sub.PlanCode] = sub
 }
 
-// KnownServers 返回当前已知服务器集合（用于持久化）
-func (m *Monitor) KnownServers() []string {
-	m.subsMu.Lock()
-	defer m.subsMu.Unlock()
-	out := make([]string, 0, len(m.knownServers))
-	for k := range m.knownServers {
-		out = append(out, k)
+// normalizeSub 保证 slice / map 字段不为 nil（JSON 输出给前端），并建好状态时间序列
+func normalizeSub(s *Subscription) {
+	if s.History == nil {
+		s.History = []HistoryEntry{}
+	}
+	if s.Datacenters == nil {
+		s.Datacenters = []string{}
+	}
+	if s.LastStatus == nil {
+		s.LastStatus = map[string]string{}
+	}
+	if s.timeline == nil {
+		s.timeline = newTimeline()
 	}
-	return out
 }
 
 // MessageUUIDCacheLookup 用于 webhook 回调时取回完整配置。
-// 先查内存，再查 SQLite（进程重启后按钮仍可用）。
+// 先查内存，再查 SQLite（进程重启或被 LRU 淘汰后按钮仍可用）。
 func (m *Monitor) MessageUUIDCacheLookup(id string) *CachedMessage {
-	ttlSec := int64(m.messageUUIDCacheTTL.Seconds())
-	now := time.Now().Unix()
-
 	// 注意：lookup 允许读取未消费配置；是否已 used 由 webhook 层单独判断。
 	// 不要在这里因 used_at 返回 nil，否则「先 consume 再 lookup」或并发路径会丢配置。
-
-	m.cacheLock.Lock()
-	if cm, ok := m.messageUUIDCache[id]; ok {
-		if now-int64(cm.Timestamp) < ttlSec {
-			m.cacheLock.Unlock()
-			return cm
-		}
-		delete(m.messageUUIDCache, id)
-		m.cacheLock.Unlock()
-		m.state.Logger.Warn("UUID缓存已过期: "+id, "telegram")
-		if m.state.DB != nil {
-			_ = m.state.DB.DeleteTelegramButton(id)
-		}
-		return nil
+	if cm, ok := m.messageUUIDCache.Get(id); ok {
+		return cm
 	}
-	m.cacheLock.Unlock()
 
 	// 内存未命中 → SQLite（部署/重启后恢复）
 	if m.state.DB == nil {
@@ -180,7 +177,7 @@ func (m *Monitor) MessageUUIDCacheLookup(id string) *CachedMessage {
 	if !ok {
 		return nil
 	}
-	if now-int64(row.CreatedAt) >= ttlSec {
+	if time.Now().Unix()-int64(row.CreatedAt) >= int64(m.messageUUIDCacheTTL.Seconds()) {
 		m.state.Logger.Warn("UUID持久化缓存已过期: "+id, "telegram")
 		_ = m.state.DB.DeleteTelegramButton(id)
 		return nil
@@ -192,10 +189,8 @@ func (m *Monitor) MessageUUIDCacheLookup(id string) *CachedMessage {
 		ConfigInfo: db.ParseTelegramButtonConfigInfo(row.ConfigInfo),
 		Timestamp:  row.CreatedAt,
 	}
-	// 回灌内存，避免每次点按钮都查库
-	m.cacheLock.Lock()
-	m.messageUUIDCache[id] = cm
-	m.cacheLock.Unlock()
+	// 回灌内存，避免每次点按钮都查库；过期时间仍按原创建时间算
+	m.messageUUIDCache.SetAt(id, cm, unixTime(row.CreatedAt))
 	m.state.Logger.Info("✅ 从 SQLite 恢复 UUID 按钮配置: "+id+" → "+cm.PlanCode+"@"+cm.Datacenter, "telegram")
 	return cm
 }
@@ -205,79 +200,64 @@ func (m *Monitor) InvalidateMessageUUID(id string) {
 	if id == "" {
 		return
 	}
-	m.cacheLock.Lock()
-	delete(m.messageUUIDCache, id)
-	m.cacheLock.Unlock()
+	m.messageUUIDCache.Delete(id)
 }
 
 // OptionsCacheLookup 兼容旧机制
 func (m *Monitor) OptionsCacheLookup(key string) []string {
-	m.cacheLock.Lock()
-	defer m.cacheLock.Unlock()
-	if c, ok := m.optionsCache[key]; ok {
-		if time.Now().Unix()-int64(c.Timestamp) < int64(m.optionsCacheTTL.Seconds()) {
-			return c.Options
-		}
-		delete(m.optionsCache, key)
-		m.state.Logger.Warn("options缓存已过期: "+key, "telegram")
+	if c, ok := m.optionsCache.Get(key); ok {
+		return c.Options
 	}
 	return nil
 }
 
+// CacheStats 消息 UUID 缓存与 options 缓存的条目数与命中 / 淘汰计数（运行指标用）
+func (m *Monitor) CacheStats() (uuids, options ttlcache.Stats) {
+	return m.messageUUIDCache.Stats(), m.optionsCache.Stats()
+}
+
 // cleanupExpiredCaches 对应 Python: _cleanup_expired_caches
+// 内存缓存只弹出已到期条目；SQLite 里的过期按钮攒够一批或隔一段时间才删一次
+// （lookup 本身会校验 created_at，过期行晚删不影响正确性）。
 func (m *Monitor) cleanupExpiredCaches() {
-	now := time.Now().Unix()
-	ttlUUID := int64(m.messageUUIDCacheTTL.Seconds())
-	ttlOpts := int64(m.optionsCacheTTL.Seconds())
-	m.cacheLock.Lock()
-	expUUIDs := []string{}
-	for k, v := range m.messageUUIDCache {
-		if now-int64(v.Timestamp) >= ttlUUID {
-			expUUIDs = append(expUUIDs, k)
-		}
-	}
-	for _, k := range expUUIDs {
-		delete(m.messageUUIDCache, k)
-	}
-	expOpts := []string{}
-	for k, v := range m.optionsCache {
-		if now-int64(v.Timestamp) >= ttlOpts {
-			expOpts = append(expOpts, k)
-		}
-	}
-	for _, k := range expOpts {
-		delete(m.optionsCache, k)
-	}
-	m.cacheLock.Unlock()
+	now := time.Now()
+	expUUIDs := m.messageUUIDCache.Expire(now)
+	expOpts := m.optionsCache.Expire(now)
 
-	// 同步清理 SQLite 过期按钮
-	if m.state.DB != nil {
-		if n, err := m.state.DB.DeleteExpiredTelegramButtons(float64(now - ttlUUID)); err != nil {
+	pending := m.pendingButtonExpiry.Add(int64(expUUIDs))
+	if m.state.DB != nil && (pending >= buttonSweepBatch || now.Unix()-m.lastButtonSweep.Load() >= int64(buttonSweepInterval.Seconds())) {
+		m.pendingButtonExpiry.Store(0)
+		m.lastButtonSweep.Store(now.Unix())
+		before := float64(now.Add(-m.messageUUIDCacheTTL).Unix())
+		if n, err := m.state.DB.DeleteExpiredTelegramButtons(before); err != nil {
 			m.state.Logger.Warn("清理过期 TG 按钮失败: "+err.Error(), "monitor")
 		} else if n > 0 {
 			m.state.Logger.Debug(fmt.Sprintf("清理过期 TG 按钮: %d 条", n), "monitor")
 		}
 	}
-	if len(expUUIDs) > 0 || len(expOpts) > 0 {
-		m.state.Logger.Debug(fmt.Sprintf("清理过期缓存: UUID=%d个, Options=%d个", len(expUUIDs), len(expOpts)), "monitor")
+	if expUUIDs > 0 || expOpts > 0 {
+		m.state.Logger.Debug(fmt.Sprintf("清理过期缓存: UUID=%d个, Options=%d个", expUUIDs, expOpts), "monitor")
 	}
 }
 
+// unixTime float 秒 → time.Time
+func unixTime(sec float64) time.Time {
+	return time.Unix(0, int64(sec*float64(time.Second)))
+}
+
 // AddMessageUUID 缓存按钮对应的配置（内存 + SQLite 双写）
 func (m *Monitor) AddMessageUUID(id, planCode, datacenter string, options []string, configInfo map[string]interface{}) {
 	ts := float64(time.Now().Unix())
 	if options == nil {
 		options = []string{}
 	}
-	m.cacheLock.Lock()
-	m.messageUUIDCache[id] = &CachedMessage{
+	m.messageUUIDCache.Set(id, &CachedMessage{
 		PlanCode:   planCode,
 		Datacenter: datacenter,
 		Options:    append([]string{}, options...),
 		ConfigInfo: configInfo,
 		Timestamp:  ts,
-	}
-	m.cacheLock.Unlock()
+	})
 
 	if m.state.DB != nil {
 		if err := m.state.DB.UpsertTelegramButton(id, planCode, datacenter, options, configInfo, ts); err != nil {
@@ -297,18 +277,16 @@ func (m *Monitor) LoadMessageUUIDCacheFromDB() {
 		m.state.Logger.Warn("加载 TG 一键下单按钮缓存失败: "+err.Error(), "monitor")
 		return
 	}
-	m.cacheLock.Lock()
 	for _, row := range rows {
-		m.messageUUIDCache[row.ID] = &CachedMessage{
+		m.messageUUIDCache.SetAt(row.ID, &CachedMessage{
 			PlanCode:   row.PlanCode,
 			Datacenter: row.Datacenter,
 			Options:    db.ParseTelegramButtonOptions(row.Options),
 			ConfigInfo: db.ParseTelegramButtonConfigInfo(row.ConfigInfo),
 			Timestamp:  row.CreatedAt,
-		}
+		}, unixTime(row.CreatedAt))
 	}
 	n := len(rows)
-	m.cacheLock.Unlock()
 	if n > 0 {
 		m.state.Logger.Info(fmt.Sprintf("已从 SQLite 回灌 %d 个 TG 一键下单按钮", n), "monitor")
 	}
@@ -2,38 +2,75 @@ package monitor
 
 import (
 	"sync"
+	"sync/atomic"
 	"time"
 
 	"github.com/ovh-webui/server/internal/app"
+	"github.com/ovh-webui/server/internal/availability"
+	"github.com/ovh-webui/server/internal/ttlcache"
+)
+
+const (
+	// messageUUIDCacheCap / optionsCacheCap 内存缓存条目上限
+	messageUUIDCacheCap = 10000
+	optionsCacheCap     = 1000
+	// SQLite 过期按钮删除：累计到期超过 buttonSweepBatch 个或距上次超过 buttonSweepInterval 才执行
+	buttonSweepBatch    = 200
+	buttonSweepInterval = 10 * time.Minute
 )
 
 // Monitor 对应 Python: ServerMonitor 类
 type Monitor struct {
 	state *app.State
 
-	subsMu        sync.Mutex
+	// 订阅注册表：subscriptions 保持添加顺序，byPlan 按 planCode 索引（planCode 即订阅唯一键）。
+	// 读（HTTP 查询、循环取快照、存在性检查）走读锁。
+	subsMu        sync.RWMutex
 	subscriptions []*Subscription
-	knownServers  map[string]struct{}
+	byPlan        map[string]*Subscription
 
-	running       bool
+	// running 无锁读；启停由 runMu 串行化，stopCh 在 Stop 时关闭以立即唤醒等待中的循环
+	running       atomic.Bool
+	runMu         sync.Mutex
+	stopCh        chan struct{}
 	checkInterval int // 全局固定 5 秒
 	thread        *sync.WaitGroup
 	maxWorkers    int
 
 	// Options 缓存（旧机制，兼容性保留）
-	optionsCache    map[string]*CachedOptions
-	optionsCacheTTL time.Duration
+	optionsCache *ttlcache.Cache[string, *CachedOptions]
 
-	// UUID 消息缓存
-	messageUUIDCache    map[string]*CachedMessage
+	// UUID 消息缓存（一键下单按钮 → 配置）。内存按 TTL 过期堆清理、超过上限 LRU 淘汰，
+	// 被淘汰的按钮仍可从 SQLite 查回
+	messageUUIDCache    *ttlcache.Cache[string, *CachedMessage]
 	messageUUIDCacheTTL time.Duration
 
-	cacheLock sync.Mutex
+	// SQLite 过期按钮惰性批量删除：累计到期数与上次删除时间（unix 秒）
+	pendingButtonExpiry atomic.Int64
+	lastButtonSweep     atomic.Int64
 
 	// TG 健康检查时间戳:loop 每 5 分钟 verify 一次,失败就自停。
 	// 不放 subsMu 下,简单用单独的锁。
 	tgCheckMu   sync.Mutex
 	lastTGCheck time.Time
+
+	// 运行指标（/api/system/metrics 采样）：正在检查订阅的 worker 数、上一轮检查耗时（纳秒）
+	busyWorkers    atomic.Int32
+	lastCycleNanos atomic.Int64
+
+	// dirty 订阅状态（LastStatus / History）自上次落库后有变化；循环只在有变化时写回 SQLite
+	dirty atomic.Bool
+	// 补货状态明细上次折叠时间（unix 秒）
+	lastAvailabilityCompact atomic.Int64
+
+	// 集群模式（见 cluster.go，均受 subsMu 保护）：本实例改过配置 / 删除、尚未写库的订阅，
+	// 上次从库同步到的订阅，上次同步时归本实例负责的订阅
+	clusterEdited  map[string]bool
+	clusterRemoved map[string]bool
+	syncedPlans    map[string]bool
+	ownedPlans     map[string]bool
+	// 累计检查的订阅次数（集群模式下只含本实例负责的；/api/cluster/status 按差值算吞吐）
+	checksTotal atomic.Int64
 }
 
 type CachedOptions struct {
@@ -62,6 +99,9 @@ type Subscription struct {
 	AutoOrder          bool                   `json:"autoOrder,omitempty"`
 	Quantity           int                    `json:"quantity,omitempty"`
 	AutoOrderAccountID string                 `json:"autoOrderAccountId,omitempty"` // 空 = 触发时只通知不下单
+
+	// timeline 各 (机房, 配置) 的状态变化序列：历时计算与补货统计用，单独落 monitor_transitions
+	timeline *availability.Timeline
 }
 
 // HistoryEntry 历史记录条目
@@ -79,70 +119,49 @@ func New(state *app.State) *Monitor {
 	return &Monitor{
 		state:               state,
 		subscriptions:       []*Subscription{},
-		knownServers:        map[string]struct{}{},
+		byPlan:              map[string]*Subscription{},
 		checkInterval:       5,
 		maxWorkers:          4,
-		optionsCache:        map[string]*CachedOptions{},
-		optionsCacheTTL:     24 * time.Hour,
-		messageUUIDCache:    map[string]*CachedMessage{},
+		optionsCache:        ttlcache.New[string, *CachedOptions](24*time.Hour, optionsCacheCap),
+		messageUUIDCache:    ttlcache.New[string, *CachedMessage](24*time.Hour, messageUUIDCacheCap),
 		messageUUIDCacheTTL: 24 * time.Hour,
+		clusterEdited:       map[string]bool{},
+		clusterRemoved:      map[string]bool{},
+		syncedPlans:         map[string]bool{},
+		ownedPlans:          map[string]bool{},
 	}
 }
 
-// Snapshot 返回订阅列表副本（JSON 用），永不返回 nil
+// Snapshot 返回订阅列表副本（JSON 用），永不返回 nil。
+// sub.History、sub.Datacenters、sub.LastStatus 在写入注册表时（putLocked）已保证不为 nil，
+// 前端调 .length 不会报错；这里只读，可与其它读者并发。
 func (m *Monitor) Snapshot() []*Subscription {
-	m.subsMu.Lock()
-	defer m.subsMu.Unlock()
-	cp := make([]*Subscription, 0, len(m.subscriptions))
-	for _, s := range m.subscriptions {
-		// 保证 sub.History、sub.Datacenters、sub.LastStatus 均不为 nil
-		if s.History == nil {
-			s.History = []HistoryEntry{}
-		}
-		if s.Datacenters == nil {
-			s.Datacenters = []string{}
-		}
-		if s.LastStatus == nil {
-			s.LastStatus = map[string]string{}
-		}
-		cp = append(cp, s)
-	}
+	m.subsMu.RLock()
+	defer m.subsMu.RUnlock()
+	cp := make([]*Subscription, len(m.subscriptions))
+	copy(cp, m.subscriptions)
 	return cp
 }
 
 // Status 对应 Python: get_status
 func (m *Monitor) Status() map[string]interface{} {
-	m.subsMu.Lock()
-	defer m.subsMu.Unlock()
-	subs := make([]*Subscription, len(m.subscriptions))
-	for i, s := range m.subscriptions {
-		// 与 Snapshot 保持一致：保证 sub 内 slice/map 字段不是 nil，
-		// 避免前端调 .length 时报错
-		if s.History == nil {
-			s.History = []HistoryEntry{}
-		}
-		if s.Datacenters == nil {
-			s.Datacenters = []string{}
-		}
-		if s.LastStatus == nil {
-			s.LastStatus = map[string]string{}
-		}
-		subs[i] = s
-	}
+	knownServers := m.state.ServerPlanCount()
+	subs := m.Snapshot()
+	m.subsMu.RLock()
+	interval := m.checkInterval
+	m.subsMu.RUnlock()
 	return map[string]interface{}{
-		"running":             m.running,
-		"subscriptions_count": len(m.subscriptions),
-		"known_servers_count": len(m.knownServers),
-		"check_interval":      m.checkInterval,
+		"running":             m.running.Load(),
+		"subscriptions_count": len(subs),
+		"known_servers_count": knownServers,
+		"check_interval":      interval,
 		"subscriptions":       subs,
 	}
 }
 
 // Running 监控是否在运行
 func (m *Monitor) Running() bool {
-	m.subsMu.Lock()
-	defer m.subsMu.Unlock()
-	return m.running
+	return m.running.Load()
 }
 
 // SetCheckInterval 已禁用，全局固定 5
@@ -162,8 +181,9 @@ func (m *Monitor) nowBeijing() time.Time {
 	return time.Now().In(loc)
 }
 
+// limitHistorySize 只保留最近 maxSize 条；复制到新数组，被裁掉的旧条目（及其 Config）可以回收
 func (m *Monitor) limitHistorySize(sub *Subscription, maxSize int) {
 	if len(sub.History) > maxSize {
-		sub.History = sub.History[len(sub.History)-maxSize:]
+		sub.History = append([]HistoryEntry(nil), sub.History[len(sub.History)-maxSize:]...)
 	}
 }
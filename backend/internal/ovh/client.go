@@ -2,7 +2,10 @@ package ovh
 
 import (
 	"fmt"
+	"net/http"
+	"sort"
 	"sync"
+	"time"
 
 	"github.com/ovh/go-ovh/ovh"
 
@@ -15,25 +18,43 @@ import (
 //   id == "x" → 精确找 x
 type AccountLookup func(id string) (types.OVHAccount, bool)
 
+// AccountLister 由 State 提供,返回全部账户副本(只读查询按 endpoint 分流用)
+type AccountLister func() []types.OVHAccount
+
 // Factory OVH client 工厂。按 accountID 缓存 client 实例;
 // 同一账户多次取拿到同一个 client;Invalidate 失效特定账户的缓存。
 //
 // 不同账户即使 endpoint 相同(都 ovh-eu)也是独立 client(凭据不同),
 // 缓存 key 是 accountID 不是 endpoint。
 type Factory struct {
-	lookup   AccountLookup
+	lookup       AccountLookup
+	listAccounts AccountLister
 	fallback *config.Store // 兼容老 Client() 调用,等所有 callsite 迁完可移除
 
 	mu    sync.Mutex
 	cache map[string]*ovh.Client // accountID → client
+
+	// 弹性层（见 resilience.go）：熔断器按账户，重试预算 / 延迟统计按路由跨账户共享
+	breakers map[string]*breaker // accountID → 熔断器，由 mu 保护
+	routes   *routeTable
+	stats    resilienceStats
+	// 各账户负载观测（见 dispatch.go），ReadClientFor 按它分流
+	loadMu sync.Mutex
+	loads  map[string]*accountLoad
+	// OnCircuitChange 任一账户熔断状态变化时回调（记日志、推 stats 事件），启动时设置
+	OnCircuitChange func(accountID, state string)
 }
 
-// NewFactory 构造工厂。lookup 由 State 闭包注入。
-func NewFactory(cfg *config.Store, lookup AccountLookup) *Factory {
+// NewFactory 构造工厂。lookup / list 由 State 闭包注入。
+func NewFactory(cfg *config.Store, lookup AccountLookup, list AccountLister) *Factory {
 	return &Factory{
-		lookup:   lookup,
-		fallback: cfg,
-		cache:    map[string]*ovh.Client{},
+		lookup:       lookup,
+		listAccounts: list,
+		fallback:     cfg,
+		cache:        map[string]*ovh.Client{},
+		breakers:     map[string]*breaker{},
+		routes:       &routeTable{routes: map[string]*routeStats{}},
+		loads:        map[string]*accountLoad{},
 	}
 }
 
@@ -64,22 +85,87 @@ func (f *Factory) ClientFor(accountID string) (*ovh.Client, error) {
 	if err != nil {
 		return nil, err
 	}
+	f.wrapLocked(cli, acc.ID)
 	f.cache[acc.ID] = cli
 	return cli, nil
 }
 
-// Invalidate 清掉指定账户的缓存 client(更新 / 删除账户后调,避免拿到旧凭据)
+// wrapLocked 给 client 的 http.Client 装上弹性层。调用方持有 mu。
+func (f *Factory) wrapLocked(cli *ovh.Client, accountID string) {
+	b, ok := f.breakers[accountID]
+	if !ok {
+		b = newBreaker(func(st string) {
+			if fn := f.OnCircuitChange; fn != nil {
+				fn(accountID, st)
+			}
+		})
+		f.breakers[accountID] = b
+	}
+	if cli.Client == nil {
+		cli.Client = &http.Client{}
+	}
+	base := cli.Client.Transport
+	if base == nil {
+		base = http.DefaultTransport
+	}
+	f.loadMu.Lock()
+	load := f.loadForLocked(accountID)
+	f.loadMu.Unlock()
+	cli.Client.Transport = &resilientTransport{
+		base: base, breaker: b, routes: f.routes, stats: &f.stats,
+		load: load, loadMu: &f.loadMu,
+	}
+}
+
+// ClientStats 各账户熔断 / 负载状态 + 重试 / 对冲计数（/api/stats）
+func (f *Factory) ClientStats() types.OVHClientStats {
+	f.mu.Lock()
+	ids := make([]string, 0, len(f.breakers))
+	for id := range f.breakers {
+		ids = append(ids, id)
+	}
+	sort.Strings(ids)
+	now := time.Now()
+	circuits := make([]types.CircuitBreakerStatus, 0, len(ids))
+	f.loadMu.Lock()
+	for _, id := range ids {
+		st := f.breakers[id].status(id)
+		if l, ok := f.loads[id]; ok {
+			l.fill(&st, now)
+		}
+		circuits = append(circuits, st)
+	}
+	f.loadMu.Unlock()
+	f.mu.Unlock()
+	return types.OVHClientStats{
+		Circuits:             circuits,
+		Retries:              f.stats.retries.Load(),
+		Hedges:               f.stats.hedges.Load(),
+		HedgeWins:            f.stats.hedgeWins.Load(),
+		RetryBudgetExhausted: f.stats.budgetExhausted.Load(),
+	}
+}
+
+// Invalidate 清掉指定账户的缓存 client 和熔断状态(更新 / 删除账户后调,避免拿到旧凭据)
 func (f *Factory) Invalidate(accountID string) {
 	f.mu.Lock()
 	delete(f.cache, accountID)
+	delete(f.breakers, accountID)
 	f.mu.Unlock()
+	f.loadMu.Lock()
+	delete(f.loads, accountID)
+	f.loadMu.Unlock()
 }
 
 // InvalidateAll 清全部缓存(比如重置 OVH 配置时)
 func (f *Factory) InvalidateAll() {
 	f.mu.Lock()
 	f.cache = map[string]*ovh.Client{}
+	f.breakers = map[string]*breaker{}
 	f.mu.Unlock()
+	f.loadMu.Lock()
+	f.loads = map[string]*accountLoad{}
+	f.loadMu.Unlock()
 }
 
 // Client 老接口,等价于 ClientFor("")(默认账户)。
@@ -106,5 +192,8 @@ func (f *Factory) Client() (*ovh.Client, error) {
 	if err != nil {
 		return nil, err
 	}
+	f.mu.Lock()
+	f.wrapLocked(cli, "config")
+	f.mu.Unlock()
 	return cli, nil
 }
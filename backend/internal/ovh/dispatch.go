@@ -0,0 +1,79 @@
+package ovh
+
+import (
+	"fmt"
+	"strings"
+	"time"
+
+	"github.com/ovh/go-ovh/ovh"
+)
+
+// loadForLocked 取账户负载（不存在则创建）。调用方持有 loadMu。
+func (f *Factory) loadForLocked(accountID string) *accountLoad {
+	l, ok := f.loads[accountID]
+	if !ok {
+		l = &accountLoad{}
+		f.loads[accountID] = l
+	}
+	return l
+}
+
+// ReadClientFor 只读查询（可用性 / 目录 / 询价）用的 client：在与 accountID（空 = 默认账户）
+// 同一 endpoint、同一 zone（subsidiary）的全部账户里，挑熔断关闭（半开时探测已在途，也不分过去）、
+// 未被 429 限流、额度余量最大的那个；没有可分流的账户时固定用原账户。
+// 同 zone 才能分流：询价的临时购物车会 assign 到分流账户，跨 subsidiary 的账户报价币种 / 价格不同或直接失败。
+// 返回选中的账户 ID；下单等写操作仍用 ClientFor 固定到指定账户。
+func (f *Factory) ReadClientFor(accountID string) (*ovh.Client, string, error) {
+	if f.lookup == nil || f.listAccounts == nil {
+		cli, err := f.ClientFor(accountID)
+		return cli, accountID, err
+	}
+	pinned, ok := f.lookup(accountID)
+	if !ok {
+		cli, err := f.ClientFor(accountID)
+		return cli, accountID, err
+	}
+
+	// 先取账户列表再加锁：账户写操作可能持 AccountsMu 调 Invalidate
+	accounts := f.listAccounts()
+	now := time.Now()
+	best, bestScore := "", 0.0
+	f.mu.Lock()
+	f.loadMu.Lock()
+	for _, acc := range accounts {
+		if acc.Endpoint != pinned.Endpoint || !strings.EqualFold(acc.Zone, pinned.Zone) ||
+			acc.AppKey == "" || acc.AppSecret == "" || acc.ConsumerKey == "" {
+			continue
+		}
+		if b, ok := f.breakers[acc.ID]; ok && b.status(acc.ID).State != "closed" {
+			continue
+		}
+		l := f.loadForLocked(acc.ID)
+		if now.Before(l.throttledUntil) {
+			continue
+		}
+		s := l.score(now)
+		if acc.ID == pinned.ID {
+			s -= 0.01 // 同分时优先原账户
+		}
+		if best == "" || s < bestScore {
+			best, bestScore = acc.ID, s
+		}
+	}
+	f.loadMu.Unlock()
+	f.mu.Unlock()
+
+	if best == "" {
+		// 全部熔断 / 限流：退回原账户，由熔断器决定是否快速失败
+		best = pinned.ID
+	}
+	cli, err := f.ClientFor(best)
+	if err != nil && best != pinned.ID {
+		best = pinned.ID
+		cli, err = f.ClientFor(best)
+	}
+	if err != nil {
+		return nil, best, fmt.Errorf("ovh read client: %w", err)
+	}
+	return cli, best, nil
+}
@@ -0,0 +1,91 @@
+package ovh
+
+import (
+	"time"
+
+	"github.com/ovh-webui/server/internal/types"
+)
+
+const (
+	// loadWindowSec 账户负载统计窗口（秒）：最近一分钟请求数
+	loadWindowSec = 60
+	// assumedLimitPerMin 没观测到 429 前假定的每分钟请求额度，只用于在账户间比较余量
+	assumedLimitPerMin = 600
+	// throttleCooldown 429 且没带 Retry-After 时，该账户暂停接分流请求的时间
+	throttleCooldown = 30 * time.Second
+	// errEWMAWeight 错误率指数滑动平均的新样本权重
+	errEWMAWeight = 0.1
+)
+
+// accountLoad 单账户的负载观测：最近一分钟请求数、在途请求、错误率、429 时观测到的额度
+type accountLoad struct {
+	buckets        [loadWindowSec]int
+	bucketSec      [loadWindowSec]int64
+	inflight       int
+	errRate        float64
+	limit          int // 最近一次 429 时窗口内的请求数；0 = 未观测到
+	throttledUntil time.Time
+}
+
+// begin 记一次请求开始。调用方持有 Factory.loadMu。
+func (l *accountLoad) begin(now time.Time) {
+	sec := now.Unix()
+	i := sec % loadWindowSec
+	if l.bucketSec[i] != sec {
+		l.bucketSec[i] = sec
+		l.buckets[i] = 0
+	}
+	l.buckets[i]++
+	l.inflight++
+}
+
+// end 记一次请求结果。调用方持有 Factory.loadMu。
+func (l *accountLoad) end(now time.Time, failed, throttled bool, retryAfter time.Duration) {
+	if l.inflight > 0 {
+		l.inflight--
+	}
+	sample := 0.0
+	if failed {
+		sample = 1
+	}
+	l.errRate += errEWMAWeight * (sample - l.errRate)
+	if throttled {
+		l.limit = l.recent(now)
+		if retryAfter <= 0 {
+			retryAfter = throttleCooldown
+		}
+		l.throttledUntil = now.Add(retryAfter)
+	}
+}
+
+// recent 最近 loadWindowSec 秒的请求数
+func (l *accountLoad) recent(now time.Time) int {
+	sec := now.Unix()
+	n := 0
+	for i := range l.buckets {
+		if sec-l.bucketSec[i] < loadWindowSec {
+			n += l.buckets[i]
+		}
+	}
+	return n
+}
+
+// score 分流打分，越小越空闲：额度使用率 + 错误率 + 在途请求
+func (l *accountLoad) score(now time.Time) float64 {
+	limit := l.limit
+	if limit <= 0 {
+		limit = assumedLimitPerMin
+	}
+	return float64(l.recent(now))/float64(limit) + 2*l.errRate + 0.05*float64(l.inflight)
+}
+
+// fill 把负载观测写进账户状态。调用方持有 loadMu。
+func (l *accountLoad) fill(st *types.CircuitBreakerStatus, now time.Time) {
+	st.RecentRequests = l.recent(now)
+	st.ObservedLimit = l.limit
+	st.ErrorRate = l.errRate
+	st.Inflight = l.inflight
+	if now.Before(l.throttledUntil) {
+		st.ThrottledUntil = l.throttledUntil.UTC().Format(time.RFC3339)
+	}
+}
@@ -0,0 +1,471 @@
+package ovh
+
+import (
+	"context"
+	"errors"
+	"fmt"
+	"io"
+	"math/rand"
+	"net/http"
+	"sort"
+	"strconv"
+	"strings"
+	"sync"
+	"sync/atomic"
+	"time"
+
+	"github.com/ovh-webui/server/internal/types"
+)
+
+const (
+	// breakerThreshold 连续失败多少次打开熔断
+	breakerThreshold = 5
+	// breakerCooldown 熔断打开后多久放一个探测请求（半开）
+	breakerCooldown = 30 * time.Second
+
+	// retryMax 单个 GET 最多重试次数
+	retryMax = 2
+	// retryBaseDelay / retryMaxDelay 指数退避（全抖动）的基数和上限
+	retryBaseDelay = 200 * time.Millisecond
+	retryMaxDelay  = 2 * time.Second
+	// retryAfterMax 429 的 Retry-After 超过这个值就不在请求内等待，直接返回
+	retryAfterMax = 5 * time.Second
+	// retryBudgetRatio / retryBudgetMax 每路由重试预算：每个请求存 0.2 个令牌，重试和对冲各花 1 个，
+	// 上限 10 个。OVH 整体故障时重试量被限制在正常流量的 20% 左右，不会放大成重试风暴。
+	retryBudgetRatio = 0.2
+	retryBudgetMax   = 10
+
+	// hedgeMinSamples 路由延迟样本少于这个数时用 hedgeDefaultDelay
+	hedgeMinSamples   = 16
+	hedgeDefaultDelay = 1500 * time.Millisecond
+	hedgeMinDelay     = 150 * time.Millisecond
+	hedgeMaxDelay     = 5 * time.Second
+	// latencyWindow 每路由保留的最近延迟样本数（算 p95）
+	latencyWindow = 64
+	// maxRoutes 路由表上限，超出的路由共用一个统计桶
+	maxRoutes = 512
+)
+
+// ErrCircuitOpen 账户熔断中，GET 请求直接失败
+var ErrCircuitOpen = errors.New("ovh circuit breaker open")
+
+// hedgeable 可对冲的幂等 GET：可用性查询（监控热路径，尾延迟直接决定抢不抢得到）
+func hedgeable(req *http.Request) bool {
+	return req.Method == http.MethodGet && strings.Contains(req.URL.Path, "/availabilities")
+}
+
+// breaker 单账户熔断器：连续 breakerThreshold 次失败（网络错误 / 5xx / 429）打开，
+// breakerCooldown 后半开放一个探测请求，成功关闭、失败重新打开。
+// 只拦 GET：下单 / 控制类写请求照常发出（结果仍计入失败统计）。
+type breaker struct {
+	mu          sync.Mutex
+	state       string // closed / open / half-open
+	failures    int
+	openedAt    time.Time
+	probing     bool
+	rejected    int64
+	lastFailure string
+	onChange    func(state string)
+}
+
+func newBreaker(onChange func(state string)) *breaker {
+	return &breaker{state: "closed", onChange: onChange}
+}
+
+// allow GET 是否放行；半开时只放一个探测，probe=true 表示放行的就是这个探测
+// （调用方取消时要 release，否则熔断器一直卡在半开）
+func (b *breaker) allow(now time.Time) (ok, probe bool) {
+	b.mu.Lock()
+	defer b.mu.Unlock()
+	switch b.state {
+	case "open":
+		if now.Sub(b.openedAt) < breakerCooldown {
+			b.rejected++
+			return false, false
+		}
+		b.state = "half-open"
+		b.probing = true
+		return true, true
+	case "half-open":
+		if b.probing {
+			b.rejected++
+			return false, false
+		}
+		b.probing = true
+		return true, true
+	}
+	return true, false
+}
+
+// release 探测请求被调用方取消：不记成败，让下一个 GET 重新探测
+func (b *breaker) release() {
+	b.mu.Lock()
+	b.probing = false
+	b.mu.Unlock()
+}
+
+// record 记录一次请求结果
+func (b *breaker) record(failed bool, reason string, now time.Time) {
+	b.mu.Lock()
+	prev := b.state
+	if failed {
+		b.failures++
+		b.lastFailure = reason
+		if b.state == "half-open" || b.failures >= breakerThreshold {
+			b.state = "open"
+			b.openedAt = now
+		}
+	} else {
+		b.failures = 0
+		b.state = "closed"
+	}
+	b.probing = false
+	changed, cur := b.state != prev, b.state
+	onChange := b.onChange
+	b.mu.Unlock()
+	if changed && onChange != nil {
+		onChange(cur)
+	}
+}
+
+func (b *breaker) status(accountID string) types.CircuitBreakerStatus {
+	b.mu.Lock()
+	defer b.mu.Unlock()
+	st := types.CircuitBreakerStatus{
+		AccountID:           accountID,
+		State:               b.state,
+		ConsecutiveFailures: b.failures,
+		Rejected:            b.rejected,
+		LastFailure:         b.lastFailure,
+	}
+	if b.state != "closed" {
+		st.OpenedAt = b.openedAt.UTC().Format(time.RFC3339)
+		st.RetryAt = b.openedAt.Add(breakerCooldown).UTC().Format(time.RFC3339)
+	}
+	return st
+}
+
+// routeStats 单路由的重试预算和延迟样本（所有账户共享：同一个 OVH 接口慢 / 挂与账户无关）
+type routeStats struct {
+	mu      sync.Mutex
+	tokens  float64
+	samples [latencyWindow]time.Duration
+	n       int // 已写入样本总数
+}
+
+// deposit 每个原始请求给预算存一点令牌
+func (r *routeStats) deposit() {
+	r.mu.Lock()
+	r.tokens += retryBudgetRatio
+	if r.tokens > retryBudgetMax {
+		r.tokens = retryBudgetMax
+	}
+	r.mu.Unlock()
+}
+
+// take 花一个令牌做重试 / 对冲；预算不足返回 false
+func (r *routeStats) take() bool {
+	r.mu.Lock()
+	defer r.mu.Unlock()
+	if r.tokens < 1 {
+		return false
+	}
+	r.tokens--
+	return true
+}
+
+func (r *routeStats) observe(d time.Duration) {
+	r.mu.Lock()
+	r.samples[r.n%latencyWindow] = d
+	r.n++
+	r.mu.Unlock()
+}
+
+// hedgeDelay 对冲等待时间：最近样本的 p95，样本不足时用默认值
+func (r *routeStats) hedgeDelay() time.Duration {
+	r.mu.Lock()
+	n := r.n
+	if n > latencyWindow {
+		n = latencyWindow
+	}
+	if n < hedgeMinSamples {
+		r.mu.Unlock()
+		return hedgeDefaultDelay
+	}
+	s := make([]time.Duration, n)
+	copy(s, r.samples[:n])
+	r.mu.Unlock()
+	sort.Slice(s, func(i, j int) bool { return s[i] < s[j] })
+	d := s[(n*95)/100]
+	if d < hedgeMinDelay {
+		d = hedgeMinDelay
+	}
+	if d > hedgeMaxDelay {
+		d = hedgeMaxDelay
+	}
+	return d
+}
+
+// resilienceStats 全局计数（/api/stats 展示）
+type resilienceStats struct {
+	retries         atomic.Int64
+	hedges          atomic.Int64
+	hedgeWins       atomic.Int64
+	budgetExhausted atomic.Int64
+}
+
+// routeTable 路由 → 统计
+type routeTable struct {
+	mu     sync.Mutex
+	routes map[string]*routeStats
+}
+
+func (t *routeTable) get(key string) *routeStats {
+	t.mu.Lock()
+	defer t.mu.Unlock()
+	r, ok := t.routes[key]
+	if !ok {
+		if len(t.routes) >= maxRoutes {
+			key = "other"
+			if r, ok = t.routes[key]; ok {
+				return r
+			}
+		}
+		r = &routeStats{tokens: retryBudgetMax}
+		t.routes[key] = r
+	}
+	return r
+}
+
+// routeKey 方法 + 路径模板：数字 ID、服务名（含 "."）等可变段替换成 *，查询串忽略
+func routeKey(method, path string) string {
+	segs := strings.Split(strings.Trim(path, "/"), "/")
+	for i, s := range segs {
+		if i == 0 {
+			continue // API 版本前缀 "1.0" / "v2"
+		}
+		if _, err := strconv.ParseInt(s, 10, 64); err == nil || strings.ContainsAny(s, ".%:@") {
+			segs[i] = "*"
+		}
+	}
+	return method + " /" + strings.Join(segs, "/")
+}
+
+// resilientTransport 包在单个账户 client 的 http.Client 上：熔断 → 重试（预算内）→ 可用性 GET 对冲
+type resilientTransport struct {
+	base    http.RoundTripper
+	breaker *breaker
+	routes  *routeTable
+	stats   *resilienceStats
+	// 账户负载观测（dispatch.go），由 loadMu 保护；测试里可为 nil
+	load   *accountLoad
+	loadMu *sync.Mutex
+}
+
+func (t *resilientTransport) RoundTrip(req *http.Request) (*http.Response, error) {
+	isGet := req.Method == http.MethodGet
+	probe := false
+	if isGet {
+		var ok bool
+		if ok, probe = t.breaker.allow(time.Now()); !ok {
+			return nil, fmt.Errorf("%w: %s", ErrCircuitOpen, req.URL.Path)
+		}
+	}
+	// cancelled 调用方主动取消：不算 OVH 的失败，持有的探测名额交还
+	cancelled := func() {
+		if probe {
+			t.breaker.release()
+		}
+	}
+	route := t.routes.get(routeKey(req.Method, req.URL.Path))
+	route.deposit()
+
+	for attempt := 0; ; attempt++ {
+		start := time.Now()
+		t.trackBegin(start)
+		var resp *http.Response
+		var err error
+		if hedgeable(req) {
+			resp, err = t.hedged(req, route)
+		} else {
+			resp, err = t.base.RoundTrip(req)
+		}
+		if ctxErr := req.Context().Err(); ctxErr != nil {
+			if !errors.Is(ctxErr, context.DeadlineExceeded) {
+				cancelled()
+				t.trackEnd(time.Now(), false, false, 0)
+				return resp, err
+			}
+			// 超时（http.Client.Timeout 也是通过 context deadline 生效）：OVH 没按时响应，计为失败，
+			// 否则 OVH 挂起不回时熔断永远不会打开
+			t.breaker.record(true, "timeout: "+ctxErr.Error(), time.Now())
+			t.trackEnd(time.Now(), true, false, 0)
+			return resp, err
+		}
+		failed, reason, wait := classify(resp, err)
+		t.breaker.record(failed, reason, time.Now())
+		probe = false
+		t.trackEnd(time.Now(), failed, resp != nil && resp.StatusCode == http.StatusTooManyRequests, wait)
+		if !failed {
+			route.observe(time.Since(start))
+			return resp, nil
+		}
+		// 重试算一次新请求：这次失败已让熔断打开就不再重试
+		if !isGet || attempt >= retryMax || wait > retryAfterMax {
+			return resp, err
+		}
+		ok, retryProbe := t.breaker.allow(time.Now())
+		if !ok {
+			return resp, err
+		}
+		probe = retryProbe
+		if !route.take() {
+			t.stats.budgetExhausted.Add(1)
+			cancelled()
+			return resp, err
+		}
+		if resp != nil {
+			_, _ = io.Copy(io.Discard, io.LimitReader(resp.Body, 64<<10))
+			resp.Body.Close()
+		}
+		t.stats.retries.Add(1)
+		if wait <= 0 {
+			wait = backoff(attempt)
+		}
+		timer := time.NewTimer(wait)
+		select {
+		case <-req.Context().Done():
+			timer.Stop()
+			cancelled()
+			return nil, req.Context().Err()
+		case <-timer.C:
+		}
+	}
+}
+
+func (t *resilientTransport) trackBegin(now time.Time) {
+	if t.load == nil {
+		return
+	}
+	t.loadMu.Lock()
+	t.load.begin(now)
+	t.loadMu.Unlock()
+}
+
+func (t *resilientTransport) trackEnd(now time.Time, failed, throttled bool, retryAfter time.Duration) {
+	if t.load == nil {
+		return
+	}
+	t.loadMu.Lock()
+	t.load.end(now, failed, throttled, retryAfter)
+	t.loadMu.Unlock()
+}
+
+// classify 判断是否算失败（网络错误 / 5xx / 429），429 时返回 Retry-After
+func classify(resp *http.Response, err error) (failed bool, reason string, wait time.Duration) {
+	if err != nil {
+		return true, err.Error(), 0
+	}
+	switch {
+	case resp.StatusCode == http.StatusTooManyRequests:
+		if s, perr := strconv.Atoi(resp.Header.Get("Retry-After")); perr == nil {
+			wait = time.Duration(s) * time.Second
+		}
+		return true, resp.Status, wait
+	case resp.StatusCode >= 500:
+		return true, resp.Status, 0
+	}
+	return false, "", 0
+}
+
+// backoff 全抖动指数退避
+func backoff(attempt int) time.Duration {
+	d := retryBaseDelay << attempt
+	if d > retryMaxDelay {
+		d = retryMaxDelay
+	}
+	return time.Duration(rand.Int63n(int64(d)) + 1)
+}
+
+type hedgeResult struct {
+	resp  *http.Response
+	err   error
+	hedge bool
+}
+
+// hedged 先发一个请求，超过路由 p95 还没回就再发一个（花一个重试预算），取先成功的那个
+func (t *resilientTransport) hedged(req *http.Request, route *routeStats) (*http.Response, error) {
+	ctx, cancel := context.WithCancel(req.Context())
+	results := make(chan hedgeResult, 2)
+	send := func(hedge bool) {
+		resp, err := t.base.RoundTrip(req.Clone(ctx))
+		results <- hedgeResult{resp, err, hedge}
+	}
+	go send(false)
+	inflight := 1
+	timer := time.NewTimer(route.hedgeDelay())
+	defer timer.Stop()
+
+	var fallback *hedgeResult
+	for {
+		select {
+		case <-timer.C:
+			if route.take() {
+				t.stats.hedges.Add(1)
+				inflight++
+				go send(true)
+			}
+		case r := <-results:
+			inflight--
+			failed, _, _ := classify(r.resp, r.err)
+			if failed && inflight > 0 {
+				// 失败但另一个还在飞：先留着，等另一个结果
+				res := r
+				fallback = &res
+				continue
+			}
+			win := r
+			if fallback != nil {
+				loser := fallback
+				if failed {
+					// 两个都失败：返回先回来的那个
+					win, loser = *fallback, &r
+				}
+				if loser.resp != nil {
+					loser.resp.Body.Close()
+				}
+			}
+			if win.hedge && !failed {
+				t.stats.hedgeWins.Add(1)
+			}
+			go drainHedges(results, inflight)
+			if win.resp != nil {
+				win.resp.Body = &cancelOnClose{ReadCloser: win.resp.Body, cancel: cancel}
+			} else {
+				cancel()
+			}
+			return win.resp, win.err
+		}
+	}
+}
+
+// drainHedges 关掉输掉的请求的响应体
+func drainHedges(results <-chan hedgeResult, n int) {
+	for ; n > 0; n-- {
+		if r := <-results; r.resp != nil {
+			r.resp.Body.Close()
+		}
+	}
+}
+
+// cancelOnClose 响应体读完关闭时取消对冲请求的 context
+type cancelOnClose struct {
+	io.ReadCloser
+	cancel context.CancelFunc
+}
+
+func (c *cancelOnClose) Close() error {
+	err := c.ReadCloser.Close()
+	c.cancel()
+	return err
+}
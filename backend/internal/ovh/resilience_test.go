@@ -0,0 +1,168 @@
+package ovh
+
+import (
+	"context"
+	"errors"
+	"io"
+	"net/http"
+	"strings"
+	"sync/atomic"
+	"testing"
+	"time"
+)
+
+type fakeRT func(req *http.Request, n int) (*http.Response, error)
+
+type countingRT struct {
+	n  atomic.Int32
+	fn fakeRT
+}
+
+func (c *countingRT) RoundTrip(req *http.Request) (*http.Response, error) {
+	return c.fn(req, int(c.n.Add(1)))
+}
+
+func reply(code int) *http.Response {
+	return &http.Response{StatusCode: code, Status: http.StatusText(code), Header: http.Header{}, Body: io.NopCloser(strings.NewReader("{}"))}
+}
+
+func newTestTransport(fn fakeRT) (*resilientTransport, *countingRT) {
+	rt := &countingRT{fn: fn}
+	return &resilientTransport{
+		base:    rt,
+		breaker: newBreaker(nil),
+		routes:  &routeTable{routes: map[string]*routeStats{}},
+		stats:   &resilienceStats{},
+	}, rt
+}
+
+func TestRouteKey(t *testing.T) {
+	got := routeKey("GET", "/1.0/dedicated/server/ns123.ip-1-2-3.eu/task/456")
+	if got != "GET /1.0/dedicated/server/*/task/*" {
+		t.Fatalf("routeKey=%q", got)
+	}
+}
+
+func TestRetryThenSuccess(t *testing.T) {
+	tr, rt := newTestTransport(func(_ *http.Request, n int) (*http.Response, error) {
+		if n == 1 {
+			return reply(http.StatusServiceUnavailable), nil
+		}
+		return reply(http.StatusOK), nil
+	})
+	req, _ := http.NewRequest(http.MethodGet, "https://eu.api.ovh.com/1.0/me", nil)
+	resp, err := tr.RoundTrip(req)
+	if err != nil || resp.StatusCode != http.StatusOK {
+		t.Fatalf("resp=%v err=%v", resp, err)
+	}
+	if rt.n.Load() != 2 || tr.stats.retries.Load() != 1 {
+		t.Fatalf("calls=%d retries=%d", rt.n.Load(), tr.stats.retries.Load())
+	}
+}
+
+func TestBreakerOpensAndProbes(t *testing.T) {
+	tr, rt := newTestTransport(func(_ *http.Request, _ int) (*http.Response, error) {
+		return nil, errors.New("connection reset")
+	})
+	get, _ := http.NewRequest(http.MethodGet, "https://eu.api.ovh.com/1.0/me", nil)
+	for i := 0; i < 3 && tr.breaker.status("a").State == "closed"; i++ {
+		_, _ = tr.RoundTrip(get)
+	}
+	if st := tr.breaker.status("a"); st.State != "open" {
+		t.Fatalf("state=%s failures=%d", st.State, st.ConsecutiveFailures)
+	}
+	calls := rt.n.Load()
+	if _, err := tr.RoundTrip(get); !errors.Is(err, ErrCircuitOpen) {
+		t.Fatalf("expected ErrCircuitOpen, got %v", err)
+	}
+	post, _ := http.NewRequest(http.MethodPost, "https://eu.api.ovh.com/1.0/order/cart", nil)
+	_, _ = tr.RoundTrip(post)
+	if rt.n.Load() != calls+1 {
+		t.Fatal("writes must pass an open breaker")
+	}
+
+	tr.breaker.mu.Lock()
+	tr.breaker.openedAt = time.Now().Add(-breakerCooldown)
+	tr.breaker.mu.Unlock()
+	rt.fn = func(_ *http.Request, _ int) (*http.Response, error) { return reply(http.StatusOK), nil }
+	if resp, err := tr.RoundTrip(get); err != nil || resp.StatusCode != http.StatusOK {
+		t.Fatalf("probe failed: %v", err)
+	}
+	if st := tr.breaker.status("a"); st.State != "closed" {
+		t.Fatalf("state after probe=%s", st.State)
+	}
+}
+
+func TestCancelledProbeReleasesBreaker(t *testing.T) {
+	tr, rt := newTestTransport(func(req *http.Request, _ int) (*http.Response, error) {
+		<-req.Context().Done()
+		return nil, req.Context().Err()
+	})
+	tr.breaker.mu.Lock()
+	tr.breaker.state, tr.breaker.failures = "open", breakerThreshold
+	tr.breaker.openedAt = time.Now().Add(-breakerCooldown)
+	tr.breaker.mu.Unlock()
+
+	// 半开探测被调用方取消：不算失败，也不能占着探测名额
+	ctx, cancel := context.WithCancel(context.Background())
+	cancel()
+	get, _ := http.NewRequestWithContext(ctx, http.MethodGet, "https://eu.api.ovh.com/1.0/me", nil)
+	if _, err := tr.RoundTrip(get); !errors.Is(err, context.Canceled) {
+		t.Fatalf("expected context.Canceled, got %v", err)
+	}
+	if st := tr.breaker.status("a"); st.State != "half-open" || st.ConsecutiveFailures != breakerThreshold {
+		t.Fatalf("after cancel: state=%s failures=%d", st.State, st.ConsecutiveFailures)
+	}
+
+	// 下一个 GET 可以重新探测；超时计为失败，熔断重新打开
+	ctx, cancel = context.WithTimeout(context.Background(), 10*time.Millisecond)
+	defer cancel()
+	get, _ = http.NewRequestWithContext(ctx, http.MethodGet, "https://eu.api.ovh.com/1.0/me", nil)
+	if _, err := tr.RoundTrip(get); errors.Is(err, ErrCircuitOpen) || rt.n.Load() != 2 {
+		t.Fatalf("probe not released: err=%v calls=%d", err, rt.n.Load())
+	}
+	if st := tr.breaker.status("a"); st.State != "open" {
+		t.Fatalf("timed-out probe: state=%s", st.State)
+	}
+}
+
+func TestHedgeWinsOverSlowRequest(t *testing.T) {
+	tr, _ := newTestTransport(func(req *http.Request, n int) (*http.Response, error) {
+		if n == 1 {
+			<-req.Context().Done()
+			return nil, req.Context().Err()
+		}
+		return reply(http.StatusOK), nil
+	})
+	route := tr.routes.get(routeKey(http.MethodGet, "/1.0/dedicated/server/datacenter/availabilities"))
+	for i := 0; i < hedgeMinSamples; i++ {
+		route.observe(10 * time.Millisecond)
+	}
+	req, _ := http.NewRequest(http.MethodGet, "https://eu.api.ovh.com/1.0/dedicated/server/datacenter/availabilities?planCode=x", nil)
+	start := time.Now()
+	resp, err := tr.RoundTrip(req)
+	if err != nil || resp.StatusCode != http.StatusOK {
+		t.Fatalf("resp=%v err=%v", resp, err)
+	}
+	resp.Body.Close()
+	if tr.stats.hedgeWins.Load() != 1 || time.Since(start) > time.Second {
+		t.Fatalf("hedgeWins=%d elapsed=%s", tr.stats.hedgeWins.Load(), time.Since(start))
+	}
+}
+
+func TestAccountLoadThrottle(t *testing.T) {
+	now := time.Now()
+	var busy, idle accountLoad
+	for i := 0; i < 30; i++ {
+		busy.begin(now)
+		busy.end(now, false, false, 0)
+	}
+	if busy.score(now) <= idle.score(now) {
+		t.Fatal("busy account should score higher")
+	}
+	busy.begin(now)
+	busy.end(now, true, true, 0)
+	if busy.limit != 31 || !now.Before(busy.throttledUntil) {
+		t.Fatalf("limit=%d throttledUntil=%s", busy.limit, busy.throttledUntil)
+	}
+}
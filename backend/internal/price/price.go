@@ -27,15 +27,15 @@ type PriceInfo struct {
 	Items       []map[string]interface{} `json:"items"`
 }
 
-// GetInternal 询价。accountID 决定用哪个账户调 OVH(空 = 默认账户),
-// 以及购物车走哪个 subsidiary(账户的 zone)。多账户必须区分。
+// GetInternal 询价。accountID 决定购物车走哪个 subsidiary(账户的 zone,空 = 默认账户),多账户必须区分;
+// 询价只建临时购物车,凭据由 OVH.ReadClientFor 在同 endpoint、同 zone 的账户间分流(购物车 assign 到分流账户)。
 func GetInternal(state *app.State, accountID, planCode, datacenter string, options []string) Result {
 	if options == nil {
 		options = []string{}
 	}
 	apiDC := ovh.ConvertDisplayDCToAPIDC(datacenter)
 
-	client, err := state.OVH.ClientFor(accountID)
+	client, _, err := state.OVH.ReadClientFor(accountID)
 	if err != nil {
 		return Result{Success: false, Error: "未配置OVH API密钥: " + err.Error()}
 	}
@@ -432,93 +432,72 @@ func extract(v interface{}) *float64 {
 }
 
 func recordSuccess(state *app.State, item *types.QueueItem, orderID, orderURL, expirationTime string, priceInfo *types.PriceInfo) {
-	state.HistoryMu.Lock()
-	defer state.HistoryMu.Unlock()
 	now := types.NowISO()
-
-	for i := range state.History {
-		if state.History[i].TaskID == item.ID {
-			state.History[i].Status = "success"
-			state.History[i].AccountID = item.AccountID
-			state.History[i].OrderID = orderID
-			state.History[i].OrderURL = orderURL
-			state.History[i].ErrorMessage = nil
-			state.History[i].PurchaseTime = now
-			state.History[i].AttemptCount = item.RetryCount
-			state.History[i].Options = item.Options
-			if expirationTime != "" {
-				state.History[i].ExpirationTime = expirationTime
-			}
-			if priceInfo != nil {
-				state.History[i].Price = priceInfo
+	err := state.UpdateHistoryByTask(item.ID, func(h *types.PurchaseHistoryEntry, exists bool) bool {
+		if !exists {
+			*h = types.PurchaseHistoryEntry{
+				ID:         uuid.NewString(),
+				TaskID:     item.ID,
+				PlanCode:   item.PlanCode,
+				Datacenter: item.Datacenter,
 			}
+		}
+		h.Status = "success"
+		h.AccountID = item.AccountID
+		h.OrderID = orderID
+		h.OrderURL = orderURL
+		h.ErrorMessage = nil
+		h.PurchaseTime = now
+		h.AttemptCount = item.RetryCount
+		h.Options = item.Options
+		if expirationTime != "" {
+			h.ExpirationTime = expirationTime
+		}
+		if priceInfo != nil {
+			h.Price = priceInfo
+		}
+		if exists {
 			state.Logger.Info("更新抢购历史(成功) 任务ID: "+item.ID, "purchase")
-			go state.SaveHistory()
-			return
+		} else {
+			state.Logger.Info("创建抢购历史(成功) 任务ID: "+item.ID, "purchase")
 		}
+		return true
+	})
+	if err != nil {
+		state.Logger.Error("保存抢购历史(成功)失败 任务ID: "+item.ID+": "+err.Error(), "purchase")
 	}
-
-	entry := types.PurchaseHistoryEntry{
-		ID:           uuid.NewString(),
-		TaskID:       item.ID,
-		AccountID:    item.AccountID,
-		PlanCode:     item.PlanCode,
-		Datacenter:   item.Datacenter,
-		Options:      item.Options,
-		Status:       "success",
-		OrderID:      orderID,
-		OrderURL:     orderURL,
-		PurchaseTime: now,
-		AttemptCount: item.RetryCount,
-	}
-	if expirationTime != "" {
-		entry.ExpirationTime = expirationTime
-	}
-	if priceInfo != nil {
-		entry.Price = priceInfo
-	}
-	state.History = append(state.History, entry)
-	state.Logger.Info("创建抢购历史(成功) 任务ID: "+item.ID, "purchase")
-	go state.SaveHistory()
 }
 
 func recordFailure(state *app.State, item *types.QueueItem, errMsg string) {
-	state.HistoryMu.Lock()
-	defer state.HistoryMu.Unlock()
 	now := types.NowISO()
-
-	for i := range state.History {
-		if state.History[i].TaskID == item.ID {
-			state.History[i].Status = "failed"
-			state.History[i].AccountID = item.AccountID
-			state.History[i].OrderID = ""
-			state.History[i].OrderURL = ""
-			em := errMsg
-			state.History[i].ErrorMessage = &em
-			state.History[i].PurchaseTime = now
-			state.History[i].AttemptCount = item.RetryCount
-			state.History[i].Options = item.Options
+	err := state.UpdateHistoryByTask(item.ID, func(h *types.PurchaseHistoryEntry, exists bool) bool {
+		if !exists {
+			*h = types.PurchaseHistoryEntry{
+				ID:         uuid.NewString(),
+				TaskID:     item.ID,
+				PlanCode:   item.PlanCode,
+				Datacenter: item.Datacenter,
+			}
+		}
+		em := errMsg
+		h.Status = "failed"
+		h.AccountID = item.AccountID
+		h.OrderID = ""
+		h.OrderURL = ""
+		h.ErrorMessage = &em
+		h.PurchaseTime = now
+		h.AttemptCount = item.RetryCount
+		h.Options = item.Options
+		if exists {
 			state.Logger.Info("更新抢购历史(失败) 任务ID: "+item.ID, "purchase")
-			go state.SaveHistory()
-			return
+		} else {
+			state.Logger.Info("创建抢购历史(失败) 任务ID: "+item.ID, "purchase")
 		}
+		return true
+	})
+	if err != nil {
+		state.Logger.Error("保存抢购历史(失败)失败 任务ID: "+item.ID+": "+err.Error(), "purchase")
 	}
-	em := errMsg
-	entry := types.PurchaseHistoryEntry{
-		ID:           uuid.NewString(),
-		TaskID:       item.ID,
-		AccountID:    item.AccountID,
-		PlanCode:     item.PlanCode,
-		Datacenter:   item.Datacenter,
-		Options:      item.Options,
-		Status:       "failed",
-		ErrorMessage: &em,
-		PurchaseTime: now,
-		AttemptCount: item.RetryCount,
-	}
-	state.History = append(state.History, entry)
-	state.Logger.Info("创建抢购历史(失败) 任务ID: "+item.ID, "purchase")
-	go state.SaveHistory()
 }
 
 // backfillOrderDetail 下单成功后异步补 history 行的 expirationTime + price。
@@ -574,26 +553,26 @@ func backfillOrderDetail(state *app.State, client *ovhsdk.Client, taskID, orderI
 		return
 	}
 
-	state.HistoryMu.Lock()
-	defer state.HistoryMu.Unlock()
-	for i := range state.History {
-		if state.History[i].TaskID != taskID {
-			continue
+	err := state.UpdateHistoryByTask(taskID, func(h *types.PurchaseHistoryEntry, exists bool) bool {
+		if !exists {
+			return false
 		}
 		changed := false
-		if expirationTime != "" && state.History[i].ExpirationTime != expirationTime {
-			state.History[i].ExpirationTime = expirationTime
+		if expirationTime != "" && h.ExpirationTime != expirationTime {
+			h.ExpirationTime = expirationTime
 			changed = true
 		}
-		if priceInfo != nil && state.History[i].Price == nil {
-			state.History[i].Price = priceInfo
+		if priceInfo != nil && h.Price == nil {
+			h.Price = priceInfo
 			changed = true
 		}
 		if changed {
 			state.Logger.Info(fmt.Sprintf("补全订单 %s 详情: 过期时间=%q 价格=%v",
 				orderID, expirationTime, priceInfo != nil), "purchase")
-			go state.SaveHistory()
 		}
-		return
+		return changed
+	})
+	if err != nil {
+		state.Logger.Warn(fmt.Sprintf("保存订单 %s 详情失败: %s", orderID, err.Error()), "purchase")
 	}
 }
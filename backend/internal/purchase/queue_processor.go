@@ -11,9 +11,17 @@ import (
 
 const concurrentBatchSize = 10
 
+// clusterQueueSyncInterval 集群模式下接管失联实例队列任务的检查间隔
+const clusterQueueSyncInterval = 10 * time.Second
+
 // ProcessQueueLoop 对应 Python: process_queue
 func ProcessQueueLoop(state *app.State) {
+	var lastClusterSync time.Time
 	for {
+		if state.Cluster != nil && time.Since(lastClusterSync) >= clusterQueueSyncInterval {
+			lastClusterSync = time.Now()
+			state.SyncClusterQueue()
+		}
 		state.QueueMu.Lock()
 		queueEmpty := len(state.Queue) == 0
 		state.QueueMu.Unlock()
@@ -119,6 +127,16 @@ func ProcessQueueLoop(state *app.State) {
 				if deleted {
 					return
 				}
+				// 集群模式：确认任务仍归本实例并拿到下单认领，保证同一任务不会被两个实例同时下单
+				if ok, drop := state.ClusterQueueAttempt(it); !ok {
+					if drop {
+						state.Logger.Info("任务 "+it.ID+" 已由其它实例接管或完成，从本实例队列移除", "queue")
+						procMu.Lock()
+						processedIDs = append(processedIDs, it.ID)
+						procMu.Unlock()
+					}
+					return
+				}
 
 				// 更新检查时间、重试次数
 				state.QueueMu.Lock()
@@ -149,19 +167,26 @@ func ProcessQueueLoop(state *app.State) {
 				}
 
 				success := PurchaseServer(state, &snapshot)
+				var done types.QueueItem
 				if success {
 					state.QueueMu.Lock()
 					for i := range state.Queue {
 						if state.Queue[i].ID == it.ID {
 							state.Queue[i].Status = "completed"
 							state.Queue[i].UpdatedAt = types.NowISO()
+							done = state.Queue[i]
 							break
 						}
 					}
 					state.QueueMu.Unlock()
+					// 随后会被移出队列，先把终态推给前端
+					if done.ID != "" {
+						state.PublishQueueItem("updated", done)
+					}
 					procMu.Lock()
 					processedIDs = append(processedIDs, it.ID)
 					procMu.Unlock()
+					state.FinishClusterQueueItem(it.ID)
 					if finalRetry == 1 {
 						state.Logger.Info("首次尝试购买成功: "+it.PlanCode, "queue")
 					} else {
@@ -175,13 +200,18 @@ func ProcessQueueLoop(state *app.State) {
 							if state.Queue[i].ID == it.ID {
 								state.Queue[i].Status = "failed"
 								state.Queue[i].UpdatedAt = types.NowISO()
+								done = state.Queue[i]
 								break
 							}
 						}
 						state.QueueMu.Unlock()
+						if done.ID != "" {
+							state.PublishQueueItem("updated", done)
+						}
 						procMu.Lock()
 						processedIDs = append(processedIDs, it.ID)
 						procMu.Unlock()
+						state.FinishClusterQueueItem(it.ID)
 						state.Logger.Info("任务达到 MaxRetries 上限已终止: "+it.PlanCode+" ("+it.ID+")", "queue")
 					} else if finalRetry == 1 {
 						state.Logger.Info("首次尝试购买失败或服务器暂无货: "+it.PlanCode, "queue")
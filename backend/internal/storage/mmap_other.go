@@ -0,0 +1,11 @@
+//go:build !unix
+
+package storage
+
+import "os"
+
+// mmapFile 非 unix 平台没有 syscall.Mmap，直接整文件读入
+func mmapFile(path string) (data []byte, unmap func(), err error) {
+	data, err = os.ReadFile(path)
+	return data, func() {}, err
+}
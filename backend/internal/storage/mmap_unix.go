@@ -0,0 +1,31 @@
+//go:build unix
+
+package storage
+
+import (
+	"os"
+	"syscall"
+)
+
+// mmapFile 只读映射整个文件，返回的 unmap 必须在不再访问 data 后调用
+func mmapFile(path string) (data []byte, unmap func(), err error) {
+	f, err := os.Open(path)
+	if err != nil {
+		return nil, nil, err
+	}
+	defer f.Close()
+	fi, err := f.Stat()
+	if err != nil {
+		return nil, nil, err
+	}
+	if fi.Size() == 0 {
+		return []byte{}, func() {}, nil
+	}
+	data, err = syscall.Mmap(int(f.Fd()), 0, int(fi.Size()), syscall.PROT_READ, syscall.MAP_SHARED)
+	if err != nil {
+		// 某些文件系统不支持 mmap，退回普通读
+		data, err = os.ReadFile(path)
+		return data, func() {}, err
+	}
+	return data, func() { _ = syscall.Munmap(data) }, nil
+}
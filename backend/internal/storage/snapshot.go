@@ -0,0 +1,306 @@
+package storage
+
+import (
+	"bytes"
+	"encoding/binary"
+	"errors"
+	"fmt"
+	"hash/crc32"
+	"os"
+	"path/filepath"
+
+	"github.com/ovh-webui/server/internal/types"
+)
+
+// 服务器目录二进制快照（servers.snap）
+//
+// 布局（整数均为 uvarint）：
+//
+//	magic "OVHSNAP" | version(1 字节) | updatedAtMs
+//	字符串表：count, 每项 len + bytes      —— 所有字段值去重后只存一次
+//	plans：count, 每个 plan：
+//	    8 个字符串字段的表索引
+//	    datacenters / defaultOptions / availableOptions：count+1（0 = nil），元素内字段同样是表索引
+//	crc32(IEEE) 4 字节小端，覆盖前面全部内容
+//
+// 解码时每个不同的字符串只分配一次，所有 plan 共享（同一个 "gra" / "unavailable" 不再各自一份）。
+// SQLite servers 表仍是权威数据，快照只是启动加速用的缓存：读失败 / 版本不符 / 时间戳对不上就回退 SQLite。
+
+const (
+	snapshotMagic   = "OVHSNAP"
+	snapshotVersion = 1
+)
+
+// ErrSnapshotInvalid 快照损坏 / 截断 / 版本不兼容
+var ErrSnapshotInvalid = errors.New("invalid server snapshot")
+
+// EncodeServerSnapshot 把目录编码成快照字节
+func EncodeServerSnapshot(plans []types.ServerPlan, updatedAtMs int64) []byte {
+	idx := make(map[string]uint64, 256)
+	table := make([]string, 0, 256)
+	intern := func(s string) uint64 {
+		if i, ok := idx[s]; ok {
+			return i
+		}
+		i := uint64(len(table))
+		idx[s] = i
+		table = append(table, s)
+		return i
+	}
+
+	// 先编 plans 部分（同时建字符串表），再按顺序拼成完整文件
+	var body []byte
+	putCount := func(n int, isNil bool) {
+		if isNil {
+			body = binary.AppendUvarint(body, 0)
+			return
+		}
+		body = binary.AppendUvarint(body, uint64(n)+1)
+	}
+	putStr := func(s string) { body = binary.AppendUvarint(body, intern(s)) }
+	putOptions := func(opts []types.ServerOption) {
+		putCount(len(opts), opts == nil)
+		for _, o := range opts {
+			putStr(o.Label)
+			putStr(o.Value)
+			putStr(o.Family)
+			if o.IsDefault {
+				body = append(body, 1)
+			} else {
+				body = append(body, 0)
+			}
+		}
+	}
+
+	body = binary.AppendUvarint(body, uint64(len(plans)))
+	for _, p := range plans {
+		putStr(p.PlanCode)
+		putStr(p.Name)
+		putStr(p.Description)
+		putStr(p.CPU)
+		putStr(p.Memory)
+		putStr(p.Storage)
+		putStr(p.Bandwidth)
+		putStr(p.VrackBandwidth)
+		putCount(len(p.Datacenters), p.Datacenters == nil)
+		for _, dc := range p.Datacenters {
+			putStr(dc.Datacenter)
+			putStr(dc.Availability)
+			putStr(dc.DCName)
+			putStr(dc.Region)
+		}
+		putOptions(p.DefaultOptions)
+		putOptions(p.AvailableOptions)
+	}
+
+	out := make([]byte, 0, len(body)+len(table)*8+32)
+	out = append(out, snapshotMagic...)
+	out = append(out, snapshotVersion)
+	out = binary.AppendUvarint(out, uint64(updatedAtMs))
+	out = binary.AppendUvarint(out, uint64(len(table)))
+	for _, s := range table {
+		out = binary.AppendUvarint(out, uint64(len(s)))
+		out = append(out, s...)
+	}
+	out = append(out, body...)
+	return binary.LittleEndian.AppendUint32(out, crc32.ChecksumIEEE(out))
+}
+
+// snapshotReader 顺序读取，任何越界都记成 ErrSnapshotInvalid
+type snapshotReader struct {
+	buf   []byte
+	off   int
+	table []string
+	err   error
+}
+
+func (r *snapshotReader) uvarint() uint64 {
+	if r.err != nil {
+		return 0
+	}
+	v, n := binary.Uvarint(r.buf[r.off:])
+	if n <= 0 {
+		r.err = ErrSnapshotInvalid
+		return 0
+	}
+	r.off += n
+	return v
+}
+
+func (r *snapshotReader) u8() byte {
+	if r.err != nil {
+		return 0
+	}
+	if r.off >= len(r.buf) {
+		r.err = ErrSnapshotInvalid
+		return 0
+	}
+	b := r.buf[r.off]
+	r.off++
+	return b
+}
+
+func (r *snapshotReader) str() string {
+	i := r.uvarint()
+	if r.err != nil {
+		return ""
+	}
+	if i >= uint64(len(r.table)) {
+		r.err = ErrSnapshotInvalid
+		return ""
+	}
+	return r.table[i]
+}
+
+// count 读 count+1 编码；返回 -1 表示 nil。上限按剩余字节数粗校验，防止坏数据撑爆 make。
+func (r *snapshotReader) count() int {
+	v := r.uvarint()
+	if r.err != nil || v == 0 {
+		return -1
+	}
+	n := v - 1
+	if n > uint64(len(r.buf)-r.off) {
+		r.err = ErrSnapshotInvalid
+		return -1
+	}
+	return int(n)
+}
+
+func (r *snapshotReader) options() []types.ServerOption {
+	n := r.count()
+	if n < 0 {
+		return nil
+	}
+	out := make([]types.ServerOption, n)
+	for i := range out {
+		out[i] = types.ServerOption{Label: r.str(), Value: r.str(), Family: r.str(), IsDefault: r.u8() == 1}
+	}
+	return out
+}
+
+// DecodeServerSnapshot 解码快照。返回的字符串都是独立拷贝，不引用 data（data 可以是 mmap 区域）。
+func DecodeServerSnapshot(data []byte) (plans []types.ServerPlan, updatedAtMs int64, err error) {
+	head := len(snapshotMagic) + 1
+	if len(data) < head+4 || !bytes.Equal(data[:len(snapshotMagic)], []byte(snapshotMagic)) {
+		return nil, 0, ErrSnapshotInvalid
+	}
+	if v := data[len(snapshotMagic)]; v != snapshotVersion {
+		return nil, 0, fmt.Errorf("%w: version %d", ErrSnapshotInvalid, v)
+	}
+	payload := data[:len(data)-4]
+	if crc32.ChecksumIEEE(payload) != binary.LittleEndian.Uint32(data[len(data)-4:]) {
+		return nil, 0, fmt.Errorf("%w: checksum mismatch", ErrSnapshotInvalid)
+	}
+
+	r := &snapshotReader{buf: payload, off: head}
+	updatedAtMs = int64(r.uvarint())
+	nStr := r.uvarint()
+	if r.err == nil && nStr > uint64(len(payload)) {
+		r.err = ErrSnapshotInvalid
+	}
+	if r.err != nil {
+		return nil, 0, r.err
+	}
+	r.table = make([]string, nStr)
+	for i := range r.table {
+		l := r.uvarint()
+		if r.err != nil || l > uint64(len(payload)-r.off) {
+			return nil, 0, ErrSnapshotInvalid
+		}
+		r.table[i] = string(payload[r.off : r.off+int(l)])
+		r.off += int(l)
+	}
+
+	nPlans := r.uvarint()
+	if r.err == nil && nPlans > uint64(len(payload)-r.off) {
+		r.err = ErrSnapshotInvalid
+	}
+	if r.err != nil {
+		return nil, 0, r.err
+	}
+	plans = make([]types.ServerPlan, nPlans)
+	for i := range plans {
+		p := &plans[i]
+		p.PlanCode = r.str()
+		p.Name = r.str()
+		p.Description = r.str()
+		p.CPU = r.str()
+		p.Memory = r.str()
+		p.Storage = r.str()
+		p.Bandwidth = r.str()
+		p.VrackBandwidth = r.str()
+		if n := r.count(); n >= 0 {
+			p.Datacenters = make([]types.Datacenter, n)
+			for j := range p.Datacenters {
+				p.Datacenters[j] = types.Datacenter{Datacenter: r.str(), Availability: r.str(), DCName: r.str(), Region: r.str()}
+			}
+		}
+		p.DefaultOptions = r.options()
+		p.AvailableOptions = r.options()
+		if r.err != nil {
+			return nil, 0, r.err
+		}
+	}
+	if r.off != len(payload) {
+		return nil, 0, fmt.Errorf("%w: trailing bytes", ErrSnapshotInvalid)
+	}
+	return plans, updatedAtMs, nil
+}
+
+// WriteServerSnapshot 原子写快照文件（tmp + rename，与 WriteJSON 一致）
+func WriteServerSnapshot(path string, plans []types.ServerPlan, updatedAtMs int64) error {
+	m := lockFor(path)
+	m.Lock()
+	defer m.Unlock()
+
+	if err := os.MkdirAll(filepath.Dir(path), 0o755); err != nil {
+		return err
+	}
+	tmp := path + ".tmp"
+	if err := os.WriteFile(tmp, EncodeServerSnapshot(plans, updatedAtMs), 0o644); err != nil {
+		return err
+	}
+	return os.Rename(tmp, path)
+}
+
+// ReadServerSnapshot 读快照文件；文件不存在时 ok=false 且不报错。
+// useMmap=true 时用只读内存映射代替整文件读入（平台不支持时自动退回 ReadFile），
+// 解码完即解除映射，不会有字符串引用映射区。
+func ReadServerSnapshot(path string, useMmap bool) (plans []types.ServerPlan, updatedAtMs int64, ok bool, err error) {
+	m := lockFor(path)
+	m.Lock()
+	defer m.Unlock()
+
+	var data []byte
+	if useMmap {
+		var unmap func()
+		data, unmap, err = mmapFile(path)
+		if err == nil {
+			defer unmap()
+		}
+	} else {
+		data, err = os.ReadFile(path)
+	}
+	if err != nil {
+		if os.IsNotExist(err) {
+			return nil, 0, false, nil
+		}
+		return nil, 0, false, err
+	}
+	plans, updatedAtMs, err = DecodeServerSnapshot(data)
+	if err != nil {
+		return nil, 0, false, err
+	}
+	return plans, updatedAtMs, true, nil
+}
+
+// RemoveServerSnapshot 删除快照（不存在不报错）
+func RemoveServerSnapshot(path string) error {
+	m := lockFor(path)
+	m.Lock()
+	defer m.Unlock()
+	if err := os.Remove(path); err != nil && !os.IsNotExist(err) {
+		return err
+	}
+	return nil
+}
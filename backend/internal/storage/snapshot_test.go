@@ -0,0 +1,190 @@
+package storage
+
+import (
+	"encoding/json"
+	"errors"
+	"fmt"
+	"path/filepath"
+	"reflect"
+	"testing"
+
+	"github.com/ovh-webui/server/internal/types"
+)
+
+// sampleCatalog 构造接近真实规模的目录：每个 plan 6 个机房 + 若干内存/硬盘/带宽选项，字段值大量重复
+func sampleCatalog(n int) []types.ServerPlan {
+	dcs := []string{"gra", "rbx", "sbg", "bhs", "waw", "fra"}
+	avail := []string{"unavailable", "1H-low", "72H", "unavailable"}
+	plans := make([]types.ServerPlan, n)
+	for i := range plans {
+		p := types.ServerPlan{
+			PlanCode:    fmt.Sprintf("24sk%03d", i),
+			Name:        fmt.Sprintf("KS-%d", i%20),
+			Description: "Intel Xeon-E 2136 - 6c/12t - 3.3 GHz/4.5 GHz",
+			CPU:         "Intel Xeon-E 2136",
+			Memory:      "32GB DDR4 ECC",
+			Storage:     "2x 512GB SSD NVMe",
+			Bandwidth:   "1 Gbps",
+		}
+		for j, dc := range dcs {
+			p.Datacenters = append(p.Datacenters, types.Datacenter{Datacenter: dc, Availability: avail[(i+j)%len(avail)]})
+		}
+		p.DefaultOptions = []types.ServerOption{
+			{Label: "memory", Value: "ram-32g-ecc-2666", Family: "memory", IsDefault: true},
+			{Label: "storage", Value: "softraid-2x512nvme", Family: "storage", IsDefault: true},
+		}
+		for _, v := range []string{"ram-64g-ecc-2666", "ram-128g-ecc-2666", "softraid-2x2000sa", "bandwidth-1000"} {
+			p.AvailableOptions = append(p.AvailableOptions, types.ServerOption{Label: v, Value: v})
+		}
+		plans[i] = p
+	}
+	return plans
+}
+
+func TestServerSnapshotRoundTrip(t *testing.T) {
+	plans := sampleCatalog(50)
+	plans[3].Datacenters = nil
+	plans[4].AvailableOptions = []types.ServerOption{}
+
+	raw := EncodeServerSnapshot(plans, 1700000000123)
+	got, ts, err := DecodeServerSnapshot(raw)
+	if err != nil {
+		t.Fatalf("decode: %v", err)
+	}
+	if ts != 1700000000123 {
+		t.Fatalf("updatedAt = %d", ts)
+	}
+	if !reflect.DeepEqual(got, plans) {
+		t.Fatal("round-trip mismatch")
+	}
+	// nil 与空切片要分开保留，否则 JSON 输出 null / [] 会变
+	if got[3].Datacenters != nil || got[4].AvailableOptions == nil {
+		t.Fatal("nil/empty slices not preserved")
+	}
+}
+
+func TestServerSnapshotRejectsCorruption(t *testing.T) {
+	raw := EncodeServerSnapshot(sampleCatalog(5), 1)
+	cases := map[string][]byte{
+		"empty":     {},
+		"truncated": raw[:len(raw)/2],
+		"bad magic": append([]byte("XXXXXXX"), raw[7:]...),
+	}
+	flipped := append([]byte(nil), raw...)
+	flipped[len(flipped)/2] ^= 0xff
+	cases["bit flip"] = flipped
+	ver := append([]byte(nil), raw...)
+	ver[len(snapshotMagic)] = snapshotVersion + 1
+	cases["version"] = ver
+
+	for name, data := range cases {
+		if _, _, err := DecodeServerSnapshot(data); !errors.Is(err, ErrSnapshotInvalid) {
+			t.Errorf("%s: err = %v, want ErrSnapshotInvalid", name, err)
+		}
+	}
+}
+
+func TestServerSnapshotFile(t *testing.T) {
+	path := filepath.Join(t.TempDir(), "servers.snap")
+	if _, _, ok, err := ReadServerSnapshot(path, true); ok || err != nil {
+		t.Fatalf("missing file: ok=%v err=%v", ok, err)
+	}
+	plans := sampleCatalog(10)
+	if err := WriteServerSnapshot(path, plans, 42); err != nil {
+		t.Fatal(err)
+	}
+	for _, useMmap := range []bool{false, true} {
+		got, ts, ok, err := ReadServerSnapshot(path, useMmap)
+		if err != nil || !ok || ts != 42 || !reflect.DeepEqual(got, plans) {
+			t.Fatalf("mmap=%v: ok=%v ts=%d err=%v", useMmap, ok, ts, err)
+		}
+	}
+	if err := RemoveServerSnapshot(path); err != nil {
+		t.Fatal(err)
+	}
+	if err := RemoveServerSnapshot(path); err != nil {
+		t.Fatalf("remove twice: %v", err)
+	}
+}
+
+// 对比基准：
+//
+//	go test ./internal/storage -run '^$' -bench ServerCatalog -benchmem
+//
+// JSONRows 模拟 DB.ListServers 的现有路径（每行一段 JSON 各自 Unmarshal），
+// Snapshot / SnapshotMmap 为快照路径。B/op、allocs/op 即加载一次目录的内存开销。
+func BenchmarkServerCatalogLoad(b *testing.B) {
+	plans := sampleCatalog(300)
+	rows := make([][]byte, len(plans))
+	jsonBytes := 0
+	for i, p := range plans {
+		rows[i], _ = json.Marshal(p)
+		jsonBytes += len(rows[i])
+	}
+	snap := EncodeServerSnapshot(plans, 1)
+	path := filepath.Join(b.TempDir(), "servers.snap")
+	if err := WriteServerSnapshot(path, plans, 1); err != nil {
+		b.Fatal(err)
+	}
+	b.Logf("plans=%d json=%dB snapshot=%dB", len(plans), jsonBytes, len(snap))
+
+	b.Run("JSONRows", func(b *testing.B) {
+		b.ReportAllocs()
+		b.SetBytes(int64(jsonBytes))
+		for i := 0; i < b.N; i++ {
+			out := make([]types.ServerPlan, 0, len(rows))
+			for _, r := range rows {
+				var p types.ServerPlan
+				if err := json.Unmarshal(r, &p); err != nil {
+					b.Fatal(err)
+				}
+				out = append(out, p)
+			}
+		}
+	})
+	b.Run("Snapshot", func(b *testing.B) {
+		b.ReportAllocs()
+		b.SetBytes(int64(len(snap)))
+		for i := 0; i < b.N; i++ {
+			if _, _, err := DecodeServerSnapshot(snap); err != nil {
+				b.Fatal(err)
+			}
+		}
+	})
+	b.Run("SnapshotFile", func(b *testing.B) {
+		b.ReportAllocs()
+		for i := 0; i < b.N; i++ {
+			if _, _, _, err := ReadServerSnapshot(path, false); err != nil {
+				b.Fatal(err)
+			}
+		}
+	})
+	b.Run("SnapshotMmap", func(b *testing.B) {
+		b.ReportAllocs()
+		for i := 0; i < b.N; i++ {
+			if _, _, _, err := ReadServerSnapshot(path, true); err != nil {
+				b.Fatal(err)
+			}
+		}
+	})
+}
+
+func BenchmarkServerCatalogSave(b *testing.B) {
+	plans := sampleCatalog(300)
+	b.Run("JSONRows", func(b *testing.B) {
+		b.ReportAllocs()
+		for i := 0; i < b.N; i++ {
+			for _, p := range plans {
+				if _, err := json.Marshal(p); err != nil {
+					b.Fatal(err)
+				}
+			}
+		}
+	})
+	b.Run("Snapshot", func(b *testing.B) {
+		b.ReportAllocs()
+		for i := 0; i < b.N; i++ {
+			_ = EncodeServerSnapshot(plans, 1)
+		}
+	})
+}
@@ -91,13 +91,14 @@ func ReadJSON(path string, v interface{}) error {
 	return json.Unmarshal(data, v)
 }
 
-// WriteJSON 原子写 JSON 文件（先写 tmp 再 rename，避免崩溃半写）
+// WriteJSON 原子写 JSON 文件（先写 tmp 再 rename，避免崩溃半写）。
+// 紧凑输出：这些文件只给程序读，缩进会让日志文件体积翻倍、每次 flush 多做一倍的序列化。
 func WriteJSON(path string, v interface{}) error {
 	m := lockFor(path)
 	m.Lock()
 	defer m.Unlock()
 
-	data, err := json.MarshalIndent(v, "", "  ")
+	data, err := json.Marshal(v)
 	if err != nil {
 		return err
 	}
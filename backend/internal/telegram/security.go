@@ -231,18 +231,10 @@ func HasActiveDuplicate(state *app.State, planCode, datacenter string, options [
 // RecentSuccessDuplicate 近 120s 内是否刚成功同配置
 func RecentSuccessDuplicate(state *app.State, planCode, datacenter string, options []string) bool {
 	fp := OptionsFingerprint(options)
-	nowTS := time.Now().Unix()
-	state.HistoryMu.Lock()
-	defer state.HistoryMu.Unlock()
-	for i := len(state.History) - 1; i >= 0; i-- {
-		h := state.History[i]
-		if h.PlanCode == planCode && h.Datacenter == datacenter && h.Status == "success" &&
+	for _, h := range state.RecentSuccessHistory(120 * time.Second) {
+		if h.PlanCode == planCode && h.Datacenter == datacenter &&
 			OptionsFingerprint(h.Options) == fp {
-			if t, err := time.Parse(time.RFC3339Nano, h.PurchaseTime); err == nil {
-				if nowTS-t.Unix() < 120 {
-					return true
-				}
-			}
+			return true
 		}
 	}
 	return false
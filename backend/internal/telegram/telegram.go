@@ -6,6 +6,7 @@ import (
 	"fmt"
 	"io"
 	"net/http"
+	"os"
 	"strconv"
 	"strings"
 	"time"
@@ -14,6 +15,19 @@ import (
 	"github.com/ovh-webui/server/internal/app"
 )
 
+// defaultBotAPIBase Telegram Bot API 官方地址
+const defaultBotAPIBase = "https://api.telegram.org"
+
+// botURL 拼 Bot API 方法地址。TELEGRAM_API_BASE 可指向自建 Bot API 服务器或本地替身
+// （scripts/tg_quick_order_bench.py），每次调用时读取（.env 在包初始化之后才加载）。
+func botURL(token, method string) string {
+	base := strings.TrimRight(strings.TrimSpace(os.Getenv("TELEGRAM_API_BASE")), "/")
+	if base == "" {
+		base = defaultBotAPIBase
+	}
+	return base + "/bot" + token + "/" + method
+}
+
 // VerifyConfig 检查 Telegram 是否可用:Token / Chat ID 是否填写 + bot 是否能 getMe + chat 是否可访问。
 // 用于 AddSubscription 等"必须 TG 有效"的强制校验。
 // 返回 (ok, 失败原因)。所有失败原因都是面向终端用户的中文短句。
@@ -30,7 +44,7 @@ func VerifyConfig(state *app.State) (bool, string) {
 	client := &http.Client{Timeout: 10 * time.Second}
 
 	// 1) getMe 验 token
-	resp, err := client.Get("https://api.telegram.org/bot" + token + "/getMe")
+	resp, err := client.Get(botURL(token, "getMe"))
 	if err != nil {
 		return false, "无法连接 Telegram API: " + err.Error()
 	}
@@ -47,7 +61,7 @@ func VerifyConfig(state *app.State) (bool, string) {
 	}
 
 	// 2) getChat 验 chat_id (bot 是否能访问这个 chat)
-	resp2, err := client.Get("https://api.telegram.org/bot" + token + "/getChat?chat_id=" + chatID)
+	resp2, err := client.Get(botURL(token, "getChat") + "?chat_id=" + chatID)
 	if err != nil {
 		return false, "无法连接 Telegram API: " + err.Error()
 	}
@@ -79,7 +93,7 @@ func SendMessage(state *app.State, message string, replyMarkup map[string]interf
 
 	state.Logger.Info(fmt.Sprintf("准备发送Telegram消息，ChatID: %s, TokenLength: %d", cfg.TgChatID, len(cfg.TgToken)), "")
 
-	url := "https://api.telegram.org/bot" + cfg.TgToken + "/sendMessage"
+	url := botURL(cfg.TgToken, "sendMessage")
 	payload := map[string]interface{}{
 		"chat_id": cfg.TgChatID,
 		"text":    message,
@@ -143,7 +157,7 @@ func SetWebhook(state *app.State, webhookURL string) (bool, string, map[string]i
 		// 只接收消息与回调查询，减小攻击面
 		"allowed_updates": []string{"message", "callback_query"},
 	})
-	setURL := "https://api.telegram.org/bot" + cfg.TgToken + "/setWebhook"
+	setURL := botURL(cfg.TgToken, "setWebhook")
 	req, err := http.NewRequest(http.MethodPost, setURL, bytes.NewReader(payload))
 	if err != nil {
 		return false, err.Error(), nil
@@ -167,7 +181,7 @@ func SetWebhook(state *app.State, webhookURL string) (bool, string, map[string]i
 		}
 		// 获取 webhook info
 		var info map[string]interface{}
-		infoResp, err := client.Get("https://api.telegram.org/bot" + cfg.TgToken + "/getWebhookInfo")
+		infoResp, err := client.Get(botURL(cfg.TgToken, "getWebhookInfo"))
 		if err == nil {
 			infoBody, _ := io.ReadAll(infoResp.Body)
 			infoResp.Body.Close()
@@ -206,7 +220,7 @@ func SetMyCommands(state *app.State) string {
 		{Command: "price", Description: "查询价格 planCode dc"},
 	}
 	payload, _ := json.Marshal(map[string]interface{}{"commands": commands})
-	url := "https://api.telegram.org/bot" + cfg.TgToken + "/setMyCommands"
+	url := botURL(cfg.TgToken, "setMyCommands")
 	client := &http.Client{Timeout: 10 * time.Second}
 	req, err := http.NewRequest(http.MethodPost, url, bytes.NewReader(payload))
 	if err != nil {
@@ -239,7 +253,7 @@ func GetWebhookInfo(state *app.State) (bool, map[string]interface{}, string) {
 		return false, nil, "未配置 Telegram Bot Token"
 	}
 	client := &http.Client{Timeout: 10 * time.Second}
-	resp, err := client.Get("https://api.telegram.org/bot" + cfg.TgToken + "/getWebhookInfo")
+	resp, err := client.Get(botURL(cfg.TgToken, "getWebhookInfo"))
 	if err != nil {
 		state.Logger.Error("请求 Telegram API 失败: "+err.Error(), "telegram")
 		return false, nil, err.Error()
@@ -272,7 +286,7 @@ func AnswerCallback(state *app.State, callbackQueryID, text string, showAlert bo
 	body, _ := json.Marshal(payload)
 	client := &http.Client{Timeout: 5 * time.Second}
 	req, _ := http.NewRequest(http.MethodPost,
-		"https://api.telegram.org/bot"+cfg.TgToken+"/answerCallbackQuery",
+		botURL(cfg.TgToken, "answerCallbackQuery"),
 		bytes.NewReader(body))
 	req.Header.Set("Content-Type", "application/json")
 	resp, err := client.Do(req)
@@ -301,7 +315,7 @@ func SendReply(state *app.State, chatID interface{}, text string, replyToMessage
 	body, _ := json.Marshal(payload)
 	client := &http.Client{Timeout: 10 * time.Second}
 	req, err := http.NewRequest(http.MethodPost,
-		"https://api.telegram.org/bot"+cfg.TgToken+"/sendMessage",
+		botURL(cfg.TgToken, "sendMessage"),
 		bytes.NewReader(body))
 	if err != nil {
 		state.Logger.Error("SendReply 构造请求失败: "+err.Error(), "telegram")
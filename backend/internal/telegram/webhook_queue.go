@@ -0,0 +1,109 @@
+package telegram
+
+import (
+	"container/list"
+	"sync"
+)
+
+// RecentUpdates 最近处理过的 update_id（固定容量 LRU）。webhook 先查这里，
+// 命中即重放直接 200，不再为每个重复 update 写一次 SQLite；未命中才走 DB 幂等表（跨重启）。
+type RecentUpdates struct {
+	mu    sync.Mutex
+	cap   int
+	order *list.List // 前 = 最近
+	items map[int64]*list.Element
+}
+
+// NewRecentUpdates capacity 为保留的 update_id 个数
+func NewRecentUpdates(capacity int) *RecentUpdates {
+	if capacity < 1 {
+		capacity = 1
+	}
+	return &RecentUpdates{cap: capacity, order: list.New(), items: make(map[int64]*list.Element, capacity)}
+}
+
+// Seen 已见过返回 true；否则记下并返回 false
+func (r *RecentUpdates) Seen(id int64) bool {
+	r.mu.Lock()
+	defer r.mu.Unlock()
+	if e, ok := r.items[id]; ok {
+		r.order.MoveToFront(e)
+		return true
+	}
+	r.items[id] = r.order.PushFront(id)
+	if r.order.Len() > r.cap {
+		old := r.order.Back()
+		r.order.Remove(old)
+		delete(r.items, old.Value.(int64))
+	}
+	return false
+}
+
+// Forget 移除记录（未能处理的 update，让 Telegram 重投时不被当成重复）
+func (r *RecentUpdates) Forget(id int64) {
+	r.mu.Lock()
+	defer r.mu.Unlock()
+	if e, ok := r.items[id]; ok {
+		r.order.Remove(e)
+		delete(r.items, id)
+	}
+}
+
+// UpdatePool 有界 worker 池：webhook 收到 update 立即应答，处理放到这里异步跑。
+// 两条队列，worker 总是先取高优先级（一键下单按钮回调），告警风暴时按钮点击不排在普通消息后面。
+type UpdatePool struct {
+	high    chan func()
+	normal  chan func()
+	onPanic func(r interface{})
+}
+
+// NewUpdatePool workers 个 worker，每条队列最多排 queue 个；onPanic 可为 nil
+func NewUpdatePool(workers, queue int, onPanic func(r interface{})) *UpdatePool {
+	p := &UpdatePool{
+		high:    make(chan func(), queue),
+		normal:  make(chan func(), queue),
+		onPanic: onPanic,
+	}
+	for i := 0; i < workers; i++ {
+		go p.worker()
+	}
+	return p
+}
+
+// Submit 不阻塞入队；队列满返回 false（调用方应让 Telegram 稍后重投）
+func (p *UpdatePool) Submit(priority bool, job func()) bool {
+	ch := p.normal
+	if priority {
+		ch = p.high
+	}
+	select {
+	case ch <- job:
+		return true
+	default:
+		return false
+	}
+}
+
+func (p *UpdatePool) worker() {
+	for {
+		var job func()
+		select {
+		case job = <-p.high:
+		default:
+			select {
+			case job = <-p.high:
+			case job = <-p.normal:
+			}
+		}
+		p.run(job)
+	}
+}
+
+func (p *UpdatePool) run(job func()) {
+	defer func() {
+		if r := recover(); r != nil && p.onPanic != nil {
+			p.onPanic(r)
+		}
+	}()
+	job()
+}
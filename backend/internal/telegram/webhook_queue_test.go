@@ -0,0 +1,56 @@
+package telegram
+
+import (
+	"sync"
+	"testing"
+)
+
+func TestRecentUpdatesEvicts(t *testing.T) {
+	r := NewRecentUpdates(2)
+	if r.Seen(1) || r.Seen(2) {
+		t.Fatal("first sight must not be a duplicate")
+	}
+	if !r.Seen(1) {
+		t.Fatal("1 should be remembered")
+	}
+	r.Seen(3) // 淘汰最久未用的 2
+	if r.Seen(2) {
+		t.Fatal("2 should have been evicted")
+	}
+	r.Forget(3)
+	if r.Seen(3) {
+		t.Fatal("forgotten id must be accepted again")
+	}
+}
+
+func TestUpdatePoolPrefersPriority(t *testing.T) {
+	// 不用 NewUpdatePool：先把两条队列排好，再启动单个 worker，应先跑完高优先级
+	p := &UpdatePool{high: make(chan func(), 8), normal: make(chan func(), 8)}
+	var mu sync.Mutex
+	var order []string
+	var wg sync.WaitGroup
+	rec := func(s string) func() {
+		wg.Add(1)
+		return func() {
+			mu.Lock()
+			order = append(order, s)
+			mu.Unlock()
+			wg.Done()
+		}
+	}
+	for i := 0; i < 3; i++ {
+		p.Submit(false, rec("n"))
+	}
+	p.Submit(true, rec("h"))
+	p.Submit(true, rec("h"))
+	go p.worker()
+	wg.Wait()
+	if len(order) != 5 || order[0] != "h" || order[1] != "h" {
+		t.Fatalf("order=%v", order)
+	}
+
+	full := &UpdatePool{high: make(chan func(), 1), normal: make(chan func(), 1)}
+	if !full.Submit(false, func() {}) || full.Submit(false, func() {}) {
+		t.Fatal("submit should fail once the queue is full")
+	}
+}
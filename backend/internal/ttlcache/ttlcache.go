@@ -0,0 +1,174 @@
+// Package ttlcache 带过期堆与容量上限的内存缓存：
+// 过期清理只弹出堆顶已过期的条目（O(过期数 · log n)），不再全表扫描；
+// 超过容量按 LRU 淘汰最久未访问的条目；命中 / 未命中 / 淘汰 / 过期计数供运行指标使用。
+package ttlcache
+
+import (
+	"container/heap"
+	"container/list"
+	"sync"
+	"time"
+)
+
+// Stats 累计计数与当前条目数
+type Stats struct {
+	Size        int    `json:"size"`
+	Capacity    int    `json:"capacity"`
+	Hits        uint64 `json:"hits"`
+	Misses      uint64 `json:"misses"`
+	Evictions   uint64 `json:"evictions"`   // 因容量上限被 LRU 淘汰
+	Expirations uint64 `json:"expirations"` // 到期被清理（Expire 或读到时惰性删除）
+}
+
+type entry[K comparable, V any] struct {
+	key      K
+	value    V
+	expireAt time.Time
+	heapIdx  int
+	lru      *list.Element
+}
+
+// expiryHeap 按 expireAt 的最小堆
+type expiryHeap[K comparable, V any] []*entry[K, V]
+
+func (h expiryHeap[K, V]) Len() int           { return len(h) }
+func (h expiryHeap[K, V]) Less(i, j int) bool { return h[i].expireAt.Before(h[j].expireAt) }
+func (h expiryHeap[K, V]) Swap(i, j int) {
+	h[i], h[j] = h[j], h[i]
+	h[i].heapIdx = i
+	h[j].heapIdx = j
+}
+func (h *expiryHeap[K, V]) Push(x any) {
+	e := x.(*entry[K, V])
+	e.heapIdx = len(*h)
+	*h = append(*h, e)
+}
+func (h *expiryHeap[K, V]) Pop() any {
+	old := *h
+	n := len(old)
+	e := old[n-1]
+	old[n-1] = nil
+	*h = old[:n-1]
+	e.heapIdx = -1
+	return e
+}
+
+// Cache 并发安全。ttl 为写入后的存活时间；capacity <= 0 表示不限条目数。
+type Cache[K comparable, V any] struct {
+	mu       sync.Mutex
+	ttl      time.Duration
+	capacity int
+	items    map[K]*entry[K, V]
+	expiry   expiryHeap[K, V]
+	lru      *list.List // 前 = 最近访问
+	stats    Stats
+}
+
+// New 创建缓存
+func New[K comparable, V any](ttl time.Duration, capacity int) *Cache[K, V] {
+	return &Cache[K, V]{
+		ttl:      ttl,
+		capacity: capacity,
+		items:    make(map[K]*entry[K, V]),
+		lru:      list.New(),
+	}
+}
+
+// Get 取未过期的值；已过期的条目在这里惰性删除并计入 Expirations
+func (c *Cache[K, V]) Get(key K) (V, bool) {
+	c.mu.Lock()
+	defer c.mu.Unlock()
+	e, ok := c.items[key]
+	if !ok {
+		c.stats.Misses++
+		var zero V
+		return zero, false
+	}
+	if !time.Now().Before(e.expireAt) {
+		c.removeLocked(e)
+		c.stats.Expirations++
+		c.stats.Misses++
+		var zero V
+		return zero, false
+	}
+	c.lru.MoveToFront(e.lru)
+	c.stats.Hits++
+	return e.value, true
+}
+
+// Set 写入，写入时刻起 ttl 后过期
+func (c *Cache[K, V]) Set(key K, value V) {
+	c.SetAt(key, value, time.Now())
+}
+
+// SetAt 按指定的写入时刻计算过期（从持久化恢复时用原始创建时间）。已过期的直接丢弃。
+func (c *Cache[K, V]) SetAt(key K, value V, at time.Time) {
+	expireAt := at.Add(c.ttl)
+	if !time.Now().Before(expireAt) {
+		return
+	}
+	c.mu.Lock()
+	defer c.mu.Unlock()
+	if e, ok := c.items[key]; ok {
+		e.value = value
+		e.expireAt = expireAt
+		heap.Fix(&c.expiry, e.heapIdx)
+		c.lru.MoveToFront(e.lru)
+		return
+	}
+	e := &entry[K, V]{key: key, value: value, expireAt: expireAt}
+	e.lru = c.lru.PushFront(e)
+	heap.Push(&c.expiry, e)
+	c.items[key] = e
+	for c.capacity > 0 && len(c.items) > c.capacity {
+		c.removeLocked(c.lru.Back().Value.(*entry[K, V]))
+		c.stats.Evictions++
+	}
+}
+
+// Delete 删除（不计入淘汰 / 过期）
+func (c *Cache[K, V]) Delete(key K) {
+	c.mu.Lock()
+	defer c.mu.Unlock()
+	if e, ok := c.items[key]; ok {
+		c.removeLocked(e)
+	}
+}
+
+// Expire 清理 now 之前到期的条目，返回清理数。只看堆顶，没有到期条目时 O(1)。
+func (c *Cache[K, V]) Expire(now time.Time) int {
+	c.mu.Lock()
+	defer c.mu.Unlock()
+	n := 0
+	for len(c.expiry) > 0 && !now.Before(c.expiry[0].expireAt) {
+		c.removeLocked(c.expiry[0])
+		n++
+	}
+	c.stats.Expirations += uint64(n)
+	return n
+}
+
+// Len 当前条目数（含尚未清理的过期条目）
+func (c *Cache[K, V]) Len() int {
+	c.mu.Lock()
+	defer c.mu.Unlock()
+	return len(c.items)
+}
+
+// Stats 计数快照
+func (c *Cache[K, V]) Stats() Stats {
+	c.mu.Lock()
+	defer c.mu.Unlock()
+	s := c.stats
+	s.Size = len(c.items)
+	s.Capacity = c.capacity
+	return s
+}
+
+func (c *Cache[K, V]) removeLocked(e *entry[K, V]) {
+	delete(c.items, e.key)
+	c.lru.Remove(e.lru)
+	if e.heapIdx >= 0 {
+		heap.Remove(&c.expiry, e.heapIdx)
+	}
+}
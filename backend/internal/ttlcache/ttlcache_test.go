@@ -0,0 +1,51 @@
+package ttlcache
+
+import (
+	"testing"
+	"time"
+)
+
+func TestCacheExpiryAndLRU(t *testing.T) {
+	c := New[string, int](time.Hour, 3)
+	now := time.Now()
+	c.SetAt("old", 1, now.Add(-50*time.Minute))
+	c.SetAt("mid", 2, now.Add(-30*time.Minute))
+	c.Set("new", 3)
+	c.SetAt("dead", 4, now.Add(-2*time.Hour)) // 写入即已过期，丢弃
+	if c.Len() != 3 {
+		t.Fatalf("len=%d", c.Len())
+	}
+
+	// 只有 old 在 now+15m 前到期
+	if n := c.Expire(now.Add(15 * time.Minute)); n != 1 {
+		t.Fatalf("expired=%d", n)
+	}
+	if _, ok := c.Get("old"); ok {
+		t.Fatal("old should be gone")
+	}
+
+	// 访问 mid 后再写两个，容量 3：最久未访问的 new 被淘汰
+	if v, ok := c.Get("mid"); !ok || v != 2 {
+		t.Fatalf("mid=%v %v", v, ok)
+	}
+	c.Set("a", 5)
+	c.Set("b", 6)
+	if _, ok := c.Get("new"); ok {
+		t.Fatal("new should have been evicted")
+	}
+
+	st := c.Stats()
+	if st.Size != 3 || st.Evictions != 1 || st.Expirations != 1 || st.Hits != 1 || st.Misses != 2 {
+		t.Fatalf("stats=%+v", st)
+	}
+
+	// 覆盖写刷新过期时间：Expire 到 mid 原到期时刻不应删掉它
+	c.Set("mid", 7)
+	if n := c.Expire(now.Add(31 * time.Minute)); n != 0 {
+		t.Fatalf("refreshed entry expired, n=%d", n)
+	}
+	c.Delete("mid")
+	if _, ok := c.Get("mid"); ok || c.Len() != 2 {
+		t.Fatal("delete failed")
+	}
+}
@@ -44,6 +44,34 @@ type Stats struct {
 	PurchaseFailed        int  `json:"purchaseFailed"`
 	QueueProcessorRunning bool `json:"queueProcessorRunning"`
 	MonitorRunning        bool `json:"monitorRunning"`
+	// OVH 请求的熔断 / 重试 / 对冲状态
+	OVHClient OVHClientStats `json:"ovhClient"`
+}
+
+// OVHClientStats OVH client 弹性层统计
+type OVHClientStats struct {
+	Circuits             []CircuitBreakerStatus `json:"circuits"`
+	Retries              int64                  `json:"retries"`
+	Hedges               int64                  `json:"hedges"`
+	HedgeWins            int64                  `json:"hedgeWins"`
+	RetryBudgetExhausted int64                  `json:"retryBudgetExhausted"`
+}
+
+// CircuitBreakerStatus 单个账户的熔断器与负载状态。State: closed / open / half-open
+type CircuitBreakerStatus struct {
+	AccountID           string `json:"accountId"`
+	State               string `json:"state"`
+	ConsecutiveFailures int    `json:"consecutiveFailures"`
+	Rejected            int64  `json:"rejected"` // 熔断期间直接拒绝的 GET 数
+	LastFailure         string `json:"lastFailure,omitempty"`
+	OpenedAt            string `json:"openedAt,omitempty"`
+	RetryAt             string `json:"retryAt,omitempty"`
+	// 负载观测（只读查询多账户分流用）
+	RecentRequests int     `json:"recentRequests"`          // 最近一分钟请求数
+	ObservedLimit  int     `json:"observedLimit,omitempty"` // 最近一次 429 时一分钟内的请求数
+	ErrorRate      float64 `json:"errorRate"`               // 错误率（指数滑动平均）
+	Inflight       int     `json:"inflight"`
+	ThrottledUntil string  `json:"throttledUntil,omitempty"`
 }
 
 // OVHAccount OVH 账户凭据。多账户场景下每条记录代表一个 OVH 账户。
@@ -137,6 +165,22 @@ type ServerPlan struct {
 	AvailableOptions []ServerOption `json:"availableOptions"`
 }
 
+// CatalogChange 服务器目录两次刷新之间单个 plan 的变化（catalog_changes 表一行）。
+// Kind: added / removed / changed；Fields 只在 changed 时有值：info / datacenters / options。
+// 机房库存（availability）频繁跳变、由订阅监控负责，不算目录变化。
+type CatalogChange struct {
+	Seq                int64    `json:"seq"`
+	At                 string   `json:"at"`
+	PlanCode           string   `json:"planCode"`
+	Kind               string   `json:"kind"`
+	Name               string   `json:"name,omitempty"`
+	Fields             []string `json:"fields,omitempty"`
+	AddedDatacenters   []string `json:"addedDatacenters,omitempty"`
+	RemovedDatacenters []string `json:"removedDatacenters,omitempty"`
+	AddedOptions       []string `json:"addedOptions,omitempty"`
+	RemovedOptions     []string `json:"removedOptions,omitempty"`
+}
+
 // SubscriptionHistoryEntry 监控订阅的历史记录条目
 type SubscriptionHistoryEntry struct {
 	Timestamp   string                 `json:"timestamp"`
@@ -190,7 +234,10 @@ type CacheInfo struct {
 	AutoRefreshEnabled bool     `json:"autoRefreshEnabled"`
 }
 
+// ISOLayout NowISO 使用的时间格式（本地时间、无时区、定长，字典序即时间序）
+const ISOLayout = "2006-01-02T15:04:05.000000"
+
 // NowISO 返回 ISO8601 时间（与 datetime.now().isoformat() 一致）
 func NowISO() string {
-	return time.Now().Format("2006-01-02T15:04:05.000000")
+	return time.Now().Format(ISOLayout)
 }
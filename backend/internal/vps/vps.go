@@ -11,6 +11,7 @@ import (
 	"time"
 
 	"github.com/ovh-webui/server/internal/app"
+	"github.com/ovh-webui/server/internal/events"
 	"github.com/ovh-webui/server/internal/numconv"
 	"github.com/ovh-webui/server/internal/telegram"
 	"github.com/ovh-webui/server/internal/types"
@@ -95,16 +96,20 @@ func CheckVPSDCAvailability(state *app.State, planCode, ovhSubsidiary string) ma
 	return data
 }
 
-// SaveSubscriptions 把订阅 + check_interval 写回 SQLite
+// SaveSubscriptions 把订阅 + check_interval 写回 SQLite。
+// 集群模式下订阅表由各实例共享，本实例的内存副本可能落后，不整表覆盖，只写 check_interval；
+// 订阅的增删改走 SaveSubscription / DeleteSubscription / ClearSubscriptions 逐行写。
 func SaveSubscriptions(state *app.State) error {
 	state.VPSSubsMu.Lock()
 	subs := make([]types.VPSSubscription, len(state.VPSSubscriptions))
 	copy(subs, state.VPSSubscriptions)
 	interval := state.VPSCheckInterval
 	state.VPSSubsMu.Unlock()
-	if err := state.DB.ReplaceVPSSubscriptions(subs); err != nil {
-		state.Logger.Error("保存VPS订阅时出错: "+err.Error(), "")
-		return err
+	if state.Cluster == nil {
+		if err := state.DB.ReplaceVPSSubscriptions(subs); err != nil {
+			state.Logger.Error("保存VPS订阅时出错: "+err.Error(), "")
+			return err
+		}
 	}
 	if err := state.DB.SetKV("vps_check_interval", interval); err != nil {
 		state.Logger.Error("保存VPS检查间隔时出错: "+err.Error(), "")
@@ -114,6 +119,43 @@ func SaveSubscriptions(state *app.State) error {
 	return nil
 }
 
+// SaveSubscription 新增 / 修改单个订阅后写库。集群模式只 upsert 这一行的配置列，
+// 不覆盖别的实例新增的订阅和负责实例写入的 last_status / history。
+func SaveSubscription(state *app.State, sub types.VPSSubscription) error {
+	if state.Cluster == nil {
+		return SaveSubscriptions(state)
+	}
+	if err := state.DB.UpsertVPSSubscriptionConfig(sub); err != nil {
+		state.Logger.Error("保存VPS订阅时出错: "+err.Error(), "")
+		return err
+	}
+	return nil
+}
+
+// DeleteSubscription 删除单个订阅后写库。集群模式只删这一行。
+func DeleteSubscription(state *app.State, id string) error {
+	if state.Cluster == nil {
+		return SaveSubscriptions(state)
+	}
+	if err := state.DB.DeleteVPSSubscription(id); err != nil {
+		state.Logger.Error("删除VPS订阅时出错: "+err.Error(), "")
+		return err
+	}
+	return nil
+}
+
+// ClearSubscriptions 清空订阅后写库。集群模式直接清空共享表（包括别的实例刚新增、本实例还没同步到的）。
+func ClearSubscriptions(state *app.State) error {
+	if state.Cluster == nil {
+		return SaveSubscriptions(state)
+	}
+	if _, err := state.DB.ClearVPSSubscriptions(); err != nil {
+		state.Logger.Error("清空VPS订阅时出错: "+err.Error(), "")
+		return err
+	}
+	return nil
+}
+
 var vpsModelMap = map[string]string{
 	"vps-2025-model1": "VPS-1",
 	"vps-2025-model2": "VPS-2",
@@ -196,6 +238,7 @@ func MonitorLoop(state *app.State) {
 			break
 		}
 
+		state.SyncClusterVPS()
 		state.VPSSubsMu.Lock()
 		subs := make([]types.VPSSubscription, len(state.VPSSubscriptions))
 		copy(subs, state.VPSSubscriptions)
@@ -204,6 +247,7 @@ func MonitorLoop(state *app.State) {
 
 		if len(subs) > 0 {
 			state.Logger.Info(fmt.Sprintf("开始检查 %d 个VPS订阅...", len(subs)), "vps_monitor")
+			checked := make(map[string]bool, len(subs))
 			for idx := range subs {
 				runningMu.Lock()
 				isRunning = running
@@ -212,6 +256,11 @@ func MonitorLoop(state *app.State) {
 					break
 				}
 				sub := &subs[idx]
+				// 集群模式：只检查分到本实例的订阅
+				if !state.ClusterOwns("vps:" + sub.ID) {
+					continue
+				}
+				checked[sub.ID] = true
 				ovhSub := sub.OvhSubsidiary
 				if ovhSub == "" {
 					ovhSub = "IE"
@@ -326,6 +375,18 @@ func MonitorLoop(state *app.State) {
 					}
 				}
 
+				if len(newAvailable) > 0 || len(newUnavailable) > 0 || (isFirstCheckOverall && len(initialAvailable) > 0) {
+					state.Events.Publish(events.TypeVPSMonitor, map[string]interface{}{
+						"op":             "status",
+						"subscriptionId": sub.ID,
+						"planCode":       sub.PlanCode,
+						"initial":        isFirstCheckOverall,
+						"available":      newAvailable,
+						"unavailable":    newUnavailable,
+						"datacenters":    initialAvailable,
+					})
+				}
+
 				sub.LastStatus = lastStatus
 				if len(sub.History) > 100 {
 					sub.History = sub.History[len(sub.History)-100:]
@@ -345,7 +406,20 @@ func MonitorLoop(state *app.State) {
 				}
 			}
 			state.VPSSubsMu.Unlock()
-			_ = SaveSubscriptions(state)
+			if state.Cluster != nil {
+				// 集群模式只写回本轮检查过的订阅的状态列：配置列可能已被别的实例改过，
+				// 本轮期间被删掉的订阅 UPDATE 不到，不会被重新插入
+				for i := range subs {
+					if !checked[subs[i].ID] {
+						continue
+					}
+					if err := state.DB.UpdateVPSSubscriptionState(subs[i]); err != nil {
+						state.Logger.Error("保存VPS订阅时出错: "+err.Error(), "vps_monitor")
+					}
+				}
+			} else {
+				_ = SaveSubscriptions(state)
+			}
 		} else {
 			state.Logger.Info("当前无VPS订阅，跳过检查", "vps_monitor")
 		}
@@ -384,6 +458,7 @@ func Start(state *app.State) bool {
 	tgCheckMu.Unlock()
 	go MonitorLoop(state)
 	state.Logger.Info(fmt.Sprintf("VPS监控已启动 (检查间隔: %d秒)", state.VPSCheckInterval), "vps_monitor")
+	state.Events.Publish(events.TypeVPSMonitor, map[string]interface{}{"op": "running", "running": true})
 	return true
 }
 
@@ -397,6 +472,7 @@ func Stop(state *app.State) bool {
 	running = false
 	runningMu.Unlock()
 	state.Logger.Info("正在停止VPS监控...", "vps_monitor")
+	state.Events.Publish(events.TypeVPSMonitor, map[string]interface{}{"op": "running", "running": false})
 	return true
 }
 
@@ -2,11 +2,12 @@ package main
 
 import (
 	"context"
-	"io/fs"
+	"fmt"
 	"log/slog"
 	"net/http"
 	"os"
 	"os/signal"
+	"strconv"
 	"strings"
 	"syscall"
 	"time"
@@ -17,13 +18,17 @@ import (
 
 	"github.com/ovh-webui/server/internal/app"
 	"github.com/ovh-webui/server/internal/auth"
+	"github.com/ovh-webui/server/internal/cluster"
 	"github.com/ovh-webui/server/internal/config"
 	"github.com/ovh-webui/server/internal/db"
+	"github.com/ovh-webui/server/internal/events"
 	"github.com/ovh-webui/server/internal/handlers"
 	"github.com/ovh-webui/server/internal/logger"
+	"github.com/ovh-webui/server/internal/metrics"
 	"github.com/ovh-webui/server/internal/monitor"
 	"github.com/ovh-webui/server/internal/purchase"
 	"github.com/ovh-webui/server/internal/storage"
+	"github.com/ovh-webui/server/internal/types"
 )
 
 func main() {
@@ -68,16 +73,37 @@ func main() {
 	if state.Port == "" {
 		state.Port = "19998"
 	}
-	state.LoadAll()
+	state.CatalogMmap = strings.EqualFold(os.Getenv("CATALOG_SNAPSHOT_MMAP"), "true")
+	// 多实例部署（可选）：各实例 DATA_DIR 指向同一 SQLite，按分片租约分摊订阅与队列。
+	// 须在 LoadAll 之前注入：队列按实例归属加载
+	var clusterStop chan struct{}
+	if strings.EqualFold(os.Getenv("CLUSTER_MODE"), "true") {
+		state.Cluster = newClusterCoordinator(sqliteDB)
+		clusterStop = make(chan struct{})
+		go state.Cluster.Run(clusterStop)
+		st := state.Cluster.Status()
+		console.Info("cluster mode", "instance", st.InstanceID, "shards", st.Shards, "leaseTTL", state.Cluster.TTL())
+	}
+	// 旧日志文件在后台解码，不阻塞启动（见 logger.Load）
+	state.Startup.Register("logs", false)
+	go func() { _ = state.Startup.Run("logs", lg.Load) }()
 
-	// 监控器
+	// 监控器（订阅在下面 LoadAll 里与其它关键数据并发加载）
 	mon := monitor.New(state)
-	mon.LoadFromDB()
-	mon.LoadMessageUUIDCacheFromDB()
-	mon.SetCheckInterval(5)
-	// 注意：启动时不要 SaveToDB()。
-	// ReplaceMonitorSubscriptions 会先 DELETE 全表；若加载失败/空读却再写回，会把线上订阅抹掉。
-	console.Info("监控检查间隔已强制设置为: 5秒（全局固定值）")
+	// 目录刷新的增量变化 → 上新 / 订阅型号配置变化提醒
+	state.OnCatalogDiff(mon.HandleCatalogDiff)
+	// 推送通道（/api/events）：新日志、统计
+	lg.SetHook(func(e types.LogEntry) { state.Events.Publish(events.TypeLog, e) })
+	state.SetStatsSource(func() interface{} { return handlers.StatsSnapshot(state, mon) })
+
+	// 进程运行指标：每秒采样，1m / 1h / 24h 三档降采样，供 /api/system/metrics 返回趋势
+	runtimeSeries := metrics.NewSeries(time.Second, metrics.DefaultTiers)
+	handlers.RegisterRuntimeMetrics(runtimeSeries, state, mon)
+	runtimeSeries.Start()
+	state.OVH.OnCircuitChange = func(accountID, st string) {
+		state.Logger.Warn("OVH 账户 "+accountID+" 熔断状态: "+st, "system")
+		state.TouchStats()
+	}
 
 	// Gin
 	if mode := os.Getenv("GIN_MODE"); mode != "" {
@@ -103,13 +129,17 @@ func main() {
 		Enabled:        enableAuth,
 		WhitelistPaths: auth.DefaultWhitelist(),
 	}))
+	// 关键数据加载完成前 /api/* 返回 503
+	r.Use(handlers.StartupGate(state))
 
-	// 健康检查
-	r.GET("/health", handlers.Health())
+	// 健康检查（含启动阶段进度）
+	r.GET("/health", handlers.Health(state))
 
 	api := r.Group("/api")
+	// 大响应 gzip（/api/catalog、/api/servers、日志、独服列表等）
+	api.Use(handlers.CompressResponses())
 	{
-		api.GET("/health", handlers.Health())
+		api.GET("/health", handlers.Health(state))
 
 		// Settings
 		api.GET("/settings", handlers.GetSettings(state))
@@ -122,6 +152,7 @@ func main() {
 		api.POST("/logs/flush", handlers.FlushLogs(state))
 		api.DELETE("/logs", handlers.ClearLogs(state))
 		api.GET("/stats", handlers.GetStats(state, mon))
+		api.GET("/events", handlers.StreamEvents(state))
 
 		// Queue
 		api.GET("/queue", handlers.GetQueue(state))
@@ -142,6 +173,7 @@ func main() {
 		api.PUT("/monitor/subscriptions/:planCode", handlers.UpdateSubscription(state, mon))
 		api.DELETE("/monitor/subscriptions/:planCode", handlers.RemoveSubscription(state, mon))
 		api.GET("/monitor/subscriptions/:planCode/history", handlers.GetSubscriptionHistory(state, mon))
+		api.GET("/monitor/restock-stats", handlers.GetRestockStats(state, mon))
 		api.POST("/monitor/start", handlers.StartMonitor(state, mon))
 		api.POST("/monitor/stop", handlers.StopMonitor(state, mon))
 		api.GET("/monitor/status", handlers.GetMonitorStatus(state, mon))
@@ -165,7 +197,18 @@ func main() {
 		api.GET("/cache/info", handlers.CacheInfo(state))
 		api.POST("/cache/clear", handlers.ClearCache(state))
 		api.GET("/catalog", handlers.GetCatalog(state))
-		api.GET("/system/metrics", handlers.GetSystemMetrics(state))
+		api.GET("/catalog/aggregate", handlers.GetAggregatedCatalog(state))
+		api.GET("/catalog/changes", handlers.GetCatalogChanges(state))
+		api.GET("/system/metrics", handlers.GetSystemMetrics(state, runtimeSeries))
+		api.GET("/cluster/status", handlers.GetClusterStatus(state, mon))
+
+		// 性能剖析：pprof / trace 与 mutex、block 采样开关。关闭认证时默认不挂载，需显式 ENABLE_DEBUG_ENDPOINTS=true
+		if debugEnabled := os.Getenv("ENABLE_DEBUG_ENDPOINTS"); strings.EqualFold(debugEnabled, "true") ||
+			(enableAuth && !strings.EqualFold(debugEnabled, "false")) {
+			api.GET("/debug/pprof/*name", handlers.DebugPprof())
+			api.GET("/debug/profile-rates", handlers.GetProfileRates())
+			api.PUT("/debug/profile-rates", handlers.SetProfileRates())
+		}
 		api.GET("/version", handlers.GetVersion(state))
 		api.GET("/version/check-update", handlers.CheckUpdate(state))
 
@@ -183,6 +226,7 @@ func main() {
 
 		// Server control - basic
 		sc := api.Group("/server-control")
+		sc.Use(handlers.ExpireInventoryOnWrite(state))
 		{
 			sc.GET("/list", handlers.ListMyServers(state))
 			// 服务器本地别名:纯本地显示用,不下发 OVH
@@ -190,6 +234,7 @@ func main() {
 			sc.PUT("/:service_name/alias", handlers.SetServerAlias(state))
 			sc.DELETE("/:service_name/alias", handlers.DeleteServerAlias(state))
 			sc.GET("/order-mapping", handlers.GetOrderMapping(state))
+			sc.GET("/:service_name/overview", handlers.GetServerOverview(state))
 			sc.POST("/:service_name/reboot", handlers.Reboot(state))
 			sc.GET("/:service_name/templates", handlers.GetOSTemplates(state))
 			sc.POST("/:service_name/install", handlers.InstallOS(state))
@@ -388,17 +433,6 @@ func main() {
 	// 前端静态文件（仅 `-tags ui` 构建时生效）
 	mountEmbeddedUI(r)
 
-	// 后台线程
-	go purchase.ProcessQueueLoop(state)
-	// 服务器目录走懒加载：访问到且缓存过期时才打 OVH，无后台定时刷新
-
-	// 自动启动监控（如果有订阅）
-	if len(mon.Snapshot()) > 0 {
-		mon.Start()
-		state.Logger.Info("自动启动服务器监控", "system")
-	}
-
-	state.Logger.Info("Server started", "system")
 	// 默认监听所有网卡（双栈 IPv4+IPv6）。容器 / Linux 生产请保持 LISTEN_HOST 为空。
 	// 仅本机调试可设 LISTEN_HOST=127.0.0.1
 	host := os.Getenv("LISTEN_HOST")
@@ -415,6 +449,7 @@ func main() {
 		IdleTimeout:       90 * time.Second,
 	}
 
+	// 先开始监听：加载期间 /health 可报告各阶段进度，/api/* 由 StartupGate 返回 503
 	errCh := make(chan error, 1)
 	go func() {
 		if err := srv.ListenAndServe(); err != nil && err != http.ErrServerClosed {
@@ -422,6 +457,35 @@ func main() {
 		}
 	}()
 
+	// 关键数据：accounts 先行，queue / vps / monitor 订阅并发加载；
+	// history 计数器与服务器目录首次使用时才读。
+	state.LoadAll(map[string]func() error{
+		"monitor": func() error {
+			mon.LoadFromDB()
+			mon.LoadMessageUUIDCacheFromDB()
+			mon.SetCheckInterval(5)
+			// 注意：启动时不要 SaveToDB()。
+			// ReplaceMonitorSubscriptions 会先 DELETE 全表；若加载失败/空读却再写回，会把线上订阅抹掉。
+			return nil
+		},
+	})
+	console.Info("监控检查间隔已强制设置为: 5秒（全局固定值）")
+	state.Startup.MarkReady()
+	_, readyMs, _ := state.Startup.Snapshot()
+	console.Info("startup ready", "ms", readyMs)
+
+	// 后台线程
+	go purchase.ProcessQueueLoop(state)
+	// 服务器目录走懒加载：访问到且缓存过期时才打 OVH，无后台定时刷新
+
+	// 自动启动监控（如果有订阅）
+	if len(mon.Snapshot()) > 0 {
+		mon.Start()
+		state.Logger.Info("自动启动服务器监控", "system")
+	}
+
+	state.Logger.Info("Server started", "system")
+
 	sigCh := make(chan os.Signal, 1)
 	signal.Notify(sigCh, os.Interrupt, syscall.SIGTERM, syscall.SIGINT)
 
@@ -438,6 +502,11 @@ func main() {
 	if mon != nil {
 		mon.Stop()
 	}
+	// 集群模式：释放分片租约，其它实例下一轮协调即可接手，无需等租约过期
+	if clusterStop != nil {
+		close(clusterStop)
+		state.Cluster.Leave()
+	}
 	// 刷日志到盘
 	state.Logger.Flush()
 
@@ -450,30 +519,45 @@ func main() {
 	console.Info("server stopped cleanly")
 }
 
+// newClusterCoordinator CLUSTER_MODE=true 时的分片协调器，协调存储即共享的 SQLite。
+// CLUSTER_INSTANCE_ID 默认 主机名-进程号；CLUSTER_SHARDS 所有实例必须一致。
+func newClusterCoordinator(sqliteDB *db.DB) *cluster.Coordinator {
+	id := strings.TrimSpace(os.Getenv("CLUSTER_INSTANCE_ID"))
+	if id == "" {
+		host, _ := os.Hostname()
+		id = fmt.Sprintf("%s-%d", host, os.Getpid())
+	}
+	shards := envPositiveInt("CLUSTER_SHARDS", 64)
+	ttl := time.Duration(envPositiveInt("CLUSTER_LEASE_TTL_SEC", 30)) * time.Second
+	return cluster.New(sqliteDB.ClusterStore(), id, shards, ttl)
+}
+
+func envPositiveInt(key string, fallback int) int {
+	if n, err := strconv.Atoi(strings.TrimSpace(os.Getenv(key))); err == nil && n > 0 {
+		return n
+	}
+	return fallback
+}
+
 // mountEmbeddedUI 把嵌入的前端挂到根路径。
 // 没启用 -tags ui 时 hasUI() 为 false，不注册任何 NoRoute；
 // 启用时：/api/* 未匹配 → 404 JSON；命中具体文件 → 直接 serve；其余 → 返回 index.html 让 SPA 路由接管。
 //
-// 注意：index.html 不能交给 http.FileServer 去 serve，否则它会把 /index.html 301 重定向到 /，
-// 触发与我们 SPA fallback 的相互重定向死循环（ERR_TOO_MANY_REDIRECTS）。
-// 直接读出来缓存到内存，命中 SPA 路径时手工写回，绕开 FileServer 的内部行为。
+// 文件启动时全部读进内存（见 uiAssetTable）：构建时预压缩的 .br / .gz 按 Accept-Encoding 直接回，
+// 运行时不再压缩；assets/ 下带内容哈希的文件 immutable 长缓存，index.html 等 no-cache + ETag 协商。
+// 不用 http.FileServer：它会把 /index.html 301 重定向到 /，与 SPA fallback 相互重定向死循环。
 func mountEmbeddedUI(r *gin.Engine) {
 	if !hasUI() {
 		return
 	}
-	distFS := webDistFS()
-	indexHTML, err := fs.ReadFile(distFS, "index.html")
+	assets, err := uiAssetTable(webDistFS())
 	if err != nil {
-		// 没构出 index.html，等于没 UI；退化为纯 API
 		return
 	}
-	fileServer := http.FileServer(http.FS(distFS))
-
-	serveIndex := func(c *gin.Context) {
-		c.Header("Content-Type", "text/html; charset=utf-8")
-		c.Header("Cache-Control", "no-cache")
-		c.Status(http.StatusOK)
-		_, _ = c.Writer.Write(indexHTML)
+	index, ok := assets["index.html"]
+	if !ok {
+		// 没构出 index.html，等于没 UI；退化为纯 API
+		return
 	}
 
 	r.NoRoute(func(c *gin.Context) {
@@ -482,19 +566,12 @@ func mountEmbeddedUI(r *gin.Engine) {
 			c.JSON(http.StatusNotFound, gin.H{"error": "not found"})
 			return
 		}
-		clean := strings.TrimPrefix(reqPath, "/")
-		// 根路径或显式访问 index.html：直接写 index.html，绕开 FileServer 的 301 重定向
-		if clean == "" || clean == "index.html" {
-			serveIndex(c)
-			return
-		}
-		// 命中具体文件 → FileServer 处理（带正确 Content-Type + 缓存语义）
-		if info, err := fs.Stat(distFS, clean); err == nil && !info.IsDir() {
-			fileServer.ServeHTTP(c.Writer, c.Request)
+		if a, ok := assets[strings.TrimPrefix(reqPath, "/")]; ok {
+			a.serve(c)
 			return
 		}
-		// SPA 客户端路由：写 index.html，让前端 router 接管
-		serveIndex(c)
+		// 根路径与 SPA 客户端路由：写 index.html，让前端 router 接管
+		index.serve(c)
 	})
 }
 
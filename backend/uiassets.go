@@ -0,0 +1,105 @@
+package main
+
+import (
+	"bytes"
+	"crypto/sha256"
+	"encoding/hex"
+	"io/fs"
+	"mime"
+	"net/http"
+	"path"
+	"strings"
+	"time"
+
+	"github.com/gin-gonic/gin"
+
+	"github.com/ovh-webui/server/internal/handlers"
+)
+
+// uiVariant 一个文件的一种编码（原文 / 构建时预压缩的 .br / .gz）
+type uiVariant struct {
+	encoding string // "" = 原文
+	data     []byte
+	etag     string
+}
+
+// uiAsset 嵌入前端里的一个文件及其预压缩版本
+type uiAsset struct {
+	contentType  string
+	cacheControl string
+	variants     []uiVariant // 按优先级：br, gzip, 原文
+}
+
+// uiAssetTable 启动时把嵌入前端整理成 路径 → 文件：预压缩的 .br / .gz 作为同名文件的变体，
+// 不单独对外暴露；ETag 用内容哈希。vite 输出到 assets/ 的文件名带内容哈希，可以永久缓存。
+func uiAssetTable(distFS fs.FS) (map[string]*uiAsset, error) {
+	files := map[string][]byte{}
+	err := fs.WalkDir(distFS, ".", func(p string, d fs.DirEntry, err error) error {
+		if err != nil || d.IsDir() {
+			return err
+		}
+		data, err := fs.ReadFile(distFS, p)
+		if err != nil {
+			return err
+		}
+		files[p] = data
+		return nil
+	})
+	if err != nil {
+		return nil, err
+	}
+
+	table := map[string]*uiAsset{}
+	for p, data := range files {
+		if strings.HasSuffix(p, ".br") || strings.HasSuffix(p, ".gz") {
+			if _, ok := files[p[:len(p)-3]]; ok {
+				continue
+			}
+		}
+		ct := mime.TypeByExtension(path.Ext(p))
+		if ct == "" {
+			ct = http.DetectContentType(data)
+		}
+		cc := "no-cache"
+		if strings.HasPrefix(p, "assets/") {
+			cc = "public, max-age=31536000, immutable"
+		}
+		a := &uiAsset{contentType: ct, cacheControl: cc}
+		for _, enc := range []struct{ name, ext string }{{"br", ".br"}, {"gzip", ".gz"}} {
+			if zdata, ok := files[p+enc.ext]; ok && len(zdata) < len(data) {
+				a.variants = append(a.variants, uiVariant{encoding: enc.name, data: zdata, etag: contentETag(zdata)})
+			}
+		}
+		a.variants = append(a.variants, uiVariant{data: data, etag: contentETag(data)})
+		table[p] = a
+	}
+	return table, nil
+}
+
+func contentETag(data []byte) string {
+	sum := sha256.Sum256(data)
+	return `"` + hex.EncodeToString(sum[:8]) + `"`
+}
+
+// serve 按 Accept-Encoding 选变体写出；If-None-Match / Range 交给 http.ServeContent
+func (a *uiAsset) serve(c *gin.Context) {
+	accept := c.Request.Header.Get("Accept-Encoding")
+	v := a.variants[len(a.variants)-1]
+	for _, cand := range a.variants[:len(a.variants)-1] {
+		if handlers.AcceptsEncoding(accept, cand.encoding) {
+			v = cand
+			break
+		}
+	}
+	h := c.Writer.Header()
+	h.Set("Content-Type", a.contentType)
+	h.Set("Cache-Control", a.cacheControl)
+	h.Set("ETag", v.etag)
+	if len(a.variants) > 1 {
+		h.Set("Vary", "Accept-Encoding")
+	}
+	if v.encoding != "" {
+		h.Set("Content-Encoding", v.encoding)
+	}
+	http.ServeContent(c.Writer, c.Request, "", time.Time{}, bytes.NewReader(v.data))
+}
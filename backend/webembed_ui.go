@@ -7,8 +7,8 @@ import (
 	"io/fs"
 )
 
-// 启用方式：`cd web && npm run build` 把前端打到 server/web/，
-// 然后 `cd server && go build -tags ui ./...` —— //go:embed 会把 server/web 整目录塞进二进制。
+// 启用方式：仓库根目录 `npm run build:embed` 把前端打到 backend/web/ 并生成预压缩的 .br / .gz，
+// 然后 `cd backend && go build -tags ui ./...` —— //go:embed 会把 backend/web 整目录塞进二进制。
 // 不加 -tags ui 时走 webembed_noui.go，二进制不含前端，纯 API。
 
 //go:embed all:web
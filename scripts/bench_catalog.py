@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+eco catalog 解码 / 服务器目录刷新基准驱动
+
+子命令:
+  record   从运行中的后端 /api/catalog 录制各 subsidiary 的原始 eco catalog，
+           写到 backend/internal/catalog/testdata/eco-<SUB>.json（Go 基准会自动使用）
+  bench    跑 go test -bench EcoCatalog，汇总 MapDecode(旧) / TypedDecode / Build 的中位数
+  refresh  对一个或多个后端实例反复请求 /api/servers?forceRefresh=true，对比刷新耗时
+           （例如旧二进制跑在 19998、新二进制跑在 19999）
+
+用法:
+  set API_SECRET_KEY=<与 backend/.env 一致>
+  python scripts/bench_catalog.py record --subsidiaries IE,FR,CA
+  python scripts/bench_catalog.py bench --count 6
+  python scripts/bench_catalog.py refresh --base http://127.0.0.1:19998 --base http://127.0.0.1:19999 --runs 5
+
+refresh 会真实调用 OVH（每次刷新约 100 次可用性查询），注意频率。
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+
+ROOT = os.path.normpath(os.path.join(os.path.dirname(__file__), ".."))
+BACKEND = os.path.join(ROOT, "backend")
+TESTDATA = os.path.join(BACKEND, "internal", "catalog", "testdata")
+
+BASE = os.environ.get("SMOKE_BASE", "http://127.0.0.1:19998")
+API_KEY = os.environ.get("API_SECRET_KEY", "")
+
+BENCH_LINE = re.compile(
+    r"^Benchmark(?P<name>\S+?)(?:-\d+)?\s+\d+\s+(?P<ns>[\d.]+) ns/op"
+    r"(?:\s+[\d.]+ MB/s)?(?:\s+(?P<bytes>\d+) B/op)?(?:\s+(?P<allocs>\d+) allocs/op)?"
+)
+
+
+def get(base: str, path: str, timeout: float = 300) -> tuple[int, bytes]:
+    r = urllib.request.Request(
+        base + path,
+        headers={
+            "X-API-Key": API_KEY,
+            "X-Request-Time": str(int(time.time() * 1000)),
+        },
+    )
+    try:
+        with urllib.request.urlopen(r, timeout=timeout) as resp:
+            return resp.status, resp.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read()
+
+
+def cmd_record(args: argparse.Namespace) -> int:
+    os.makedirs(TESTDATA, exist_ok=True)
+    for sub in [s.strip().upper() for s in args.subsidiaries.split(",") if s.strip()]:
+        q = f"/api/catalog?subsidiary={sub}" + ("&forceRefresh=true" if args.force else "")
+        code, body = get(args.base, q)
+        if code != 200:
+            print(f"[{sub}] code={code} {body[:200]!r}")
+            return 1
+        plans = len(json.loads(body).get("plans") or [])
+        path = os.path.join(TESTDATA, f"eco-{sub}.json")
+        with open(path, "wb") as fp:
+            fp.write(body)
+        print(f"[{sub}] {len(body) // 1024} KB, {plans} plans → {os.path.relpath(path, ROOT)}")
+    return 0
+
+
+def cmd_bench(args: argparse.Namespace) -> int:
+    cmd = [
+        "go", "test", "./internal/catalog",
+        "-run", "^$", "-bench", "EcoCatalog", "-benchmem",
+        "-count", str(args.count),
+    ]
+    print("$ " + " ".join(cmd))
+    proc = subprocess.run(cmd, cwd=BACKEND, capture_output=True, text=True)
+    if proc.returncode != 0:
+        print(proc.stdout + proc.stderr)
+        return proc.returncode
+
+    samples: dict[str, dict[str, list[float]]] = defaultdict(lambda: defaultdict(list))
+    for line in proc.stdout.splitlines():
+        m = BENCH_LINE.match(line.strip())
+        if not m:
+            continue
+        s = samples[m.group("name").removeprefix("EcoCatalog/")]
+        s["ns"].append(float(m.group("ns")))
+        if m.group("bytes"):
+            s["bytes"].append(float(m.group("bytes")))
+        if m.group("allocs"):
+            s["allocs"].append(float(m.group("allocs")))
+
+    med = {k: {f: statistics.median(v) for f, v in s.items()} for k, s in samples.items()}
+    print(f"\n{'benchmark':<40} | {'ms/op':>9} | {'KB/op':>9} | {'allocs/op':>10} | {'vs MapDecode':>12}")
+    print("-" * 92)
+    for name in sorted(med):
+        row = med[name]
+        base = med.get(name.rsplit("/", 1)[0] + "/MapDecode")
+        ratio = f"{base['ns'] / row['ns']:.2f}x" if base and row["ns"] else "-"
+        print(
+            f"{name:<40} | {row['ns'] / 1e6:>9.2f} | {row.get('bytes', 0) / 1024:>9.0f} | "
+            f"{row.get('allocs', 0):>10.0f} | {ratio:>12}"
+        )
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fp:
+            json.dump(med, fp, indent=2)
+        print(f"\n结果已写: {args.json}")
+    return 0
+
+
+def cmd_refresh(args: argparse.Namespace) -> int:
+    bases = args.base or [BASE]
+    rows = []
+    for base in bases:
+        times = []
+        count = 0
+        for i in range(args.runs):
+            t0 = time.perf_counter()
+            code, body = get(base, "/api/servers?showApiServers=true&forceRefresh=true")
+            ms = (time.perf_counter() - t0) * 1000
+            if code != 200:
+                print(f"{base} run {i + 1}: code={code} {body[:200]!r}")
+                return 1
+            data = json.loads(body)
+            count = len(data.get("servers") or []) if isinstance(data, dict) else len(data)
+            times.append(ms)
+            print(f"{base} run {i + 1}: {ms:.0f} ms ({count} servers)")
+            if args.pause and i + 1 < args.runs:
+                time.sleep(args.pause)
+        rows.append((base, times, count))
+
+    print(f"\n{'base':<32} | {'median ms':>10} | {'min':>8} | {'max':>8} | {'servers':>7}")
+    print("-" * 78)
+    for base, times, count in rows:
+        print(
+            f"{base:<32} | {statistics.median(times):>10.0f} | {min(times):>8.0f} | "
+            f"{max(times):>8.0f} | {count:>7}"
+        )
+    return 0
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="eco catalog 解码 / 目录刷新基准")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    p = sub.add_parser("record", help="录制真实 catalog 到 testdata")
+    p.add_argument("--base", default=BASE)
+    p.add_argument("--subsidiaries", default="IE")
+    p.add_argument("--force", action="store_true", help="绕过后端 2 小时 catalog 缓存")
+    p.set_defaults(fn=cmd_record)
+
+    p = sub.add_parser("bench", help="跑 Go 基准并汇总")
+    p.add_argument("--count", type=int, default=5)
+    p.add_argument("--json", default="")
+    p.set_defaults(fn=cmd_bench)
+
+    p = sub.add_parser("refresh", help="对比实例的 forceRefresh 耗时")
+    p.add_argument("--base", action="append", help="可重复，多个实例依次测")
+    p.add_argument("--runs", type=int, default=3)
+    p.add_argument("--pause", type=float, default=5.0, help="两次刷新之间的间隔秒数")
+    p.set_defaults(fn=cmd_refresh)
+
+    args = ap.parse_args()
+    if args.cmd in ("record", "refresh") and not API_KEY:
+        print("ERROR: 设置环境变量 API_SECRET_KEY（与 backend/.env 一致）")
+        return 2
+    return args.fn(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
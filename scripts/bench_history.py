@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+全功能测试耗时历史库 + 回归判定
+
+full_functional_test.py 每次运行把每个用例的各次耗时追加到 SQLite（只追加，不改旧记录），
+带后端版本（/api/version）、被测 BASE、运行主机、git 提交与可选标签；
+对比模式按用例比较本次与基线的中位数，超过阈值判为回归。
+
+判定（每个用例，两次运行都有成功样本时）：
+  当前中位数 > 基线中位数 × (1 + threshold)
+  且 差值 > min_delta_ms
+  且 差值 > 3 × 基线 MAD × 1.4826（基线本身抖动大的用例不误报）
+
+子命令:
+  list                       列出最近的运行
+  show <run>                 打印一次运行各用例的统计
+  compare <baseline> <run>   对比两次运行，回归时退出码 1
+
+<run> 可写运行 ID、标签（取该标签最新一次）或 last / prev。
+库文件默认 scripts/.bench/functional.sqlite，可用 BENCH_DB 覆盖。
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import socket
+import sqlite3
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+
+ROOT = os.path.normpath(os.path.join(os.path.dirname(__file__), ".."))
+DEFAULT_DB = os.environ.get("BENCH_DB", os.path.join(ROOT, "scripts", ".bench", "functional.sqlite"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at  TEXT NOT NULL,
+    base        TEXT NOT NULL,
+    version     TEXT NOT NULL DEFAULT '',
+    host        TEXT NOT NULL DEFAULT '',
+    git_rev     TEXT NOT NULL DEFAULT '',
+    label       TEXT NOT NULL DEFAULT '',
+    repeat      INTEGER NOT NULL DEFAULT 1,
+    total       INTEGER NOT NULL DEFAULT 0,
+    passed      INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS samples (
+    run_id  INTEGER NOT NULL REFERENCES runs(id),
+    grp     TEXT NOT NULL,
+    name    TEXT NOT NULL,
+    iter    INTEGER NOT NULL,
+    ms      REAL NOT NULL,
+    ok      INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_samples_run ON samples(run_id, name);
+CREATE INDEX IF NOT EXISTS idx_runs_label ON runs(label, id);
+"""
+
+
+def connect(path: str = DEFAULT_DB) -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    db = sqlite3.connect(path)
+    db.executescript(SCHEMA)
+    return db
+
+
+def git_rev() -> str:
+    try:
+        p = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True)
+        return p.stdout.strip() if p.returncode == 0 else ""
+    except OSError:
+        return ""
+
+
+@dataclass
+class CheckSamples:
+    group: str
+    name: str
+    ms: list[float]  # 每次迭代耗时（含失败）
+    ok: list[bool]
+
+
+def record_run(
+    db: sqlite3.Connection,
+    *,
+    base: str,
+    version: str,
+    label: str,
+    repeat: int,
+    checks: list[CheckSamples],
+) -> int:
+    total = len(checks)
+    passed = sum(1 for c in checks if all(c.ok))
+    with db:
+        cur = db.execute(
+            "INSERT INTO runs (started_at, base, version, host, git_rev, label, repeat, total, passed)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (time.strftime("%Y-%m-%d %H:%M:%S"), base, version, socket.gethostname(), git_rev(),
+             label, repeat, total, passed),
+        )
+        run_id = cur.lastrowid
+        db.executemany(
+            "INSERT INTO samples (run_id, grp, name, iter, ms, ok) VALUES (?, ?, ?, ?, ?, ?)",
+            [(run_id, c.group, c.name, i, ms, int(ok))
+             for c in checks for i, (ms, ok) in enumerate(zip(c.ms, c.ok))],
+        )
+    return int(run_id)
+
+
+def resolve_run(db: sqlite3.Connection, ref: str) -> int | None:
+    """运行 ID / 标签 / last / prev → 运行 ID"""
+    if ref == "last":
+        row = db.execute("SELECT id FROM runs ORDER BY id DESC LIMIT 1").fetchone()
+    elif ref == "prev":
+        row = db.execute("SELECT id FROM runs ORDER BY id DESC LIMIT 1 OFFSET 1").fetchone()
+    elif ref.isdigit():
+        row = db.execute("SELECT id FROM runs WHERE id = ?", (int(ref),)).fetchone()
+    else:
+        row = db.execute("SELECT id FROM runs WHERE label = ? ORDER BY id DESC LIMIT 1", (ref,)).fetchone()
+    return int(row[0]) if row else None
+
+
+@dataclass
+class Stat:
+    group: str
+    name: str
+    n: int
+    median: float
+    mad: float
+    p90: float
+    min: float
+
+
+def robust(xs: list[float]) -> tuple[float, float, float, float]:
+    """中位数、MAD、p90、最小值"""
+    xs = sorted(xs)
+    med = statistics.median(xs)
+    mad = statistics.median([abs(x - med) for x in xs])
+    p90 = xs[min(len(xs) - 1, int(round(0.9 * (len(xs) - 1))))]
+    return med, mad, p90, xs[0]
+
+
+def run_stats(db: sqlite3.Connection, run_id: int) -> dict[str, Stat]:
+    """按用例汇总成功样本；全部失败的用例不参与对比"""
+    by: dict[str, tuple[str, list[float]]] = {}
+    for grp, name, ms in db.execute(
+        "SELECT grp, name, ms FROM samples WHERE run_id = ? AND ok = 1 ORDER BY iter", (run_id,)
+    ):
+        by.setdefault(name, (grp, []))[1].append(ms)
+    out: dict[str, Stat] = {}
+    for name, (grp, xs) in by.items():
+        med, mad, p90, lo = robust(xs)
+        out[name] = Stat(grp, name, len(xs), med, mad, p90, lo)
+    return out
+
+
+def run_meta(db: sqlite3.Connection, run_id: int) -> str:
+    row = db.execute(
+        "SELECT id, started_at, version, host, git_rev, label, repeat, passed, total FROM runs WHERE id = ?",
+        (run_id,),
+    ).fetchone()
+    if not row:
+        return f"#{run_id} (不存在)"
+    rid, at, ver, host, rev, label, rep, passed, total = row
+    tag = f" [{label}]" if label else ""
+    return f"#{rid}{tag} {at} version={ver or '?'} host={host} git={rev or '?'} repeat={rep} {passed}/{total}"
+
+
+@dataclass
+class Regression:
+    name: str
+    base: Stat
+    cur: Stat
+
+
+def compare(
+    db: sqlite3.Connection,
+    baseline_id: int,
+    run_id: int,
+    *,
+    threshold: float = 0.25,
+    min_delta_ms: float = 20,
+    verbose: bool = True,
+) -> list[Regression]:
+    base, cur = run_stats(db, baseline_id), run_stats(db, run_id)
+    regressions: list[Regression] = []
+    if verbose:
+        print(f"基线: {run_meta(db, baseline_id)}")
+        print(f"本次: {run_meta(db, run_id)}")
+        print(f"阈值: +{threshold:.0%} 且 > {min_delta_ms:g}ms 且 > 3×MAD\n")
+        print(f"{'用例':<40} {'基线 p50':>10} {'本次 p50':>10} {'变化':>8}  判定")
+    for name, c in cur.items():
+        b = base.get(name)
+        if b is None:
+            continue
+        delta = c.median - b.median
+        noise = 3 * b.mad * 1.4826
+        regressed = c.median > b.median * (1 + threshold) and delta > min_delta_ms and delta > noise
+        if regressed:
+            regressions.append(Regression(name, b, c))
+        if verbose:
+            change = f"{(c.median / b.median - 1):+.0%}" if b.median > 0 else "n/a"
+            verdict = "REGRESSED" if regressed else ""
+            print(f"{name[:40]:<40} {b.median:>9.0f}ms {c.median:>9.0f}ms {change:>8}  {verdict}")
+    if verbose:
+        missing = sorted(set(base) - set(cur))
+        if missing:
+            print(f"\n本次缺少成功样本的用例: {', '.join(missing)}")
+        print(f"\n回归 {len(regressions)} 项")
+    return regressions
+
+
+def cmd_list(db: sqlite3.Connection, args: argparse.Namespace) -> int:
+    rows = db.execute("SELECT id FROM runs ORDER BY id DESC LIMIT ?", (args.limit,)).fetchall()
+    for (rid,) in rows:
+        print(run_meta(db, rid))
+    return 0
+
+
+def cmd_show(db: sqlite3.Connection, args: argparse.Namespace) -> int:
+    rid = resolve_run(db, args.run)
+    if rid is None:
+        print(f"找不到运行: {args.run}")
+        return 2
+    print(run_meta(db, rid) + "\n")
+    print(f"{'用例':<40} {'n':>3} {'p50':>8} {'p90':>8} {'min':>8} {'MAD':>7}")
+    for s in sorted(run_stats(db, rid).values(), key=lambda s: (s.group, s.name)):
+        print(f"{s.name[:40]:<40} {s.n:>3} {s.median:>7.0f}ms {s.p90:>7.0f}ms {s.min:>7.0f}ms {s.mad:>6.1f}")
+    return 0
+
+
+def cmd_compare(db: sqlite3.Connection, args: argparse.Namespace) -> int:
+    bid, rid = resolve_run(db, args.baseline), resolve_run(db, args.run)
+    if bid is None or rid is None:
+        print(f"找不到运行: {args.baseline if bid is None else args.run}")
+        return 2
+    regs = compare(db, bid, rid, threshold=args.threshold, min_delta_ms=args.min_delta_ms)
+    return 1 if regs else 0
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="全功能测试耗时历史")
+    ap.add_argument("--db", default=DEFAULT_DB)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("list")
+    p.add_argument("--limit", type=int, default=20)
+    p = sub.add_parser("show")
+    p.add_argument("run")
+    p = sub.add_parser("compare")
+    p.add_argument("baseline")
+    p.add_argument("run", nargs="?", default="last")
+    p.add_argument("--threshold", type=float, default=0.25)
+    p.add_argument("--min-delta-ms", type=float, default=20)
+    args = ap.parse_args()
+    db = connect(args.db)
+    return {"list": cmd_list, "show": cmd_show, "compare": cmd_compare}[args.cmd](db, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
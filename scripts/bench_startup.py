@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+启动耗时 / 峰值内存基准
+
+按不同数据量预置 DATA_DIR（sniper.db 的 history / queue / servers 行 + logs/app.log.json），
+拉起后端二进制，轮询 /health 直到 ready=true，记录：
+  - 进程启动 → 首次 200（HTTP 可用）
+  - 进程启动 → ready=true（关键阶段完成，/api/* 放行）
+  - ready 后首次 /api/stats（触发 history 计数器 + 服务器目录懒加载）
+  - 峰值 RSS（/proc/<pid>/status 的 VmHWM，仅 Linux）
+  - /health 报告的各阶段耗时
+
+只读本地临时目录，不连接 OVH：队列任务全部预置为 completed，不建监控订阅。
+
+用法:
+  cd backend && go build -o ../bin/server . && cd ..
+  python scripts/bench_startup.py --binary bin/server --sizes 0,10000,100000 --runs 3
+  python scripts/bench_startup.py --binary bin/server --json docs/handover/startup-bench.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import socket
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from dataclasses import asdict, dataclass, field
+
+API_KEY = "bench-startup-" + "x" * 32
+ISO_LAYOUT = "%Y-%m-%dT%H:%M:%S.%f"
+
+
+@dataclass
+class Run:
+    size: int
+    listen_ms: int = -1
+    ready_ms: int = -1
+    first_stats_ms: int = -1
+    peak_rss_kb: int = -1
+    phases: list = field(default_factory=list)
+    error: str = ""
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def get_json(url: str, timeout: float = 2.0) -> tuple[int, dict | None]:
+    r = urllib.request.Request(
+        url,
+        headers={
+            "X-API-Key": API_KEY,
+            "X-Request-Time": str(int(time.time() * 1000)),
+        },
+    )
+    try:
+        with urllib.request.urlopen(r, timeout=timeout) as resp:
+            return resp.status, json.loads(resp.read().decode() or "null")
+    except urllib.error.HTTPError as e:
+        try:
+            return e.code, json.loads(e.read().decode() or "null")
+        except Exception:
+            return e.code, None
+
+
+def peak_rss_kb(pid: int) -> int:
+    try:
+        with open(f"/proc/{pid}/status", encoding="utf-8") as fp:
+            for line in fp:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return -1
+
+
+def start(binary: str, data_dir: str, port: int) -> subprocess.Popen:
+    env = dict(os.environ)
+    env.update(
+        {
+            "DATA_DIR": data_dir,
+            "PORT": str(port),
+            "LISTEN_HOST": "127.0.0.1",
+            "API_SECRET_KEY": API_KEY,
+            "GIN_MODE": "release",
+        }
+    )
+    return subprocess.Popen(
+        [binary],
+        cwd=data_dir,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+def stop(proc: subprocess.Popen) -> None:
+    if proc.poll() is None:
+        proc.terminate()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+
+
+def init_schema(binary: str, data_dir: str, timeout: float) -> None:
+    """空目录跑一次二进制，让它自己建表 + 迁移，之后再灌数据"""
+    port = free_port()
+    proc = start(binary, data_dir, port)
+    try:
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if proc.poll() is not None:
+                raise RuntimeError(f"server exited with {proc.returncode}")
+            code, _ = get_json(f"http://127.0.0.1:{port}/health", timeout=0.5)
+            if code in (200, 503):
+                return
+            time.sleep(0.05)
+        raise RuntimeError("schema init timeout")
+    finally:
+        stop(proc)
+
+
+def seed(data_dir: str, size: int) -> None:
+    """history = size 行，queue = size/10，servers = size/50，日志写满 1000 条"""
+    now = time.time()
+    conn = sqlite3.connect(os.path.join(data_dir, "sniper.db"))
+    try:
+        cur = conn.cursor()
+        cur.executemany(
+            "INSERT OR REPLACE INTO history (id, task_id, plan_code, datacenter, options, status,"
+            " order_id, order_url, error_message, purchase_time, attempt_count, expiration_time, price)"
+            " VALUES (?, ?, ?, ?, '[]', ?, '', '', NULL, ?, 1, '', NULL)",
+            (
+                (
+                    f"h{i}",
+                    f"t{i}",
+                    f"24sk{i % 40:02d}",
+                    ("gra", "rbx", "sbg", "bhs")[i % 4],
+                    "success" if i % 7 == 0 else "failed",
+                    time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(now - i * 60)) + ".000000",
+                )
+                for i in range(size)
+            ),
+        )
+        ts = time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(now)) + ".000000"
+        cur.executemany(
+            "INSERT OR REPLACE INTO queue (id, plan_code, datacenter, options, status, created_at, updated_at)"
+            " VALUES (?, ?, 'gra', '[]', 'completed', ?, ?)",
+            ((f"q{i}", f"24sk{i % 40:02d}", ts, ts) for i in range(size // 10)),
+        )
+        cur.executemany(
+            "INSERT OR REPLACE INTO servers (plan_code, data, updated_at) VALUES (?, ?, ?)",
+            (
+                (
+                    f"24sk{i:04d}",
+                    json.dumps(
+                        {
+                            "planCode": f"24sk{i:04d}",
+                            "name": f"KS-{i}",
+                            "cpu": "Intel Xeon",
+                            "memory": "64GB",
+                            "storage": "2x2TB",
+                            "datacenters": [
+                                {"datacenter": dc, "availability": "unavailable"}
+                                for dc in ("gra", "rbx", "sbg", "bhs", "waw", "fra")
+                            ],
+                        }
+                    ),
+                    int(now * 1000),
+                )
+                for i in range(size // 50)
+            ),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+    logs_dir = os.path.join(data_dir, "logs")
+    os.makedirs(logs_dir, exist_ok=True)
+    entries = [
+        {
+            "id": f"l{i}",
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(now - i)) + ".000000",
+            "level": "INFO",
+            "message": f"bench seed entry {i} " + "-" * 80,
+            "source": "system",
+        }
+        for i in range(min(size, 1000))
+    ]
+    with open(os.path.join(logs_dir, "app.log.json"), "w", encoding="utf-8") as fp:
+        json.dump(entries, fp, ensure_ascii=False)
+
+
+def measure(binary: str, data_dir: str, size: int, timeout: float) -> Run:
+    run = Run(size=size)
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    t0 = time.perf_counter()
+    proc = start(binary, data_dir, port)
+    try:
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if proc.poll() is not None:
+                run.error = f"server exited with {proc.returncode}"
+                return run
+            code, data = get_json(base + "/health", timeout=0.5)
+            elapsed = int((time.perf_counter() - t0) * 1000)
+            if code in (200, 503) and run.listen_ms < 0:
+                run.listen_ms = elapsed
+            if code == 200 and isinstance(data, dict) and data.get("ready"):
+                run.ready_ms = elapsed
+                break
+            time.sleep(0.01)
+        else:
+            run.error = "ready timeout"
+            return run
+
+        t1 = time.perf_counter()
+        code, _ = get_json(base + "/api/stats", timeout=timeout)
+        if code == 200:
+            run.first_stats_ms = int((time.perf_counter() - t1) * 1000)
+        else:
+            run.error = f"/api/stats code={code}"
+
+        # stats 之后懒加载阶段也已完成，再取一次 phases
+        _, data = get_json(base + "/health")
+        if isinstance(data, dict):
+            run.phases = data.get("phases") or []
+        run.peak_rss_kb = peak_rss_kb(proc.pid)
+    finally:
+        stop(proc)
+    return run
+
+
+def fmt(values: list[int]) -> str:
+    ok = [v for v in values if v >= 0]
+    if not ok:
+        return "-"
+    if len(ok) == 1:
+        return str(ok[0])
+    return f"{int(statistics.median(ok))} ({min(ok)}-{max(ok)})"
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="OVH_WEBUI 启动耗时 / 峰值内存基准")
+    ap.add_argument("--binary", required=True, help="已编译的后端二进制")
+    ap.add_argument("--sizes", default="0,1000,10000,100000", help="history 行数档位，逗号分隔")
+    ap.add_argument("--runs", type=int, default=3, help="每档重复次数")
+    ap.add_argument("--timeout", type=float, default=60.0, help="单次等待 ready 的秒数")
+    ap.add_argument("--json", default="", help="结果另存为 JSON")
+    ap.add_argument("--keep", action="store_true", help="保留临时数据目录")
+    args = ap.parse_args()
+
+    binary = os.path.abspath(args.binary)
+    if not os.path.isfile(binary):
+        print(f"ERROR: 找不到二进制 {binary}")
+        return 2
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+
+    results: list[Run] = []
+    for size in sizes:
+        data_dir = tempfile.mkdtemp(prefix=f"ovh-bench-{size}-")
+        try:
+            init_schema(binary, data_dir, args.timeout)
+            t = time.perf_counter()
+            seed(data_dir, size)
+            print(f"[size={size}] seeded in {time.perf_counter() - t:.1f}s  dir={data_dir}")
+            for i in range(args.runs):
+                r = measure(binary, data_dir, size, args.timeout)
+                results.append(r)
+                print(
+                    f"  run {i + 1}: listen={r.listen_ms}ms ready={r.ready_ms}ms "
+                    f"stats={r.first_stats_ms}ms rss={r.peak_rss_kb}KB {r.error}"
+                )
+        finally:
+            if not args.keep:
+                shutil.rmtree(data_dir, ignore_errors=True)
+
+    print(f"\n{'size':>8} | {'listen ms':>16} | {'ready ms':>16} | {'1st stats ms':>16} | {'peak RSS KB':>20}")
+    print("-" * 90)
+    for size in sizes:
+        rs = [r for r in results if r.size == size]
+        print(
+            f"{size:>8} | {fmt([r.listen_ms for r in rs]):>16} | {fmt([r.ready_ms for r in rs]):>16} | "
+            f"{fmt([r.first_stats_ms for r in rs]):>16} | {fmt([r.peak_rss_kb for r in rs]):>20}"
+        )
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fp:
+            json.dump([asdict(r) for r in results], fp, ensure_ascii=False, indent=2)
+        print(f"\n结果已写: {args.json}")
+
+    return 1 if any(r.error for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+集群模式多进程扩展性测试：本机起 1..N 个后端实例共享同一 DATA_DIR，测每个检查间隔内被检查的订阅数
+
+每一档（实例数 k = 1, 2, ... --max-instances）：
+  - 起 k 个 CLUSTER_MODE=true 的后端（PORT 从 --port 起递增，日志 / 缓存目录各自独立）
+  - 等分片租约均衡（各实例 /api/cluster/status 的 ownedShards 之和 == 分片数且互不重叠）
+  - 在第一个实例上建订阅、各实例启动监控，跑 --window 秒
+  - 各实例 monitor.checksTotal 的增量之和 / 窗口秒数 × 检查间隔(5s) = 每个间隔检查的订阅数
+  - 停掉全部实例进入下一档
+
+报告每档的吞吐、相对 1 个实例的加速比与效率（加速比 / k），以及每档的负责订阅分布。
+--kill-one 时最后一档跑完窗口后 kill -9 一个实例，等租约过期后检查剩余实例是否接手全部分片、没有分片被两个实例持有。
+
+订阅检查会真实请求 OVH，且监控启动要求 Telegram 已配置（同一 DATA_DIR 的库里）；
+单实例的吞吐受 maxWorkers=4 与 OVH 延迟限制，多实例即多组 worker 并行。--no-monitor 时只验证分片均衡与故障接管。
+
+用法:
+  cd backend && go build -o ../ovh-server . && cd ..
+  set API_SECRET_KEY=<与 backend/.env 一致>
+  python scripts/cluster_scaling.py --binary ./ovh-server --data-dir ./data --max-instances 4 --subscriptions 40
+  python scripts/cluster_scaling.py --binary ./ovh-server --data-dir /tmp/cluster-data --no-monitor --kill-one
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+API_KEY = os.environ.get("API_SECRET_KEY", "")
+CHECK_INTERVAL = 5  # 后端全局固定的监控检查间隔（秒）
+
+
+def call_json(base: str, method: str, path: str, body: dict | None = None, timeout: float = 30) -> tuple[int, object]:
+    data = json.dumps(body).encode("utf-8") if body is not None else None
+    r = urllib.request.Request(
+        base + path,
+        data=data,
+        method=method,
+        headers={
+            "Content-Type": "application/json",
+            "X-API-Key": API_KEY,
+            "X-Request-Time": str(int(time.time() * 1000)),
+        },
+    )
+    try:
+        with urllib.request.urlopen(r, timeout=timeout) as resp:
+            raw = resp.read()
+            return resp.status, json.loads(raw) if raw else None
+    except urllib.error.HTTPError as e:
+        return e.code, None
+    except (urllib.error.URLError, OSError, json.JSONDecodeError):
+        return 0, None
+
+
+class Instance:
+    """一个后端进程：共享 DATA_DIR，日志 / 缓存目录独立"""
+
+    def __init__(self, args: argparse.Namespace, idx: int, scratch: str) -> None:
+        self.id = f"scale-{idx}"
+        self.port = args.port + idx
+        self.base = f"http://127.0.0.1:{self.port}"
+        own = os.path.join(scratch, self.id)
+        env = dict(os.environ)
+        env.update({
+            "PORT": str(self.port),
+            "LISTEN_HOST": "127.0.0.1",
+            "DATA_DIR": os.path.abspath(args.data_dir),
+            "CACHE_DIR": os.path.join(own, "cache"),
+            "LOGS_DIR": os.path.join(own, "logs"),
+            "CLUSTER_MODE": "true",
+            "CLUSTER_INSTANCE_ID": self.id,
+            "CLUSTER_SHARDS": str(args.shards),
+            "CLUSTER_LEASE_TTL_SEC": str(args.lease_ttl),
+        })
+        self.log = open(os.path.join(scratch, self.id + ".out"), "wb")
+        self.proc = subprocess.Popen([os.path.abspath(args.binary)], env=env, stdout=self.log, stderr=subprocess.STDOUT)
+
+    def status(self) -> dict | None:
+        code, data = call_json(self.base, "GET", "/api/cluster/status")
+        return data if code == 200 and isinstance(data, dict) else None
+
+    def stop(self, kill: bool = False) -> None:
+        if self.proc.poll() is None:
+            self.proc.send_signal(signal.SIGKILL if kill else signal.SIGTERM)
+            try:
+                self.proc.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+        self.log.close()
+
+
+def shard_owners(insts: list[Instance]) -> tuple[dict[int, list[str]], dict[str, dict]]:
+    owners: dict[int, list[str]] = {}
+    statuses: dict[str, dict] = {}
+    for inst in insts:
+        st = inst.status()
+        if st is None:
+            continue
+        statuses[inst.id] = st
+        for s in (st.get("cluster") or {}).get("ownedShards") or []:
+            owners.setdefault(s, []).append(inst.id)
+    return owners, statuses
+
+
+def wait_balanced(insts: list[Instance], shards: int, timeout: float) -> tuple[bool, dict[str, dict]]:
+    """等到每个分片恰好一个实例持有，且各实例持有数与份额一致"""
+    deadline = time.time() + timeout
+    statuses: dict[str, dict] = {}
+    while time.time() < deadline:
+        owners, statuses = shard_owners(insts)
+        if len(statuses) == len(insts) and len(owners) == shards and all(len(o) == 1 for o in owners.values()):
+            if all(len(st["cluster"]["ownedShards"]) == st["cluster"]["target"] for st in statuses.values()):
+                return True, statuses
+        time.sleep(1)
+    return False, statuses
+
+
+def ensure_subscriptions(base: str, n: int) -> list[str]:
+    code, data = call_json(base, "GET", "/api/monitor/subscriptions")
+    existing = [s.get("planCode") for s in data if isinstance(s, dict)] if code == 200 and isinstance(data, list) else []
+    if len(existing) >= n:
+        return []
+    code, data = call_json(base, "GET", "/api/servers", timeout=120)
+    plans = []
+    if code == 200 and isinstance(data, dict):
+        plans = [s.get("planCode") for s in data.get("servers") or [] if isinstance(s, dict) and s.get("planCode")]
+    created = []
+    for plan in [p for p in plans if p not in existing][: n - len(existing)]:
+        code, _ = call_json(base, "POST", "/api/monitor/subscriptions",
+                            {"planCode": plan, "notifyAvailable": False, "notifyUnavailable": False})
+        if code == 200:
+            created.append(plan)
+    return created
+
+
+def run_tier(args: argparse.Namespace, k: int, scratch: str, kill_one: bool) -> dict:
+    insts = [Instance(args, i, scratch) for i in range(k)]
+    result: dict = {"instances": k}
+    try:
+        ok, statuses = wait_balanced(insts, args.shards, args.lease_ttl * 4 + 30)
+        result["balanced"] = ok
+        if not ok:
+            print(f"  [FAIL] {k} 个实例 {args.lease_ttl * 4 + 30}s 内未均衡: "
+                  f"{ {i: len((s.get('cluster') or {}).get('ownedShards') or []) for i, s in statuses.items()} }")
+            return result
+        result["shards"] = {i: len(s["cluster"]["ownedShards"]) for i, s in statuses.items()}
+
+        if not args.no_monitor:
+            created = ensure_subscriptions(insts[0].base, args.subscriptions)
+            if created:
+                print(f"  新建订阅 {len(created)} 个")
+            for inst in insts:
+                call_json(inst.base, "POST", "/api/monitor/start")
+            # 等一轮同步让所有实例看到新订阅
+            time.sleep(CHECK_INTERVAL * 2)
+            before = {i.id: (i.status() or {}).get("monitor", {}).get("checksTotal", 0) for i in insts}
+            t0 = time.time()
+            time.sleep(args.window)
+            elapsed = time.time() - t0
+            after = {i.id: i.status() or {} for i in insts}
+            checks = sum(after[i.id].get("monitor", {}).get("checksTotal", 0) - before[i.id] for i in insts)
+            result["owned"] = {i: s.get("monitor", {}).get("ownedPlans", 0) for i, s in after.items()}
+            result["perInterval"] = checks / elapsed * CHECK_INTERVAL
+            stopped = [i for i, s in after.items() if not s.get("monitor", {}).get("running")]
+            if stopped:
+                print(f"  [WARN] 监控未运行（Telegram 未配置？）: {', '.join(stopped)}")
+
+        if kill_one and k > 1:
+            victim = insts[-1]
+            victim.stop(kill=True)
+            survivors = insts[:-1]
+            ok, statuses = wait_balanced(survivors, args.shards, args.lease_ttl * 4 + 30)
+            result["failover"] = ok
+            print(f"  kill -9 {victim.id} 后剩余实例{'已' if ok else '未能'}接手全部分片: "
+                  f"{ {i: len((s.get('cluster') or {}).get('ownedShards') or []) for i, s in statuses.items()} }")
+        return result
+    finally:
+        for inst in insts:
+            inst.stop()
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="集群模式多进程扩展性测试")
+    ap.add_argument("--binary", required=True, help="后端可执行文件（go build 产物）")
+    ap.add_argument("--data-dir", required=True, help="所有实例共享的 DATA_DIR（含 sniper.db）")
+    ap.add_argument("--max-instances", type=int, default=4)
+    ap.add_argument("--port", type=int, default=20100, help="第一个实例的端口，其余递增")
+    ap.add_argument("--shards", type=int, default=64)
+    ap.add_argument("--lease-ttl", type=int, default=6, help="CLUSTER_LEASE_TTL_SEC（测试用较短值，加快故障接管）")
+    ap.add_argument("--subscriptions", type=int, default=40, help="订阅数不足时在第一个实例上补建")
+    ap.add_argument("--window", type=float, default=60, help="每档吞吐采样窗口（秒）")
+    ap.add_argument("--no-monitor", action="store_true", help="不启动监控，只验证分片均衡 / 故障接管")
+    ap.add_argument("--kill-one", action="store_true", help="最后一档结束时 kill -9 一个实例验证接管")
+    ap.add_argument("--min-efficiency", type=float, default=0.8, help="效率低于此值判失败")
+    args = ap.parse_args()
+    if not API_KEY:
+        print("请设置 API_SECRET_KEY")
+        return 2
+
+    scratch = tempfile.mkdtemp(prefix="cluster-scaling-")
+    print(f"DATA_DIR={os.path.abspath(args.data_dir)} 分片={args.shards} 租约={args.lease_ttl}s 输出={scratch}")
+    results = []
+    failed = False
+    try:
+        for k in range(1, args.max_instances + 1):
+            print(f"\n== {k} 个实例 ==")
+            r = run_tier(args, k, scratch, args.kill_one and k == args.max_instances)
+            results.append(r)
+            if not r.get("balanced") or r.get("failover") is False:
+                failed = True
+            if "perInterval" in r:
+                print(f"  每 {CHECK_INTERVAL}s 检查订阅 {r['perInterval']:.1f} 个；负责分布 {r['owned']}")
+    except KeyboardInterrupt:
+        print("\n中断")
+
+    base = next((r["perInterval"] for r in results if r.get("perInterval")), 0)
+    if base:
+        print(f"\n{'实例':>4} {'每间隔检查':>10} {'加速比':>8} {'效率':>6}")
+        for r in results:
+            if "perInterval" not in r:
+                continue
+            speedup = r["perInterval"] / base
+            eff = speedup / r["instances"]
+            mark = "" if eff >= args.min_efficiency else "  LOW"
+            failed = failed or eff < args.min_efficiency
+            print(f"{r['instances']:>4} {r['perInterval']:>10.1f} {speedup:>8.2f} {eff:>6.0%}{mark}")
+    if not failed:
+        shutil.rmtree(scratch, ignore_errors=True)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -12,11 +12,19 @@ OVH_WEBUI 全功能测试（从零）
   set API_SECRET_KEY=<与 backend/.env 一致>
   set SMOKE_ALLOWED_SERVER=<可选，只读目标机>
   python scripts/full_functional_test.py
+
+耗时历史 / 回归判定（见 scripts/bench_history.py）：
+  每次运行把各用例耗时追加到 scripts/.bench/functional.sqlite（--no-record 关闭）
+  python scripts/full_functional_test.py --repeat 5 --label v1.4.0           # 记一条基线
+  python scripts/full_functional_test.py --repeat 5 --baseline v1.4.0        # 与基线对比，回归则退出码 1
+  python scripts/bench_history.py list / show last / compare v1.4.0 last
 """
 from __future__ import annotations
 
+import argparse
 import json
 import os
+import statistics
 import sys
 import time
 import urllib.error
@@ -28,6 +36,10 @@ BASE = os.environ.get("SMOKE_BASE", "http://127.0.0.1:19998")
 API_KEY = os.environ.get("API_SECRET_KEY", "")
 ALLOWED = os.environ.get("SMOKE_ALLOWED_SERVER", "").strip()
 
+# 每个用例执行次数（取中位数）与不计时的预热次数，由命令行参数设置
+REPEAT = 1
+WARMUP = 0
+
 # 绝对禁止的危险路径关键字（测试脚本自身不会调用）
 FORBIDDEN_ACTIONS = (
     "reboot",
@@ -54,6 +66,8 @@ class Result:
     detail: str = ""
     ms: int = 0
     group: str = ""
+    samples: list[float] = field(default_factory=list)  # 每次执行耗时（ms）
+    oks: list[bool] = field(default_factory=list)
 
 
 @dataclass
@@ -113,13 +127,26 @@ def check(
     name: str,
     fn: Callable[[], tuple[bool, str]],
 ) -> bool:
-    t0 = time.time()
-    try:
-        ok, detail = fn()
-    except Exception as e:
-        ok, detail = False, f"exception: {e}"
-    ms = int((time.time() - t0) * 1000)
-    suite.add(Result(name=name, ok=ok, detail=detail, ms=ms, group=group))
+    def once() -> tuple[bool, str, float]:
+        t0 = time.time()
+        try:
+            ok, detail = fn()
+        except Exception as e:
+            ok, detail = False, f"exception: {e}"
+        return ok, detail, (time.time() - t0) * 1000
+
+    for _ in range(WARMUP):
+        once()
+    samples: list[float] = []
+    oks: list[bool] = []
+    detail = ""
+    for _ in range(max(1, REPEAT)):
+        ok, detail, ms = once()
+        samples.append(ms)
+        oks.append(ok)
+    ok = all(oks)
+    suite.add(Result(name=name, ok=ok, detail=detail, ms=int(statistics.median(samples)), group=group,
+                     samples=samples, oks=oks))
     return ok
 
 
@@ -127,7 +154,63 @@ def section(title: str) -> None:
     print(f"\n{'=' * 60}\n{title}\n{'=' * 60}")
 
 
+def parse_args() -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description="OVH_WEBUI 全功能测试")
+    ap.add_argument("--repeat", type=int, default=1, help="每个用例执行次数，报告取中位数")
+    ap.add_argument("--warmup", type=int, default=0, help="每个用例不计时的预热次数")
+    ap.add_argument("--label", default="", help="本次运行的标签（可作为之后的 --baseline）")
+    ap.add_argument("--baseline", default="", help="对比基线：运行 ID / 标签 / last / prev")
+    ap.add_argument("--threshold", type=float, default=0.25, help="中位数变慢超过该比例判回归")
+    ap.add_argument("--min-delta-ms", type=float, default=20, help="变慢不足该毫秒数不判回归")
+    ap.add_argument("--db", default="", help="历史库路径（默认 scripts/.bench/functional.sqlite）")
+    ap.add_argument("--no-record", action="store_true", help="不写入历史库")
+    return ap.parse_args()
+
+
+def record_history(args: argparse.Namespace, suite: Suite) -> int:
+    """追加本次耗时到历史库；给了 --baseline 时对比，回归返回 1"""
+    import bench_history
+
+    if args.no_record and not args.baseline:
+        return 0
+    db = bench_history.connect(args.db or bench_history.DEFAULT_DB)
+    baseline_id = None
+    if args.baseline:
+        # 先解析基线，避免 last / prev 指到本次运行
+        baseline_id = bench_history.resolve_run(db, args.baseline)
+        if baseline_id is None:
+            print(f"找不到基线运行: {args.baseline}")
+            return 2
+    if args.no_record:
+        print("--baseline 需要记录本次运行，忽略 --no-record")
+    code, data = req("GET", "/api/version")
+    version = str(data.get("version", "")) if code == 200 and isinstance(data, dict) else ""
+    run_id = bench_history.record_run(
+        db,
+        base=BASE,
+        version=version,
+        label=args.label,
+        repeat=REPEAT,
+        checks=[
+            bench_history.CheckSamples(r.group, r.name, r.samples, r.oks)
+            for r in suite.results
+            if r.samples
+        ],
+    )
+    print(f"耗时已记入历史库: run #{run_id}")
+    if baseline_id is None:
+        return 0
+    section("性能对比")
+    regs = bench_history.compare(
+        db, baseline_id, run_id, threshold=args.threshold, min_delta_ms=args.min_delta_ms
+    )
+    return 1 if regs else 0
+
+
 def main() -> int:
+    global REPEAT, WARMUP
+    args = parse_args()
+    REPEAT, WARMUP = max(1, args.repeat), max(0, args.warmup)
     if not API_KEY:
         print("ERROR: 设置环境变量 API_SECRET_KEY（与 backend/.env 一致）")
         return 2
@@ -413,6 +496,22 @@ def main() -> int:
 
             check(suite, "E", f"GET {name}", make())
 
+        def overview():
+            # 聚合概览：一次请求取齐默认分区，第二次应全部命中缓存（tasks TTL 5s 除外）
+            code, data = req("GET", f"{base}/overview", timeout=90)
+            if code != 200 or not isinstance(data, dict) or not data.get("success"):
+                return False, f"code={code} {str(data)[:120]}"
+            secs = data.get("sections") or {}
+            bad = [k for k, v in secs.items() if v.get("status") != "ok"]
+            code2, data2 = req("GET", f"{base}/overview", timeout=90)
+            cached = sum(1 for v in ((data2 or {}).get("sections") or {}).values() if v.get("cached"))
+            return code2 == 200, (
+                f"sections={len(secs)} failed={bad} elapsed={data.get('elapsedMs')}ms "
+                f"→ 2nd elapsed={(data2 or {}).get('elapsedMs')}ms cached={cached}"
+            )
+
+        check(suite, "E", "GET overview (聚合)", overview)
+
     # ─── F. 询价 + 订阅更新 API 可达性 ───────────────────────
     section("F. 询价 / 订阅更新")
 
@@ -616,6 +715,7 @@ def main() -> int:
         f"- 目标机: `{ALLOWED}`",
         f"- 结果: **{passed}/{total} PASS**",
         f"- 硬失败(核心): {len(hard)}",
+        f"- 每用例执行: {REPEAT} 次（ms 为中位数）",
         f"- Config Sniper: **完全下线**",
         f"- 安全: 未执行暂停/删除/重启/重装/终止",
         "",
@@ -649,9 +749,15 @@ def main() -> int:
         fp.write("\n".join(lines))
     print(f"\n报告已写: {md_path}")
 
+    perf = record_history(args, suite)
+    if perf == 2:
+        return 2
     if hard:
         print("OVERALL: FAIL (核心用例失败)")
         return 1
+    if perf:
+        print("OVERALL: FAIL (性能回归)")
+        return 1
     if failed:
         print("OVERALL: PASS_WITH_WARNINGS (核心通过，部分 soft 失败)")
         return 0
@@ -0,0 +1,53 @@
+#!/usr/bin/env node
+// 嵌入前端的构建时预压缩：给 dist 目录里可压缩的文件生成同名 .br / .gz，
+// 后端（backend/uiassets.go）按 Accept-Encoding 直接回预压缩版本，运行时不再压缩。
+// 只用 Node 自带 zlib，不需要额外依赖。
+//
+// 用法：node scripts/precompress-ui.mjs [dir]   （默认 backend/web）
+import { readdirSync, readFileSync, statSync, writeFileSync } from "node:fs";
+import { join, extname } from "node:path";
+import { brotliCompressSync, gzipSync, constants } from "node:zlib";
+
+const MIN_SIZE = 1024;
+const COMPRESSIBLE = new Set([
+  ".html", ".js", ".mjs", ".css", ".json", ".svg", ".txt", ".xml", ".map", ".webmanifest", ".ico", ".wasm",
+]);
+
+const root = process.argv[2] || "backend/web";
+
+function* walk(dir) {
+  for (const name of readdirSync(dir)) {
+    const p = join(dir, name);
+    if (statSync(p).isDirectory()) {
+      yield* walk(p);
+    } else {
+      yield p;
+    }
+  }
+}
+
+let files = 0;
+let rawBytes = 0;
+let brBytes = 0;
+for (const file of walk(root)) {
+  if (!COMPRESSIBLE.has(extname(file))) continue;
+  const data = readFileSync(file);
+  if (data.length < MIN_SIZE) continue;
+  const br = brotliCompressSync(data, {
+    params: {
+      [constants.BROTLI_PARAM_QUALITY]: constants.BROTLI_MAX_QUALITY,
+      [constants.BROTLI_PARAM_SIZE_HINT]: data.length,
+    },
+  });
+  const gz = gzipSync(data, { level: 9 });
+  // 压缩后不更小的不写，后端只在变体更小时使用
+  if (br.length < data.length) writeFileSync(file + ".br", br);
+  if (gz.length < data.length) writeFileSync(file + ".gz", gz);
+  files++;
+  rawBytes += data.length;
+  brBytes += Math.min(br.length, data.length);
+}
+
+console.log(
+  `precompressed ${files} files under ${root}: ${(rawBytes / 1024).toFixed(0)} KiB -> ${(brBytes / 1024).toFixed(0)} KiB (br)`,
+);
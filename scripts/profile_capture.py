@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+后端性能剖析抓取：在跑 full_functional_test.py / 压测期间抓 /api/debug/ 下的 pprof，
+下载到本地并打印每轮的 CPU 热点函数与锁竞争 / 阻塞位置。
+
+每一轮：
+  1. PUT /api/debug/profile-rates 打开 mutex / block 采样，记下 mutex / block / heap 基线
+  2. 启动负载命令（不给命令则只抓 --seconds 秒），期间按 --seconds 分段连续抓 CPU profile
+  3. 负载结束后再抓 mutex / block / heap / goroutine，与基线相减（go tool pprof -base）
+  4. 恢复采样率，用 go tool pprof -top 打印热点
+
+用法:
+  set API_SECRET_KEY=<与 backend/.env 一致>
+  python scripts/profile_capture.py -- python scripts/full_functional_test.py
+  python scripts/profile_capture.py --runs 3 --seconds 20 -- python scripts/bench_catalog.py refresh --runs 2
+  python scripts/profile_capture.py --seconds 30 --trace 5        # 不跑命令，直接抓 30 秒 + 5 秒 trace
+
+输出目录默认 profiles/<时间戳>/run<N>/，可直接 go tool pprof -http=: <文件> 打开。
+分析需要本机有 go 工具链；没有时只下载不分析。
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+
+ROOT = os.path.normpath(os.path.join(os.path.dirname(__file__), ".."))
+
+BASE = os.environ.get("SMOKE_BASE", "http://127.0.0.1:19998")
+API_KEY = os.environ.get("API_SECRET_KEY", "")
+
+
+def call(base: str, method: str, path: str, body: dict | None = None, timeout: float = 60) -> tuple[int, bytes]:
+    data = json.dumps(body).encode("utf-8") if body is not None else None
+    r = urllib.request.Request(
+        base + path,
+        data=data,
+        method=method,
+        headers={
+            "Content-Type": "application/json",
+            "X-API-Key": API_KEY,
+            "X-Request-Time": str(int(time.time() * 1000)),
+        },
+    )
+    try:
+        with urllib.request.urlopen(r, timeout=timeout) as resp:
+            return resp.status, resp.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read()
+
+
+def fetch(base: str, path: str, dest: str, timeout: float = 60) -> bool:
+    code, body = call(base, "GET", path, timeout=timeout)
+    if code != 200:
+        print(f"  [WARN] {path} -> {code} {body[:200]!r}")
+        return False
+    with open(dest, "wb") as fp:
+        fp.write(body)
+    return True
+
+
+def set_rates(base: str, mutex_fraction: int, block_rate_ns: int) -> dict:
+    code, body = call(base, "PUT", "/api/debug/profile-rates",
+                      {"mutexFraction": mutex_fraction, "blockRateNs": block_rate_ns})
+    if code != 200:
+        raise RuntimeError(f"profile-rates -> {code} {body[:200]!r}")
+    return json.loads(body).get("rates") or {}
+
+
+class CPUSampler(threading.Thread):
+    """负载运行期间连续抓 CPU profile，每段 seconds 秒，stop 后抓完当前段退出"""
+
+    def __init__(self, base: str, seconds: int, out_dir: str) -> None:
+        super().__init__(daemon=True)
+        self.base, self.seconds, self.out_dir = base, seconds, out_dir
+        self.files: list[str] = []
+        self._halt = threading.Event()
+
+    def stop(self) -> None:
+        self._halt.set()
+
+    def run(self) -> None:
+        i = 0
+        while True:
+            dest = os.path.join(self.out_dir, f"cpu-{i}.pb.gz")
+            if fetch(self.base, f"/api/debug/pprof/profile?seconds={self.seconds}", dest, timeout=self.seconds + 60):
+                self.files.append(dest)
+            i += 1
+            if self._halt.is_set():
+                return
+
+
+def go_top(go: str | None, files: list[str], top: int, *, base_file: str | None = None,
+           sample_index: str | None = None) -> str:
+    if not go or not files:
+        return ""
+    cmd = [go, "tool", "pprof", "-top", f"-nodecount={top}"]
+    if sample_index:
+        cmd.append(f"-sample_index={sample_index}")
+    if base_file:
+        cmd.append(f"-base={base_file}")
+    cmd += files
+    p = subprocess.run(cmd, cwd=os.path.join(ROOT, "backend"), capture_output=True, text=True)
+    if p.returncode != 0:
+        return f"(go tool pprof 失败: {p.stderr.strip()[:300]})"
+    # 去掉 pprof 的文件头，保留 Showing / flat 表
+    lines = p.stdout.splitlines()
+    for i, line in enumerate(lines):
+        if line.startswith("Showing") or line.lstrip().startswith("flat"):
+            return "\n".join(lines[i:])
+    return p.stdout
+
+
+def run_once(args: argparse.Namespace, n: int, out_dir: str, go: str | None) -> int:
+    os.makedirs(out_dir, exist_ok=True)
+    print(f"\n{'=' * 60}\nrun {n} → {os.path.relpath(out_dir, ROOT)}\n{'=' * 60}")
+
+    rates = set_rates(args.base, args.mutex_fraction, args.block_rate)
+    print(f"  采样率: {rates}")
+    snaps = ("mutex", "block", "heap")
+    for name in snaps:
+        fetch(args.base, f"/api/debug/pprof/{name}", os.path.join(out_dir, f"{name}-base.pb.gz"))
+
+    sampler = CPUSampler(args.base, args.seconds, out_dir)
+    t0 = time.time()
+    sampler.start()
+    rc = 0
+    try:
+        if args.command:
+            print(f"  负载: {' '.join(args.command)}")
+            rc = subprocess.run(args.command, cwd=ROOT).returncode
+        else:
+            time.sleep(args.seconds)
+    finally:
+        sampler.stop()
+        if args.trace > 0:
+            fetch(args.base, f"/api/debug/pprof/trace?seconds={args.trace}",
+                  os.path.join(out_dir, "trace.out"), timeout=args.trace + 60)
+        sampler.join()
+        for name in snaps:
+            fetch(args.base, f"/api/debug/pprof/{name}", os.path.join(out_dir, f"{name}.pb.gz"))
+        fetch(args.base, "/api/debug/pprof/goroutine", os.path.join(out_dir, "goroutine.pb.gz"))
+        set_rates(args.base, 0, 0)
+    elapsed = time.time() - t0
+    print(f"  耗时 {elapsed:.1f}s，负载退出码 {rc}，CPU profile {len(sampler.files)} 段")
+
+    if not go:
+        return rc
+    sections = [
+        ("CPU 热点", go_top(go, sampler.files, args.top)),
+        ("锁竞争（mutex，按等待时间）", go_top(go, [os.path.join(out_dir, "mutex.pb.gz")], args.top,
+                                     base_file=os.path.join(out_dir, "mutex-base.pb.gz"), sample_index="delay")),
+        ("阻塞（block，按阻塞时间）", go_top(go, [os.path.join(out_dir, "block.pb.gz")], args.top,
+                                   base_file=os.path.join(out_dir, "block-base.pb.gz"), sample_index="delay")),
+        ("本轮分配（alloc_space）", go_top(go, [os.path.join(out_dir, "heap.pb.gz")], args.top,
+                                      base_file=os.path.join(out_dir, "heap-base.pb.gz"),
+                                      sample_index="alloc_space")),
+    ]
+    for title, text in sections:
+        print(f"\n--- {title} ---\n{text or '(无数据)'}")
+    return rc
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="抓取后端 pprof 并打印热点")
+    ap.add_argument("--base", default=BASE)
+    ap.add_argument("--runs", type=int, default=1, help="重复轮数，每轮单独输出")
+    ap.add_argument("--seconds", type=int, default=30, help="每段 CPU profile 秒数（无命令时即总时长）")
+    ap.add_argument("--trace", type=int, default=0, help="负载结束时再抓 N 秒执行 trace（0 = 不抓）")
+    ap.add_argument("--mutex-fraction", type=int, default=5, help="每 N 次锁竞争采样 1 次")
+    ap.add_argument("--block-rate", type=int, default=10000, help="平均每阻塞 N 纳秒采样 1 次")
+    ap.add_argument("--top", type=int, default=15)
+    ap.add_argument("--out", default="", help="输出目录（默认 profiles/<时间戳>）")
+    ap.add_argument("command", nargs=argparse.REMAINDER, help="-- 之后为负载命令")
+    args = ap.parse_args()
+    if args.command and args.command[0] == "--":
+        args.command = args.command[1:]
+    if not API_KEY:
+        print("请设置 API_SECRET_KEY")
+        return 2
+
+    code, body = call(args.base, "GET", "/api/debug/profile-rates")
+    if code != 200:
+        print(f"/api/debug/ 不可用 ({code}): {body[:200]!r}；检查 ENABLE_DEBUG_ENDPOINTS / API_SECRET_KEY")
+        return 2
+
+    go = shutil.which("go")
+    if not go:
+        print("[WARN] 未找到 go 工具链，只下载 profile 不分析")
+    out = args.out or os.path.join(ROOT, "profiles", time.strftime("%Y%m%d-%H%M%S"))
+    rc = 0
+    for n in range(1, args.runs + 1):
+        rc = run_once(args, n, os.path.join(out, f"run{n}"), go) or rc
+    print(f"\n输出目录: {out}")
+    return rc
+
+
+if __name__ == "__main__":
+    sys.exit(main())
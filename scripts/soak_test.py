@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+长时间 soak 测试：持续跑混合只读负载 + 监控订阅，定时采样运行指标，拟合趋势找泄漏与吞吐衰减
+
+负载：
+  - --workers 个线程按权重随机请求只读接口（stats / servers / queue / 购买历史 / 日志 /
+    监控状态 / 目录变更 / 独服列表 / 可用性），--rps 限总速率
+  - 可选 --subscriptions N：从 /api/servers 取前 N 个型号建监控订阅（只通知不下单，
+    notifyAvailable=false 不推 Telegram），--start-monitor 时启动监控；结束后只删自己建的订阅、
+    恢复监控启停状态
+
+采样（每 --interval 秒）：
+  - /api/system/metrics 的 runtime.current：goroutine、堆、RSS、文件描述符、SQLite 连接、
+    常驻缓存条目（消息 UUID / options / DeletedTaskIDs / 日志）
+  - 给了 --pid 时另读本机 /proc/<pid>（RSS、fd 数），不依赖后端自报
+  - 本窗口内各接口延迟 p50 / p95 与吞吐
+
+判定（跳过前 --warmup 比例的样本后）：对每个序列做最小二乘斜率 + Spearman 单调性，
+单调递增（rho ≥ 0.8）且按斜率外推整段增长超过阈值（内存 / goroutine / fd 10%，延迟 25%）记为 LEAK / DECAY。
+
+用法:
+  set API_SECRET_KEY=<与 backend/.env 一致>
+  python scripts/soak_test.py --duration 4h --interval 60
+  python scripts/soak_test.py --duration 24h --subscriptions 5 --start-monitor --pid 12345 --json soak.json
+
+可用性查询会真实调用 OVH，默认权重很低；--no-ovh 完全去掉会打到 OVH 的接口。
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from dataclasses import asdict, dataclass, field
+
+BASE = os.environ.get("SMOKE_BASE", "http://127.0.0.1:19998")
+API_KEY = os.environ.get("API_SECRET_KEY", "")
+
+# (路径, 权重, 是否会打到 OVH)；{plan} 运行时替换为一个已知型号
+WORKLOAD: list[tuple[str, int, bool]] = [
+    ("/api/stats", 20, False),
+    ("/api/servers", 10, False),
+    ("/api/queue", 10, False),
+    ("/api/purchase-history?limit=50", 8, False),
+    ("/api/logs?limit=100", 8, False),
+    ("/api/monitor/status", 8, False),
+    ("/api/monitor/subscriptions", 5, False),
+    ("/api/catalog/changes?limit=50", 5, False),
+    ("/api/system/metrics", 4, False),
+    ("/api/server-control/list", 3, True),
+    ("/api/availability/{plan}", 1, True),
+]
+
+# 序列 → (阈值：整段外推增长比例, 类别)
+TRENDS: dict[str, tuple[float, str]] = {
+    "processRssBytes": (0.10, "memory"),
+    "heapInuseBytes": (0.10, "memory"),
+    "heapObjects": (0.10, "memory"),
+    "goroutines": (0.10, "goroutines"),
+    "openFds": (0.10, "fds"),
+    "dbOpenConns": (0.10, "fds"),
+    "monitorUUIDCache": (0.10, "cache"),
+    "monitorOptionsCache": (0.10, "cache"),
+    "deletedTaskIds": (0.10, "cache"),
+    "proc.rssBytes": (0.10, "memory"),
+    "proc.fds": (0.10, "fds"),
+    "latency.p50": (0.25, "latency"),
+    "latency.p95": (0.25, "latency"),
+}
+
+
+def parse_duration(s: str) -> float:
+    s = s.strip().lower()
+    for suf, mul in (("h", 3600), ("m", 60), ("s", 1)):
+        if s.endswith(suf):
+            return float(s[:-1]) * mul
+    return float(s)
+
+
+def call(base: str, method: str, path: str, body: dict | None = None, timeout: float = 60) -> tuple[int, bytes]:
+    data = json.dumps(body).encode("utf-8") if body is not None else None
+    r = urllib.request.Request(
+        base + path,
+        data=data,
+        method=method,
+        headers={
+            "Content-Type": "application/json",
+            "X-API-Key": API_KEY,
+            "X-Request-Time": str(int(time.time() * 1000)),
+        },
+    )
+    try:
+        with urllib.request.urlopen(r, timeout=timeout) as resp:
+            return resp.status, resp.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read()
+    except (urllib.error.URLError, OSError) as e:
+        return 0, str(e).encode()
+
+
+def call_json(base: str, method: str, path: str, body: dict | None = None) -> tuple[int, object]:
+    code, raw = call(base, method, path, body)
+    try:
+        return code, json.loads(raw) if raw else None
+    except json.JSONDecodeError:
+        return code, None
+
+
+class Latencies:
+    """各接口在当前采样窗口内的耗时；take 取走并清空"""
+
+    def __init__(self) -> None:
+        self.mu = threading.Lock()
+        self.ms: list[float] = []
+        self.by_path: dict[str, list[float]] = {}
+        self.errors = 0
+
+    def add(self, path: str, ms: float, ok: bool) -> None:
+        with self.mu:
+            self.ms.append(ms)
+            self.by_path.setdefault(path, []).append(ms)
+            if not ok:
+                self.errors += 1
+
+    def take(self) -> tuple[list[float], dict[str, list[float]], int]:
+        with self.mu:
+            out = self.ms, self.by_path, self.errors
+            self.ms, self.by_path, self.errors = [], {}, 0
+        return out
+
+
+def pct(xs: list[float], q: float) -> float:
+    if not xs:
+        return 0.0
+    xs = sorted(xs)
+    return xs[min(len(xs) - 1, int(round(q * (len(xs) - 1))))]
+
+
+def worker(base: str, paths: list[str], weights: list[int], lat: Latencies, stop: threading.Event,
+           interval: float) -> None:
+    next_at = time.monotonic()
+    while not stop.is_set():
+        path = random.choices(paths, weights)[0]
+        t0 = time.monotonic()
+        code, _ = call(base, "GET", path, timeout=120)
+        lat.add(path.split("?")[0], (time.monotonic() - t0) * 1000, 200 <= code < 300)
+        if interval > 0:
+            next_at += interval
+            delay = next_at - time.monotonic()
+            if delay > 0:
+                stop.wait(delay)
+            else:
+                next_at = time.monotonic()
+
+
+def read_proc(pid: int) -> dict[str, float]:
+    out: dict[str, float] = {}
+    try:
+        with open(f"/proc/{pid}/status", encoding="utf-8") as fp:
+            for line in fp:
+                if line.startswith("VmRSS:"):
+                    out["proc.rssBytes"] = float(line.split()[1]) * 1024
+        out["proc.fds"] = float(len(os.listdir(f"/proc/{pid}/fd")))
+    except OSError:
+        pass
+    return out
+
+
+@dataclass
+class Sample:
+    t: float  # 距开始秒数
+    values: dict[str, float] = field(default_factory=dict)
+    rps: float = 0
+    errors: int = 0
+    slowest: str = ""
+
+
+def sample(args: argparse.Namespace, t0: float, lat: Latencies, window: float) -> Sample:
+    s = Sample(t=time.time() - t0)
+    code, data = call_json(args.base, "GET", "/api/system/metrics")
+    if code == 200 and isinstance(data, dict):
+        cur = ((data.get("runtime") or {}).get("current")) or {}
+        s.values.update({k: float(v) for k, v in cur.items() if isinstance(v, (int, float))})
+    if args.pid:
+        s.values.update(read_proc(args.pid))
+    ms, by_path, errors = lat.take()
+    if ms:
+        s.values["latency.p50"] = pct(ms, 0.5)
+        s.values["latency.p95"] = pct(ms, 0.95)
+        s.slowest = max(by_path, key=lambda p: pct(by_path[p], 0.95))
+    s.rps = len(ms) / window if window > 0 else 0
+    s.values["throughput.rps"] = s.rps
+    s.errors = errors
+    return s
+
+
+def spearman(xs: list[float], ys: list[float]) -> float:
+    def ranks(v: list[float]) -> list[float]:
+        order = sorted(range(len(v)), key=lambda i: v[i])
+        r = [0.0] * len(v)
+        i = 0
+        while i < len(order):
+            j = i
+            while j + 1 < len(order) and v[order[j + 1]] == v[order[i]]:
+                j += 1
+            for k in range(i, j + 1):
+                r[order[k]] = (i + j) / 2
+            i = j + 1
+        return r
+
+    if len(xs) < 3:
+        return 0.0
+    rx, ry = ranks(xs), ranks(ys)
+    try:
+        return statistics.correlation(rx, ry)
+    except statistics.StatisticsError:  # 某一列全相同
+        return 0.0
+
+
+@dataclass
+class Trend:
+    name: str
+    kind: str
+    first: float
+    last: float
+    slope_per_h: float
+    growth: float  # 按斜率外推整段的增长 / 均值
+    rho: float
+    flagged: bool
+
+
+def analyze(samples: list[Sample], warmup: float) -> list[Trend]:
+    skip = int(len(samples) * warmup)
+    use = samples[skip:]
+    trends: list[Trend] = []
+    if len(use) < 5:
+        return trends
+    span_h = (use[-1].t - use[0].t) / 3600
+    for name, (limit, kind) in TRENDS.items():
+        pts = [(s.t / 3600, s.values[name]) for s in use if name in s.values]
+        if len(pts) < 5:
+            continue
+        xs, ys = [p[0] for p in pts], [p[1] for p in pts]
+        mean = statistics.fmean(ys)
+        try:
+            slope, _ = statistics.linear_regression(xs, ys)
+        except statistics.StatisticsError:
+            slope = 0.0
+        growth = slope * span_h / mean if mean > 0 else 0.0
+        rho = spearman(xs, ys)
+        trends.append(Trend(name, kind, ys[0], ys[-1], slope, growth, rho, rho >= 0.8 and growth > limit))
+    # 吞吐衰减：rps 单调下降超过 25%
+    pts = [(s.t / 3600, s.rps) for s in use]
+    xs, ys = [p[0] for p in pts], [p[1] for p in pts]
+    mean = statistics.fmean(ys)
+    if mean > 0:
+        try:
+            slope, _ = statistics.linear_regression(xs, ys)
+        except statistics.StatisticsError:
+            slope = 0.0
+        growth = slope * span_h / mean
+        rho = spearman(xs, ys)
+        trends.append(Trend("throughput.rps", "throughput", ys[0], ys[-1], slope, growth, rho,
+                            rho <= -0.8 and growth < -0.25))
+    return trends
+
+
+def human(name: str, v: float) -> str:
+    if name.endswith("Bytes"):
+        return f"{v / 1048576:.1f}MiB"
+    if name.startswith("latency"):
+        return f"{v:.0f}ms"
+    return f"{v:.1f}" if abs(v) < 100 else f"{v:.0f}"
+
+
+class Subscriptions:
+    """soak 期间建的监控订阅；cleanup 只删自己建的，恢复监控启停"""
+
+    def __init__(self, base: str) -> None:
+        self.base = base
+        self.created: list[str] = []
+        self.started_monitor = False
+
+    def setup(self, n: int, start_monitor: bool, plans: list[str]) -> None:
+        if n <= 0:
+            return
+        code, data = call_json(self.base, "GET", "/api/monitor/subscriptions")
+        existing = set()
+        if code == 200 and isinstance(data, list):
+            existing = {s.get("planCode") for s in data if isinstance(s, dict)}
+        for plan in [p for p in plans if p not in existing][:n]:
+            code, data = call_json(self.base, "POST", "/api/monitor/subscriptions",
+                                   {"planCode": plan, "notifyAvailable": False, "notifyUnavailable": False})
+            if code == 200:
+                self.created.append(plan)
+            else:
+                print(f"  [WARN] 订阅 {plan} 失败 ({code}): {str(data)[:160]}")
+        print(f"  新建订阅 {len(self.created)} 个: {', '.join(self.created)}")
+        if start_monitor:
+            code, data = call_json(self.base, "GET", "/api/monitor/status")
+            if code == 200 and isinstance(data, dict) and not data.get("running"):
+                code, _ = call_json(self.base, "POST", "/api/monitor/start")
+                self.started_monitor = code == 200
+                print(f"  启动监控: {'OK' if self.started_monitor else code}")
+
+    def cleanup(self) -> None:
+        if self.started_monitor:
+            call_json(self.base, "POST", "/api/monitor/stop")
+        for plan in self.created:
+            call_json(self.base, "DELETE", f"/api/monitor/subscriptions/{plan}")
+        if self.created:
+            print(f"已删除 soak 订阅 {len(self.created)} 个")
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="长时间 soak 测试")
+    ap.add_argument("--base", default=BASE)
+    ap.add_argument("--duration", default="2h", help="总时长，如 30m / 4h / 86400")
+    ap.add_argument("--interval", type=float, default=60, help="采样间隔（秒）")
+    ap.add_argument("--warmup", type=float, default=0.1, help="趋势拟合跳过的前段比例")
+    ap.add_argument("--workers", type=int, default=4)
+    ap.add_argument("--rps", type=float, default=5, help="总请求速率上限（0 = 不限）")
+    ap.add_argument("--subscriptions", type=int, default=0, help="新建的监控订阅数")
+    ap.add_argument("--start-monitor", action="store_true", help="监控未运行时启动，结束后停止")
+    ap.add_argument("--no-ovh", action="store_true", help="不请求会调用 OVH 的接口")
+    ap.add_argument("--pid", type=int, default=0, help="后端进程 PID（本机时读 /proc 交叉验证）")
+    ap.add_argument("--json", default="", help="把样本与判定写到 JSON 文件")
+    args = ap.parse_args()
+    if not API_KEY:
+        print("请设置 API_SECRET_KEY")
+        return 2
+
+    duration = parse_duration(args.duration)
+    code, data = call_json(args.base, "GET", "/api/servers")
+    plans = []
+    if code == 200 and isinstance(data, dict):
+        plans = [s.get("planCode") for s in data.get("servers") or [] if isinstance(s, dict) and s.get("planCode")]
+    plan = plans[0] if plans else "24ska01"
+
+    load = [(p.replace("{plan}", plan), w) for p, w, ovh in WORKLOAD if not (ovh and args.no_ovh)]
+    paths, weights = [p for p, _ in load], [w for _, w in load]
+    per_worker = args.workers / args.rps if args.rps > 0 else 0
+
+    print(f"BASE={args.base} 时长={duration / 3600:.2f}h 采样={args.interval:g}s "
+          f"workers={args.workers} rps≤{args.rps or '∞'}")
+    subs = Subscriptions(args.base)
+    subs.setup(args.subscriptions, args.start_monitor, plans)
+
+    lat = Latencies()
+    stop = threading.Event()
+    threads = [threading.Thread(target=worker, args=(args.base, paths, weights, lat, stop, per_worker), daemon=True)
+               for _ in range(args.workers)]
+    t0 = time.time()
+    samples: list[Sample] = []
+    try:
+        for t in threads:
+            t.start()
+        last = time.time()
+        while time.time() - t0 < duration:
+            stop.wait(min(args.interval, max(0.0, duration - (time.time() - t0))))
+            now = time.time()
+            s = sample(args, t0, lat, now - last)
+            last = now
+            samples.append(s)
+            v = s.values
+            print(f"[{s.t / 3600:6.2f}h] rss={human('processRssBytes', v.get('processRssBytes', 0))} "
+                  f"heap={human('heapInuseBytes', v.get('heapInuseBytes', 0))} "
+                  f"g={v.get('goroutines', 0):.0f} fds={v.get('openFds', 0):.0f} "
+                  f"p50={v.get('latency.p50', 0):.0f}ms p95={v.get('latency.p95', 0):.0f}ms "
+                  f"rps={s.rps:.1f} err={s.errors}")
+    except KeyboardInterrupt:
+        print("\n中断，按已有样本出报告")
+    finally:
+        stop.set()
+        for t in threads:
+            t.join(timeout=130)
+        subs.cleanup()
+
+    trends = analyze(samples, args.warmup)
+    print(f"\n{'=' * 72}\nsoak 报告：{len(samples)} 个样本，{(samples[-1].t if samples else 0) / 3600:.2f}h\n{'=' * 72}")
+    print(f"{'序列':<22} {'首':>10} {'末':>10} {'斜率/h':>10} {'外推增长':>9} {'rho':>6}  判定")
+    for tr in trends:
+        verdict = ("DECAY" if tr.kind in ("latency", "throughput") else "LEAK") if tr.flagged else ""
+        print(f"{tr.name:<22} {human(tr.name, tr.first):>10} {human(tr.name, tr.last):>10} "
+              f"{human(tr.name, tr.slope_per_h):>10} {tr.growth:>+8.0%} {tr.rho:>6.2f}  {verdict}")
+    slow = [s.slowest for s in samples if s.slowest]
+    if slow:
+        top = max(set(slow), key=slow.count)
+        print(f"\n最常成为窗口 p95 最慢的接口: {top} ({slow.count(top)}/{len(slow)} 个窗口)")
+    errors = sum(s.errors for s in samples)
+    flagged = [t for t in trends if t.flagged]
+    print(f"请求错误 {errors} 次；可疑趋势 {len(flagged)} 项" +
+          (f": {', '.join(t.name for t in flagged)}" if flagged else ""))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fp:
+            json.dump({"base": args.base, "duration": duration, "interval": args.interval,
+                       "samples": [asdict(s) for s in samples], "trends": [asdict(t) for t in trends]},
+                      fp, ensure_ascii=False, indent=1)
+        print(f"明细已写: {args.json}")
+    return 1 if flagged else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,667 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Telegram 一键下单端到端延迟基准：本地 Telegram Bot API 替身 + 本地 OVH API 替身 + 场景驱动
+
+进程内起两个替身：
+  - Telegram Bot API 替身（后端经 TELEGRAM_API_BASE 指向它）：getMe / getChat / sendMessage（记录通知与
+    inline 按钮）/ setWebhook（记下 url 与 secret_token）/ getWebhookInfo / setMyCommands /
+    answerCallbackQuery；并像 Telegram 一样把 update（按钮回调、普通消息）带 secret 头 POST 到后端 webhook
+  - OVH API 替身（账户 endpoint 填它的 URL）：/auth/time、/me、eco catalog、可用性（库存可随时翻转）、
+    购物车 / 配置 / 选项 / checkout / /me/order；--ovh-latency-ms 给每个请求加固定延迟模拟真实 RTT
+
+再用临时 DATA_DIR 起一个后端（--binary），配好 Telegram、账户、webhook 后每轮：
+  button 模式（默认）
+    新型号建订阅（只订阅 --dc，库存为无货）→ 等监控首轮检查落下基线 → t0 翻成有货
+    → 收到带按钮的补货通知 → 模拟点击（--tap-delay-ms 后投递 callback_query）
+    → answerCallbackQuery（入队结果）→ 下单购物车创建 → checkout → 抢购成功通知
+  text 模式
+    库存先有货 → 投递 "planCode dc" 文本消息（free-form 下单）→ 回复入队结果 → 购物车 → checkout
+
+报告各阶段延迟的 p50 / p95 / p99 与最大值。监控检查间隔固定 5 秒，"补货→通知"主要由轮询相位决定；
+webhook 之后的各段才是一键下单链路本身的开销（入队询价、队列轮询 1 秒、购物车与结账的 OVH 往返）。
+
+不会碰真实 OVH / Telegram：后端的 Telegram 与 OVH 请求全部落在替身上，数据目录用完即删。
+
+用法:
+  cd backend && go build -o ../ovh-server . && cd ..
+  python scripts/tg_quick_order_bench.py --binary ./ovh-server --iterations 20
+  python scripts/tg_quick_order_bench.py --binary ./ovh-server --mode text --iterations 50 --ovh-latency-ms 120
+  python scripts/tg_quick_order_bench.py --binary ./ovh-server --json bench.json --keep
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import secrets
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+API_KEY = secrets.token_hex(16)
+BOT_TOKEN = "100000:bench-token"
+CHAT_ID = 424242  # 私聊：chat id == user id
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+MEMORY = "ram-32g-ecc-2400"
+STORAGE = "softraid-2x512nvme"
+
+BUTTON_STAGES = [
+    ("alert", "补货→通知"),
+    ("tap", "通知→点击投递"),
+    ("ack", "点击→入队应答"),
+    ("cart", "入队→下单购物车"),
+    ("checkout", "购物车→checkout"),
+    ("notify", "checkout→成功通知"),
+    ("total", "补货→checkout"),
+]
+TEXT_STAGES = [
+    ("ack", "消息→入队回复"),
+    ("cart", "入队→下单购物车"),
+    ("checkout", "购物车→checkout"),
+    ("notify", "checkout→成功通知"),
+    ("total", "消息→checkout"),
+]
+
+
+class Recorder:
+    """两个替身共享的事件记录：按型号记各阶段首次出现的时间"""
+
+    def __init__(self) -> None:
+        self.cond = threading.Condition()
+        self.events: dict[str, dict[str, float]] = {}
+        self.payloads: dict[str, dict[str, object]] = {}
+
+    def mark(self, plan: str, name: str, payload: object = None) -> None:
+        with self.cond:
+            ev = self.events.setdefault(plan, {})
+            if name not in ev:
+                ev[name] = time.monotonic()
+                if payload is not None:
+                    self.payloads.setdefault(plan, {})[name] = payload
+                self.cond.notify_all()
+
+    def wait(self, plan: str, name: str, timeout: float) -> float | None:
+        deadline = time.monotonic() + timeout
+        with self.cond:
+            while name not in self.events.get(plan, {}):
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    return None
+                self.cond.wait(left)
+            return self.events[plan][name]
+
+    def payload(self, plan: str, name: str) -> object:
+        with self.cond:
+            return self.payloads.get(plan, {}).get(name)
+
+
+class JSONHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, fmt: str, *args: object) -> None:  # 安静
+        pass
+
+    def body_json(self) -> object:
+        n = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(n) if n else b""
+        if not raw:
+            return {}
+        try:
+            return json.loads(raw)
+        except json.JSONDecodeError:
+            return dict(urllib.parse.parse_qsl(raw.decode("utf-8", "replace")))
+
+    def reply(self, code: int, obj: object) -> None:
+        raw = json.dumps(obj).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+
+# ── Telegram Bot API 替身 ───────────────────────────────────────────────────
+
+class TelegramStandIn:
+    def __init__(self, rec: Recorder) -> None:
+        self.rec = rec
+        self.lock = threading.Lock()
+        self.webhook_url = ""
+        self.webhook_secret = ""
+        self.update_id = 1000
+        self.message_id = 1
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.base = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def _handler(self) -> type:
+        tg = self
+
+        class Handler(JSONHandler):
+            def do_GET(self) -> None:
+                self.dispatch()
+
+            def do_POST(self) -> None:
+                self.dispatch()
+
+            def dispatch(self) -> None:
+                u = urllib.parse.urlparse(self.path)
+                parts = u.path.strip("/").split("/")
+                if len(parts) != 2 or parts[0] != "bot" + BOT_TOKEN:
+                    self.reply(404, {"ok": False, "error_code": 404, "description": "Not Found"})
+                    return
+                body = self.body_json() if self.command == "POST" else {}
+                args = dict(urllib.parse.parse_qsl(u.query))
+                if isinstance(body, dict):
+                    args.update(body)
+                self.reply(200, {"ok": True, "result": tg.method(parts[1], args)})
+
+        return Handler
+
+    def method(self, name: str, args: dict) -> object:
+        if name == "getMe":
+            return {"id": 100000, "is_bot": True, "first_name": "bench", "username": "bench_bot"}
+        if name == "getChat":
+            return {"id": CHAT_ID, "type": "private", "first_name": "bench"}
+        if name == "setWebhook":
+            with self.lock:
+                self.webhook_url = str(args.get("url") or "")
+                self.webhook_secret = str(args.get("secret_token") or "")
+            return True
+        if name == "getWebhookInfo":
+            return {"url": self.webhook_url, "has_custom_certificate": False, "pending_update_count": 0}
+        if name == "setMyCommands":
+            return True
+        if name == "answerCallbackQuery":
+            # callback_query id 即型号（见 deliver_callback）
+            self.rec.mark(str(args.get("callback_query_id")), "ack", args.get("text"))
+            return True
+        if name == "sendMessage":
+            return self.on_message(args)
+        return True
+
+    def on_message(self, args: dict) -> dict:
+        with self.lock:
+            self.message_id += 1
+            mid = self.message_id
+        text = str(args.get("text") or "")
+        markup = args.get("reply_markup")
+        if isinstance(markup, str):
+            try:
+                markup = json.loads(markup)
+            except json.JSONDecodeError:
+                markup = None
+        buttons = [b for row in (markup or {}).get("inline_keyboard") or [] for b in row]
+        reply_to = args.get("reply_to_message_id")
+        for plan in list(self.rec.events):
+            if plan not in text:
+                if reply_to is not None and str(reply_to) == str(self.rec.payload(plan, "sent")):
+                    # free-form 下单的回复正文不一定带型号，按 reply_to 对上
+                    self.rec.mark(plan, "ack", text)
+                continue
+            if "抢购成功" in text:
+                self.rec.mark(plan, "notify")
+            elif buttons:
+                self.rec.mark(plan, "alert", {"message_id": mid, "callback_data": buttons[0].get("callback_data")})
+            elif reply_to is not None:
+                self.rec.mark(plan, "ack", text)
+        return {"message_id": mid, "date": int(time.time()), "chat": {"id": CHAT_ID, "type": "private"}, "text": text}
+
+    def deliver(self, update_key: str, update: dict) -> tuple[int, float]:
+        """像 Telegram 一样把 update 投递到 webhook，返回 (状态码, 耗时秒)"""
+        with self.lock:
+            self.update_id += 1
+            update = {"update_id": self.update_id, update_key: update}
+            url, secret = self.webhook_url, self.webhook_secret
+        req = urllib.request.Request(url, data=json.dumps(update).encode("utf-8"), method="POST",
+                                     headers={"Content-Type": "application/json", SECRET_HEADER: secret})
+        t = time.monotonic()
+        try:
+            with urllib.request.urlopen(req, timeout=10) as resp:
+                resp.read()
+                return resp.status, time.monotonic() - t
+        except urllib.error.HTTPError as e:
+            return e.code, time.monotonic() - t
+        except (urllib.error.URLError, OSError):
+            return 0, time.monotonic() - t
+
+    def deliver_callback(self, plan: str, message_id: int, data: str) -> tuple[int, float]:
+        return self.deliver("callback_query", {
+            "id": plan,
+            "from": {"id": CHAT_ID, "is_bot": False, "first_name": "bench"},
+            "message": {"message_id": message_id, "chat": {"id": CHAT_ID, "type": "private"}},
+            "chat_instance": "bench",
+            "data": data,
+        })
+
+    def deliver_text(self, plan: str, text: str) -> tuple[int, float]:
+        with self.lock:
+            self.message_id += 1
+            mid = self.message_id
+        # 先记下消息 id：后端回复可能在 webhook 返回之前就到
+        self.rec.mark(plan, "sent", mid)
+        code, took = self.deliver("message", {
+            "message_id": mid,
+            "from": {"id": CHAT_ID, "is_bot": False, "first_name": "bench"},
+            "chat": {"id": CHAT_ID, "type": "private"},
+            "date": int(time.time()),
+            "text": text,
+        })
+        return code, took
+
+
+# ── OVH API 替身 ───────────────────────────────────────────────────────────
+
+class OvhStandIn:
+    def __init__(self, rec: Recorder, latency: float) -> None:
+        self.rec = rec
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.stock: dict[str, dict[str, str]] = {}  # planCode → dc → availability
+        self.carts: dict[str, dict] = {}
+        self.seq = 0
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.base = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def set_stock(self, plan: str, dc: str, availability: str) -> None:
+        with self.lock:
+            self.stock.setdefault(plan, {})[dc] = availability
+
+    def _handler(self) -> type:
+        ovh = self
+
+        class Handler(JSONHandler):
+            def do_GET(self) -> None:
+                self.dispatch()
+
+            def do_POST(self) -> None:
+                self.dispatch()
+
+            def do_DELETE(self) -> None:
+                self.dispatch()
+
+            def dispatch(self) -> None:
+                if ovh.latency > 0:
+                    time.sleep(ovh.latency)
+                u = urllib.parse.urlparse(self.path)
+                path = u.path[len("/1.0"):] if u.path.startswith("/1.0") else u.path
+                body = self.body_json() if self.command == "POST" else {}
+                code, obj = ovh.route(self.command, path.strip("/").split("/"), dict(urllib.parse.parse_qsl(u.query)), body)
+                self.reply(code, obj)
+
+        return Handler
+
+    def route(self, method: str, p: list[str], q: dict, body: object) -> tuple[int, object]:
+        body = body if isinstance(body, dict) else {}
+        if p == ["auth", "time"]:
+            return 200, int(time.time())
+        if p == ["me"]:
+            return 200, {"nichandle": "bench-ovh", "currency": {"code": "EUR", "symbol": "EURO"}}
+        if p == ["order", "catalog", "public", "eco"]:
+            return 200, self.catalog()
+        if p == ["dedicated", "server", "datacenter", "availabilities"]:
+            return 200, self.availabilities(q.get("planCode"))
+        if p[:2] == ["me", "order"] and len(p) == 3:
+            return 200, {"orderId": int(p[2]), "expirationDate": "2099-01-01T00:00:00+00:00",
+                         "priceWithTax": {"value": 50.4, "currencyCode": "EUR"},
+                         "priceWithoutTax": {"value": 42.0, "currencyCode": "EUR"},
+                         "tax": {"value": 8.4, "currencyCode": "EUR"}}
+        if p[:2] == ["order", "cart"]:
+            return self.cart(method, p[2:], q, body)
+        return 404, {"message": "stand-in: no route " + "/".join(p)}
+
+    def catalog(self) -> dict:
+        with self.lock:
+            plans = list(self.stock)
+        return {
+            "locale": {"currencyCode": "EUR", "subsidiary": "IE"},
+            "plans": [{
+                "planCode": pc,
+                "invoiceName": "BENCH " + pc,
+                "addonFamilies": [
+                    {"name": "memory", "default": f"{MEMORY}-{pc}", "addons": [f"{MEMORY}-{pc}"]},
+                    {"name": "storage", "default": f"{STORAGE}-{pc}", "addons": [f"{STORAGE}-{pc}"]},
+                ],
+                "pricings": [
+                    {"capacities": ["renew"], "mode": "default", "interval": 1, "intervalUnit": "month", "price": 4200000000},
+                    {"capacities": ["installation"], "mode": "default", "interval": 0, "intervalUnit": "none", "price": 0},
+                ],
+            } for pc in plans],
+            "addons": [],
+        }
+
+    def availabilities(self, plan: str | None) -> list:
+        with self.lock:
+            items = [(pc, dict(dcs)) for pc, dcs in self.stock.items() if plan in (None, pc)]
+        return [{
+            "fqn": f"{pc}.{MEMORY}.{STORAGE}",
+            "planCode": pc,
+            "memory": MEMORY,
+            "storage": STORAGE,
+            "server": pc,
+            "datacenters": [{"datacenter": dc, "availability": a} for dc, a in dcs.items()],
+        } for pc, dcs in items]
+
+    def cart(self, method: str, p: list[str], q: dict, body: dict) -> tuple[int, object]:
+        if not p and method == "POST":
+            with self.lock:
+                self.seq += 1
+                cid = f"cart-{self.seq}"
+                self.carts[cid] = {"items": [], "purchase": False}
+            return 200, {"cartId": cid, "expire": "2099-01-01T00:00:00+00:00"}
+        with self.lock:
+            cart = self.carts.get(p[0]) if p else None
+        if cart is None:
+            return 404, {"message": "cart not found"}
+        rest = p[1:]
+        if not rest:
+            if method == "DELETE":
+                with self.lock:
+                    self.carts.pop(p[0], None)
+                return 200, None
+            return 200, {"cartId": p[0], "items": [{
+                "itemId": i + 1, "planCode": it, "description": it,
+                "prices": {"withTax": {"value": 50.4, "currencyCode": "EUR"},
+                           "withoutTax": {"value": 42.0, "currencyCode": "EUR"}},
+            } for i, it in enumerate(cart["items"])]}
+        if rest == ["assign"]:
+            # 下单流程先 assign 再加商品，询价流程反之：据此区分下单购物车
+            if not cart["items"]:
+                cart["purchase"] = True
+            return 200, None
+        if rest == ["eco"] and method == "POST":
+            plan = str(body.get("planCode") or "")
+            cart["items"].append(plan)
+            if cart["purchase"]:
+                self.rec.mark(plan, "cart")
+            return 200, {"itemId": len(cart["items"]), "cartId": p[0]}
+        if rest[:1] == ["item"] and rest[2:] == ["requiredConfiguration"]:
+            return 200, [{"label": "dedicated_datacenter", "required": True},
+                         {"label": "dedicated_os", "required": True},
+                         {"label": "region", "required": True}]
+        if rest[:1] == ["item"] and rest[2:] == ["configuration"]:
+            return 200, {"id": 1, "label": body.get("label"), "value": body.get("value")}
+        if rest == ["eco", "options"]:
+            if method == "POST":
+                return 200, {"itemId": len(cart["items"]) + 1}
+            pc = q.get("planCode", "")
+            return 200, [{"planCode": f"{fam}-{pc}", "duration": "P1M", "pricingMode": "default", "family": name}
+                         for name, fam in (("memory", MEMORY), ("storage", STORAGE))]
+        if rest == ["summary"]:
+            return 200, {"prices": {"withTax": {"value": 50.4, "currencyCode": "EUR"},
+                                    "withoutTax": {"value": 42.0, "currencyCode": "EUR"},
+                                    "tax": {"value": 8.4, "currencyCode": "EUR"}}}
+        if rest == ["checkout"] and method == "POST":
+            for plan in cart["items"]:
+                self.rec.mark(plan, "checkout")
+            with self.lock:
+                self.seq += 1
+                oid = 900000 + self.seq
+            return 200, {"orderId": oid, "url": f"https://example.invalid/order/{oid}"}
+        return 404, {"message": "stand-in: no cart route " + "/".join(rest)}
+
+
+# ── 场景驱动 ───────────────────────────────────────────────────────────────
+
+def call_json(base: str, method: str, path: str, body: dict | None = None, timeout: float = 30) -> tuple[int, object]:
+    data = json.dumps(body).encode("utf-8") if body is not None else None
+    r = urllib.request.Request(
+        base + path,
+        data=data,
+        method=method,
+        headers={
+            "Content-Type": "application/json",
+            "X-API-Key": API_KEY,
+            "X-Request-Time": str(int(time.time() * 1000)),
+        },
+    )
+    try:
+        with urllib.request.urlopen(r, timeout=timeout) as resp:
+            raw = resp.read()
+            return resp.status, json.loads(raw) if raw else None
+    except urllib.error.HTTPError as e:
+        return e.code, None
+    except (urllib.error.URLError, OSError, json.JSONDecodeError):
+        return 0, None
+
+
+def percentile(xs: list[float], p: float) -> float:
+    s = sorted(xs)
+    if not s:
+        return 0.0
+    k = min(len(s) - 1, max(0, int(round(p / 100 * (len(s) - 1)))))
+    return s[k]
+
+
+def start_backend(args: argparse.Namespace, scratch: str, tg: TelegramStandIn) -> tuple[subprocess.Popen, str, object]:
+    base = f"http://127.0.0.1:{args.port}"
+    env = dict(os.environ)
+    env.update({
+        "PORT": str(args.port),
+        "LISTEN_HOST": "127.0.0.1",
+        "DATA_DIR": os.path.join(scratch, "data"),
+        "API_SECRET_KEY": API_KEY,
+        "ENABLE_API_KEY_AUTH": "true",
+        "TELEGRAM_API_BASE": tg.base,
+        "TG_WEBHOOK_SECRET": secrets.token_hex(16),
+        "GIN_MODE": "release",
+    })
+    env.pop("CLUSTER_MODE", None)
+    log = open(os.path.join(scratch, "backend.out"), "wb")
+    # cwd 放在临时目录，避免读到 backend/.env
+    proc = subprocess.Popen([os.path.abspath(args.binary)], env=env, cwd=scratch, stdout=log, stderr=subprocess.STDOUT)
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"后端启动即退出，见 {log.name}")
+        code, data = call_json(base, "GET", "/api/health", timeout=2)
+        if code == 200 and isinstance(data, dict) and data.get("ready"):
+            return proc, base, log
+        time.sleep(0.3)
+    raise RuntimeError("后端 60 秒内未就绪")
+
+
+def configure(base: str, ovh: OvhStandIn) -> None:
+    code, data = call_json(base, "POST", "/api/settings", {"tgToken": BOT_TOKEN, "tgChatId": str(CHAT_ID)})
+    if code != 200:
+        raise RuntimeError(f"保存 Telegram 设置失败: {code} {data}")
+    code, data = call_json(base, "POST", "/api/accounts", {
+        "name": "bench", "zone": "IE", "endpoint": ovh.base + "/1.0", "setDefault": True,
+        "appKey": "bench-ak", "appSecret": "bench-as", "consumerKey": "bench-ck",
+    })
+    if code != 200:
+        raise RuntimeError(f"添加替身账户失败: {code} {data}")
+    code, data = call_json(base, "POST", "/api/telegram/set-webhook", {"webhook_url": base})
+    if code != 200:
+        raise RuntimeError(f"设置 webhook 失败: {code} {data}")
+
+
+def wait_baseline(base: str, plan: str, dc: str, timeout: float) -> bool:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        code, data = call_json(base, "GET", "/api/monitor/subscriptions")
+        if code == 200 and isinstance(data, list):
+            for s in data:
+                if isinstance(s, dict) and s.get("planCode") == plan:
+                    if any(k.startswith(dc + "|") for k in (s.get("lastStatus") or {})):
+                        return True
+        time.sleep(0.5)
+    return False
+
+
+def run_button(args: argparse.Namespace, base: str, tg: TelegramStandIn, ovh: OvhStandIn,
+               rec: Recorder, plan: str) -> dict[str, float] | str:
+    ovh.set_stock(plan, args.dc, "unavailable")
+    rec.events.setdefault(plan, {})
+    code, _ = call_json(base, "POST", "/api/monitor/subscriptions",
+                        {"planCode": plan, "datacenters": [args.dc], "notifyAvailable": True, "notifyUnavailable": False})
+    if code != 200:
+        return f"建订阅失败 ({code})"
+    try:
+        if not wait_baseline(base, plan, args.dc, args.timeout):
+            return "监控未在超时内完成首轮检查"
+        rec.mark(plan, "t0")
+        ovh.set_stock(plan, args.dc, "1H-high")
+        t0 = rec.wait(plan, "t0", 0)
+        t_alert = rec.wait(plan, "alert", args.timeout)
+        if t_alert is None:
+            return "未收到补货通知"
+        alert = rec.payload(plan, "alert")
+        if args.tap_delay_ms > 0:
+            time.sleep(args.tap_delay_ms / 1000)
+        rec.mark(plan, "tap")
+        status, took = tg.deliver_callback(plan, alert["message_id"], alert["callback_data"])
+        if status != 200:
+            return f"webhook 投递失败 ({status})"
+        t_ack = rec.wait(plan, "ack", args.timeout)
+        if t_ack is None:
+            return "未收到 answerCallbackQuery"
+        if rec.payload(plan, "ack") != "已添加到队列！":
+            return f"入队失败: {rec.payload(plan, 'ack')}"
+        t_tap = rec.wait(plan, "tap", 0)
+        t_cart = rec.wait(plan, "cart", args.timeout)
+        t_checkout = rec.wait(plan, "checkout", args.timeout) if t_cart else None
+        if t_checkout is None:
+            return "未在超时内 checkout"
+        t_notify = rec.wait(plan, "notify", 10)
+        out = {
+            "alert": t_alert - t0,
+            "tap": t_tap - t_alert,
+            "webhook": took,
+            "ack": t_ack - t_tap,
+            "cart": t_cart - t_ack,
+            "checkout": t_checkout - t_cart,
+            "total": t_checkout - t0,
+        }
+        if t_notify is not None:
+            out["notify"] = t_notify - t_checkout
+        return out
+    finally:
+        call_json(base, "DELETE", "/api/monitor/subscriptions/" + urllib.parse.quote(plan))
+        ovh.set_stock(plan, args.dc, "unavailable")
+
+
+def run_text(args: argparse.Namespace, base: str, tg: TelegramStandIn, ovh: OvhStandIn,
+             rec: Recorder, plan: str) -> dict[str, float] | str:
+    ovh.set_stock(plan, args.dc, "1H-high")
+    rec.events.setdefault(plan, {})
+    rec.mark(plan, "t0")
+    status, took = tg.deliver_text(plan, f"{plan} {args.dc}")
+    t0 = rec.wait(plan, "t0", 0)
+    if status != 200:
+        return f"webhook 投递失败 ({status})"
+    try:
+        t_ack = rec.wait(plan, "ack", args.timeout)
+        if t_ack is None:
+            return "未收到入队回复"
+        t_cart = rec.wait(plan, "cart", args.timeout)
+        t_checkout = rec.wait(plan, "checkout", args.timeout) if t_cart else None
+        if t_checkout is None:
+            return f"未在超时内 checkout（回复: {str(rec.payload(plan, 'ack'))[:60]}）"
+        t_notify = rec.wait(plan, "notify", 10)
+        out = {"webhook": took, "ack": t_ack - t0, "cart": t_cart - t_ack,
+               "checkout": t_checkout - t_cart, "total": t_checkout - t0}
+        if t_notify is not None:
+            out["notify"] = t_notify - t_checkout
+        return out
+    finally:
+        ovh.set_stock(plan, args.dc, "unavailable")
+
+
+def report(samples: list[dict[str, float]], stages: list[tuple[str, str]]) -> dict:
+    rows = [("webhook", "webhook 投递 ACK")] + stages
+    summary = {}
+    print(f"\n{'阶段':<18} {'n':>4} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}  (ms)")
+    for key, label in rows:
+        xs = [s[key] * 1000 for s in samples if key in s]
+        if not xs:
+            continue
+        st = {"n": len(xs), "p50": percentile(xs, 50), "p95": percentile(xs, 95),
+              "p99": percentile(xs, 99), "max": max(xs)}
+        summary[key] = st
+        print(f"{label:<18} {st['n']:>4} {st['p50']:>9.1f} {st['p95']:>9.1f} {st['p99']:>9.1f} {st['max']:>9.1f}")
+    return summary
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Telegram 一键下单端到端延迟基准（本地 Telegram / OVH 替身）")
+    ap.add_argument("--binary", required=True, help="后端可执行文件（go build 产物）")
+    ap.add_argument("--mode", choices=("button", "text"), default="button", help="button=补货通知按钮；text=free-form 文本下单")
+    ap.add_argument("--iterations", type=int, default=20)
+    ap.add_argument("--port", type=int, default=20300, help="后端监听端口")
+    ap.add_argument("--dc", default="gra")
+    ap.add_argument("--ovh-latency-ms", type=float, default=50, help="OVH 替身每个请求的固定延迟")
+    ap.add_argument("--tap-delay-ms", type=float, default=0, help="收到通知到点击按钮的模拟间隔")
+    ap.add_argument("--timeout", type=float, default=30, help="每个阶段的等待上限（秒）")
+    ap.add_argument("--json", help="把每轮样本与汇总写到该文件")
+    ap.add_argument("--keep", action="store_true", help="保留临时 DATA_DIR 与后端日志")
+    args = ap.parse_args()
+
+    rec = Recorder()
+    tg = TelegramStandIn(rec)
+    ovh = OvhStandIn(rec, args.ovh_latency_ms / 1000)
+    for srv in (tg.server, ovh.server):
+        threading.Thread(target=srv.serve_forever, daemon=True).start()
+    scratch = tempfile.mkdtemp(prefix="tg-bench-")
+    print(f"Telegram 替身 {tg.base}  OVH 替身 {ovh.base}  临时目录 {scratch}")
+
+    proc = None
+    log = None
+    samples: list[dict[str, float]] = []
+    failures: list[str] = []
+    try:
+        proc, base, log = start_backend(args, scratch, tg)
+        configure(base, ovh)
+        run = run_button if args.mode == "button" else run_text
+        for i in range(args.iterations):
+            # 每轮新型号：避开入队去重（同配置 120 秒内成功过即拒绝）
+            plan = f"24bench{i:03d}"
+            r = run(args, base, tg, ovh, rec, plan)
+            if isinstance(r, str):
+                failures.append(f"{plan}: {r}")
+                print(f"  [{i + 1}/{args.iterations}] {plan} FAIL {r}")
+            else:
+                samples.append(r)
+                print(f"  [{i + 1}/{args.iterations}] {plan} 总计 {r['total'] * 1000:.0f} ms")
+            call_json(base, "DELETE", "/api/queue/clear")
+    except (RuntimeError, KeyboardInterrupt) as e:
+        failures.append(str(e) or "中断")
+        print(f"\n{e or '中断'}")
+    finally:
+        if proc is not None and proc.poll() is None:
+            proc.send_signal(signal.SIGTERM)
+            try:
+                proc.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+        if log is not None:
+            log.close()
+        tg.server.shutdown()
+        ovh.server.shutdown()
+
+    summary = report(samples, BUTTON_STAGES if args.mode == "button" else TEXT_STAGES)
+    if failures:
+        print(f"\n失败 {len(failures)} 轮:")
+        for f in failures:
+            print("  " + f)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"mode": args.mode, "ovhLatencyMs": args.ovh_latency_ms, "samples": samples,
+                       "summary": summary, "failures": failures}, f, ensure_ascii=False, indent=2)
+    if args.keep or failures:
+        print(f"\n保留临时目录: {scratch}")
+    else:
+        shutil.rmtree(scratch, ignore_errors=True)
+    return 1 if failures or not samples else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())